@@ -0,0 +1,99 @@
+"""
+Abaco Risk Scoring Benchmark
+Per-row cost of AbacoRiskModel batch scoring versus the scalar scorer
+on a synthetic loan tape
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.modeling import (  # noqa: E402
+    AbacoRiskModel,
+    DAYS_IN_DEFAULT,
+    INTEREST_RATE_APR,
+    LOAN_STATUS,
+    OUTSTANDING_LOAN_VALUE,
+)
+
+
+def synthetic_tape(rows: int, seed: int = 7) -> pd.DataFrame:
+    """Loan tape with Abaco-like value ranges and a share of missing values."""
+    rng = np.random.default_rng(seed)
+    days = rng.choice([0, 0, 0, 5, 30, 75, 120, 200], size=rows) + rng.integers(
+        0, 10, rows
+    )
+    days = pd.array(days, dtype="Int64")
+    days[rng.random(rows) < 0.02] = pd.NA
+    rate = rng.uniform(0.28, 0.38, rows)
+    rate[rng.random(rows) < 0.02] = np.nan
+    return pd.DataFrame(
+        {
+            DAYS_IN_DEFAULT: days,
+            LOAN_STATUS: rng.choice(
+                ["Current", "Complete", "Default", "Unknown"],
+                size=rows,
+                p=[0.3, 0.6, 0.08, 0.02],
+            ),
+            INTEREST_RATE_APR: rate,
+            OUTSTANDING_LOAN_VALUE: rng.gamma(1.5, 8000.0, rows),
+        }
+    )
+
+
+def run_benchmark(rows: int, scalar_sample: int) -> Dict:
+    """Time batch scoring on ``rows`` loans and the scalar scorer on a sample."""
+    model = AbacoRiskModel()
+    tape = synthetic_tape(rows)
+
+    started = time.perf_counter()
+    batch = model.score_frame(tape)
+    batch_seconds = time.perf_counter() - started
+
+    sample = tape.head(scalar_sample)
+    started = time.perf_counter()
+    scalar = sample.apply(model.calculate_abaco_risk_score, axis=1)
+    scalar_seconds = time.perf_counter() - started
+
+    batch_per_row = batch_seconds / rows
+    scalar_per_row = scalar_seconds / len(sample)
+    return {
+        "rows": rows,
+        "batch_seconds": round(batch_seconds, 4),
+        "batch_ns_per_row": round(batch_per_row * 1e9, 1),
+        "scalar_sample_rows": len(sample),
+        "scalar_seconds": round(scalar_seconds, 4),
+        "scalar_ns_per_row": round(scalar_per_row * 1e9, 1),
+        "speedup": round(scalar_per_row / batch_per_row, 1),
+        "identical_on_sample": bool(
+            np.array_equal(scalar.to_numpy(), batch.head(len(sample)).to_numpy())
+        ),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument(
+        "--scalar-sample",
+        type=int,
+        default=20_000,
+        help="Rows scored with the scalar version to estimate its per-row cost",
+    )
+    args = parser.parse_args()
+
+    report = run_benchmark(args.rows, args.scalar_sample)
+    print(json.dumps(report, indent=2))
+    return 0 if report["identical_on_sample"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -41,7 +41,9 @@ class AbacoCore:
             "last_active_date",
         ]
         for col in date_columns:
-            if col in result_df.columns:
+            if col in result_df.columns and not pd.api.types.is_datetime64_any_dtype(
+                result_df[col]
+            ):
                 try:
                     result_df[col] = pd.to_datetime(result_df[col], errors="coerce")
                     logger.debug(f"Standardized date column: {col}")
@@ -53,7 +55,8 @@ class AbacoCore:
         for col in numeric_columns:
             if col in result_df.columns:
                 try:
-                    result_df[col] = pd.to_numeric(result_df[col], errors="coerce")
+                    if not pd.api.types.is_numeric_dtype(result_df[col]):
+                        result_df[col] = pd.to_numeric(result_df[col], errors="coerce")
                     # Apply validation rules
                     if col == "loan_amount":
                         min_amount = self.config["validation_rules"]["min_loan_amount"]
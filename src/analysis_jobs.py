@@ -0,0 +1,210 @@
+"""
+In-process job manager for portfolio analysis runs
+Runs analyses on a bounded thread pool with a warm, long-lived processor,
+tracks them by job ID and coalesces identical concurrent triggers
+"""
+
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+ACTIVE_STATES = frozenset({JOB_QUEUED, JOB_RUNNING})
+
+DEFAULT_JOB_KEY = "portfolio_analysis"
+
+
+class JobQueueFullError(RuntimeError):
+    """Too many analysis jobs are already queued or running"""
+
+
+@dataclass
+class AnalysisJob:
+    """One analysis run and its outcome"""
+
+    job_id: str
+    key: str
+    status: str = JOB_QUEUED
+    submitted_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    coalesced_requests: int = 0
+
+    @property
+    def duration_seconds(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        end = self.finished_at or datetime.now()
+        return round((end - self.started_at).total_seconds(), 3)
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        """JSON-friendly view of the job"""
+        data = {
+            "job_id": self.job_id,
+            "key": self.key,
+            "status": self.status,
+            "submitted_at": self.submitted_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "duration_seconds": self.duration_seconds,
+            "coalesced_requests": self.coalesced_requests,
+            "error": self.error,
+        }
+        if include_result:
+            data["result"] = self.result
+        return data
+
+
+def _default_processor_factory():
+    """Create the portfolio processor lazily so importing this module is cheap"""
+    from src.process_portfolio import PortfolioProcessor
+
+    return PortfolioProcessor()
+
+
+class AnalysisJobManager:
+    """
+    Bounded, in-process runner for portfolio analysis jobs.
+
+    All jobs share one long-lived processor whose datasets stay loaded between
+    runs (see ``PortfolioProcessor.load_data``), and ``warm`` loads them ahead
+    of the first trigger. While a job for a key is queued or running, further
+    submissions for that key return the same job instead of starting a
+    duplicate analysis.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_active: int = 8,
+        max_history: int = 100,
+        processor_factory: Callable[[], Any] = _default_processor_factory,
+    ):
+        self.max_active = max_active
+        self.max_history = max_history
+        self._processor_factory = processor_factory
+        self._processor = None
+        self._processor_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="analysis-job"
+        )
+        self._jobs: "OrderedDict[str, AnalysisJob]" = OrderedDict()
+        self._active: Dict[str, AnalysisJob] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def processor(self):
+        """Shared processor, created on first use"""
+        with self._processor_lock:
+            if self._processor is None:
+                self._processor = self._processor_factory()
+            return self._processor
+
+    def warm(self) -> Future:
+        """Create the processor and load its datasets in the background"""
+        return self._executor.submit(lambda: self.processor.load_data())
+
+    def submit(self, key: str = DEFAULT_JOB_KEY) -> Tuple[AnalysisJob, bool]:
+        """
+        Queue an analysis, or join the identical one already in flight.
+
+        Args:
+            key: Identity of the analysis; concurrent submissions with the
+                same key are coalesced into one job
+
+        Returns:
+            Tuple of (job, created); ``created`` is False when the request
+            was coalesced into a job already in flight
+
+        Raises:
+            JobQueueFullError: If ``max_active`` jobs are queued or running
+        """
+        with self._lock:
+            active = self._active.get(key)
+            if active is not None and active.status in ACTIVE_STATES:
+                active.coalesced_requests += 1
+                logger.info(f"Coalesced analysis trigger into job {active.job_id}")
+                return active, False
+
+            if len(self._active) >= self.max_active:
+                raise JobQueueFullError(
+                    f"{len(self._active)} analysis jobs already queued or running"
+                )
+
+            job = AnalysisJob(job_id=uuid.uuid4().hex, key=key)
+            self._jobs[job.job_id] = job
+            self._active[key] = job
+            self._evict_finished()
+
+        self._executor.submit(self._run, job)
+        logger.info(f"Queued analysis job {job.job_id}")
+        return job, True
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        """Return a job by ID, or None if unknown or evicted"""
+        return self._jobs.get(job_id)
+
+    def list_jobs(self, limit: int = 20) -> List[AnalysisJob]:
+        """Most recently submitted jobs first"""
+        with self._lock:
+            return list(reversed(self._jobs.values()))[:limit]
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Stop accepting jobs and release the worker threads"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, job: AnalysisJob) -> None:
+        job.status, job.started_at = JOB_RUNNING, datetime.now()
+        try:
+            result = self.processor.process_portfolio()
+            if isinstance(result, dict) and result.get("status") == "error":
+                job.status = JOB_FAILED
+                job.error = result.get("message", "Analysis failed")
+            else:
+                job.status = JOB_SUCCEEDED
+            job.result = result
+        except Exception as e:
+            logger.error(f"Analysis job {job.job_id} failed: {e}")
+            job.status, job.error = JOB_FAILED, str(e)
+        finally:
+            job.finished_at = datetime.now()
+            with self._lock:
+                if self._active.get(job.key) is job:
+                    del self._active[job.key]
+            logger.info(
+                f"Analysis job {job.job_id} {job.status} in {job.duration_seconds}s"
+            )
+
+    def _evict_finished(self) -> None:
+        """Drop the oldest finished jobs beyond ``max_history``"""
+        excess = len(self._jobs) - self.max_history
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[job_id].status not in ACTIVE_STATES:
+                del self._jobs[job_id]
+                excess -= 1
+
+
+__all__ = [
+    "AnalysisJob",
+    "AnalysisJobManager",
+    "JobQueueFullError",
+    "DEFAULT_JOB_KEY",
+    "JOB_QUEUED",
+    "JOB_RUNNING",
+    "JOB_SUCCEEDED",
+    "JOB_FAILED",
+]
@@ -8,10 +8,42 @@ import numpy as np
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
+from pathlib import Path
+from functools import cached_property
 import logging
 
+try:
+    from src.analytics.kpi_history import KPIHistoryStore
+except ImportError:
+    from kpi_history import KPIHistoryStore
+
 logger = logging.getLogger(__name__)
 
+LOAN_PORTFOLIO = "loan_portfolio"
+PAYMENT_SCHEDULE = "payment_schedule"
+HISTORIC_PAYMENTS = "historic_payments"
+CUSTOMER_DATA = "customer_data"
+ACTIVE_STATUS = "active"
+NPL_DPD_THRESHOLD = 180
+# KPI history location when the config manager does not provide one
+DEFAULT_HISTORY_DIR = Path("abaco_runtime/kpi_history")
+
+# KPIs whose business definitions have not been signed off yet. They are
+# reported with ``provisional=True`` and kept out of the KPI history, so they
+# never drive trends or anomaly flags.
+PROVISIONAL_KPIS = frozenset(
+    {
+        "portfolio_yield",
+        "days_past_due_avg",
+        "new_client_acquisition",
+        "portfolio_growth",
+        "client_retention",
+        "net_interest_margin",
+        "return_on_assets",
+        "cost_per_acquisition",
+    }
+)
+
 
 @dataclass
 class KPIResult:
@@ -27,6 +59,182 @@ class KPIResult:
     trend: str
     status: str
     description: str
+    anomaly: bool = False
+    provisional: bool = False
+
+
+class KPIContext:
+    """
+    Building blocks shared by the KPIs of one run.
+
+    The active-loan mask, per-customer and per-loan aggregates, last DPD per
+    loan, month-parsed date columns and the month's targets are computed on
+    first use and then reused by every KPI, so a full run reads each dataset
+    once instead of once per KPI.
+    """
+
+    def __init__(
+        self, datasets: Dict[str, pd.DataFrame], data_loader=None, config=None
+    ):
+        self.datasets = datasets
+        self.data_loader = data_loader
+        self.config = config
+        self.current_month = datetime.now().strftime("%Y-%m")
+        self._target_month = datetime.now().strftime("%Y-%m-01")
+        self._month_codes: Dict[Tuple[str, str], np.ndarray] = {}
+        self._monthly_totals: Dict[Tuple[str, str, str], pd.Series] = {}
+
+    @cached_property
+    def loans(self) -> pd.DataFrame:
+        return self.datasets[LOAN_PORTFOLIO]
+
+    @cached_property
+    def active_mask(self) -> np.ndarray:
+        """Rows of the loan portfolio with an active status"""
+        return (self.loans["loan_status"] == ACTIVE_STATUS).to_numpy(dtype=bool)
+
+    @cached_property
+    def active_loans(self) -> pd.DataFrame:
+        return self.loans[self.active_mask]
+
+    @cached_property
+    def active_principal(self) -> float:
+        return self.active_loans["principal_amount"].sum()
+
+    @cached_property
+    def customers(self) -> pd.DataFrame:
+        """
+        Per customer: total and active principal, number of active loans and
+        the month code of their first origination
+        """
+        loans = self.loans
+        principal = loans["principal_amount"]
+        columns = {
+            "principal": principal,
+            "active_principal": principal.where(self.active_mask, 0),
+            "active_loans": self.active_mask.astype(np.int64),
+        }
+        aggregations = {name: "sum" for name in columns}
+        if "origination_date" in loans:
+            columns["first_month"] = self.month_codes(
+                LOAN_PORTFOLIO, "origination_date"
+            )
+            aggregations["first_month"] = "min"
+        frame = pd.DataFrame(columns, index=loans.index)
+        return frame.groupby(loans["customer_id"]).agg(aggregations)
+
+    @cached_property
+    def _loan_codes(self) -> Dict[str, np.ndarray]:
+        """Integer loan codes shared by all loan-level datasets (one factorize)"""
+        names = [
+            name
+            for name in (LOAN_PORTFOLIO, PAYMENT_SCHEDULE, HISTORIC_PAYMENTS)
+            if self.datasets.get(name) is not None and "loan_id" in self.datasets[name]
+        ]
+        columns = [self.datasets[name]["loan_id"] for name in names]
+        if not columns:
+            return {}
+        codes = pd.factorize(pd.concat(columns, ignore_index=True))[0]
+        bounds = np.cumsum([0] + [len(column) for column in columns])
+        return {
+            name: codes[start:end]
+            for name, start, end in zip(names, bounds[:-1], bounds[1:])
+        }
+
+    def loan_codes(self, dataset: str) -> np.ndarray:
+        """Loan code of each row of ``dataset`` (-1 where the loan ID is missing)"""
+        return self._loan_codes[dataset]
+
+    def _last_per_loan(self, dataset: str, column: str) -> pd.Series:
+        codes = self.loan_codes(dataset)
+        known = codes >= 0
+        return self.datasets[dataset][column][known].groupby(codes[known]).last()
+
+    @cached_property
+    def latest_balances(self) -> pd.Series:
+        """Most recent remaining balance per loan code in the payment schedule"""
+        return self._last_per_loan(PAYMENT_SCHEDULE, "remaining_balance")
+
+    @cached_property
+    def last_dpd(self) -> pd.Series:
+        """Most recent days past due per loan code in the payment history"""
+        return self._last_per_loan(HISTORIC_PAYMENTS, "days_past_due")
+
+    @cached_property
+    def active_dpd(self) -> np.ndarray:
+        """Last DPD of each active loan (0 without payment history)"""
+        if self.datasets.get(HISTORIC_PAYMENTS) is None:
+            return np.zeros(int(self.active_mask.sum()))
+        codes = self.loan_codes(LOAN_PORTFOLIO)[self.active_mask]
+        dpd = self.last_dpd.reindex(codes)
+        return pd.to_numeric(dpd, errors="coerce").fillna(0).to_numpy(dtype=float)
+
+    @cached_property
+    def active_interest(self) -> np.ndarray:
+        """Annual interest of each active loan (rate x principal)"""
+        loans = self.active_loans
+        return (loans["interest_rate"] * loans["principal_amount"]).to_numpy(
+            dtype=float
+        )
+
+    @property
+    def current_month_code(self) -> int:
+        return int(np.datetime64(self.current_month, "M").astype(np.int64))
+
+    def month_codes(self, dataset: str, column: str) -> np.ndarray:
+        """Months since 1970-01 of a date column, parsed once (NaN if missing)"""
+        key = (dataset, column)
+        if key not in self._month_codes:
+            # Parse each distinct date once; dates repeat heavily
+            positions, dates = pd.factorize(self.datasets[dataset][column])
+            parsed = pd.to_datetime(pd.Series(dates), errors="coerce")
+            values = parsed.to_numpy(dtype="datetime64[ns]")
+            months = values.astype("datetime64[M]").astype(np.int64).astype(float)
+            months = np.append(np.where(np.isnat(values), np.nan, months), np.nan)
+            self._month_codes[key] = months[positions]
+        return self._month_codes[key]
+
+    def monthly_total(self, dataset: str, date_column: str, column: str) -> pd.Series:
+        """Sum of ``column`` per month code of ``date_column``"""
+        key = (dataset, date_column, column)
+        if key not in self._monthly_totals:
+            months = self.month_codes(dataset, date_column)
+            values = self.datasets[dataset][column]
+            self._monthly_totals[key] = values.groupby(months).sum()
+        return self._monthly_totals[key]
+
+    def current_month_total(self, dataset: str, date_column: str, column: str) -> float:
+        """Sum of ``column`` over rows dated in the current month"""
+        totals = self.monthly_total(dataset, date_column, column)
+        return totals.get(float(self.current_month_code), 0.0)
+
+    @cached_property
+    def month_targets(self) -> Optional[pd.DataFrame]:
+        """This month's rows of the Q4 targets table, loaded once per run"""
+        if self.data_loader is None:
+            return None
+        try:
+            q4_targets = self.data_loader.load_dataset("q4_targets")
+            if q4_targets is not None:
+                return q4_targets[q4_targets["Month"] == self._target_month]
+        except Exception as e:
+            logger.debug(f"Could not load Q4 targets: {e}")
+        return None
+
+    @cached_property
+    def configured_targets(self) -> Dict[str, Any]:
+        return self.config.get_kpi_targets() if self.config is not None else {}
+
+    def target(self, kpi_name: str, default: float) -> float:
+        """KPI target from the Q4 targets table, the configuration or ``default``"""
+        month_targets = self.month_targets
+        if (
+            month_targets is not None
+            and not month_targets.empty
+            and kpi_name in month_targets.columns
+        ):
+            return float(month_targets[kpi_name].iloc[0])
+        return self.configured_targets.get(kpi_name, default)
 
 
 class CommercialLendingKPIEngine:
@@ -35,17 +243,79 @@ class CommercialLendingKPIEngine:
     Implements all promised KPIs with real business logic
     """
 
-    def __init__(self, data_loader, config_manager):
+    def __init__(
+        self,
+        data_loader,
+        config_manager,
+        history_store: Optional[KPIHistoryStore] = None,
+        persist_history: bool = True,
+    ):
+        """
+        Args:
+            data_loader: Loader serving the KPI datasets
+            config_manager: Source of KPI targets and the KPI history directory
+            history_store: Explicit KPI history store to use
+            persist_history: Set to False to keep the default history in
+                memory only (each process then starts without history)
+        """
         self.data_loader = data_loader
         self.config = config_manager
         self.calculation_cache = {}
-
-    def calculate_all_kpis(self) -> Dict[str, KPIResult]:
-        """Calculate comprehensive KPI suite for commercial lending"""
+        # Past runs' values; trends and anomaly flags read its rolling stats
+        if history_store is None:
+            path = self._history_dir() if persist_history else None
+            history_store = KPIHistoryStore(path)
+        self.history = history_store
+        self._run_context: Optional[KPIContext] = None
+
+    def _history_dir(self) -> Path:
+        """KPI history directory from the config manager, else the default"""
+        getter = getattr(self.config, "get_kpi_history_dir", None)
+        directory = getter() if callable(getter) else None
+        if isinstance(directory, (str, Path)):
+            return Path(directory)
+        return DEFAULT_HISTORY_DIR
+
+    def _context(self, datasets: Dict[str, pd.DataFrame]) -> KPIContext:
+        """The current run's context, or a fresh one for other datasets"""
+        context = self._run_context
+        if context is None or context.datasets is not datasets:
+            context = KPIContext(datasets, self.data_loader, self.config)
+        return context
+
+    def calculate_all_kpis(self, reference_date=None) -> Dict[str, KPIResult]:
+        """
+        Calculate comprehensive KPI suite for commercial lending
+
+        The run's values are appended to the KPI history under
+        ``reference_date`` (today by default) after trends are computed.
+        Provisional KPIs (``PROVISIONAL_KPIS``) are flagged and not recorded.
+        """
         logger.info("🔄 Calculating complete Commercial-View KPI suite...")
 
         # Load all required datasets
         datasets = self._load_and_validate_datasets()
+        # Shared aggregates and targets for every KPI of this run
+        self._run_context = KPIContext(datasets, self.data_loader, self.config)
+        try:
+            kpi_results = self._calculate_kpi_suite(datasets)
+        finally:
+            self._run_context = None
+
+        recorded = {}
+        for kpi_name, result in kpi_results.items():
+            if kpi_name in PROVISIONAL_KPIS:
+                result.provisional = True
+                continue
+            stats = self.history.stats(kpi_name)
+            result.anomaly = stats is not None and stats.is_anomaly(result.value)
+            recorded[kpi_name] = result.value
+        self.history.append_run(recorded, reference_date=reference_date)
+        return kpi_results
+
+    def _calculate_kpi_suite(
+        self, datasets: Dict[str, pd.DataFrame]
+    ) -> Dict[str, KPIResult]:
 
         kpi_results = {
             # Portfolio KPIs
@@ -77,25 +347,12 @@ class CommercialLendingKPIEngine:
         self, datasets: Dict[str, pd.DataFrame]
     ) -> KPIResult:
         """Calculate total outstanding portfolio value"""
-        loan_data = datasets["loan_portfolio"]
-        payment_schedule = datasets.get("payment_schedule")
-
-        # Get active loans
-        active_loans = loan_data[loan_data["loan_status"] == "active"]
-
-        if payment_schedule is not None:
-            # Use most recent EOM balances from payment schedule
-            latest_balances = payment_schedule.groupby("loan_id")[
-                "remaining_balance"
-            ].last()
-            outstanding_value = latest_balances.sum()
-        else:
-            # Fallback to principal amounts
-            outstanding_value = active_loans["principal_amount"].sum()
+        context = self._context(datasets)
+        outstanding_value = self._outstanding_value(context)
 
         # Get target from Q4 targets
         target_value = self._get_target_value(
-            "outstanding_portfolio", 7800000
+            "outstanding_portfolio", 7800000, context
         )  # Default $7.8M
 
         return KPIResult(
@@ -111,23 +368,29 @@ class CommercialLendingKPIEngine:
             description="Total outstanding principal balance across active commercial loans",
         )
 
+    def _outstanding_value(self, context: KPIContext) -> float:
+        """Latest schedule balances, or active principal without a schedule"""
+        if context.datasets.get(PAYMENT_SCHEDULE) is not None:
+            # Use most recent EOM balances from payment schedule
+            return context.latest_balances.sum()
+        # Fallback to principal amounts
+        return context.active_principal
+
     def _calculate_weighted_apr(self, datasets: Dict[str, pd.DataFrame]) -> KPIResult:
         """Calculate portfolio-weighted average APR"""
-        loan_data = datasets["loan_portfolio"]
-
-        active_loans = loan_data[loan_data["loan_status"] == "active"]
+        context = self._context(datasets)
 
-        if len(active_loans) == 0:
+        if len(context.active_loans) == 0:
             weighted_apr = 0.0
         else:
             # Calculate weighted average: sum(rate * balance) / sum(balance)
-            total_weighted = (
-                active_loans["interest_rate"] * active_loans["principal_amount"]
-            ).sum()
-            total_balance = active_loans["principal_amount"].sum()
+            total_weighted = context.active_interest.sum()
+            total_balance = context.active_principal
             weighted_apr = total_weighted / total_balance if total_balance > 0 else 0.0
 
-        target_apr = self._get_target_value("weighted_apr", 0.185)  # 18.5% target
+        target_apr = self._get_target_value(
+            "weighted_apr", 0.185, context
+        )  # 18.5% target
 
         return KPIResult(
             name="Weighted Average APR",
@@ -144,18 +407,14 @@ class CommercialLendingKPIEngine:
 
     def _calculate_npl_rate(self, datasets: Dict[str, pd.DataFrame]) -> KPIResult:
         """Calculate Non-Performing Loan (NPL) rate for loans ≥180 days past due"""
-        historic_payments = datasets["historic_payments"]
-        loan_data = datasets["loan_portfolio"]
+        context = self._context(datasets)
 
-        # Get current DPD status for each loan
-        current_dpd = historic_payments.groupby("loan_id")["days_past_due"].last()
-
-        # Count loans ≥180 DPD
-        npl_loans = (current_dpd >= 180).sum()
-        total_active_loans = len(loan_data[loan_data["loan_status"] == "active"])
+        # Count loans ≥180 DPD by their current DPD status
+        npl_loans = (context.last_dpd >= NPL_DPD_THRESHOLD).sum()
+        total_active_loans = len(context.active_loans)
 
         npl_rate = npl_loans / total_active_loans if total_active_loans > 0 else 0.0
-        target_npl = self._get_target_value("npl_rate", 0.025)  # 2.5% target
+        target_npl = self._get_target_value("npl_rate", 0.025, context)  # 2.5% target
 
         return KPIResult(
             name="NPL Rate (≥180 days)",
@@ -174,10 +433,10 @@ class CommercialLendingKPIEngine:
         self, datasets: Dict[str, pd.DataFrame]
     ) -> KPIResult:
         """Calculate top client concentration risk"""
-        loan_data = datasets["loan_portfolio"]
+        context = self._context(datasets)
 
-        # Group by customer and sum exposures
-        customer_exposure = loan_data.groupby("customer_id")["principal_amount"].sum()
+        # Customer exposures summed over all their loans
+        customer_exposure = context.customers["principal"]
         total_portfolio = customer_exposure.sum()
 
         # Get top client concentration
@@ -189,7 +448,7 @@ class CommercialLendingKPIEngine:
         )
 
         target_concentration = self._get_target_value(
-            "concentration_limit", 0.15
+            "concentration_limit", 0.15, context
         )  # 15% limit
 
         return KPIResult(
@@ -209,12 +468,10 @@ class CommercialLendingKPIEngine:
 
     def _calculate_active_clients(self, datasets: Dict[str, pd.DataFrame]) -> KPIResult:
         """Calculate number of active clients"""
-        loan_data = datasets["loan_portfolio"]
+        context = self._context(datasets)
 
-        active_clients = loan_data[loan_data["loan_status"] == "active"][
-            "customer_id"
-        ].nunique()
-        target_clients = self._get_target_value("active_clients", 150)
+        active_clients = int((context.customers["active_loans"] > 0).sum())
+        target_clients = self._get_target_value("active_clients", 150, context)
 
         return KPIResult(
             name="Active Clients",
@@ -233,24 +490,21 @@ class CommercialLendingKPIEngine:
         self, datasets: Dict[str, pd.DataFrame]
     ) -> KPIResult:
         """Calculate collection rate from payment history"""
-        payment_schedule = datasets["payment_schedule"]
-        historic_payments = datasets["historic_payments"]
+        context = self._context(datasets)
 
         # Calculate scheduled vs actual payments
-        current_month = datetime.now().strftime("%Y-%m")
-        monthly_scheduled = payment_schedule[
-            payment_schedule["due_date"].str.startswith(current_month)
-        ]["total_amount"].sum()
-
-        monthly_collected = historic_payments[
-            historic_payments["payment_date"].str.startswith(current_month)
-        ]["amount_paid"].sum()
+        monthly_scheduled = context.current_month_total(
+            PAYMENT_SCHEDULE, "due_date", "total_amount"
+        )
+        monthly_collected = context.current_month_total(
+            HISTORIC_PAYMENTS, "payment_date", "amount_paid"
+        )
 
         collection_rate = (
             monthly_collected / monthly_scheduled if monthly_scheduled > 0 else 0.0
         )
         target_collection = self._get_target_value(
-            "collection_rate", 0.95
+            "collection_rate", 0.95, context
         )  # 95% target
 
         return KPIResult(
@@ -270,17 +524,14 @@ class CommercialLendingKPIEngine:
         self, datasets: Dict[str, pd.DataFrame]
     ) -> KPIResult:
         """Calculate monthly disbursement volume"""
-        loan_data = datasets["loan_portfolio"]
+        context = self._context(datasets)
 
-        # Filter loans originated this month
-        current_month = datetime.now().strftime("%Y-%m")
-        monthly_loans = loan_data[
-            loan_data["origination_date"].str.startswith(current_month)
-        ]
-
-        monthly_disbursements = monthly_loans["principal_amount"].sum()
+        # Loans originated this month
+        monthly_disbursements = context.current_month_total(
+            LOAN_PORTFOLIO, "origination_date", "principal_amount"
+        )
         target_disbursements = self._get_target_value(
-            "monthly_disbursements", 450000
+            "monthly_disbursements", 450000, context
         )  # $450K target
 
         return KPIResult(
@@ -296,6 +547,242 @@ class CommercialLendingKPIEngine:
             description="Total loan originations for the current month",
         )
 
+    def _calculate_portfolio_yield(
+        self, datasets: Dict[str, pd.DataFrame]
+    ) -> KPIResult:
+        """Calculate annual interest yield of the performing active portfolio"""
+        context = self._context(datasets)
+
+        # Loans at or past the NPL threshold no longer accrue interest
+        performing = context.active_dpd < NPL_DPD_THRESHOLD
+        interest_income = context.active_interest[performing].sum()
+        outstanding_value = self._outstanding_value(context)
+        portfolio_yield = (
+            interest_income / outstanding_value if outstanding_value > 0 else 0.0
+        )
+        target_yield = self._get_target_value("portfolio_yield", 0.185, context)
+
+        return KPIResult(
+            name="Portfolio Yield",
+            value=portfolio_yield,
+            target=target_yield,
+            unit="%",
+            calculation_method="Annual interest of performing active loans / Outstanding portfolio",
+            data_sources=["loan_portfolio", "historic_payments", "payment_schedule"],
+            confidence_level=0.9,
+            trend=self._calculate_trend(portfolio_yield, "portfolio_yield"),
+            status=self._determine_status(
+                portfolio_yield, target_yield, tolerance=0.01
+            ),
+            description="Interest earned on the outstanding portfolio, excluding non-accruing loans",
+        )
+
+    def _calculate_average_dpd(self, datasets: Dict[str, pd.DataFrame]) -> KPIResult:
+        """Calculate average days past due of active loans"""
+        context = self._context(datasets)
+
+        dpd = context.active_dpd
+        average_dpd = float(dpd.mean()) if len(dpd) else 0.0
+        target_dpd = self._get_target_value("days_past_due_avg", 15, context)
+
+        return KPIResult(
+            name="Average Days Past Due",
+            value=average_dpd,
+            target=target_dpd,
+            unit="days",
+            calculation_method="Mean of each active loan's latest DPD",
+            data_sources=["loan_portfolio", "historic_payments"],
+            confidence_level=0.92,
+            trend=self._calculate_trend(average_dpd, "days_past_due_avg"),
+            status=self._determine_status(
+                average_dpd, target_dpd, lower_is_better=True
+            ),
+            description="Average delinquency of active loans from their latest payment record",
+        )
+
+    def _calculate_new_clients(self, datasets: Dict[str, pd.DataFrame]) -> KPIResult:
+        """Calculate clients acquired this month"""
+        context = self._context(datasets)
+
+        first_month = context.customers.get("first_month")
+        new_clients = (
+            int((first_month == context.current_month_code).sum())
+            if first_month is not None
+            else 0
+        )
+        target_new = self._get_target_value("new_client_acquisition", 50, context)
+
+        return KPIResult(
+            name="New Client Acquisition",
+            value=float(new_clients),
+            target=float(target_new),
+            unit="",
+            calculation_method="Customers whose first loan originated this month",
+            data_sources=["loan_portfolio"],
+            confidence_level=0.97,
+            trend=self._calculate_trend(new_clients, "new_client_acquisition"),
+            status=self._determine_status(new_clients, target_new),
+            description="Number of customers taking their first loan in the current month",
+        )
+
+    def _calculate_portfolio_growth(
+        self, datasets: Dict[str, pd.DataFrame]
+    ) -> KPIResult:
+        """
+        Calculate month-over-month growth of active principal
+
+        Provisional: originations only, ignoring repayments and payoffs,
+        until the definition is signed off (see ``PROVISIONAL_KPIS``).
+        """
+        context = self._context(datasets)
+
+        monthly = context.current_month_total(
+            LOAN_PORTFOLIO, "origination_date", "principal_amount"
+        )
+        months = context.month_codes(LOAN_PORTFOLIO, "origination_date")
+        earlier = months[context.active_mask] < context.current_month_code
+        opening = context.active_loans["principal_amount"][earlier].sum()
+        growth = monthly / opening if opening > 0 else 0.0
+        target_growth = self._get_target_value(
+            "portfolio_growth", 0.20 / 12, context
+        )  # 20% annually
+
+        return KPIResult(
+            name="Portfolio Growth",
+            value=growth,
+            target=target_growth,
+            unit="%",
+            calculation_method="Current month originations / Active principal originated before this month",
+            data_sources=["loan_portfolio"],
+            confidence_level=0.85,
+            trend=self._calculate_trend(growth, "portfolio_growth"),
+            status=self._determine_status(growth, target_growth),
+            description="Monthly growth of the active portfolio from new originations",
+        )
+
+    def _calculate_client_retention(
+        self, datasets: Dict[str, pd.DataFrame]
+    ) -> KPIResult:
+        """Calculate share of earlier clients that still hold an active loan"""
+        context = self._context(datasets)
+
+        customers = context.customers
+        if "first_month" in customers:
+            existing = customers[customers["first_month"] < context.current_month_code]
+        else:
+            existing = customers
+        retained = int((existing["active_loans"] > 0).sum())
+        retention = retained / len(existing) if len(existing) > 0 else 0.0
+        target_retention = self._get_target_value("client_retention", 0.85, context)
+
+        return KPIResult(
+            name="Client Retention",
+            value=retention,
+            target=target_retention,
+            unit="%",
+            calculation_method="Clients acquired before this month with an active loan / All such clients",
+            data_sources=["loan_portfolio"],
+            confidence_level=0.9,
+            trend=self._calculate_trend(retention, "client_retention"),
+            status=self._determine_status(retention, target_retention),
+            description="Share of existing clients that keep borrowing",
+        )
+
+    def _calculate_net_interest_margin(
+        self, datasets: Dict[str, pd.DataFrame]
+    ) -> KPIResult:
+        """Calculate net interest margin on active principal"""
+        context = self._context(datasets)
+
+        performing = context.active_dpd < NPL_DPD_THRESHOLD
+        interest_income = context.active_interest[performing].sum()
+        principal = context.active_principal
+        cost_of_funds = self._get_target_value("cost_of_funds", 0.08, context)
+        margin = interest_income / principal - cost_of_funds if principal > 0 else 0.0
+        target_margin = self._get_target_value("net_interest_margin", 0.105, context)
+
+        return KPIResult(
+            name="Net Interest Margin",
+            value=margin,
+            target=target_margin,
+            unit="%",
+            calculation_method="Performing interest income / Active principal - Cost of funds",
+            data_sources=["loan_portfolio", "historic_payments"],
+            confidence_level=0.8,
+            trend=self._calculate_trend(margin, "net_interest_margin"),
+            status=self._determine_status(margin, target_margin),
+            description="Interest earned on active loans net of the configured cost of funds",
+        )
+
+    def _calculate_return_on_assets(
+        self, datasets: Dict[str, pd.DataFrame]
+    ) -> KPIResult:
+        """
+        Calculate annual return on total loan assets net of NPL losses
+
+        Provisional: the full NPL principal is charged against one year's
+        interest until the definition is signed off (see ``PROVISIONAL_KPIS``).
+        """
+        context = self._context(datasets)
+
+        npl = context.active_dpd >= NPL_DPD_THRESHOLD
+        interest_income = context.active_interest[~npl].sum()
+        npl_principal = context.active_loans["principal_amount"].to_numpy()[npl].sum()
+        total_assets = context.customers["principal"].sum()
+        roa = (
+            (interest_income - npl_principal) / total_assets
+            if total_assets > 0
+            else 0.0
+        )
+        target_roa = self._get_target_value("return_on_assets", 0.08, context)
+
+        return KPIResult(
+            name="Return on Assets",
+            value=roa,
+            target=target_roa,
+            unit="%",
+            calculation_method="(Performing interest income - NPL principal) / Total loan principal",
+            data_sources=["loan_portfolio", "historic_payments"],
+            confidence_level=0.75,
+            trend=self._calculate_trend(roa, "return_on_assets"),
+            status=self._determine_status(roa, target_roa),
+            description="Annual interest income net of non-performing principal over all loan assets",
+        )
+
+    def _calculate_cost_per_acquisition(
+        self, datasets: Dict[str, pd.DataFrame]
+    ) -> KPIResult:
+        """Calculate acquisition cost per client with a loan"""
+        context = self._context(datasets)
+        customer_data = datasets.get(CUSTOMER_DATA)
+
+        clients = len(context.customers)
+        has_costs = customer_data is not None and "acquisition_cost" in customer_data
+        if has_costs and clients > 0:
+            cost_per_client = customer_data["acquisition_cost"].sum() / clients
+        else:
+            cost_per_client = 0.0
+        target_cost = self._get_target_value("cost_per_acquisition", 500, context)
+
+        return KPIResult(
+            name="Cost per Acquisition",
+            value=cost_per_client,
+            target=target_cost,
+            unit="$",
+            calculation_method="Total customer acquisition cost / Clients with loans",
+            data_sources=["customer_data", "loan_portfolio"],
+            confidence_level=0.7 if has_costs else 0.0,
+            trend=self._calculate_trend(cost_per_client, "cost_per_acquisition"),
+            status=(
+                self._determine_status(
+                    cost_per_client, target_cost, lower_is_better=True
+                )
+                if has_costs
+                else "unknown"
+            ),
+            description="Average acquisition cost of each client holding a loan",
+        )
+
     def _load_and_validate_datasets(self) -> Dict[str, pd.DataFrame]:
         """Load and validate all required datasets"""
         required_datasets = [
@@ -319,21 +806,14 @@ class CommercialLendingKPIEngine:
 
         return datasets
 
-    def _get_target_value(self, kpi_name: str, default: float) -> float:
+    def _get_target_value(
+        self, kpi_name: str, default: float, context: Optional[KPIContext] = None
+    ) -> float:
         """Get KPI target value from Q4_Targets.csv or configuration"""
-        try:
-            # Load Q4 targets if available
-            q4_targets = self.data_loader.load_dataset("q4_targets")
-            if q4_targets is not None:
-                current_month = datetime.now().strftime("%Y-%m-01")
-                month_targets = q4_targets[q4_targets["Month"] == current_month]
-                if not month_targets.empty and kpi_name in month_targets.columns:
-                    return float(month_targets[kpi_name].iloc[0])
-        except Exception as e:
-            logger.debug(f"Could not load Q4 targets: {e}")
-
-        # Fallback to configuration or default
-        return self.config.get_kpi_targets().get(kpi_name, default)
+        # The run context loads the Q4 targets table once for all KPIs
+        if context is None:
+            context = self._context({})
+        return context.target(kpi_name, default)
 
     def _determine_status(
         self,
@@ -368,8 +848,13 @@ class CommercialLendingKPIEngine:
                 return "critical"
 
     def _calculate_trend(self, current_value: float, kpi_name: str) -> str:
-        """Calculate trend direction for KPI"""
-        # This would compare with historical values - simplified for now
+        """Calculate trend direction for KPI against its rolling history"""
+        if kpi_name in PROVISIONAL_KPIS:
+            return "stable"
+        stats = self.history.stats(kpi_name)
+        if stats is not None:
+            return stats.trend(current_value)
+
         historical_avg = self.calculation_cache.get(
             f"{kpi_name}_historical", current_value
         )
@@ -0,0 +1,460 @@
+"""
+Append-only KPI history store
+One row per KPI per run is kept in columnar arrays (persisted as Parquet
+parts), with per-KPI rolling windows updated as runs are appended so trend
+and anomaly checks read precomputed statistics
+"""
+
+import importlib.util
+import json
+import logging
+import math
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+MANIFEST_FILENAME = "manifest.json"
+DEFAULT_WINDOW = 12
+DEFAULT_MAX_PARTS = 64
+TREND_BAND = 0.05
+ANOMALY_Z = 3.0
+
+DateLike = Union[str, pd.Timestamp, np.datetime64, datetime]
+
+
+@dataclass
+class RollingStats:
+    """Statistics of a KPI's last ``count`` runs"""
+
+    count: int
+    mean: float
+    std: float
+    slope: float
+    last: float
+
+    def trend(self, value: float, band: float = TREND_BAND) -> str:
+        """``up``/``down`` when ``value`` is outside +/- ``band`` of the mean"""
+        if value > self.mean + abs(self.mean) * band:
+            return "up"
+        if value < self.mean - abs(self.mean) * band:
+            return "down"
+        return "stable"
+
+    def is_anomaly(self, value: float, z: float = ANOMALY_Z) -> bool:
+        """True when ``value`` is more than ``z`` standard deviations off the mean"""
+        if self.count < 3 or not self.std > 0:
+            return False
+        return abs(value - self.mean) > z * self.std
+
+
+class _RollingWindow:
+    """
+    Mean, variance and least-squares slope over the last ``size`` values.
+
+    Values are indexed by their sequence number; moments are updated with
+    Welford-style add/remove steps, so each append is O(1) and stays
+    accurate for large KPI values.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values: Deque[Tuple[int, float]] = deque()
+        self.mean_x = self.mean_y = 0.0
+        self.m2_x = self.m2_y = self.c_xy = 0.0
+
+    def add(self, x: int, y: float) -> None:
+        if len(self.values) == self.size:
+            self._remove(*self.values.popleft())
+        self.values.append((x, y))
+        n = len(self.values)
+        dx, dy = x - self.mean_x, y - self.mean_y
+        self.mean_x += dx / n
+        self.mean_y += dy / n
+        self.m2_x += dx * (x - self.mean_x)
+        self.m2_y += dy * (y - self.mean_y)
+        self.c_xy += dx * (y - self.mean_y)
+
+    def _remove(self, x: int, y: float) -> None:
+        # Called after the value left the deque: ``n`` is the new count
+        n = len(self.values)
+        if n == 0:
+            self.mean_x = self.mean_y = 0.0
+            self.m2_x = self.m2_y = self.c_xy = 0.0
+            return
+        old_mean_y = self.mean_y
+        mean_x = (self.mean_x * (n + 1) - x) / n
+        mean_y = (self.mean_y * (n + 1) - y) / n
+        self.m2_x -= (x - mean_x) * (x - self.mean_x)
+        self.m2_y -= (y - mean_y) * (y - old_mean_y)
+        self.c_xy -= (x - mean_x) * (y - old_mean_y)
+        self.mean_x, self.mean_y = mean_x, mean_y
+
+    def stats(self) -> Optional[RollingStats]:
+        n = len(self.values)
+        if n == 0:
+            return None
+        variance = max(self.m2_y, 0.0) / (n - 1) if n > 1 else 0.0
+        slope = self.c_xy / self.m2_x if self.m2_x > 0 else 0.0
+        return RollingStats(
+            count=n,
+            mean=self.mean_y,
+            std=math.sqrt(variance),
+            slope=slope,
+            last=self.values[-1][1],
+        )
+
+
+def _day(value: Optional[DateLike]) -> np.datetime64:
+    stamp = pd.Timestamp.today() if value is None else pd.Timestamp(value)
+    return np.datetime64(stamp.normalize(), "D")
+
+
+class KPIHistoryStore:
+    """
+    Append-only history of KPI values, one row per KPI per run.
+
+    Rows live in columnar NumPy arrays (KPI code, run id, reference date,
+    value) and, when a directory is given, in one Parquet part per run plus
+    a JSON manifest listing the live parts. Range queries binary-search an
+    index sorted by (KPI, reference date, run). Every KPI keeps a rolling
+    window of its last ``window`` values whose mean, standard deviation and
+    slope (per run) are updated on append, so ``stats`` is a dictionary
+    lookup.
+
+    Parts are compacted into one once there are more than ``max_parts``;
+    ``apply_retention`` drops old runs and compacts. Compaction switches the
+    manifest to the merged part before deleting the old ones, so an
+    interrupted compaction keeps the previous parts. Without pyarrow the
+    history is kept in memory only.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        window: int = DEFAULT_WINDOW,
+        max_parts: int = DEFAULT_MAX_PARTS,
+    ):
+        self.path = Path(path) if path is not None else None
+        self.window = window
+        self.max_parts = max_parts
+        self.kpis: List[str] = []
+        self._kpi_codes: Dict[str, int] = {}
+        self._chunks: List[Dict[str, np.ndarray]] = []
+        self._columns = self._empty_columns()
+        self._order: Optional[np.ndarray] = None
+        self._windows: Dict[int, _RollingWindow] = {}
+        self._sequence: Dict[int, int] = {}
+        self.next_run_id = 0
+        # Index of the next part file and the parts the manifest lists
+        self.parts = 0
+        self.part_files: List[str] = []
+        if self.path is not None:
+            self._load()
+
+    @property
+    def persistent(self) -> bool:
+        return self.path is not None and _PARQUET_AVAILABLE
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.path / MANIFEST_FILENAME
+
+    @staticmethod
+    def _empty_columns() -> Dict[str, np.ndarray]:
+        return {
+            "kpi": np.array([], dtype=np.int32),
+            "run_id": np.array([], dtype=np.int64),
+            "reference_date": np.array([], dtype="datetime64[D]"),
+            "value": np.array([], dtype=np.float64),
+        }
+
+    def __len__(self) -> int:
+        return len(self.columns["value"])
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Columnar rows in append order"""
+        if self._chunks:
+            self._columns = {
+                name: np.concatenate(
+                    [self._columns[name]] + [c[name] for c in self._chunks]
+                )
+                for name in self._columns
+            }
+            self._chunks = []
+        return self._columns
+
+    def _code(self, kpi: str) -> int:
+        code = self._kpi_codes.get(kpi)
+        if code is None:
+            code = len(self.kpis)
+            self.kpis.append(kpi)
+            self._kpi_codes[kpi] = code
+        return code
+
+    def append_run(
+        self,
+        values: Mapping[str, float],
+        reference_date: Optional[DateLike] = None,
+        run_id: Optional[int] = None,
+    ) -> int:
+        """
+        Record one run of KPI values.
+
+        Args:
+            values: KPI name -> value; non-numeric values are skipped
+            reference_date: Date the values describe (defaults to today)
+            run_id: Explicit run id (defaults to the next id)
+
+        Returns:
+            The run id
+        """
+        run_id = self.next_run_id if run_id is None else int(run_id)
+        self.next_run_id = max(self.next_run_id, run_id + 1)
+        rows = []
+        for kpi, value in values.items():
+            try:
+                rows.append((self._code(kpi), float(value)))
+            except (TypeError, ValueError):
+                logger.debug(f"Skipping non-numeric KPI {kpi}: {value!r}")
+        if not rows:
+            return run_id
+
+        codes = np.array([code for code, _ in rows], dtype=np.int32)
+        chunk = {
+            "kpi": codes,
+            "run_id": np.full(len(rows), run_id, dtype=np.int64),
+            "reference_date": np.full(len(rows), _day(reference_date)),
+            "value": np.array([value for _, value in rows], dtype=np.float64),
+        }
+        self._chunks.append(chunk)
+        self._order = None
+        for code, value in rows:
+            self._observe(code, value)
+
+        if self.persistent:
+            self.part_files.append(self._write_part(chunk))
+            self._save_manifest()
+            if len(self.part_files) > self.max_parts:
+                self.compact()
+        return run_id
+
+    def _observe(self, code: int, value: float) -> None:
+        window = self._windows.get(code)
+        if window is None:
+            window = self._windows[code] = _RollingWindow(self.window)
+        sequence = self._sequence.get(code, 0)
+        window.add(sequence, value)
+        self._sequence[code] = sequence + 1
+
+    def stats(self, kpi: str) -> Optional[RollingStats]:
+        """Rolling statistics of the KPI's last ``window`` runs, None if unseen"""
+        code = self._kpi_codes.get(kpi)
+        window = self._windows.get(code) if code is not None else None
+        return window.stats() if window is not None else None
+
+    def _sorted_index(self) -> np.ndarray:
+        """Row positions ordered by (KPI, reference date, run id)"""
+        if self._order is None:
+            columns = self.columns
+            self._order = np.lexsort(
+                (columns["run_id"], columns["reference_date"], columns["kpi"])
+            )
+        return self._order
+
+    def history(
+        self,
+        kpi: str,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+    ) -> pd.DataFrame:
+        """
+        Values of one KPI with reference dates in [start, end].
+
+        Returns:
+            DataFrame with reference_date, run_id and value, in date order
+        """
+        code = self._kpi_codes.get(kpi)
+        if code is None:
+            return pd.DataFrame(columns=["reference_date", "run_id", "value"])
+        columns = self.columns
+        order = self._sorted_index()
+        kpi_codes = columns["kpi"][order]
+        lo, hi = np.searchsorted(kpi_codes, [code, code + 1])
+        rows = order[lo:hi]
+        dates = columns["reference_date"][rows]
+        first = np.searchsorted(dates, _day(start)) if start is not None else 0
+        last = (
+            np.searchsorted(dates, _day(end), side="right")
+            if end is not None
+            else len(rows)
+        )
+        rows = rows[first:last]
+        return pd.DataFrame(
+            {
+                "reference_date": pd.DatetimeIndex(
+                    columns["reference_date"][rows].astype("datetime64[ns]")
+                ),
+                "run_id": columns["run_id"][rows],
+                "value": columns["value"][rows],
+            }
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """All rows in append order"""
+        columns = self.columns
+        return pd.DataFrame(
+            {
+                "kpi": (
+                    pd.Categorical.from_codes(columns["kpi"], categories=self.kpis)
+                    if self.kpis
+                    else pd.Categorical([])
+                ),
+                "run_id": columns["run_id"],
+                "reference_date": columns["reference_date"].astype("datetime64[ns]"),
+                "value": columns["value"],
+            }
+        )
+
+    def apply_retention(
+        self,
+        max_age_days: Optional[int] = None,
+        keep_runs: Optional[int] = None,
+        as_of: Optional[DateLike] = None,
+    ) -> int:
+        """
+        Drop runs older than ``max_age_days`` before ``as_of`` and/or all but
+        the latest ``keep_runs`` runs, then compact.
+
+        Returns:
+            Number of rows removed
+        """
+        columns = self.columns
+        keep = np.ones(len(columns["value"]), dtype=bool)
+        if max_age_days is not None:
+            cutoff = _day(as_of) - np.timedelta64(int(max_age_days), "D")
+            keep &= columns["reference_date"] >= cutoff
+        if keep_runs is not None:
+            runs = np.unique(columns["run_id"])
+            if len(runs) > keep_runs:
+                oldest_kept = runs[-keep_runs] if keep_runs > 0 else runs[-1] + 1
+                keep &= columns["run_id"] >= oldest_kept
+        removed = int((~keep).sum())
+        if removed:
+            self._columns = {name: column[keep] for name, column in columns.items()}
+            self._order = None
+            self._rebuild_windows()
+        self.compact()
+        logger.info(f"KPI history retention removed {removed} rows")
+        return removed
+
+    def compact(self) -> None:
+        """
+        Rewrite the persisted parts as a single part.
+
+        The merged part is written under a temporary name and renamed, the
+        manifest is switched to it, and only then are the old parts (and any
+        part the manifest does not list) deleted.
+        """
+        if not self.persistent:
+            return
+        columns = self.columns
+        old_parts = set(self.part_files)
+        self.part_files = [self._write_part(columns)] if len(columns["value"]) else []
+        self._save_manifest()
+        live = set(self.part_files)
+        for part in self.path.glob("part-*.parquet"):
+            if part.name in old_parts or part.name not in live:
+                part.unlink(missing_ok=True)
+
+    def _rebuild_windows(self) -> None:
+        """Recompute rolling windows from the tail of each KPI's history"""
+        self._windows, self._sequence = {}, {}
+        columns = self.columns
+        # Windows follow append order (run id order within a KPI)
+        order = np.lexsort((np.arange(len(columns["kpi"])), columns["kpi"]))
+        codes, values = columns["kpi"][order], columns["value"][order]
+        if not len(codes):
+            return
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        ends = np.r_[starts[1:], len(codes)]
+        for start, end in zip(starts, ends):
+            code = int(codes[start])
+            window = self._windows[code] = _RollingWindow(self.window)
+            first = max(start, end - self.window)
+            for sequence, value in enumerate(values[first:end], first - start):
+                window.add(sequence, float(value))
+            self._sequence[code] = end - start
+
+    def _write_part(self, columns: Dict[str, np.ndarray]) -> str:
+        """Write rows as the next part file and return its name"""
+        self.path.mkdir(parents=True, exist_ok=True)
+        frame = pd.DataFrame(
+            {
+                "kpi": np.asarray(self.kpis, dtype=object)[columns["kpi"]],
+                "run_id": columns["run_id"],
+                "reference_date": columns["reference_date"].astype("datetime64[ns]"),
+                "value": columns["value"],
+            }
+        )
+        name = f"part-{self.parts:05d}.parquet"
+        self.parts += 1
+        tmp_path = self.path / f"{name}.tmp"
+        frame.to_parquet(tmp_path, index=False)
+        tmp_path.replace(self.path / name)
+        return name
+
+    def _save_manifest(self) -> None:
+        manifest = {
+            "parts": self.parts,
+            "part_files": self.part_files,
+            "next_run_id": self.next_run_id,
+            "window": self.window,
+            "updated_at": datetime.now().isoformat(),
+        }
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        tmp_path.replace(self.manifest_path)
+
+    def _load(self) -> None:
+        """Read the parts listed in the manifest and rebuild the rolling windows"""
+        if not _PARQUET_AVAILABLE:
+            logger.warning("pyarrow not installed; KPI history is kept in memory only")
+            return
+        if not self.manifest_path.exists():
+            return
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            manifest: Dict[str, Any] = json.load(f)
+        self.part_files = list(manifest.get("part_files", []))
+        self.parts = int(manifest.get("parts", len(self.part_files)))
+        self.next_run_id = int(manifest.get("next_run_id", 0))
+        parts = [self.path / name for name in self.part_files]
+        if not parts:
+            return
+        frame = pd.concat([pd.read_parquet(part) for part in parts], ignore_index=True)
+        frame = frame.sort_values("run_id", kind="stable", ignore_index=True)
+        codes = np.array([self._code(kpi) for kpi in frame["kpi"]], dtype=np.int32)
+        self._columns = {
+            "kpi": codes,
+            "run_id": frame["run_id"].to_numpy(dtype=np.int64),
+            "reference_date": frame["reference_date"]
+            .to_numpy(dtype="datetime64[ns]")
+            .astype("datetime64[D]"),
+            "value": frame["value"].to_numpy(dtype=np.float64),
+        }
+        self.next_run_id = max(self.next_run_id, int(self._columns["run_id"].max()) + 1)
+        self._rebuild_windows()
+        logger.info(f"Loaded KPI history: {len(frame)} rows from {len(parts)} parts")
+
+
+__all__ = ["KPIHistoryStore", "RollingStats"]
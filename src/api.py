@@ -3,17 +3,23 @@ Commercial View Analytics API
 FastAPI-based web service for portfolio analysis
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
-import json
 import os
-import subprocess
-import asyncio
+import sys
 from pathlib import Path
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, List, Optional
 import logging
-import aiofiles
+
+# Project root, so the ``src`` package resolves however the API is started
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.analysis_jobs import AnalysisJobManager, JobQueueFullError
+from src.export_catalog import ANALYTICS_EXPORT_DIR, CATALOG_FILENAME, ExportCatalog
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -25,6 +31,51 @@ app = FastAPI(
     version="1.0.0"
 )
 
+
+def _portfolio_processor():
+    """Long-lived processor rooted at the project directory"""
+    from src.process_portfolio import PortfolioProcessor
+    return PortfolioProcessor(base_dir=str(PROJECT_ROOT))
+
+
+# Bounded in-process runner for /analysis/trigger
+job_manager = AnalysisJobManager(
+    max_workers=int(os.getenv("ANALYSIS_MAX_WORKERS", "2")),
+    processor_factory=_portfolio_processor,
+)
+
+
+# Index of exported analyses, written by PortfolioProcessor.export_results
+analytics_dir = PROJECT_ROOT / ANALYTICS_EXPORT_DIR
+
+
+@lru_cache(maxsize=1)
+def get_export_catalog() -> ExportCatalog:
+    """Open the export catalogue, indexing older exports on first creation"""
+    catalog = ExportCatalog(analytics_dir / CATALOG_FILENAME)
+    if catalog.is_new:
+        catalog.backfill(analytics_dir)
+    return catalog
+
+
+@app.on_event("startup")
+async def warm_analysis_worker():
+    """Load the portfolio datasets before the first analysis is triggered"""
+    job_manager.warm()
+
+
+@app.on_event("startup")
+async def open_export_catalog():
+    """Open (and on first start, backfill) the export catalogue"""
+    await run_in_threadpool(get_export_catalog)
+
+
+@app.on_event("shutdown")
+async def stop_analysis_worker():
+    """Release the analysis worker threads"""
+    job_manager.shutdown()
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
@@ -37,6 +88,8 @@ async def root():
             "health": "/health",
             "portfolio_summary": "/portfolio/summary", 
             "latest_analysis": "/analysis/latest",
+            "trigger_analysis": "/analysis/trigger",
+            "analysis_jobs": "/analysis/jobs",
             "docs": "/docs"
         }
     }
@@ -61,37 +114,26 @@ async def health_check():
     }
 
 @app.get("/analysis/latest")
-async def latest_analysis():
-    """Get the latest analysis results"""
+async def latest_analysis(
+    limit: int = Query(5, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    """Get the latest analysis results, newest first, from the export catalogue"""
     try:
-        analytics_path = Path("abaco_runtime/exports/analytics")
-        if not analytics_path.exists():
-            return {"message": "No analytics directory found", "analyses": []}
-        
-        json_files = analytics_path.glob("*.json")
-        analyses = []
-        
-        for file in sorted(json_files, key=os.path.getctime, reverse=True)[:5]:
-            try:
-                async with aiofiles.open(file, 'r') as f:
-                    content = await f.read()
-                    data = json.loads(content)
-                
-                total_records_dict = data.get("total_records", {})
-                total_records = sum(total_records_dict.values()) if total_records_dict else 0
-                
-                analyses.append({
-                    "filename": file.name,
-                    "timestamp": data.get("processing_timestamp"),
-                    "datasets": data.get("datasets_loaded", []),
-                    "total_records": total_records
-                })
-            except Exception as e:
-                logger.warning(f"Error reading {file}: {e}")
+        catalog = await run_in_threadpool(get_export_catalog)
+        entries, total = await run_in_threadpool(
+            catalog.list_runs, limit, offset, since, until
+        )
+        next_offset = offset + len(entries)
         
         return {
-            "latest_analyses": analyses,
-            "count": len(analyses),
+            "latest_analyses": [entry.summary() for entry in entries],
+            "count": len(entries),
+            "total": total,
+            "offset": offset,
+            "next_offset": next_offset if next_offset < total else None,
             "api_timestamp": datetime.now().isoformat()
         }
     
@@ -100,36 +142,29 @@ async def latest_analysis():
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/portfolio/summary")
-async def portfolio_summary():
-    """Get portfolio summary from latest analysis"""
+async def portfolio_summary(
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+):
+    """Get portfolio summary from the latest analysis in the time range"""
     try:
-        # Find the most recent analysis file
-        analytics_path = Path("abaco_runtime/exports/analytics")
-        if not analytics_path.exists():
-            raise HTTPException(status_code=404, detail="No analytics data found")
-        
-        json_files = analytics_path.glob("*.json")
-        json_files_list = list(json_files)  # Need list for max() function
-        if not json_files_list:
-            raise HTTPException(status_code=404, detail="No analysis files found")
-        
-        # Get the most recent file
-        latest_file = max(json_files_list, key=os.path.getctime)
-        
-        async with aiofiles.open(latest_file, 'r') as f:
-            content = await f.read()
-            data = json.loads(content)
-        
-        return {
-            "summary": data,
-            "file": str(latest_file),
-            "generated": data.get("processing_timestamp"),
-            "api_timestamp": datetime.now().isoformat()
-        }
-    
+        catalog = await run_in_threadpool(get_export_catalog)
+        entry = await run_in_threadpool(catalog.latest, since, until)
     except Exception as e:
         logger.error(f"Error reading portfolio summary: {e}")
         raise HTTPException(status_code=500, detail=f"Error reading analysis: {str(e)}")
+    
+    if entry is None:
+        raise HTTPException(status_code=404, detail="No analysis files found")
+    
+    return {
+        "summary": entry.payload,
+        "file": entry.path,
+        "run_id": entry.run_id,
+        "exported_at": entry.exported_at,
+        "generated": entry.processing_timestamp,
+        "api_timestamp": datetime.now().isoformat()
+    }
 
 @app.get("/data/status")
 async def data_status():
@@ -159,50 +194,44 @@ async def data_status():
         logger.error(f"Error checking data status: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/analysis/trigger")
+@app.post("/analysis/trigger", status_code=202)
 async def trigger_analysis():
-    """Trigger a new portfolio analysis"""
+    """Queue a new portfolio analysis
+    
+    Returns immediately with a job ID; poll ``/analysis/jobs/{job_id}`` for
+    the outcome. Triggers arriving while an analysis is already queued or
+    running join that job instead of starting a duplicate.
+    """
     try:
-        # Change to the correct directory
-        os.chdir("/workspaces/Commercial-View")
-        
-        # Run the portfolio processor asynchronously
-        process = await asyncio.create_subprocess_exec(
-            "python", "src/process_portfolio.py",
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        
-        try:
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(), timeout=300
-            )
-            
-            if process.returncode == 0:
-                return {
-                    "status": "success",
-                    "message": "Analysis completed successfully",
-                    "output": stdout.decode(),
-                    "timestamp": datetime.now().isoformat()
-                }
-            else:
-                return {
-                    "status": "error", 
-                    "message": "Analysis failed",
-                    "error": stderr.decode(),
-                    "timestamp": datetime.now().isoformat()
-                }
-        except asyncio.TimeoutError:
-            process.kill()
-            return {
-                "status": "timeout",
-                "message": "Analysis timed out after 5 minutes",
-                "timestamp": datetime.now().isoformat()
-            }
+        job, created = job_manager.submit()
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
     
-    except Exception as e:
-        logger.error(f"Error triggering analysis: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "status": job.status,
+        "job_id": job.job_id,
+        "coalesced": not created,
+        "status_url": f"/analysis/jobs/{job.job_id}",
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/analysis/jobs")
+async def list_analysis_jobs(limit: int = 20):
+    """List recent analysis jobs, newest first"""
+    jobs = job_manager.list_jobs(limit)
+    return {
+        "jobs": [job.to_dict(include_result=False) for job in jobs],
+        "count": len(jobs),
+        "api_timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/analysis/jobs/{job_id}")
+async def analysis_job_status(job_id: str):
+    """Get the status, and once finished the result, of an analysis job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown analysis job: {job_id}")
+    return job.to_dict()
 
 # Add CORS middleware if needed
 from fastapi.middleware.cors import CORSMiddleware
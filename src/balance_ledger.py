@@ -0,0 +1,261 @@
+"""
+Event-sourced outstanding balance ledger
+Disbursements and True Principal Payment rows are signed principal events,
+sorted once, so balances per loan, customer, company or portfolio can be
+read at any date by binary search or laid out as daily or monthly series
+"""
+
+import logging
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    from src.date_codes import DateLike, day_number, month_ends, to_days
+except ImportError:
+    from date_codes import DateLike, day_number, month_ends, to_days
+
+logger = logging.getLogger(__name__)
+
+COMPANY = "Company"
+CUSTOMER_ID = "Customer ID"
+LOAN_ID = "Loan ID"
+DISBURSEMENT_DATE = "Disbursement Date"
+DISBURSEMENT_AMOUNT = "Disbursement Amount"
+TRUE_PAYMENT_DATE = "True Payment Date"
+TRUE_PRINCIPAL_PAYMENT = "True Principal Payment"
+
+PORTFOLIO = "portfolio"
+LEVEL_COLUMNS = {"loan": LOAN_ID, "customer": CUSTOMER_ID, "company": COMPANY}
+FREQUENCIES = ("D", "M")
+
+
+def _cents(values: pd.Series) -> np.ndarray:
+    amounts = pd.to_numeric(values, errors="coerce").to_numpy(
+        dtype="float64", na_value=0.0
+    )
+    return np.rint(amounts * 100).astype(np.int64)
+
+
+class _LevelIndex:
+    """Events of one level ordered by (entity, day) with running balances"""
+
+    def __init__(self, codes: np.ndarray, days: np.ndarray, cents: np.ndarray):
+        keep = codes >= 0
+        codes, days, cents = codes[keep], days[keep], cents[keep]
+        self.day_span = int(days.max() - days.min()) + 2 if len(days) else 1
+        self.first_day = int(days.min()) if len(days) else 0
+        keys = codes * self.day_span + (days - self.first_day)
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.codes = codes[order]
+        running = np.cumsum(cents[order])
+        # Subtract each entity's running total before its first event
+        starts = np.flatnonzero(np.r_[True, self.codes[1:] != self.codes[:-1]])
+        before = (running[starts] - cents[order][starts]) if len(starts) else running
+        lengths = np.diff(np.r_[starts, len(self.codes)])
+        self.balances = running - np.repeat(before, lengths)
+
+    def as_of(self, codes: np.ndarray, day: int) -> np.ndarray:
+        """Balance in cents of each entity code at the end of ``day``"""
+        offset = np.clip(day - self.first_day, -1, self.day_span - 1)
+        position = np.searchsorted(self.keys, codes * self.day_span + offset, "right")
+        last = position - 1
+        found = last >= 0
+        found[found] = self.codes[last[found]] == codes[found]
+        return np.where(found, self.balances[np.maximum(last, 0)], 0)
+
+
+class BalanceLedger:
+    """
+    Outstanding principal rebuilt from disbursement and repayment events.
+
+    Each disbursement adds ``Disbursement Amount`` on its disbursement date
+    and each payment subtracts ``True Principal Payment`` on its payment date.
+    Events are kept in integer cents and sorted once by day; portfolio
+    balances are prefix sums over that order, and each entity level keeps
+    its own (entity, day) order, so an as-of query is one ``searchsorted``.
+
+    Events without a date are ignored. Loans, customers or companies missing
+    on an event still count toward the portfolio balance. Balances are not
+    floored, so overpaid loans show negative balances.
+    """
+
+    def __init__(
+        self,
+        days: np.ndarray,
+        cents: np.ndarray,
+        entities: Dict[str, Tuple[np.ndarray, pd.Index]],
+    ):
+        """
+        Args:
+            days: Event dates as ``datetime64[D]``
+            cents: Signed principal change of each event, in cents
+            entities: Level name -> (entity code per event, -1 if missing;
+                entity labels)
+        """
+        dated = ~np.isnat(days)
+        self._days = days[dated].astype(np.int64)
+        order = np.argsort(self._days, kind="stable")
+        self._days = self._days[order]
+        self._cents = cents[dated][order]
+        self._running = np.cumsum(self._cents)
+        self._entities = {
+            level: (codes[dated][order], labels)
+            for level, (codes, labels) in entities.items()
+        }
+        self._levels: Dict[str, _LevelIndex] = {}
+
+    @classmethod
+    def from_tables(
+        cls, loan_data: pd.DataFrame, payments: Optional[pd.DataFrame] = None
+    ) -> "BalanceLedger":
+        """
+        Build the ledger from the Loan Data and Historic Real Payment tables.
+
+        Args:
+            loan_data: Loans with disbursement date and amount
+            payments: Payments with True Payment Date and True Principal Payment
+        """
+        frames = [
+            (loan_data, DISBURSEMENT_DATE, DISBURSEMENT_AMOUNT, 1),
+        ]
+        if payments is not None:
+            frames.append((payments, TRUE_PAYMENT_DATE, TRUE_PRINCIPAL_PAYMENT, -1))
+
+        days = np.concatenate([to_days(df[date]) for df, date, _, _ in frames])
+        cents = np.concatenate(
+            [sign * _cents(df[amount]) for df, _, amount, sign in frames]
+        )
+        entities = {}
+        for level, column in LEVEL_COLUMNS.items():
+            labels = pd.concat(
+                [
+                    df[column] if column in df else pd.Series(None, index=df.index)
+                    for df, _, _, _ in frames
+                ],
+                ignore_index=True,
+            )
+            entities[level] = pd.factorize(labels, sort=True)
+        ledger = cls(days.astype("datetime64[D]"), cents, entities)
+        logger.info(f"Balance ledger built from {len(ledger._days)} events")
+        return ledger
+
+    @property
+    def levels(self) -> Tuple[str, ...]:
+        """Entity levels available besides the portfolio"""
+        return tuple(self._entities)
+
+    @property
+    def date_range(self) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+        """First and last event dates"""
+        if not len(self._days):
+            return None, None
+        first, last = self._days[[0, -1]].astype("datetime64[D]")
+        return pd.Timestamp(first), pd.Timestamp(last)
+
+    def _level(self, level: str) -> _LevelIndex:
+        if level not in self._entities:
+            raise ValueError(
+                f"Unknown level {level!r}; expected {PORTFOLIO!r} or one of "
+                f"{sorted(self._entities)}"
+            )
+        index = self._levels.get(level)
+        if index is None:
+            codes, _ = self._entities[level]
+            index = _LevelIndex(codes, self._days, self._cents)
+            self._levels[level] = index
+        return index
+
+    def balance_as_of(
+        self, as_of: DateLike, level: str = PORTFOLIO, key: Optional[str] = None
+    ) -> Union[float, pd.Series]:
+        """
+        Outstanding principal at the end of ``as_of``.
+
+        Args:
+            as_of: Date to read the balance at
+            level: ``portfolio``, ``loan``, ``customer`` or ``company``
+            key: One loan, customer or company; all of them when omitted
+
+        Returns:
+            A float for the portfolio or a single key, otherwise a Series
+            indexed by entity
+        """
+        day = day_number(as_of)
+        if level == PORTFOLIO:
+            position = np.searchsorted(self._days, day, side="right")
+            return float(self._running[position - 1]) / 100 if position else 0.0
+
+        index = self._level(level)
+        labels = self._entities[level][1]
+        if key is not None:
+            code = labels.get_indexer([key])
+            return float(index.as_of(code, day)[0]) / 100 if code[0] >= 0 else 0.0
+        balances = index.as_of(np.arange(len(labels)), day) / 100
+        return pd.Series(balances, index=labels.rename(LEVEL_COLUMNS[level]))
+
+    def _period_ends(
+        self, freq: str, start: Optional[DateLike], end: Optional[DateLike]
+    ) -> np.ndarray:
+        if freq not in FREQUENCIES:
+            raise ValueError(
+                f"Unknown frequency {freq!r}; expected one of {FREQUENCIES}"
+            )
+        first, last = self.date_range
+        start = pd.Timestamp(start) if start is not None else first
+        end = pd.Timestamp(end) if end is not None else last
+        if start is None or end is None or start > end:
+            return np.array([], dtype="datetime64[D]")
+        if freq == "D":
+            first_day = np.datetime64(start.normalize(), "D")
+            return np.arange(first_day, np.datetime64(end.normalize(), "D") + 1)
+        return month_ends(start, end)
+
+    def series(
+        self,
+        level: str = PORTFOLIO,
+        freq: str = "D",
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+    ) -> Union[pd.Series, pd.DataFrame]:
+        """
+        Balance at the end of each day or month.
+
+        Args:
+            level: ``portfolio``, ``loan``, ``customer`` or ``company``
+            freq: ``D`` for daily or ``M`` for month-end balances
+            start: First date (defaults to the first event)
+            end: Last date (defaults to the last event)
+
+        Returns:
+            A Series for the portfolio, otherwise a DataFrame with one column
+            per entity; entity series are dense (periods x entities)
+        """
+        ends = self._period_ends(freq, start, end)
+        index = pd.DatetimeIndex(ends, name="date")
+        end_days = ends.astype(np.int64)
+
+        if level == PORTFOLIO:
+            position = np.searchsorted(self._days, end_days, side="right")
+            running = np.r_[0, self._running]
+            return pd.Series(running[position] / 100, index=index, name="balance")
+
+        self._level(level)
+        codes, labels = self._entities[level]
+        known = codes >= 0
+        # Period of each event: the first period end on or after its day
+        period = np.searchsorted(end_days, self._days[known], side="left")
+        flat = period * len(labels) + codes[known]
+        shape = (len(ends) + 1, len(labels))
+        changes = np.bincount(
+            flat, weights=self._cents[known], minlength=shape[0] * shape[1]
+        ).reshape(shape)
+        balances = np.cumsum(changes[:-1], axis=0) / 100
+        return pd.DataFrame(
+            balances, index=index, columns=labels.rename(LEVEL_COLUMNS[level])
+        )
+
+
+__all__ = ["BalanceLedger", "FREQUENCIES", "LEVEL_COLUMNS", "PORTFOLIO"]
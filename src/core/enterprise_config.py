@@ -99,6 +99,7 @@ class EnterpriseConfigManager:
                 "refresh_interval_hours": 6,
                 "data_retention_days": 2555,  # 7 years for regulatory compliance
             },
+            "kpi_history": {"directory": "abaco_runtime/kpi_history"},
             "integrations": {
                 "openai": {"model": "gpt-4-turbo", "max_tokens": 4000},
                 "anthropic": {"model": "claude-3-sonnet", "max_tokens": 4000},
@@ -201,6 +202,10 @@ class EnterpriseConfigManager:
         """Get the KPI targets configuration"""
         return self.base_config["commercial_lending"]["kpi_targets"]
 
+    def get_kpi_history_dir(self) -> Path:
+        """Get the directory of the persistent KPI history store"""
+        return Path(self.base_config["kpi_history"]["directory"])
+
     def get_data_sources_config(self) -> Dict[str, Any]:
         """Get the data sources configuration"""
         return self.base_config["data_sources"]
@@ -0,0 +1,201 @@
+"""
+Process-wide Abaco dataset cache for the API services
+Tables are loaded lazily, one at a time, and reloaded only when their source
+file changes, so each endpoint pays only for the table it touches
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+from src.data_loader import (
+    ABACO_TABLE_FILES,
+    COLLATERAL_TABLE,
+    HISTORIC_REAL_PAYMENT_TABLE,
+    LOAN_DATA_TABLE,
+    PAYMENT_SCHEDULE_TABLE,
+    load_collateral,
+    load_historic_real_payment,
+    load_loan_data,
+    load_payment_schedule,
+)
+
+logger = logging.getLogger(__name__)
+
+# (size, mtime_ns) of the source file, or None when it does not exist
+DataVersion = Optional[Tuple[int, int]]
+
+# API table name -> (loader, schema dataset name)
+DEFAULT_TABLES: Dict[str, Tuple[Callable[..., pd.DataFrame], str]] = {
+    "loan_data": (load_loan_data, LOAN_DATA_TABLE),
+    "payment_history": (load_historic_real_payment, HISTORIC_REAL_PAYMENT_TABLE),
+    "payment_schedule": (load_payment_schedule, PAYMENT_SCHEDULE_TABLE),
+    "collateral": (load_collateral, COLLATERAL_TABLE),
+}
+
+
+@dataclass
+class CachedTable:
+    """One cached table with its data version and counters"""
+
+    frame: Optional[pd.DataFrame] = None
+    version: DataVersion = None
+    loaded: bool = False
+    hits: int = 0
+    misses: int = 0
+    last_load_seconds: float = 0.0
+    loaded_at: Optional[float] = None
+    # Artifacts built from ``frame`` (Arrow tables, indexes...), dropped on reload
+    derived: Dict[str, Any] = field(default_factory=dict, repr=False)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+
+class DatasetCache:
+    """
+    Lazily loaded, file-change invalidated cache of Abaco tables.
+
+    Each ``get`` costs one ``stat`` of the source file; the table is only
+    (re)loaded when it has never been loaded or the file's size or mtime has
+    changed. Loads are serialized per table, so concurrent requests for a
+    cold table trigger a single load.
+    """
+
+    def __init__(
+        self,
+        base_path: Optional[Path] = None,
+        tables: Optional[Dict[str, Tuple[Callable[..., pd.DataFrame], str]]] = None,
+    ):
+        self.base_path = Path(base_path) if base_path else Path("data")
+        self.tables = dict(tables or DEFAULT_TABLES)
+        self._entries: Dict[str, CachedTable] = {
+            name: CachedTable() for name in self.tables
+        }
+
+    def source_path(self, name: str) -> Path:
+        """Return the CSV backing a cached table"""
+        _, schema_table = self.tables[name]
+        return self.base_path / ABACO_TABLE_FILES[schema_table]
+
+    def current_version(self, name: str) -> DataVersion:
+        """Return the on-disk version of a table without loading it"""
+        try:
+            stat = self.source_path(name).stat()
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def get(self, name: str) -> pd.DataFrame:
+        """
+        Return a table, loading it only if it is cold or its file changed.
+
+        Args:
+            name: Table name, e.g. ``"loan_data"``
+
+        Returns:
+            Cached DataFrame (shared; callers must not modify it in place)
+
+        Raises:
+            KeyError: If ``name`` is not a configured table
+        """
+        entry = self._entries[name]
+        version = self.current_version(name)
+        if entry.loaded and entry.version == version:
+            entry.hits += 1
+            return entry.frame
+
+        with entry.lock:
+            # Another request may have loaded it while we waited
+            if entry.loaded and entry.version == version:
+                entry.hits += 1
+                return entry.frame
+
+            entry.misses += 1
+            loader, _ = self.tables[name]
+            started = time.perf_counter()
+            frame = loader(self.base_path)
+            entry.last_load_seconds = round(time.perf_counter() - started, 4)
+            entry.frame, entry.version, entry.loaded = frame, version, True
+            entry.derived = {}
+            entry.loaded_at = time.time()
+            logger.info(
+                f"Dataset cache loaded {name}: {len(frame)} rows "
+                f"in {entry.last_load_seconds}s"
+            )
+            return frame
+
+    def get_many(self, names: Iterable[str]) -> Dict[str, pd.DataFrame]:
+        """Return several tables, each loaded at most once per data version"""
+        return {name: self.get(name) for name in names}
+
+    def derived(self, name: str, key: str, build: Callable[[pd.DataFrame], Any]) -> Any:
+        """
+        Return an artifact built from a table, built once per data version.
+
+        Args:
+            name: Table name
+            key: Artifact name, e.g. ``"arrow"``
+            build: Function turning the table into the artifact
+
+        Returns:
+            ``build(frame)`` for the current version of the table
+        """
+        return self.derived_with_frame(name, key, build)[1]
+
+    def derived_with_frame(
+        self, name: str, key: str, build: Callable[[pd.DataFrame], Any]
+    ) -> Tuple[pd.DataFrame, Any]:
+        """
+        Like ``derived``, but also return the exact frame the artifact is for.
+
+        Use this when the artifact holds row positions, so a reload between
+        two separate calls cannot pair an artifact with the wrong frame.
+        """
+        frame = self.get(name)
+        entry = self._entries[name]
+        with entry.lock:
+            if entry.frame is frame and key in entry.derived:
+                return frame, entry.derived[key]
+            artifact = build(frame)
+            if entry.frame is frame:
+                entry.derived[key] = artifact
+            return frame, artifact
+
+    def version(self, name: str) -> DataVersion:
+        """Return the data version of the cached copy of a table"""
+        return self._entries[name].version
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Drop one table (or every table) so the next access reloads it"""
+        for table in [name] if name else list(self._entries):
+            entry = self._entries[table]
+            with entry.lock:
+                entry.frame, entry.version, entry.loaded = None, None, False
+                entry.derived = {}
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and load times per table"""
+        tables = {
+            name: {
+                "loaded": entry.loaded,
+                "rows": len(entry.frame) if entry.frame is not None else 0,
+                "hits": entry.hits,
+                "misses": entry.misses,
+                "last_load_seconds": entry.last_load_seconds,
+                "version": list(entry.version) if entry.version else None,
+                "derived": sorted(entry.derived),
+            }
+            for name, entry in self._entries.items()
+        }
+        return {
+            "hits": sum(entry.hits for entry in self._entries.values()),
+            "misses": sum(entry.misses for entry in self._entries.values()),
+            "tables": tables,
+        }
+
+
+__all__ = ["DatasetCache", "CachedTable", "DEFAULT_TABLES"]
@@ -0,0 +1,72 @@
+"""
+Integer date coding shared by the vectorised analytics modules
+Dates are coded as day numbers (days since 1970-01-01) or month codes
+(months since 1970-01, the ordinal of a monthly Period), so grouping and
+ordering by date reduce to integer sorts, bincounts and searchsorted
+"""
+
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+DateLike = Union[str, pd.Timestamp, np.datetime64]
+
+MISSING_MONTH = -1
+
+
+def to_days(values: pd.Series) -> np.ndarray:
+    """Dates as ``datetime64[D]``; unparseable values become NaT"""
+    if not pd.api.types.is_datetime64_any_dtype(values):
+        values = pd.to_datetime(values, errors="coerce")
+    return values.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+
+
+def day_numbers(values: pd.Series, missing: int) -> np.ndarray:
+    """Dates as int64 days since the epoch, with ``missing`` for NaT"""
+    days = to_days(values)
+    return np.where(np.isnat(days), missing, days.astype(np.int64))
+
+
+def day_number(value: DateLike) -> np.int64:
+    """Days since the epoch of a single date"""
+    return np.datetime64(pd.Timestamp(value), "D").astype(np.int64)
+
+
+def days_between(later: np.ndarray, earlier: np.ndarray) -> np.ndarray:
+    """Whole days between two datetime arrays, NaN where either is missing"""
+    delta = (later - earlier).astype("timedelta64[D]").astype("float64")
+    delta[np.isnat(later) | np.isnat(earlier)] = np.nan
+    return delta
+
+
+def month_codes(values: pd.Series) -> np.ndarray:
+    """Months since 1970-01 for each date; -1 where the date is missing"""
+    days = to_days(values)
+    codes = days.astype("datetime64[M]").astype(np.int64)
+    return np.where(np.isnat(days), MISSING_MONTH, codes)
+
+
+def month_starts(codes: np.ndarray) -> pd.DatetimeIndex:
+    """First day of each month code"""
+    months = np.asarray(codes, dtype=np.int64).astype("datetime64[M]")
+    return pd.DatetimeIndex(months.astype("datetime64[ns]"))
+
+
+def month_ends(start: pd.Timestamp, end: pd.Timestamp) -> np.ndarray:
+    """Last day of every month from ``start`` to ``end`` as ``datetime64[D]``"""
+    months = pd.period_range(start, end, freq="M")
+    return months.end_time.normalize().to_numpy().astype("datetime64[D]")
+
+
+__all__ = [
+    "DateLike",
+    "MISSING_MONTH",
+    "day_number",
+    "day_numbers",
+    "days_between",
+    "month_codes",
+    "month_ends",
+    "month_starts",
+    "to_days",
+]
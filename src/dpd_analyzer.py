@@ -5,39 +5,51 @@ Advanced DPD calculation and bucket assignment
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import logging
 
+try:
+    from src.dpd_policy import DPDBucketEngine, UNKNOWN_BUCKET, default_dpd_engine
+except ImportError:
+    from dpd_policy import DPDBucketEngine, UNKNOWN_BUCKET, default_dpd_engine
+
 logger = logging.getLogger(__name__)
 
 
 class DPDAnalyzer:
     """Advanced DPD analysis with bucket assignment capabilities"""
 
-    def __init__(self):
+    def __init__(self, engine: Optional[DPDBucketEngine] = None):
+        self.engine = engine or default_dpd_engine()
+        policy = self.engine.policy
         self.dpd_buckets = {
-            "current": (0, 0),
-            "1_30": (1, 30),
-            "31_60": (31, 60),
-            "61_90": (61, 90),
-            "90_plus": (91, float("inf")),
+            name: (int(lower), int(upper))
+            for name, lower, upper in zip(
+                policy.names, policy.lower_days, policy.upper_days
+            )
         }
 
     def assign_dpd_buckets(
-        self, df: pd.DataFrame, dpd_column: str = "days_past_due"
+        self,
+        df: pd.DataFrame,
+        dpd_column: str = "days_past_due",
+        balance_column: Optional[str] = None,
     ) -> pd.DataFrame:
-        """Assign DPD buckets based on days past due"""
-        result_df = df.copy()
+        """
+        Assign policy DPD buckets, risk weights and provisions in one pass
 
-        def get_bucket(dpd_value):
-            if pd.isna(dpd_value):
-                return "unknown"
-            for bucket_name, (min_days, max_days) in self.dpd_buckets.items():
-                if min_days <= dpd_value <= max_days:
-                    return bucket_name
-            return "unknown"
+        Rows without a matching bucket (missing or negative DPD) are labelled
+        ``unknown``. ``provision_amount`` is added when ``balance_column`` is given.
+        """
+        buckets = self.engine.assign(df, dpd_column, balance_column)
+        buckets["dpd_bucket"] = (
+            buckets["dpd_bucket"]
+            .cat.add_categories(UNKNOWN_BUCKET)
+            .fillna(UNKNOWN_BUCKET)
+        )
 
-        result_df["dpd_bucket"] = result_df[dpd_column].apply(get_bucket)
+        result_df = df.copy()
+        result_df[buckets.columns] = buckets
         logger.info(f"DPD buckets assigned for {len(result_df)} records")
         return result_df
 
@@ -0,0 +1,183 @@
+"""
+Policy-driven DPD bucketing engine
+Delinquency buckets, risk weights and provisioning rates are read from
+config/dpd_policy.yml and applied to whole columns with one searchsorted
+"""
+
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DPD_POLICY_PATH = Path(__file__).resolve().parent.parent / "config" / "dpd_policy.yml"
+UNKNOWN_BUCKET = "unknown"
+UNKNOWN_CODE = -1
+
+
+@dataclass(frozen=True, eq=False)
+class DPDPolicy:
+    """Delinquency buckets in ascending order with their weights and provisions"""
+
+    names: Tuple[str, ...]
+    lower_days: np.ndarray
+    upper_days: np.ndarray
+    risk_weights: np.ndarray
+    provisioning_rates: np.ndarray
+    default_threshold: int = 180
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "DPDPolicy":
+        """
+        Build a policy from the parsed ``dpd_policy.yml`` document.
+
+        Raises:
+            ValueError: If buckets overlap or a bucket has no risk weight or
+                provisioning rate
+        """
+        buckets = config.get("delinquency_buckets") or {}
+        if not buckets:
+            raise ValueError("DPD policy defines no delinquency_buckets")
+
+        ordered = sorted(buckets.items(), key=lambda item: item[1]["days_range"][0])
+        names = tuple(name for name, _ in ordered)
+        lower = np.array([spec["days_range"][0] for _, spec in ordered], dtype=np.int64)
+        upper = np.array([spec["days_range"][1] for _, spec in ordered], dtype=np.int64)
+        if np.any(upper < lower) or np.any(lower[1:] <= upper[:-1]):
+            raise ValueError("DPD policy buckets must be ordered and non-overlapping")
+
+        def rates(section: str) -> np.ndarray:
+            values = config.get(section) or {}
+            missing = [name for name in names if name not in values]
+            if missing:
+                raise ValueError(f"DPD policy {section} missing buckets: {missing}")
+            return np.array([float(values[name]) for name in names])
+
+        threshold = (config.get("default_threshold") or {}).get("days", 180)
+        return cls(
+            names=names,
+            lower_days=lower,
+            upper_days=upper,
+            risk_weights=rates("risk_weights"),
+            provisioning_rates=rates("provisioning_rates"),
+            default_threshold=int(threshold),
+        )
+
+
+@lru_cache(maxsize=8)
+def _load_policy(path: Path, mtime_ns: int) -> DPDPolicy:
+    import yaml
+
+    with open(path, "r") as f:
+        policy = DPDPolicy.from_config(yaml.safe_load(f) or {})
+    logger.info(f"Loaded DPD policy with {len(policy.names)} buckets from {path}")
+    return policy
+
+
+def load_dpd_policy(path: Optional[Union[str, Path]] = None) -> DPDPolicy:
+    """
+    Load (and cache) the DPD policy; an edited file is re-read.
+
+    Args:
+        path: Policy YAML file (defaults to ``config/dpd_policy.yml``)
+    """
+    path = Path(path or DPD_POLICY_PATH).resolve()
+    return _load_policy(path, path.stat().st_mtime_ns)
+
+
+class DPDBucketEngine:
+    """
+    Vectorized assignment of DPD buckets, risk weights and provisions.
+
+    Days are floored to whole days and located among the bucket lower bounds
+    with a single ``searchsorted``; the resulting integer codes index the
+    policy's weight and provision arrays directly. The last bucket is
+    open-ended, so days beyond its configured upper bound stay in it. Missing
+    or negative days, and days falling in a gap between buckets, get
+    ``UNKNOWN_CODE``.
+    """
+
+    def __init__(self, policy: Optional[DPDPolicy] = None):
+        self.policy = policy or load_dpd_policy()
+        self._upper = self.policy.upper_days.copy()
+        self._upper[-1] = np.iinfo(np.int64).max
+        # Lookup tables with a trailing slot for UNKNOWN_CODE (index -1)
+        self._weights = np.append(self.policy.risk_weights, np.nan)
+        self._provisions = np.append(self.policy.provisioning_rates, np.nan)
+        self.categories = pd.CategoricalDtype(list(self.policy.names), ordered=True)
+
+    def codes(self, days: Union[pd.Series, np.ndarray]) -> np.ndarray:
+        """Bucket code of every value, ``UNKNOWN_CODE`` where none applies"""
+        values = pd.to_numeric(pd.Series(days), errors="coerce").to_numpy(
+            dtype="float64", na_value=np.nan
+        )
+        missing = np.isnan(values)
+        whole_days = np.floor(np.where(missing, -1, values)).astype(np.int64)
+        codes = np.searchsorted(self.policy.lower_days, whole_days, side="right") - 1
+        in_range = (codes >= 0) & (whole_days <= self._upper[codes.clip(0)])
+        return np.where(in_range & ~missing, codes, UNKNOWN_CODE)
+
+    def labels(self, codes: np.ndarray) -> pd.Categorical:
+        """Bucket names for codes; unknown codes become missing"""
+        return pd.Categorical.from_codes(codes, dtype=self.categories)
+
+    def assign(
+        self,
+        df: pd.DataFrame,
+        dpd_column: str,
+        balance_column: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """
+        Bucket columns for every row of ``df``, aligned on its index.
+
+        Returns:
+            DataFrame with ``dpd_bucket`` (categorical), ``dpd_bucket_code``,
+            ``risk_weight`` and ``provision_rate``, plus ``provision_amount``
+            when ``balance_column`` is given
+        """
+        codes = self.codes(df[dpd_column])
+        columns = {
+            "dpd_bucket": self.labels(codes),
+            "dpd_bucket_code": codes,
+            "risk_weight": self._weights[codes],
+            "provision_rate": self._provisions[codes],
+        }
+        if balance_column is not None:
+            balance = df[balance_column].to_numpy(dtype="float64", na_value=np.nan)
+            columns["provision_amount"] = balance * columns["provision_rate"]
+        return pd.DataFrame(columns, index=df.index)
+
+    def totals(self, codes: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Sum of ``values`` per bucket, ignoring unknown codes and missing values"""
+        valid = (codes >= 0) & ~np.isnan(values)
+        return np.bincount(
+            codes[valid], weights=values[valid], minlength=len(self.policy.names)
+        )
+
+
+_default_engine: Optional[DPDBucketEngine] = None
+
+
+def default_dpd_engine() -> DPDBucketEngine:
+    """Engine for ``config/dpd_policy.yml``, rebuilt when the policy changes"""
+    global _default_engine
+    policy = load_dpd_policy()
+    if _default_engine is None or _default_engine.policy is not policy:
+        _default_engine = DPDBucketEngine(policy)
+    return _default_engine
+
+
+__all__ = [
+    "DPDPolicy",
+    "DPDBucketEngine",
+    "load_dpd_policy",
+    "default_dpd_engine",
+    "DPD_POLICY_PATH",
+    "UNKNOWN_BUCKET",
+    "UNKNOWN_CODE",
+]
@@ -1,29 +1,141 @@
 """
 Evergreen analytics module extracted from PR #7
 Cohort retention and customer reactivation analysis functions
+
+Customers and months are integer coded (months since 1970-01), so cohort
+matrices come from one bincount over distinct customer-months
 """
 
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
 import pandas as pd
 
+try:
+    from src.date_codes import month_codes, month_starts
+except ImportError:
+    from date_codes import month_codes, month_starts
+
+
+def distinct(keys: np.ndarray) -> np.ndarray:
+    """Sorted distinct values of an integer array (sort and mask)"""
+    keys = np.sort(keys)
+    return keys[np.r_[True, keys[1:] != keys[:-1]]] if len(keys) else keys
+
+
+def customer_order(customers: np.ndarray, days: np.ndarray) -> np.ndarray:
+    """
+    Positions of the events with a customer code and a date, sorted by
+    customer then day; same-day events keep their input order.
+    """
+    valid = np.flatnonzero((customers >= 0) & ~np.isnat(days))
+    if not len(valid):
+        return valid
+    day = days[valid].astype("datetime64[D]").astype(np.int64)
+    span = int(day.max() - day.min()) + 1
+    key = customers[valid].astype(np.int64) * span + (day - day.min())
+    return valid[np.argsort(key, kind="stable")]
+
+
+@dataclass
+class CohortActivity:
+    """
+    Distinct active customers per acquisition cohort.
+
+    A customer's cohort is the month of their first activity. ``active`` is
+    indexed by calendar month from ``first_month`` and ``by_age`` by months
+    since the cohort month; ages later than ``last_month`` are not observed.
+    """
+
+    first_month: int
+    last_month: int
+    cohorts: np.ndarray
+    sizes: np.ndarray
+    active: np.ndarray
+    by_age: np.ndarray
+
+    @property
+    def months(self) -> np.ndarray:
+        """Calendar month codes of the ``active`` columns"""
+        return np.arange(self.first_month, self.last_month + 1)
+
+    def retention_by_age(self) -> np.ndarray:
+        """Share of each cohort active N months after joining; NaN if unobserved"""
+        ages = np.arange(self.by_age.shape[1])
+        observed = self.cohorts[:, None] + ages[None, :] <= self.last_month
+        rates = self.by_age / np.maximum(self.sizes, 1)[:, None]
+        return np.where(observed, rates, np.nan)
+
+
+def cohort_activity(df: pd.DataFrame, customer_id: str, dt_col: str) -> CohortActivity:
+    """Count distinct active customers per cohort and month with one bincount"""
+    customers = pd.factorize(df[customer_id])[0]
+    months = month_codes(df[dt_col])
+    keep = (customers >= 0) & (months >= 0)
+    customers, months = customers[keep], months[keep]
+    if not len(months):
+        empty = np.zeros((0, 0))
+        return CohortActivity(
+            0, -1, np.array([], dtype=np.int64), np.zeros(0), empty, empty
+        )
+
+    first_month = int(months.min())
+    span = int(months.max()) - first_month + 1
+    # Distinct (customer, month) pairs, sorted by customer then month
+    pairs = distinct(customers.astype(np.int64) * span + (months - first_month))
+    customer, month = np.divmod(pairs, span)
+    starts = np.flatnonzero(np.r_[True, customer[1:] != customer[:-1]])
+    joined = np.repeat(month[starts], np.diff(np.r_[starts, len(pairs)]))
+    # Cohort rows only for months in which some customer joined
+    present = np.bincount(month[starts], minlength=span) > 0
+    cohort_offsets = np.flatnonzero(present)
+    row = (np.cumsum(present) - 1)[joined]
+
+    shape = (len(cohort_offsets), span)
+    active = np.bincount(row * span + month, minlength=shape[0] * span)
+    by_age = np.bincount(row * span + (month - joined), minlength=shape[0] * span)
+    return CohortActivity(
+        first_month=first_month,
+        last_month=first_month + span - 1,
+        cohorts=cohort_offsets + first_month,
+        sizes=np.bincount(row[starts], minlength=shape[0]),
+        active=active.reshape(shape).astype(float),
+        by_age=by_age.reshape(shape).astype(float),
+    )
+
 
 def monthly_cohort(df: pd.DataFrame, customer_id: str, dt_col: str) -> pd.DataFrame:
     """Perform cohort retention analysis by grouping customers based on first activity month"""
-    x: pd.DataFrame = df[[customer_id, dt_col]].copy()
-    x[dt_col] = pd.to_datetime(x[dt_col]).dt.to_period("M").dt.to_timestamp()
-    first: pd.Series = pd.Series(x.groupby(customer_id)[dt_col].min().rename("cohort"))  # type: ignore
-    x = x.merge(first, on=customer_id)
-    x["month"] = x[dt_col]
-    cohort_group = x.groupby(["cohort", "month"])[customer_id]  # type: ignore
-    cohort_counts: pd.DataFrame = cohort_group.nunique().reset_index()  # type: ignore
-    cohort_pivot: pd.DataFrame = (
-        cohort_counts.pivot(index="cohort", columns="month", values=customer_id)
-        .fillna(0.0)
-        .astype(float)
+    activity = cohort_activity(df, customer_id, dt_col)
+    # Retention matrix: active customers over the cohort's size
+    retention = activity.active / np.maximum(activity.sizes, 1)[:, None]
+    return pd.DataFrame(
+        retention.round(3),
+        index=month_starts(activity.cohorts).rename("cohort"),
+        columns=month_starts(activity.months).rename("month"),
     )
-    # Retention matrix
-    base = cohort_pivot.apply(lambda r: r.iloc[0] if r.iloc[0] > 0 else 1, axis=1)  # type: ignore
-    retention: pd.DataFrame = cohort_pivot.div(base, axis=0).round(3)  # type: ignore
-    return retention
+
+
+def days_since_previous(
+    customers: np.ndarray, dates: np.ndarray, order: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Days between each event and the same customer's previous event.
+
+    ``customers`` are integer codes (-1 when missing) and ``dates`` are
+    ``datetime64`` values. First events, missing customers and missing dates
+    get NaN; results follow the input order. ``order`` may pass a
+    ``customer_order`` already computed for the same events.
+    """
+    days = dates.astype("datetime64[D]")
+    gaps = np.full(len(days), np.nan)
+    if order is None:
+        order = customer_order(customers, days)
+    same = customers[order][1:] == customers[order][:-1]
+    step = np.diff(days[order].astype(np.int64))
+    gaps[order[1:][same]] = step[same]
+    return gaps
 
 
 def reactivation_flag(
@@ -31,8 +143,9 @@ def reactivation_flag(
 ) -> pd.DataFrame:
     """Identify customer reactivation events by detecting gaps in activity"""
     d = events[[customer_id, dt_col]].copy()
-    d[dt_col] = pd.to_datetime(d[dt_col]).sort_values()
-    d["prev"] = d.groupby(customer_id)[dt_col].shift(1)
-    d["gap"] = (d[dt_col] - d["prev"]).dt.days
-    d["reactivated"] = (d["gap"] > gap_days).fillna(False)  # type: ignore
+    d[dt_col] = pd.to_datetime(d[dt_col])
+    gaps = days_since_previous(
+        pd.factorize(d[customer_id])[0], d[dt_col].to_numpy(dtype="datetime64[ns]")
+    )
+    d["reactivated"] = gaps > gap_days
     return d[[customer_id, dt_col, "reactivated"]]
@@ -0,0 +1,238 @@
+"""
+Indexed catalogue of portfolio analysis exports
+Each exported run is recorded in an embedded SQLite database, so listing and
+reading recent runs never has to scan or open the export directory
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_EXPORT_DIR = Path("abaco_runtime/exports/analytics")
+CATALOG_FILENAME = "catalog.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analysis_runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    filename TEXT NOT NULL UNIQUE,
+    path TEXT NOT NULL,
+    exported_at TEXT NOT NULL,
+    processing_timestamp TEXT,
+    datasets TEXT NOT NULL,
+    total_records INTEGER NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_analysis_runs_exported_at
+    ON analysis_runs (exported_at, run_id);
+"""
+
+
+@dataclass
+class CatalogEntry:
+    """One catalogued analysis run"""
+
+    run_id: int
+    filename: str
+    path: str
+    exported_at: str
+    processing_timestamp: Optional[str]
+    datasets: List[str]
+    total_records: int
+    payload: Optional[Dict[str, Any]] = None
+
+    def summary(self) -> Dict[str, Any]:
+        """Listing view, without the full analysis payload"""
+        return {
+            "run_id": self.run_id,
+            "filename": self.filename,
+            "timestamp": self.processing_timestamp,
+            "exported_at": self.exported_at,
+            "datasets": self.datasets,
+            "total_records": self.total_records,
+        }
+
+
+def _as_local(moment: datetime) -> datetime:
+    """Export times are stored as naive local time; align aware bounds to it"""
+    return moment.astimezone().replace(tzinfo=None) if moment.tzinfo else moment
+
+
+def _total_records(results: Dict[str, Any]) -> int:
+    counts = results.get("total_records") or {}
+    return int(sum(counts.values())) if isinstance(counts, dict) else int(counts)
+
+
+class ExportCatalog:
+    """
+    SQLite index of analysis exports, keyed by export time.
+
+    ``PortfolioProcessor.export_results`` records every run it writes; the
+    API reads runs back by time range and page. The analysis payload is
+    stored with the entry, so serving the latest summary needs no file I/O.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self.db_path = Path(db_path or ANALYTICS_EXPORT_DIR / CATALOG_FILENAME)
+        self.is_new = not self.db_path.exists()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Short-lived connection, committed and closed on exit"""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def record(
+        self,
+        path: Path,
+        results: Dict[str, Any],
+        exported_at: Optional[datetime] = None,
+    ) -> None:
+        """
+        Add (or replace) the catalogue entry for an exported run.
+
+        Args:
+            path: Exported JSON file
+            results: Analysis results written to ``path``
+            exported_at: Export time; defaults to now
+        """
+        path = Path(path)
+        exported_at = exported_at or datetime.now()
+        row = (
+            path.name,
+            str(path),
+            exported_at.isoformat(),
+            results.get("processing_timestamp"),
+            json.dumps(results.get("datasets_loaded", [])),
+            _total_records(results),
+            json.dumps(results, default=str),
+        )
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO analysis_runs (filename, path, exported_at, "
+                "processing_timestamp, datasets, total_records, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                row,
+            )
+
+    def backfill(self, directory: Path) -> int:
+        """
+        Catalogue JSON exports written before the catalogue existed.
+
+        Args:
+            directory: Export directory to scan once
+
+        Returns:
+            Number of runs added
+        """
+        directory = Path(directory)
+        if not directory.exists():
+            return 0
+
+        with self._connect() as conn:
+            rows = conn.execute("SELECT filename FROM analysis_runs").fetchall()
+        known = {row[0] for row in rows}
+        added = 0
+        for file in sorted(directory.glob("*.json")):
+            if file.name in known:
+                continue
+            try:
+                with open(file, "r") as f:
+                    results = json.load(f)
+                exported_at = datetime.fromtimestamp(file.stat().st_ctime)
+                self.record(file, results, exported_at)
+                added += 1
+            except Exception as e:
+                logger.warning(f"Skipping unreadable export {file}: {e}")
+
+        logger.info(f"Backfilled {added} analysis exports into {self.db_path}")
+        return added
+
+    @staticmethod
+    def _range_clause(
+        since: Optional[datetime], until: Optional[datetime]
+    ) -> Tuple[str, List[str]]:
+        conditions, params = [], []
+        if since:
+            conditions.append("exported_at >= ?")
+            params.append(_as_local(since).isoformat())
+        if until:
+            conditions.append("exported_at <= ?")
+            params.append(_as_local(until).isoformat())
+        return (" WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+    def list_runs(
+        self,
+        limit: int = 5,
+        offset: int = 0,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Tuple[List[CatalogEntry], int]:
+        """
+        Return a page of runs, newest first, and the total in the time range.
+
+        Args:
+            limit: Page size
+            offset: Runs to skip
+            since: Earliest export time (inclusive)
+            until: Latest export time (inclusive)
+        """
+        where, params = self._range_clause(since, until)
+        with self._connect() as conn:
+            total = conn.execute(
+                f"SELECT COUNT(*) FROM analysis_runs{where}", params
+            ).fetchone()[0]
+            rows = conn.execute(
+                "SELECT run_id, filename, path, exported_at, processing_timestamp, "
+                f"datasets, total_records FROM analysis_runs{where} "
+                "ORDER BY exported_at DESC, run_id DESC LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+        return [self._entry(row) for row in rows], total
+
+    def latest(
+        self, since: Optional[datetime] = None, until: Optional[datetime] = None
+    ) -> Optional[CatalogEntry]:
+        """Most recent run in the time range, with its full payload"""
+        where, params = self._range_clause(since, until)
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT run_id, filename, path, exported_at, processing_timestamp, "
+                f"datasets, total_records, payload FROM analysis_runs{where} "
+                "ORDER BY exported_at DESC, run_id DESC LIMIT 1",
+                params,
+            ).fetchone()
+        return self._entry(row) if row else None
+
+    @staticmethod
+    def _entry(row: tuple) -> CatalogEntry:
+        payload = json.loads(row[7]) if len(row) > 7 else None
+        return CatalogEntry(
+            run_id=row[0],
+            filename=row[1],
+            path=row[2],
+            exported_at=row[3],
+            processing_timestamp=row[4],
+            datasets=json.loads(row[5]),
+            total_records=row[6],
+            payload=payload,
+        )
+
+
+__all__ = ["ExportCatalog", "CatalogEntry", "ANALYTICS_EXPORT_DIR", "CATALOG_FILENAME"]
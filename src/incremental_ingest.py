@@ -0,0 +1,342 @@
+"""
+Incremental append ingestion for the Abaco Historic Real Payment tape
+Payment history only grows, so each run parses just the bytes appended since
+the previous run and appends them to a columnar store of Parquet parts; the
+parts are compacted into one once there are more than ``max_parts``
+"""
+
+import hashlib
+import io
+import json
+import logging
+import shutil
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import pandas as pd
+
+from src.data_loader import (
+    ABACO_TABLE_FILES,
+    CACHE_DIRNAME,
+    HISTORIC_REAL_PAYMENT_TABLE,
+    _PARQUET_AVAILABLE,
+    get_table_spec,
+)
+
+logger = logging.getLogger(__name__)
+
+TRUE_PAYMENT_DATE = "True Payment Date"
+
+# Bytes before the watermark that are re-hashed to detect a rewritten file
+FINGERPRINT_WINDOW = 64 * 1024
+WATERMARK_FILENAME = "watermark.json"
+DEFAULT_MAX_PARTS = 32
+
+
+@dataclass
+class IngestWatermark:
+    """Position in the source file up to which rows have been ingested"""
+
+    source: str
+    byte_offset: int
+    row_count: int
+    header: List[str]
+    tail_fingerprint: str
+    max_true_payment_date: Optional[str] = None
+    parts: int = 0
+    part_files: List[str] = field(default_factory=list)
+    terminated: bool = True
+    updated_at: str = field(default_factory=lambda: datetime.now().isoformat())
+
+    def __post_init__(self):
+        # Watermarks written before ``part_files`` existed list parts by count
+        if self.parts and not self.part_files:
+            self.part_files = [_part_name(index) for index in range(self.parts)]
+
+
+def _part_name(index: int) -> str:
+    return f"part-{index:05d}.parquet"
+
+
+@dataclass
+class IngestResult:
+    """Outcome of one ingestion run"""
+
+    delta: pd.DataFrame
+    watermark: IngestWatermark
+    full_rebuild: bool
+    load_history: Callable[[], pd.DataFrame] = field(repr=False)
+
+    @property
+    def data(self) -> pd.DataFrame:
+        """Full payment history, read and concatenated on first access"""
+        return self.load_history()
+
+    @property
+    def new_rows(self) -> int:
+        """Number of payment rows added by this run"""
+        return len(self.delta)
+
+
+class IncrementalPaymentIngestor:
+    """
+    Append-only ingestion of Historic Real Payment with a byte-offset watermark.
+
+    The watermark stores the byte offset and row count reached, the header,
+    a fingerprint of the bytes just before the offset, the max
+    ``True Payment Date`` and the live Parquet parts. When the file has only
+    grown, the next run seeks to the offset and parses only the appended
+    rows; the stored history is read only when ``IngestResult.data`` is used.
+    If the file shrank, its header changed or the fingerprinted bytes differ,
+    the store is rebuilt from scratch. Edits further back than the
+    fingerprint window are not detected; use ``ingest(full_refresh=True)``
+    after correcting history.
+
+    End of file terminates the last row even without a trailing newline. If
+    the file later grows without a line break at the old end, that row was
+    still being written, and the store is rebuilt.
+    """
+
+    def __init__(
+        self,
+        base_path: Optional[Path] = None,
+        store_dir: Optional[Path] = None,
+        max_parts: int = DEFAULT_MAX_PARTS,
+    ):
+        file_name = ABACO_TABLE_FILES[HISTORIC_REAL_PAYMENT_TABLE]
+        self.file_path = Path(base_path or "data") / file_name
+        self.store_dir = (
+            Path(store_dir)
+            if store_dir
+            else self.file_path.parent / CACHE_DIRNAME / "historic_real_payment"
+        )
+        self.spec = get_table_spec(HISTORIC_REAL_PAYMENT_TABLE)
+        self.max_parts = max_parts
+        self._watermark: Optional[IngestWatermark] = None
+        # History frames not yet concatenated; None until the store is read
+        self._frames: Optional[List[pd.DataFrame]] = None
+
+    @property
+    def watermark_path(self) -> Path:
+        return self.store_dir / WATERMARK_FILENAME
+
+    def load_watermark(self) -> Optional[IngestWatermark]:
+        """Return the persisted watermark, or None if there is no usable one"""
+        if not self.watermark_path.exists():
+            return None
+        try:
+            with open(self.watermark_path, "r", encoding="utf-8") as f:
+                return IngestWatermark(**json.load(f))
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable watermark {self.watermark_path}: {e}")
+            return None
+
+    def ingest(self, full_refresh: bool = False) -> IngestResult:
+        """
+        Bring the columnar store up to date with the source file.
+
+        Args:
+            full_refresh: Discard the store and re-ingest the whole file
+
+        Returns:
+            IngestResult with the full history, the rows new in this run and
+            the updated watermark
+
+        Raises:
+            FileNotFoundError: If the payment history file does not exist
+        """
+        if not self.file_path.exists():
+            raise FileNotFoundError(f"Payment history file not found: {self.file_path}")
+
+        watermark = None if full_refresh else self.load_watermark()
+        if watermark is None or not self._is_append_of(watermark):
+            return self._rebuild()
+
+        if self.file_path.stat().st_size == watermark.byte_offset:
+            logger.info("Payment history unchanged since last ingestion")
+            self._watermark = watermark
+            return IngestResult(
+                pd.DataFrame(columns=watermark.header), watermark, False, self.history
+            )
+
+        with open(self.file_path, "rb") as f:
+            f.seek(watermark.byte_offset)
+            appended = f.read()
+        delta = self._parse_rows(appended, watermark.header)
+        watermark = self._advance(
+            watermark, delta, watermark.byte_offset + len(appended)
+        )
+
+        if not delta.empty:
+            watermark.part_files.append(self._write_part(delta, watermark.parts))
+            watermark.parts += 1
+            if self._frames is not None:
+                self._frames.append(delta)
+        self._save_watermark(watermark)
+        self._watermark = watermark
+        if len(watermark.part_files) > self.max_parts:
+            self.compact()
+
+        logger.info(
+            f"Ingested {len(delta)} new payment rows "
+            f"(total {watermark.row_count}, offset {watermark.byte_offset})"
+        )
+        return IngestResult(delta, watermark, False, self.history)
+
+    def _rebuild(self) -> IngestResult:
+        """Ingest the whole file into a fresh store"""
+        with open(self.file_path, "rb") as f:
+            content = f.read()
+        header_end = content.find(b"\n") + 1 or len(content)
+        header = list(pd.read_csv(io.BytesIO(content[:header_end]), nrows=0).columns)
+        data = self._parse_rows(content[header_end:], header)
+
+        watermark = IngestWatermark(
+            source=str(self.file_path),
+            byte_offset=header_end,
+            row_count=0,
+            header=header,
+            tail_fingerprint="",
+        )
+        watermark = self._advance(watermark, data, len(content))
+
+        if self.store_dir.exists():
+            shutil.rmtree(self.store_dir)
+        if _PARQUET_AVAILABLE:
+            watermark.part_files = [self._write_part(data, 0)]
+            watermark.parts = 1
+            self._save_watermark(watermark)
+        else:
+            logger.warning(
+                "pyarrow not installed; payment history will be re-ingested each run"
+            )
+
+        self._watermark = watermark
+        self._frames = [data]
+        logger.info(f"Rebuilt payment history store with {len(data)} rows")
+        return IngestResult(data, watermark, True, self.history)
+
+    def history(self) -> pd.DataFrame:
+        """
+        Full stored history, reading the Parquet parts listed in the
+        watermark once per process and concatenating appended deltas lazily
+        """
+        if self._frames is None:
+            watermark = self._watermark or self.load_watermark()
+            part_files = watermark.part_files if watermark is not None else []
+            self._frames = [
+                pd.read_parquet(self.store_dir / name) for name in part_files
+            ]
+        if not self._frames:
+            return pd.DataFrame()
+        if len(self._frames) > 1:
+            data = pd.concat(self._frames, ignore_index=True)
+            self._frames = [self._restore_categoricals(data)]
+        return self._frames[0]
+
+    def compact(self) -> None:
+        """
+        Merge the Parquet parts into one.
+
+        The merged part is written under a new name and the watermark is
+        switched to it before the old parts are deleted, so an interrupted
+        compaction leaves the previous parts in use.
+        """
+        watermark = self._watermark or self.load_watermark()
+        if watermark is None or not _PARQUET_AVAILABLE or len(watermark.part_files) < 2:
+            return
+        data = self.history()
+        old_parts = watermark.part_files
+        watermark.part_files = [self._write_part(data, watermark.parts)]
+        watermark.parts += 1
+        self._save_watermark(watermark)
+        self._watermark = watermark
+        for name in old_parts:
+            (self.store_dir / name).unlink(missing_ok=True)
+        logger.info(f"Compacted {len(old_parts)} payment history parts into one")
+
+    def _is_append_of(self, watermark: IngestWatermark) -> bool:
+        """True when the file still starts with the bytes already ingested"""
+        if not _PARQUET_AVAILABLE or watermark.source != str(self.file_path):
+            return False
+        if self.file_path.stat().st_size < watermark.byte_offset:
+            return False
+        if not watermark.terminated and not self._line_break_at(watermark.byte_offset):
+            # The unterminated last row has since been extended
+            return False
+        header = list(pd.read_csv(self.file_path, nrows=0).columns)
+        if header != watermark.header:
+            return False
+        return self._fingerprint(watermark.byte_offset) == watermark.tail_fingerprint
+
+    def _line_break_at(self, offset: int) -> bool:
+        """True at end of file or when the byte at ``offset`` ends a line"""
+        with open(self.file_path, "rb") as f:
+            f.seek(offset)
+            return f.read(1) in (b"", b"\n", b"\r")
+
+    def _fingerprint(self, offset: int) -> str:
+        start = max(0, offset - FINGERPRINT_WINDOW)
+        with open(self.file_path, "rb") as f:
+            f.seek(start)
+            return hashlib.sha256(f.read(offset - start)).hexdigest()
+
+    def _advance(
+        self, watermark: IngestWatermark, delta: pd.DataFrame, new_offset: int
+    ) -> IngestWatermark:
+        """Move the watermark past ``delta``, parsed up to ``new_offset``"""
+        max_date = watermark.max_true_payment_date
+        if (
+            TRUE_PAYMENT_DATE in delta.columns
+            and delta[TRUE_PAYMENT_DATE].notna().any()
+        ):
+            delta_max = delta[TRUE_PAYMENT_DATE].max().date().isoformat()
+            max_date = max(filter(None, [max_date, delta_max]))
+
+        return IngestWatermark(
+            source=watermark.source,
+            byte_offset=new_offset,
+            row_count=watermark.row_count + len(delta),
+            header=watermark.header,
+            tail_fingerprint=self._fingerprint(new_offset),
+            max_true_payment_date=max_date,
+            parts=watermark.parts,
+            part_files=list(watermark.part_files),
+            terminated=self._line_break_at(new_offset - 1) if new_offset else True,
+        )
+
+    def _parse_rows(self, raw: bytes, header: List[str]) -> pd.DataFrame:
+        """Parse headerless CSV bytes with the typed payment schema"""
+        if not raw.strip():
+            return pd.DataFrame(columns=header)
+        df = pd.read_csv(
+            io.BytesIO(raw), header=None, names=header, **self.spec.read_options(header)
+        )
+        return self.spec.finalize(df)
+
+    def _write_part(self, df: pd.DataFrame, index: int) -> str:
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        name = _part_name(index)
+        df.to_parquet(self.store_dir / name, index=False)
+        return name
+
+    def _save_watermark(self, watermark: IngestWatermark) -> None:
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.watermark_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(watermark), f, indent=2)
+        tmp_path.replace(self.watermark_path)
+
+    def _restore_categoricals(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Concatenating parts with different category sets falls back to text"""
+        for col, dtype in self.spec.read_options(list(df.columns))["dtype"].items():
+            if dtype == "category" and not isinstance(
+                df[col].dtype, pd.CategoricalDtype
+            ):
+                df[col] = df[col].astype("category")
+        return df
+
+
+__all__ = ["IngestWatermark", "IngestResult", "IncrementalPaymentIngestor"]
@@ -0,0 +1,190 @@
+"""
+Materialized portfolio metrics snapshot for the Abaco API
+Metrics are computed once per data version in a background thread and served
+from memory, so dashboard polling never touches the loan tape
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from src.dataset_cache import DatasetCache
+
+logger = logging.getLogger(__name__)
+
+OUTSTANDING_LOAN_VALUE = "Outstanding Loan Value"
+LOAN_STATUS = "Loan Status"
+CLIENTE = "Cliente"
+SA_DE_CV = "S.A. DE C.V."
+
+SNAPSHOT_TABLES = ("loan_data", "payment_history", "payment_schedule")
+
+
+@dataclass
+class MetricsSnapshot:
+    """Portfolio metrics for one version of the source tables"""
+
+    metrics: Dict[str, Any]
+    version: str
+    data_version: Tuple[Any, ...]
+    built_at: datetime = field(default_factory=datetime.now)
+    build_seconds: float = 0.0
+
+    def describe(self, stale: bool = False) -> Dict[str, Any]:
+        """Snapshot metadata returned alongside the metrics"""
+        return {
+            "version": self.version,
+            "built_at": self.built_at.isoformat(),
+            "build_seconds": self.build_seconds,
+            "stale": stale,
+        }
+
+
+def _count_containing(values: pd.Series, needle: str) -> int:
+    """Count values containing ``needle``, testing each distinct value once"""
+    codes, uniques = pd.factorize(values)
+    if len(uniques) == 0:
+        return 0
+    hits = pd.Series(uniques).astype(str).str.contains(needle, regex=False).to_numpy()
+    return int(hits[codes[codes >= 0]].sum())
+
+
+def compute_portfolio_metrics(tables: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
+    """
+    Compute the data-driven part of the portfolio metrics response.
+
+    Args:
+        tables: Snapshot tables keyed by name (see ``SNAPSHOT_TABLES``)
+
+    Returns:
+        Dictionary of metrics
+    """
+    loan_df = tables.get("loan_data")
+    has_loans = loan_df is not None and not loan_df.empty
+
+    status_counts: Dict[str, int] = {}
+    if has_loans and LOAN_STATUS in loan_df.columns:
+        status_counts = loan_df[LOAN_STATUS].value_counts().to_dict()
+
+    return {
+        "total_records": int(sum(len(df) for df in tables.values())),
+        "portfolio_outstanding": (
+            float(loan_df[OUTSTANDING_LOAN_VALUE].sum())
+            if has_loans and OUTSTANDING_LOAN_VALUE in loan_df.columns
+            else 0.0
+        ),
+        "active_loans": int(status_counts.get("Current", 0)),
+        "completed_loans": int(status_counts.get("Complete", 0)),
+        "spanish_companies": (
+            _count_containing(loan_df[CLIENTE], SA_DE_CV)
+            if has_loans and CLIENTE in loan_df.columns
+            else 0
+        ),
+    }
+
+
+class PortfolioMetricsSnapshot:
+    """
+    Serves portfolio metrics from memory, rebuilding them when the data changes.
+
+    ``get`` compares the on-disk version of the source tables with the
+    snapshot's (a few ``stat`` calls). On a change it starts one background
+    rebuild and keeps serving the previous snapshot, flagged as stale, until
+    the new one is ready. Only the very first request waits for a build.
+    """
+
+    def __init__(
+        self,
+        dataset_cache: DatasetCache,
+        tables: Sequence[str] = SNAPSHOT_TABLES,
+    ):
+        self.dataset_cache = dataset_cache
+        self.tables = tuple(tables)
+        self._snapshot: Optional[MetricsSnapshot] = None
+        self._lock = threading.Lock()
+        self._build_thread: Optional[threading.Thread] = None
+        self.last_error: Optional[str] = None
+        self.builds = 0
+
+    @property
+    def ready(self) -> bool:
+        """True once a snapshot exists"""
+        return self._snapshot is not None
+
+    def data_version(self) -> Tuple[Any, ...]:
+        """On-disk version of every snapshot table"""
+        return tuple(self.dataset_cache.current_version(name) for name in self.tables)
+
+    def refresh(self) -> threading.Thread:
+        """Start a background rebuild unless one is already running"""
+        with self._lock:
+            if self._build_thread is None or not self._build_thread.is_alive():
+                self._build_thread = threading.Thread(
+                    target=self._build, name="portfolio-metrics-snapshot", daemon=True
+                )
+                self._build_thread.start()
+            return self._build_thread
+
+    def get(self, timeout: Optional[float] = None) -> Tuple[MetricsSnapshot, bool]:
+        """
+        Return the current snapshot and whether it is stale.
+
+        Args:
+            timeout: Seconds to wait for the first build
+
+        Returns:
+            Tuple of (snapshot, stale)
+
+        Raises:
+            RuntimeError: If no snapshot could be built
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            if snapshot.data_version == self.data_version():
+                return snapshot, False
+            self.refresh()
+            return snapshot, True
+
+        self.refresh().join(timeout)
+        if self._snapshot is None:
+            reason = self.last_error or "timeout"
+            raise RuntimeError(f"Portfolio metrics snapshot unavailable: {reason}")
+        return self._snapshot, False
+
+    def _build(self) -> None:
+        """Compute metrics for the current data version and publish them"""
+        try:
+            started = time.perf_counter()
+            data_version = self.data_version()
+            tables = self.dataset_cache.get_many(self.tables)
+            metrics = compute_portfolio_metrics(tables)
+            version = hashlib.sha1(repr(data_version).encode()).hexdigest()[:12]
+            self._snapshot = MetricsSnapshot(
+                metrics=metrics,
+                version=version,
+                data_version=data_version,
+                build_seconds=round(time.perf_counter() - started, 4),
+            )
+            self.builds += 1
+            self.last_error = None
+            logger.info(
+                f"Portfolio metrics snapshot {version} built "
+                f"in {self._snapshot.build_seconds}s"
+            )
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"Portfolio metrics snapshot build failed: {e}")
+
+
+__all__ = [
+    "MetricsSnapshot",
+    "PortfolioMetricsSnapshot",
+    "compute_portfolio_metrics",
+    "SNAPSHOT_TABLES",
+]
@@ -1,25 +1,25 @@
 
 # Abaco Integration Constants - 48,853 Records
 # Spanish Clients | USD Factoring | Commercial Lending
-DAYS_IN_DEFAULT = DAYS_IN_DEFAULT
-INTEREST_RATE_APR = INTEREST_RATE_APR
-OUTSTANDING_LOAN_VALUE = OUTSTANDING_LOAN_VALUE
-LOAN_CURRENCY = LOAN_CURRENCY
-PRODUCT_TYPE = PRODUCT_TYPE
-ABACO_TECHNOLOGIES = ABACO_TECHNOLOGIES
-ABACO_FINANCIAL = ABACO_FINANCIAL
-LOAN_DATA = LOAN_DATA
-HISTORIC_REAL_PAYMENT = HISTORIC_REAL_PAYMENT
-PAYMENT_SCHEDULE = PAYMENT_SCHEDULE
-CUSTOMER_ID = CUSTOMER_ID
-LOAN_ID = LOAN_ID
-SA_DE_CV = SA_DE_CV
-TRUE_PAYMENT_STATUS = TRUE_PAYMENT_STATUS
-TRUE_PAYMENT_DATE = TRUE_PAYMENT_DATE
-DISBURSEMENT_DATE = DISBURSEMENT_DATE
-DISBURSEMENT_AMOUNT = DISBURSEMENT_AMOUNT
-PAYMENT_FREQUENCY = PAYMENT_FREQUENCY
-LOAN_STATUS = LOAN_STATUS
+DAYS_IN_DEFAULT = "Days in Default"
+INTEREST_RATE_APR = "Interest Rate APR"
+OUTSTANDING_LOAN_VALUE = "Outstanding Loan Value"
+LOAN_CURRENCY = "Loan Currency"
+PRODUCT_TYPE = "Product Type"
+ABACO_TECHNOLOGIES = "Abaco Technologies"
+ABACO_FINANCIAL = "Abaco Financial"
+LOAN_DATA = "Loan Data"
+HISTORIC_REAL_PAYMENT = "Historic Real Payment"
+PAYMENT_SCHEDULE = "Payment Schedule"
+CUSTOMER_ID = "Customer ID"
+LOAN_ID = "Loan ID"
+SA_DE_CV = "S.A. DE C.V."
+TRUE_PAYMENT_STATUS = "True Payment Status"
+TRUE_PAYMENT_DATE = "True Payment Date"
+DISBURSEMENT_DATE = "Disbursement Date"
+DISBURSEMENT_AMOUNT = "Disbursement Amount"
+PAYMENT_FREQUENCY = "Payment Frequency"
+LOAN_STATUS = "Loan Status"
 
 """
 Commercial-View Modeling Module - Abaco Integration
@@ -28,9 +28,54 @@ Risk scoring calibrated for exact Abaco schema: 29.47%-36.99% APR, Spanish clien
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, List, Tuple, Optional
+from dataclasses import dataclass
+from typing import Callable, Dict, Any, List, Tuple, Optional
 from datetime import datetime
 
+from src.spanish_entities import SpanishEntityClassifier
+
+# Risk score components: weight and normalization of each factor
+DPD_WEIGHT, DPD_NORMALIZATION_DAYS = 0.4, 180.0
+STATUS_WEIGHT = 0.3
+RATE_WEIGHT = 0.2
+EXPOSURE_WEIGHT, EXPOSURE_NORMALIZATION = 0.1, 77175.0
+
+STATUS_RISK = {
+    "Current": 0.0,  # Active factoring
+    "Complete": 0.0,  # Successfully completed
+    "Default": 1.0,  # Failed factoring
+    "Unknown": 0.5,  # Uncertain status
+}
+UNKNOWN_STATUS_RISK = 0.5
+
+# USD factoring compliance rules, in report order
+COMPLIANCE_RULES = (
+    "currency_usd",
+    "product_factoring",
+    "payment_bullet",
+    "rate_in_range",
+    "company_abaco",
+)
+
+
+@dataclass
+class ComplianceReport:
+    """Outcome of the USD factoring compliance rules over a loan tape"""
+
+    total_loans: int
+    passed: Dict[str, int]
+    total_compliant: int
+    failures: Dict[str, pd.Index]
+
+    def summary(self) -> Dict[str, Any]:
+        """Counts only, without the failing row labels"""
+        return {
+            "total_loans": self.total_loans,
+            "total_compliant": self.total_compliant,
+            "passed": dict(self.passed),
+            "failed": {rule: len(index) for rule, index in self.failures.items()},
+        }
+
 
 class AbacoRiskModel:
     """
@@ -71,6 +116,9 @@ class AbacoRiskModel:
         # Abaco companies from schema
         self.abaco_companies = [ABACO_TECHNOLOGIES, ABACO_FINANCIAL]
 
+        # Memoized classifier shared by single-name and column classification
+        self.entity_classifier = SpanishEntityClassifier(self.spanish_patterns)
+
     def calculate_abaco_risk_score(self, loan_record: pd.Series) -> float:
         """
         Calculate Abaco-specific risk score (0.0-1.0 scale).
@@ -87,18 +135,16 @@ class AbacoRiskModel:
         days_default = loan_record.get(DAYS_IN_DEFAULT, 0)
         if pd.notna(days_default) and days_default > 0:
             # Normalize to 180 days (6 months for factoring)
-            dpd_risk = min(float(days_default) / 180.0, 1.0) * 0.4
+            dpd_risk = (
+                min(float(days_default) / DPD_NORMALIZATION_DAYS, 1.0) * DPD_WEIGHT
+            )
             risk_score += dpd_risk
 
         # Loan Status component (30% weight)
         loan_status = loan_record.get(LOAN_STATUS, "Unknown")
-        status_risk_map = {
-            "Current": 0.0,  # Active factoring
-            "Complete": 0.0,  # Successfully completed
-            "Default": 1.0,  # Failed factoring
-            "Unknown": 0.5,  # Uncertain status
-        }
-        status_risk = status_risk_map.get(str(loan_status), 0.5) * 0.3
+        status_risk = (
+            STATUS_RISK.get(str(loan_status), UNKNOWN_STATUS_RISK) * STATUS_WEIGHT
+        )
         risk_score += status_risk
 
         # Interest Rate component (20% weight) - exact Abaco range
@@ -111,19 +157,74 @@ class AbacoRiskModel:
                 rate_normalized = (rate - self.interest_rate_range[0]) / (
                     self.interest_rate_range[1] - self.interest_rate_range[0]
                 )
-                rate_risk = rate_normalized * 0.2
+                rate_risk = rate_normalized * RATE_WEIGHT
                 risk_score += rate_risk
 
         # Outstanding Amount component (10% weight)
         outstanding = loan_record.get(OUTSTANDING_LOAN_VALUE, 0)
         if pd.notna(outstanding) and float(outstanding) > 0:
             # Normalize to schema max: 77,175.0
-            amount_normalized = min(float(outstanding) / 77175.0, 1.0)
-            amount_risk = amount_normalized * 0.1
+            amount_normalized = min(float(outstanding) / EXPOSURE_NORMALIZATION, 1.0)
+            amount_risk = amount_normalized * EXPOSURE_WEIGHT
             risk_score += amount_risk
 
         return min(risk_score, 1.0)
 
+    def score_frame(self, loan_data: pd.DataFrame) -> pd.Series:
+        """
+        Score every loan of a tape at once (0.0-1.0 scale).
+
+        Computes the same four components as ``calculate_abaco_risk_score``
+        with array operations over whole columns, adding them in the same
+        order, so each score equals the scalar result exactly. Missing
+        columns contribute what the scalar version's defaults would.
+
+        Args:
+            loan_data: Loan tape, one loan per row
+
+        Returns:
+            Series of risk scores aligned with ``loan_data.index``
+        """
+        n_rows = len(loan_data)
+        risk_score = np.zeros(n_rows)
+
+        # Days in Default component (40% weight)
+        days_default = _numeric_column(loan_data, DAYS_IN_DEFAULT, n_rows)
+        risk_score += np.where(
+            days_default > 0,
+            np.minimum(days_default / DPD_NORMALIZATION_DAYS, 1.0) * DPD_WEIGHT,
+            0.0,
+        )
+
+        # Loan Status component (30% weight), looked up once per distinct status
+        if LOAN_STATUS in loan_data.columns:
+            codes, statuses = pd.factorize(loan_data[LOAN_STATUS])
+            status_risk = np.array(
+                [STATUS_RISK.get(str(s), UNKNOWN_STATUS_RISK) for s in statuses]
+                + [UNKNOWN_STATUS_RISK]
+            )
+            risk_score += status_risk[codes] * STATUS_WEIGHT
+        else:
+            risk_score += STATUS_RISK["Unknown"] * STATUS_WEIGHT
+
+        # Interest Rate component (20% weight) - exact Abaco range
+        rate = _numeric_column(loan_data, INTEREST_RATE_APR, n_rows)
+        low, high = self.interest_rate_range
+        in_range = (rate > 0) & (rate >= low) & (rate <= high)
+        risk_score += np.where(in_range, (rate - low) / (high - low) * RATE_WEIGHT, 0.0)
+
+        # Outstanding Amount component (10% weight)
+        outstanding = _numeric_column(loan_data, OUTSTANDING_LOAN_VALUE, n_rows)
+        risk_score += np.where(
+            outstanding > 0,
+            np.minimum(outstanding / EXPOSURE_NORMALIZATION, 1.0) * EXPOSURE_WEIGHT,
+            0.0,
+        )
+
+        return pd.Series(
+            np.minimum(risk_score, 1.0), index=loan_data.index, name="risk_score"
+        )
+
     def identify_spanish_client(self, client_name: str) -> Dict[str, Any]:
         """
         Identify Spanish business entities based on schema samples.
@@ -132,48 +233,11 @@ class AbacoRiskModel:
         - "SERVICIOS TECNICOS MEDICOS, S.A. DE C.V."
         - "KEVIN ENRIQUE CABEZAS MORALES"
         - "PRODUCTOS DE CONCRETO, S.A. DE C.V."
-        """
-        if pd.isna(client_name):
-            return {"is_spanish": False, "entity_type": "unknown", "confidence": 0.0}
-
-        name_upper = str(client_name).upper()
-
-        # Check for business entity patterns
-        for pattern in self.spanish_patterns:
-            if pattern in name_upper:
-                entity_types = {
-                    SA_DE_CV: "sociedad_anonima_cv",
-                    "S.A.": "sociedad_anonima",
-                    "S.R.L.": "sociedad_limitada",
-                    "HOSPITAL NACIONAL": "hospital_publico",
-                }
-
-                return {
-                    "is_spanish": True,
-                    "entity_type": entity_types.get(pattern, "business"),
-                    "pattern_matched": pattern,
-                    "confidence": 0.95,
-                    "utf8_supported": True,
-                }
-
-        # Check for Spanish individual names (from schema samples)
-        spanish_indicators = [
-            "ENRIQUE",
-            "KEVIN",
-            "CARMEN",
-            "GARCIA",
-            "MORALES",
-            "RAFAEL",
-        ]
-        if any(indicator in name_upper for indicator in spanish_indicators):
-            return {
-                "is_spanish": True,
-                "entity_type": "individual",
-                "confidence": 0.85,
-                "utf8_supported": True,
-            }
 
-        return {"is_spanish": False, "entity_type": "other", "confidence": 0.1}
+        Names are matched by ``entity_classifier``, which caches the result
+        of every distinct name.
+        """
+        return self.entity_classifier.identify(client_name)
 
     def validate_usd_factoring_compliance(
         self, loan_record: pd.Series
@@ -190,6 +254,47 @@ class AbacoRiskModel:
 
         return validations
 
+    def evaluate_compliance(self, loan_data: pd.DataFrame) -> ComplianceReport:
+        """
+        Evaluate every USD factoring compliance rule over a whole tape.
+
+        Each rule of ``validate_usd_factoring_compliance`` is computed as a
+        boolean array (text rules once per distinct value), so the pass
+        counts, the fully compliant count and the failing rows of each rule
+        come out of one rule-by-row matrix.
+
+        Args:
+            loan_data: Loan tape, one loan per row
+
+        Returns:
+            ComplianceReport with failures keyed by rule as index labels
+        """
+        n_rows = len(loan_data)
+        rate = _numeric_column(loan_data, INTEREST_RATE_APR, n_rows)
+        low, high = self.interest_rate_range
+        companies = set(self.abaco_companies)
+
+        checks = np.vstack(
+            [
+                _flag_values(loan_data, LOAN_CURRENCY, lambda v: v == "USD"),
+                _flag_values(loan_data, PRODUCT_TYPE, lambda v: v == "factoring"),
+                _flag_values(loan_data, PAYMENT_FREQUENCY, lambda v: v == "bullet"),
+                (rate >= low) & (rate <= high),
+                _flag_values(loan_data, "Company", lambda v: str(v) in companies),
+            ]
+        )
+
+        passed = checks.sum(axis=1)
+        return ComplianceReport(
+            total_loans=n_rows,
+            passed={rule: int(n) for rule, n in zip(COMPLIANCE_RULES, passed)},
+            total_compliant=int(checks.all(axis=0).sum()),
+            failures={
+                rule: loan_data.index[~row]
+                for rule, row in zip(COMPLIANCE_RULES, checks)
+            },
+        )
+
     def _validate_interest_rate(self, loan_record: pd.Series) -> bool:
         """Validate rate within exact Abaco range: 29.47%-36.99%."""
         rate = loan_record.get(INTEREST_RATE_APR)
@@ -236,8 +341,9 @@ class AbacoRiskModel:
 
         # Spanish client analysis
         if "Cliente" in loan_data.columns:
-            spanish_results = loan_data["Cliente"].apply(self.identify_spanish_client)
-            spanish_count = sum(1 for result in spanish_results if result["is_spanish"])
+            spanish_count = int(
+                self.entity_classifier.is_spanish(loan_data["Cliente"]).sum()
+            )
 
             metrics["spanish_analysis"] = {
                 "spanish_clients": spanish_count,
@@ -250,28 +356,43 @@ class AbacoRiskModel:
             col in loan_data.columns
             for col in [LOAN_CURRENCY, PRODUCT_TYPE, PAYMENT_FREQUENCY]
         ):
-            compliance_results = loan_data.apply(
-                self.validate_usd_factoring_compliance, axis=1
-            )
+            compliance = self.evaluate_compliance(loan_data)
 
             metrics["compliance_analysis"] = {
-                "total_compliant": sum(
-                    1 for r in compliance_results if all(r.values())
-                ),
-                "currency_compliant": sum(
-                    1 for r in compliance_results if r["currency_usd"]
-                ),
-                "product_compliant": sum(
-                    1 for r in compliance_results if r["product_factoring"]
-                ),
-                "payment_compliant": sum(
-                    1 for r in compliance_results if r["payment_bullet"]
-                ),
+                "total_compliant": compliance.total_compliant,
+                "currency_compliant": compliance.passed["currency_usd"],
+                "product_compliant": compliance.passed["product_factoring"],
+                "payment_compliant": compliance.passed["payment_bullet"],
             }
 
         return metrics
 
 
+def _numeric_column(df: pd.DataFrame, column: str, n_rows: int) -> np.ndarray:
+    """Column as float64 with NaN for missing values; zeros if it is absent"""
+    if column not in df.columns:
+        return np.zeros(n_rows)
+    return pd.to_numeric(df[column], errors="coerce").to_numpy(
+        dtype="float64", na_value=np.nan
+    )
+
+
+def _flag_values(
+    df: pd.DataFrame, column: str, predicate: Callable[[Any], bool]
+) -> np.ndarray:
+    """
+    Evaluate ``predicate`` once per distinct value of a column.
+
+    Missing values and absent columns are flagged False, as the row-wise
+    checks do for them.
+    """
+    if column not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    codes, uniques = pd.factorize(df[column])
+    flags = np.array([bool(predicate(value)) for value in uniques] + [False])
+    return flags[codes]
+
+
 def create_abaco_models() -> Tuple[AbacoRiskModel, Any]:
     """
     Create Abaco models calibrated for 48,853 record processing.
@@ -8,6 +8,11 @@ import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 
+try:
+    from src.payment_reconciliation import PaymentReconciler, Reconciliation
+except ImportError:
+    from payment_reconciliation import PaymentReconciler, Reconciliation
+
 
 class PaymentProcessor:
     """Payment processing for loan payment analysis and DPD calculation"""
@@ -46,13 +51,12 @@ class PaymentProcessor:
             "scheduled_date" in result_df.columns
             and "payment_date" in result_df.columns
         ):
-            # Convert to datetime with error handling
-            result_df["scheduled_date"] = pd.to_datetime(
-                result_df["scheduled_date"], errors="coerce"
-            )
-            result_df["payment_date"] = pd.to_datetime(
-                result_df["payment_date"], errors="coerce"
-            )
+            # Convert to datetime with error handling (typed loads are already datetime)
+            for date_col in ("scheduled_date", "payment_date"):
+                if not pd.api.types.is_datetime64_any_dtype(result_df[date_col]):
+                    result_df[date_col] = pd.to_datetime(
+                        result_df[date_col], errors="coerce"
+                    )
 
             # Calculate days past due (only positive values count as past due)
             result_df["days_past_due"] = (
@@ -62,6 +66,30 @@ class PaymentProcessor:
 
         return result_df
 
+    def reconcile_payments(
+        self,
+        schedule_df: pd.DataFrame,
+        payments_df: pd.DataFrame,
+        as_of: Optional[Any] = None,
+    ) -> Reconciliation:
+        """
+        Match Historic Real Payment rows to Payment Schedule installments
+
+        Unlike ``calculate_dpd_from_payments``, payments and installments do
+        not need to share a row: principal is allocated per Loan ID, oldest
+        installment first.
+
+        Args:
+            schedule_df: Payment Schedule table
+            payments_df: Historic Real Payment table
+            as_of: Optional cut-off date for payments and DPD aging
+
+        Returns:
+            Reconciliation with installment true DPD, partial-payment and
+            overpayment balances
+        """
+        return PaymentReconciler().reconcile(schedule_df, payments_df, as_of=as_of)
+
     def analyze_payment_patterns(self, payment_df: pd.DataFrame) -> Dict[str, Any]:
         """
         Analyze payment patterns and performance metrics
@@ -93,9 +121,10 @@ class PaymentProcessor:
 
             # Payment frequency distribution
             if "payment_date" in payment_df.columns:
-                payment_df["payment_month"] = pd.to_datetime(
-                    payment_df["payment_date"]
-                ).dt.to_period("M")
+                payment_dates = payment_df["payment_date"]
+                if not pd.api.types.is_datetime64_any_dtype(payment_dates):
+                    payment_dates = pd.to_datetime(payment_dates)
+                payment_df["payment_month"] = payment_dates.dt.to_period("M")
                 frequency = payment_df["payment_month"].value_counts().to_dict()
                 analysis["payment_frequency"] = {
                     str(k): int(v) for k, v in frequency.items()
@@ -126,7 +155,8 @@ class PaymentProcessor:
         standardized_df = payment_data.copy()
 
         # Apply standardization operations
-        if "payment_amount" in standardized_df.columns:
+        amount = standardized_df.get("payment_amount")
+        if amount is not None and not pd.api.types.is_numeric_dtype(amount):
             standardized_df["payment_amount"] = pd.to_numeric(
                 standardized_df["payment_amount"], errors="coerce"
             )
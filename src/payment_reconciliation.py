@@ -0,0 +1,351 @@
+"""
+Payment reconciliation engine
+Allocates Historic Real Payment principal to Payment Schedule installments
+per Loan ID (oldest installment first) with sorted as-of matching on
+cumulative principal, giving true DPD per installment and partial-payment
+and overpayment balances without per-loan Python loops
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from src.date_codes import days_between
+except ImportError:
+    from date_codes import days_between
+
+logger = logging.getLogger(__name__)
+
+LOAN_ID = "Loan ID"
+PAYMENT_DATE = "Payment Date"
+PRINCIPAL_PAYMENT = "Principal Payment"
+TRUE_PAYMENT_DATE = "True Payment Date"
+TRUE_PRINCIPAL_PAYMENT = "True Principal Payment"
+
+DEFAULT_TOLERANCE = 0.01
+NO_MATCH = -1
+
+INSTALLMENT_PAID = "paid"
+INSTALLMENT_PARTIAL = "partial"
+INSTALLMENT_UNPAID = "unpaid"
+INSTALLMENT_STATUSES = (INSTALLMENT_PAID, INSTALLMENT_PARTIAL, INSTALLMENT_UNPAID)
+
+
+@dataclass
+class Reconciliation:
+    """Result of matching payments to scheduled installments"""
+
+    installments: pd.DataFrame
+    payments: pd.DataFrame
+    loans: pd.DataFrame
+
+    def summary(self) -> Dict[str, Any]:
+        """Portfolio-level reconciliation totals"""
+        status = self.installments["installment_status"].value_counts()
+        return {
+            "loans": len(self.loans),
+            "installments": len(self.installments),
+            "payments": len(self.payments),
+            "installments_paid": int(status.get(INSTALLMENT_PAID, 0)),
+            "installments_partial": int(status.get(INSTALLMENT_PARTIAL, 0)),
+            "installments_unpaid": int(status.get(INSTALLMENT_UNPAID, 0)),
+            "outstanding_principal": float(self.loans["outstanding_principal"].sum()),
+            "overpayment": float(self.loans["overpayment"].sum()),
+            "max_true_dpd": (
+                float(self.installments["true_dpd"].max())
+                if len(self.installments)
+                else 0.0
+            ),
+        }
+
+
+def _as_datetime(values: pd.Series) -> np.ndarray:
+    if not pd.api.types.is_datetime64_any_dtype(values):
+        values = pd.to_datetime(values, errors="coerce")
+    return values.to_numpy(dtype="datetime64[ns]")
+
+
+def _as_cents(values: pd.Series) -> np.ndarray:
+    """Non-negative amounts in integer cents, so cumulative sums are exact"""
+    amounts = pd.to_numeric(values, errors="coerce").to_numpy(
+        dtype="float64", na_value=0.0
+    )
+    return np.rint(np.clip(amounts, 0.0, None) * 100).astype(np.int64)
+
+
+def _sorted_by_loan(codes: np.ndarray, dates: np.ndarray) -> np.ndarray:
+    """Stable order by loan, then date, with missing dates last"""
+    # Dense date ranks keep the combined key small enough for one int64 sort
+    ranks, uniques = pd.factorize(dates, sort=True)
+    ranks = np.where(ranks < 0, len(uniques), ranks).astype(np.int64)
+    return np.argsort(codes * (len(uniques) + 1) + ranks, kind="stable")
+
+
+def _cumsum_by_loan(codes: np.ndarray, cents: np.ndarray) -> np.ndarray:
+    """Running total within each loan; ``codes`` must be sorted"""
+    running = np.cumsum(cents)
+    if not len(codes):
+        return running
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    lengths = np.diff(np.r_[starts, len(codes)])
+    offsets = running[starts] - cents[starts]
+    return running - np.repeat(offsets, lengths)
+
+
+class PaymentReconciler:
+    """
+    Match actual payments to scheduled installments for every loan at once.
+
+    Payments settle installments in due-date order: each loan's paid
+    principal accumulates in payment-date order, and an installment is paid
+    by the first payment whose running total reaches the loan's cumulative
+    scheduled principal up to that installment (within ``tolerance``).
+    Amounts are matched in integer cents, and loans are laid out as disjoint
+    ranges of one sorted key, so every lookup is a single ``searchsorted``
+    over the whole tape.
+
+    Negative or missing principal amounts count as zero. Payments without
+    a Loan ID or payment date cannot be placed and are left out.
+    """
+
+    def __init__(
+        self,
+        loan_column: str = LOAN_ID,
+        due_date_column: str = PAYMENT_DATE,
+        scheduled_column: str = PRINCIPAL_PAYMENT,
+        payment_date_column: str = TRUE_PAYMENT_DATE,
+        paid_column: str = TRUE_PRINCIPAL_PAYMENT,
+        tolerance: float = DEFAULT_TOLERANCE,
+    ):
+        self.loan_column = loan_column
+        self.due_date_column = due_date_column
+        self.scheduled_column = scheduled_column
+        self.payment_date_column = payment_date_column
+        self.paid_column = paid_column
+        self.tolerance_cents = int(round(tolerance * 100))
+
+    def reconcile(
+        self,
+        schedule: pd.DataFrame,
+        payments: pd.DataFrame,
+        as_of: Optional[Any] = None,
+    ) -> Reconciliation:
+        """
+        Reconcile a payment schedule against actual payments.
+
+        Args:
+            schedule: Payment Schedule rows (Loan ID, due date, principal)
+            payments: Historic Real Payment rows (Loan ID, date, principal)
+            as_of: Only count payments made up to this date; unpaid
+                installments then age to this date. Without it, unpaid
+                installments have no DPD.
+
+        Returns:
+            Reconciliation with per-installment, per-payment and per-loan frames
+        """
+        schedule = schedule[schedule[self.loan_column].notna()]
+        payments = payments[payments[self.loan_column].notna()]
+        payment_dates = _as_datetime(payments[self.payment_date_column])
+        placeable = ~np.isnat(payment_dates)
+        if as_of is not None:
+            as_of = np.datetime64(pd.Timestamp(as_of), "ns")
+            placeable &= payment_dates <= as_of
+        if not placeable.all():
+            logger.debug(f"Leaving out {int((~placeable).sum())} unplaceable payments")
+            payments = payments[placeable]
+            payment_dates = payment_dates[placeable]
+
+        loan_codes, loan_ids = pd.factorize(
+            pd.concat(
+                [schedule[self.loan_column], payments[self.loan_column]],
+                ignore_index=True,
+            ),
+        )
+        due_codes = loan_codes[: len(schedule)]
+        pay_codes = loan_codes[len(schedule) :]
+
+        due_dates = _as_datetime(schedule[self.due_date_column])
+        order = _sorted_by_loan(due_codes, due_dates)
+        schedule = schedule.iloc[order]
+        due_codes, due_dates = due_codes[order], due_dates[order]
+        scheduled = _as_cents(schedule[self.scheduled_column])
+        scheduled_total = _cumsum_by_loan(due_codes, scheduled)
+
+        order = _sorted_by_loan(pay_codes, payment_dates)
+        payments = payments.iloc[order]
+        pay_codes, payment_dates = pay_codes[order], payment_dates[order]
+        paid = _as_cents(payments[self.paid_column])
+        paid_total = _cumsum_by_loan(pay_codes, paid)
+
+        n_loans = len(loan_ids)
+        loan_scheduled = np.bincount(due_codes, scheduled, n_loans).astype(np.int64)
+        loan_paid = np.bincount(pay_codes, paid, n_loans).astype(np.int64)
+
+        # Each loan owns the key range [code * span, (code + 1) * span)
+        largest = max(loan_scheduled.max(initial=0), loan_paid.max(initial=0))
+        span = int(largest) + self.tolerance_cents + 2
+        pay_keys = pay_codes * span + paid_total
+        due_keys = due_codes * span + scheduled_total
+
+        installments = self._installments(
+            schedule,
+            due_codes,
+            due_dates,
+            scheduled,
+            scheduled_total,
+            loan_paid,
+            pay_keys,
+            payment_dates,
+            as_of,
+            span,
+        )
+        payment_frame = self._payments(
+            payments,
+            pay_codes,
+            payment_dates,
+            paid,
+            paid_total,
+            loan_scheduled,
+            due_keys,
+            due_dates,
+            span,
+        )
+        loans = self._loans(
+            loan_ids, loan_scheduled, loan_paid, due_codes, installments
+        )
+        return Reconciliation(
+            installments=installments, payments=payment_frame, loans=loans
+        )
+
+    def _installments(
+        self,
+        schedule: pd.DataFrame,
+        codes: np.ndarray,
+        due_dates: np.ndarray,
+        scheduled: np.ndarray,
+        scheduled_total: np.ndarray,
+        loan_paid: np.ndarray,
+        pay_keys: np.ndarray,
+        payment_dates: np.ndarray,
+        as_of: Optional[np.datetime64],
+        span: int,
+    ) -> pd.DataFrame:
+        threshold = scheduled_total - self.tolerance_cents
+        nothing_due = threshold <= 0
+
+        # First payment whose running total reaches the threshold
+        settling = np.searchsorted(
+            pay_keys, codes * span + np.maximum(threshold, 0), side="left"
+        )
+        in_loan = settling < len(pay_keys)
+        in_loan[in_loan] = pay_keys[settling[in_loan]] // span == codes[in_loan]
+        settled = in_loan & ~nothing_due
+        settling = np.where(settled, settling, NO_MATCH)
+
+        settled_date = np.full(len(codes), np.datetime64("NaT"), "datetime64[ns]")
+        settled_date[settled] = payment_dates[settling[settled]]
+        dpd = days_between(settled_date, due_dates)
+        if as_of is not None:
+            open_ = ~settled & ~nothing_due
+            dpd[open_] = days_between(np.full(open_.sum(), as_of), due_dates[open_])
+        dpd[nothing_due] = 0.0
+        dpd = np.clip(dpd, 0.0, None)
+
+        previous_total = scheduled_total - scheduled
+        allocated = np.clip(loan_paid[codes] - previous_total, 0, scheduled)
+        remaining = scheduled - allocated
+        # Codes into INSTALLMENT_STATUSES: paid, partial, unpaid
+        status = np.where(
+            settled | nothing_due, 0, np.where(allocated > 0, 1, 2)
+        ).astype(np.int8)
+
+        result = schedule[[self.loan_column, self.due_date_column]].copy()
+        result[self.due_date_column] = due_dates
+        result["scheduled_principal"] = scheduled / 100
+        result["allocated_principal"] = allocated / 100
+        result["remaining_principal"] = remaining / 100
+        result["settled_date"] = settled_date
+        result["true_dpd"] = dpd
+        result["installment_status"] = pd.Categorical.from_codes(
+            status, categories=INSTALLMENT_STATUSES
+        )
+        return result
+
+    def _payments(
+        self,
+        payments: pd.DataFrame,
+        codes: np.ndarray,
+        payment_dates: np.ndarray,
+        paid: np.ndarray,
+        paid_total: np.ndarray,
+        loan_scheduled: np.ndarray,
+        due_keys: np.ndarray,
+        due_dates: np.ndarray,
+        span: int,
+    ) -> pd.DataFrame:
+        previous_total = paid_total - paid
+        # First installment not yet covered when the payment arrives
+        covered = previous_total + self.tolerance_cents
+        first = np.searchsorted(due_keys, codes * span + covered, side="right")
+        in_loan = first < len(due_keys)
+        in_loan[in_loan] = due_keys[first[in_loan]] // span == codes[in_loan]
+        first = np.where(in_loan, first, NO_MATCH)
+
+        due = np.full(len(codes), np.datetime64("NaT"), "datetime64[ns]")
+        due[in_loan] = due_dates[first[in_loan]]
+        overpaid = np.clip(
+            paid_total - np.maximum(loan_scheduled[codes], previous_total), 0, None
+        )
+
+        result = payments[[self.loan_column, self.payment_date_column]].copy()
+        result[self.payment_date_column] = payment_dates
+        result["paid_principal"] = paid / 100
+        result["applied_principal"] = (paid - overpaid) / 100
+        result["overpaid_principal"] = overpaid / 100
+        result["installment_due_date"] = due
+        result["days_past_due"] = np.clip(days_between(payment_dates, due), 0.0, None)
+        return result
+
+    def _loans(
+        self,
+        loan_ids: pd.Index,
+        loan_scheduled: np.ndarray,
+        loan_paid: np.ndarray,
+        due_codes: np.ndarray,
+        installments: pd.DataFrame,
+    ) -> pd.DataFrame:
+        n_loans = len(loan_ids)
+        loans = pd.DataFrame(
+            {
+                "scheduled_principal": loan_scheduled / 100,
+                "paid_principal": loan_paid / 100,
+                "outstanding_principal": np.clip(loan_scheduled - loan_paid, 0, None)
+                / 100,
+                "overpayment": np.clip(loan_paid - loan_scheduled, 0, None) / 100,
+            },
+            index=pd.Index(loan_ids, name=self.loan_column),
+        )
+        status = installments["installment_status"].cat.codes.to_numpy()
+        for code, name in enumerate(installments["installment_status"].cat.categories):
+            loans[f"installments_{name}"] = np.bincount(
+                due_codes[status == code], minlength=n_loans
+            )
+        max_dpd = (
+            pd.Series(installments["true_dpd"].to_numpy()).groupby(due_codes).max()
+        )
+        loans["max_true_dpd"] = max_dpd.reindex(range(n_loans)).to_numpy()
+        return loans.sort_index()
+
+
+__all__ = [
+    "INSTALLMENT_PAID",
+    "INSTALLMENT_PARTIAL",
+    "INSTALLMENT_STATUSES",
+    "INSTALLMENT_UNPAID",
+    "PaymentReconciler",
+    "Reconciliation",
+]
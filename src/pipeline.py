@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import copy
 import logging
 import sys
 import os
@@ -12,6 +13,7 @@ try:
     import pandas as pd
     import numpy as np
     from pandas import DataFrame
+    from pandas.api.types import is_datetime64_any_dtype
 except ImportError as e:
     print(f"\033[91mError: {e}\033[0m")
     print("\033[93mInstall missing packages with:\033[0m")
@@ -27,6 +29,24 @@ try:
         load_payment_schedule,
         load_customer_data,
         load_collateral,
+        load_tables_concurrently,
+        iter_table_chunks,
+        DEFAULT_CHUNK_ROWS,
+        LOAN_DATA_TABLE,
+    )
+    from src.incremental_ingest import IncrementalPaymentIngestor, IngestResult
+    from src.stage_graph import StageGraph
+    from src.balance_ledger import PORTFOLIO, BalanceLedger
+    from src.roll_rates import RollRateEngine, TransitionMatrices
+    from src.vintage import VintageCurves, VintageEngine
+    from src.dpd_policy import DPDBucketEngine, default_dpd_engine
+    from src.portfolio_reducers import (
+        CustomerExposureReducer,
+        DPDBucketReducer,
+        OutstandingSumReducer,
+        UniqueCustomerReducer,
+        WeightedAPRReducer,
+        reduce_chunks,
     )
 except ImportError as e:
     print(f"\033[91mError importing from src.data_loader: {e}\033[0m")
@@ -35,18 +55,131 @@ except ImportError as e:
 
 logger = logging.getLogger(__name__)
 
+# Abaco column names (SonarLint S1192)
+CUSTOMER_ID = "Customer ID"
+LOAN_ID = "Loan ID"
+DAYS_IN_DEFAULT = "Days in Default"
+INTEREST_RATE_APR = "Interest Rate APR"
+OUTSTANDING_LOAN_VALUE = "Outstanding Loan Value"
+DISBURSEMENT_DATE = "Disbursement Date"
+DISBURSEMENT_AMOUNT = "Disbursement Amount"
+TRUE_PAYMENT_DATE = "True Payment Date"
+TRUE_PRINCIPAL_PAYMENT = "True Principal Payment"
+DAYS_IN_DEFAULT_COLUMN = DAYS_IN_DEFAULT
+OUTSTANDING_LOAN_VALUE_COLUMN = OUTSTANDING_LOAN_VALUE
+DISBURSEMENT_DATE_COLUMN = DISBURSEMENT_DATE
+DISBURSEMENT_AMOUNT_COLUMN = DISBURSEMENT_AMOUNT
+TRUE_PAYMENT_DATE_COLUMN = TRUE_PAYMENT_DATE
+
+DATASET_NAMES = (
+    "loan_data",
+    "historic_real_payment",
+    "payment_schedule",
+    "customer_data",
+    "collateral",
+)
+
+
+def _has_rows(df: Optional[DataFrame]) -> bool:
+    return df is not None and not df.empty
+
+
+def _row_count(df: Optional[DataFrame]) -> int:
+    return 0 if df is None else len(df)
+
+
+def _as_datetime(series: pd.Series) -> pd.Series:
+    """Parse a date column unless the typed loaders already did"""
+    if is_datetime64_any_dtype(series):
+        return series
+    return pd.to_datetime(series)
+
 
 class CommercialViewPipeline:
     """Enterprise-grade data pipeline for Abaco Commercial View."""
 
-    def __init__(self, base_path: Optional[Path] = None):
-        """Initialize the pipeline with optional base path."""
+    def __init__(
+        self,
+        base_path: Optional[Path] = None,
+        max_workers: Optional[int] = None,
+        dpd_engine: Optional[DPDBucketEngine] = None,
+    ):
+        """
+        Initialize the pipeline with optional base path and loader pool size.
+
+        DPD buckets, risk weights and provisions come from ``dpd_engine``,
+        by default the policy in ``config/dpd_policy.yml``.
+        """
         self.base_path = base_path
+        self.max_workers = max_workers
+        self.dpd_engine = dpd_engine or default_dpd_engine()
         self._datasets: Dict[str, DataFrame] = {}
         self._computed_metrics: Dict[str, Any] = {}
+        self.load_timings: Dict[str, float] = {}
+        self._payment_ingestor: Optional[IncrementalPaymentIngestor] = None
+        # Incremental vintage engine, kept outside the stage graph: it is
+        # built from the datasets in ``_vintage_sources`` and payments
+        # appended by ``refresh_payment_history`` are added to it in place
+        self._vintage_engine: Optional[VintageEngine] = None
+        self._vintage_sources: Tuple[Any, ...] = ()
+        self._vintage_curves: Optional[VintageCurves] = None
+        self.stages = self._build_stage_graph()
+
+    def _build_stage_graph(self) -> StageGraph:
+        """
+        Declare the metric stages and the datasets or stages each one reads.
+
+        Results are memoized per version of the loaded datasets: replacing a
+        dataset (``load_all_datasets``, ``refresh_payment_history``) recomputes
+        only the stages downstream of it.
+        """
+        graph = StageGraph(lambda name: self._datasets.get(name))
+        graph.add("dpd_buckets", self._stage_dpd_buckets, ["loan_data"])
+        graph.add("dpd_frame", self._stage_dpd_frame, ["loan_data", "dpd_buckets"])
+        graph.add(
+            "dpd_distribution",
+            self._stage_dpd_distribution,
+            ["loan_data", "dpd_buckets"],
+        )
+        graph.add(
+            "customer_outstanding", self._stage_customer_outstanding, ["loan_data"]
+        )
+        graph.add(
+            "portfolio_metrics",
+            self._stage_portfolio_metrics,
+            ["loan_data", "customer_outstanding", "dpd_distribution"],
+        )
+        graph.add("loan_cohorts", self._stage_loan_cohorts, ["loan_data"])
+        graph.add("payment_dates", self._stage_payment_dates, ["historic_real_payment"])
+        graph.add(
+            "balance_ledger",
+            self._stage_balance_ledger,
+            ["loan_data", "historic_real_payment"],
+        )
+        graph.add(
+            "dpd_transitions",
+            self._stage_dpd_transitions,
+            ["loan_data", "payment_schedule", "historic_real_payment"],
+        )
+        graph.add("data_quality", self._stage_data_quality, DATASET_NAMES)
+        graph.add(
+            "executive_summary",
+            self._stage_executive_summary,
+            ["portfolio_metrics", "data_quality"],
+        )
+        return graph
 
-    def load_all_datasets(self) -> Dict[str, DataFrame]:
-        """Load all available datasets with comprehensive error handling."""
+    def stage_timings(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage compute counts, reuse counts and compute seconds."""
+        return self.stages.timings()
+
+    def load_all_datasets(self, parallel: bool = True) -> Dict[str, DataFrame]:
+        """
+        Load all available datasets with comprehensive error handling.
+
+        The tables are independent files, so by default they are loaded
+        concurrently; per-table load times are kept in ``load_timings``.
+        """
         dataset_loaders = {
             "loan_data": load_loan_data,
             "historic_real_payment": load_historic_real_payment,
@@ -55,187 +188,453 @@ class CommercialViewPipeline:
             "collateral": load_collateral,
         }
 
-        for name, loader in dataset_loaders.items():
-            try:
-                self._datasets[name] = loader(self.base_path)
-                logger.info(
-                    f"Successfully loaded {name}: {len(self._datasets[name])} rows"
-                )
-            except FileNotFoundError:
-                logger.warning(
-                    f"Dataset {name} not found - will proceed with available data"
-                )
-                self._datasets[name] = pd.DataFrame()
-            except Exception as e:
-                logger.error(f"Error loading {name}: {str(e)}")
-                self._datasets[name] = pd.DataFrame()
+        datasets, self.load_timings = load_tables_concurrently(
+            dataset_loaders,
+            base_path=self.base_path,
+            max_workers=self.max_workers,
+            parallel=parallel,
+        )
+        for name, df in datasets.items():
+            self._datasets[name] = df
+            logger.info(f"Successfully loaded {name}: {len(df)} rows")
 
         return self._datasets
 
-    def compute_dpd_metrics(self) -> DataFrame:
-        """Compute Days Past Due (DPD) metrics with advanced logic."""
-        if "loan_data" not in self._datasets or self._datasets["loan_data"].empty:
-            return pd.DataFrame()
-
-        loan_data = self._datasets["loan_data"].copy()
-
-        # Compute DPD buckets
-        dpd_buckets = [0, 7, 15, 21, 30, 60, 75, 90, 120, 150, 180]
-        loan_data["dpd_bucket"] = pd.cut(
-            loan_data[DAYS_IN_DEFAULT],
-            bins=[-1] + dpd_buckets + [float("in")],
-            labels=["Current"] + [f"{b}d" for b in dpd_buckets[1:]] + ["180d+"],
+    def refresh_payment_history(self, full_refresh: bool = False) -> IngestResult:
+        """
+        Incrementally ingest newly appended Historic Real Payment rows.
+
+        Only rows written after the stored watermark are parsed; the full
+        history replaces ``historic_real_payment`` in the loaded datasets and
+        the returned ``IngestResult.delta`` holds just the new payments for
+        downstream consumers. Vintage curves built on the previous history
+        are updated with the delta instead of being rebuilt.
+        """
+        if self._payment_ingestor is None:
+            self._payment_ingestor = IncrementalPaymentIngestor(self.base_path)
+
+        previous = self._datasets.get("historic_real_payment")
+        result = self._payment_ingestor.ingest(full_refresh=full_refresh)
+        self._datasets["historic_real_payment"] = result.data
+        self._add_payment_delta(previous, result)
+        logger.info(
+            f"Payment history refreshed: {result.new_rows} new rows "
+            f"(max True Payment Date {result.watermark.max_true_payment_date})"
         )
+        return result
 
-        # Calculate past due amounts
-        loan_data["past_due_amount"] = loan_data[OUTSTANDING_LOAN_VALUE] * (
-            loan_data[DAYS_IN_DEFAULT] > 0
-        ).astype(int)
+    def compute_dpd_metrics(self) -> DataFrame:
+        """
+        Compute Days Past Due (DPD) metrics with advanced logic.
+
+        Returns a new frame stamped with today's ``reference_date``; the
+        memoized ``dpd_frame`` stage itself is never handed out, so callers
+        may modify the result.
+        """
+        loan_data = self.stages.get("dpd_frame")
+        if loan_data.empty:
+            return loan_data.copy()
+        loan_data = loan_data.assign(reference_date=datetime.now().date())
+        self._computed_metrics["dpd_frame"] = loan_data
+        return loan_data
 
-        # Determine default status (>90 days)
-        loan_data["is_default"] = loan_data[DAYS_IN_DEFAULT] > 90
+    def compute_portfolio_metrics(
+        self, streaming: bool = False, chunksize: int = DEFAULT_CHUNK_ROWS
+    ) -> Dict[str, Any]:
+        """
+        Compute comprehensive portfolio-level metrics.
+
+        Args:
+            streaming: Reduce the loan tape chunk by chunk from disk instead
+                of using the in-memory dataset
+            chunksize: Rows per chunk when streaming
+        """
+        if streaming:
+            return self.compute_portfolio_metrics_streaming(chunksize)
+
+        metrics = self.stages.get("portfolio_metrics")
+        self._computed_metrics["portfolio_metrics"] = metrics
+        # Callers get their own copy; the memoized stage result stays intact
+        return copy.deepcopy(metrics)
+
+    def _stage_dpd_buckets(self, loan_data: Optional[DataFrame]) -> Optional[DataFrame]:
+        """Policy bucket, risk weight and provision of every loan"""
+        if not _has_rows(loan_data):
+            return None
+        return self.dpd_engine.assign(
+            loan_data, DAYS_IN_DEFAULT, balance_column=OUTSTANDING_LOAN_VALUE
+        )
 
-        # Add reference date
-        loan_data["reference_date"] = datetime.now().date()
+    def _stage_dpd_frame(
+        self, loan_data: Optional[DataFrame], dpd_buckets: Optional[DataFrame]
+    ) -> DataFrame:
+        """Loan tape with DPD bucket columns, past due amount and default flag"""
+        if not _has_rows(loan_data):
+            return pd.DataFrame()
 
-        self._computed_metrics["dpd_frame"] = loan_data
-        return loan_data
+        return loan_data.assign(
+            **dpd_buckets,
+            # Calculate past due amounts
+            past_due_amount=loan_data[OUTSTANDING_LOAN_VALUE]
+            * (loan_data[DAYS_IN_DEFAULT] > 0).astype(int),
+            # Determine default status (>90 days)
+            is_default=loan_data[DAYS_IN_DEFAULT] > 90,
+        )
 
-    def compute_portfolio_metrics(self) -> Dict[str, Any]:
-        """Compute comprehensive portfolio-level metrics."""
+    def _stage_dpd_distribution(
+        self, loan_data: Optional[DataFrame], dpd_buckets: Optional[DataFrame]
+    ) -> Dict[str, float]:
+        """Outstanding balance per DPD bucket"""
+        if not _has_rows(loan_data):
+            return {}
+        totals = self.dpd_engine.totals(
+            dpd_buckets["dpd_bucket_code"].to_numpy(),
+            loan_data[OUTSTANDING_LOAN_VALUE].to_numpy(dtype=float, na_value=np.nan),
+        )
+        return dict(zip(self.dpd_engine.policy.names, totals.tolist()))
+
+    def _stage_customer_outstanding(self, loan_data: Optional[DataFrame]) -> pd.Series:
+        """Outstanding balance per customer"""
+        if not _has_rows(loan_data):
+            return pd.Series(dtype=float)
+        return loan_data.groupby(CUSTOMER_ID)[OUTSTANDING_LOAN_VALUE].sum()
+
+    def _stage_portfolio_metrics(
+        self,
+        loan_data: Optional[DataFrame],
+        customer_outstanding: pd.Series,
+        dpd_distribution: Dict[str, float],
+    ) -> Dict[str, Any]:
+        """Portfolio-level metrics of the loan tape"""
         metrics = {}
+        if not _has_rows(loan_data):
+            return metrics
 
-        if "loan_data" in self._datasets and not self._datasets["loan_data"].empty:
-            loan_data = self._datasets["loan_data"]
-
-            # Portfolio Outstanding
-            metrics["portfolio_outstanding"] = float(
-                loan_data[OUTSTANDING_LOAN_VALUE].sum()
-            )
+        # Portfolio Outstanding
+        metrics["portfolio_outstanding"] = float(
+            loan_data[OUTSTANDING_LOAN_VALUE].sum()
+        )
 
-            # Active Clients
-            metrics["active_clients"] = int(
-                loan_data[loan_data[OUTSTANDING_LOAN_VALUE] > 0][CUSTOMER_ID].nunique()
-            )
+        # Active Clients
+        outstanding_mask = loan_data[OUTSTANDING_LOAN_VALUE] > 0
+        metrics["active_clients"] = int(
+            loan_data.loc[outstanding_mask, CUSTOMER_ID].nunique()
+        )
 
-            # Weighted APR
-            outstanding_mask = loan_data[OUTSTANDING_LOAN_VALUE] > 0
-            if outstanding_mask.any():
-                metrics["weighted_apr"] = float(
-                    np.average(
-                        loan_data[outstanding_mask][INTEREST_RATE_APR],
-                        weights=loan_data[outstanding_mask][OUTSTANDING_LOAN_VALUE],
-                    )
+        # Weighted APR
+        if outstanding_mask.any():
+            metrics["weighted_apr"] = float(
+                np.average(
+                    loan_data.loc[outstanding_mask, INTEREST_RATE_APR],
+                    weights=loan_data.loc[outstanding_mask, OUTSTANDING_LOAN_VALUE],
                 )
-            else:
-                metrics["weighted_apr"] = 0.0
-
-            # NPL (Non-Performing Loans) > 180 days
-            metrics["npl_180"] = float(
-                loan_data[loan_data[DAYS_IN_DEFAULT] >= 180][
-                    OUTSTANDING_LOAN_VALUE
-                ].sum()
             )
+        else:
+            metrics["weighted_apr"] = 0.0
+
+        # NPL (Non-Performing Loans) > 180 days
+        npl_outstanding = loan_data.loc[
+            loan_data[DAYS_IN_DEFAULT] >= 180, OUTSTANDING_LOAN_VALUE
+        ]
+        metrics["npl_180"] = float(npl_outstanding.sum())
+
+        # Concentration metrics
+        top_10_outstanding = customer_outstanding.nlargest(10).sum()
+        metrics["concentration_top10_pct"] = float(
+            top_10_outstanding / metrics["portfolio_outstanding"] * 100
+            if metrics["portfolio_outstanding"] > 0
+            else 0
+        )
 
-            # Concentration metrics
-            customer_outstanding = loan_data.groupby(CUSTOMER_ID)[
-                OUTSTANDING_LOAN_VALUE
-            ].sum()
-            top_10_outstanding = customer_outstanding.nlargest(10).sum()
-            metrics["concentration_top10_pct"] = float(
-                top_10_outstanding / metrics["portfolio_outstanding"] * 100
-                if metrics["portfolio_outstanding"] > 0
-                else 0
-            )
+        # Single obligor concentration
+        max_outstanding = (
+            customer_outstanding.max() if len(customer_outstanding) > 0 else 0
+        )
+        metrics["max_borrower_pct"] = float(
+            max_outstanding / metrics["portfolio_outstanding"] * 100
+            if metrics["portfolio_outstanding"] > 0
+            else 0
+        )
 
-            # Single obligor concentration
-            max_outstanding = (
-                customer_outstanding.max() if len(customer_outstanding) > 0 else 0
+        # DPD distribution
+        metrics["dpd_distribution"] = dpd_distribution
+        return metrics
+
+    def compute_portfolio_metrics_streaming(
+        self, chunksize: int = DEFAULT_CHUNK_ROWS
+    ) -> Dict[str, Any]:
+        """
+        Compute portfolio metrics in constant memory over the loan tape on disk.
+
+        Produces the same keys as ``compute_portfolio_metrics``; memory is
+        bounded by ``chunksize`` plus one running total per customer.
+        """
+        columns = [
+            CUSTOMER_ID,
+            DAYS_IN_DEFAULT,
+            INTEREST_RATE_APR,
+            OUTSTANDING_LOAN_VALUE,
+        ]
+        try:
+            chunks = iter_table_chunks(
+                LOAN_DATA_TABLE, self.base_path, chunksize=chunksize, usecols=columns
             )
-            metrics["max_borrower_pct"] = float(
-                max_outstanding / metrics["portfolio_outstanding"] * 100
-                if metrics["portfolio_outstanding"] > 0
-                else 0
+            reduced = reduce_chunks(
+                chunks,
+                {
+                    "portfolio_outstanding": OutstandingSumReducer(
+                        OUTSTANDING_LOAN_VALUE
+                    ),
+                    "npl_180": OutstandingSumReducer(
+                        OUTSTANDING_LOAN_VALUE, DAYS_IN_DEFAULT, min_days=180
+                    ),
+                    "weighted_apr": WeightedAPRReducer(
+                        INTEREST_RATE_APR, OUTSTANDING_LOAN_VALUE
+                    ),
+                    "active_clients": UniqueCustomerReducer(
+                        CUSTOMER_ID, OUTSTANDING_LOAN_VALUE
+                    ),
+                    "customer_exposure": CustomerExposureReducer(
+                        CUSTOMER_ID, OUTSTANDING_LOAN_VALUE
+                    ),
+                    "dpd_distribution": DPDBucketReducer(
+                        self.dpd_engine,
+                        DAYS_IN_DEFAULT,
+                        OUTSTANDING_LOAN_VALUE,
+                    ),
+                },
             )
+        except FileNotFoundError as e:
+            logger.warning(f"Streaming portfolio metrics skipped: {e}")
+            self._computed_metrics["portfolio_metrics"] = {}
+            return {}
+
+        customer_outstanding = reduced.pop("customer_exposure")
+        outstanding = reduced["portfolio_outstanding"]
+        top_10_outstanding = customer_outstanding.nlargest(10).sum()
+        max_outstanding = (
+            customer_outstanding.max() if len(customer_outstanding) > 0 else 0
+        )
 
-            # DPD distribution
-            dpd_data = self.compute_dpd_metrics()
-            if not dpd_data.empty:
-                dpd_dist = dpd_data.groupby("dpd_bucket")[OUTSTANDING_LOAN_VALUE].sum()
-                metrics["dpd_distribution"] = {
-                    str(k): float(v) for k, v in dpd_dist.items()
-                }
+        metrics = {
+            "portfolio_outstanding": outstanding,
+            "active_clients": reduced["active_clients"],
+            "weighted_apr": reduced["weighted_apr"],
+            "npl_180": reduced["npl_180"],
+            "concentration_top10_pct": float(
+                top_10_outstanding / outstanding * 100 if outstanding > 0 else 0
+            ),
+            "max_borrower_pct": float(
+                max_outstanding / outstanding * 100 if outstanding > 0 else 0
+            ),
+            "dpd_distribution": reduced["dpd_distribution"],
+        }
 
         self._computed_metrics["portfolio_metrics"] = metrics
         return metrics
 
     def compute_recovery_metrics(self) -> DataFrame:
         """Compute recovery curve metrics by cohort."""
-        if (
-            "loan_data" not in self._datasets
-            or "historic_real_payment" not in self._datasets
-            or self._datasets["loan_data"].empty
-            or self._datasets["historic_real_payment"].empty
-        ):
+        curves = self.compute_vintage_curves()
+        if curves is None:
             return pd.DataFrame()
-
-        loan_data = self._datasets["loan_data"].copy()
-        payments = self._datasets["historic_real_payment"].copy()
-
+        recovery_summary = curves.recovery_summary()
+        if not recovery_summary.empty:
+            self._computed_metrics["recovery_metrics"] = recovery_summary
+        return recovery_summary
+
+    def compute_vintage_curves(self) -> Optional[VintageCurves]:
+        """
+        Recovery, charge-off and DPD 30+/90+ curves per disbursement cohort.
+
+        The engine is rebuilt when the loan tape, schedule or payment table
+        is replaced, except for payment appends made through
+        ``refresh_payment_history``, which add only the new rows and compute
+        only the new month-ends. Delinquency curves need the Payment
+        Schedule and stay empty (NaN) without it. Returns None without loan
+        and payment data.
+        """
+        loan_cohorts = self.stages.get("loan_cohorts")
+        payments = self.stages.get("payment_dates")
+        if loan_cohorts is None or payments is None:
+            self._vintage_engine = None
+            return None
+
+        sources = self._vintage_source_tables()
+        current = len(self._vintage_sources) == len(sources) and all(
+            a is b for a, b in zip(self._vintage_sources, sources)
+        )
         try:
-            # Convert dates
-            loan_data[DISBURSEMENT_DATE] = pd.to_datetime(loan_data[DISBURSEMENT_DATE])
-            payments[TRUE_PAYMENT_DATE] = pd.to_datetime(payments[TRUE_PAYMENT_DATE])
-
-            # Create cohort based on disbursement month
-            loan_data["cohort"] = loan_data[DISBURSEMENT_DATE].dt.to_period("M")
-
-            # Merge payments with loan data
-            recovery_data = payments.merge(
-                loan_data[[LOAN_ID, DISBURSEMENT_AMOUNT, "cohort", DISBURSEMENT_DATE]],
-                on=LOAN_ID,
-                how="left",
-            )
-
-            # Calculate months since disbursement
-            recovery_data["months_since_disbursement"] = (
-                (
-                    (
-                        recovery_data[TRUE_PAYMENT_DATE]
-                        - recovery_data[DISBURSEMENT_DATE]
-                    ).dt.days
-                    / 30.44
+            if self._vintage_engine is None or not current:
+                engine = VintageEngine(
+                    loan_cohorts, RollRateEngine(dpd_engine=self.dpd_engine)
                 )
-                .round()
-                .astype("Int64")
-            )
-
-            # Aggregate recovery by cohort and month
-            recovery_summary = (
-                recovery_data.groupby(["cohort", "months_since_disbursement"])
-                .agg({"True Principal Payment": "sum", DISBURSEMENT_AMOUNT: "first"})
-                .reset_index()
-            )
+                engine.add_payments(payments)
+                self._vintage_engine, self._vintage_sources = engine, sources
+                self._vintage_curves = None
+            if self._vintage_curves is None:
+                schedule = sources[1]
+                if _has_rows(schedule):
+                    self._vintage_engine.update_delinquency(schedule, payments)
+                self._vintage_curves = self._vintage_engine.curves()
+        except Exception as e:
+            logger.error(f"Error computing recovery metrics: {str(e)}")
+            self._vintage_engine, self._vintage_sources = None, ()
+            return None
+        return self._vintage_curves
+
+    def _vintage_source_tables(self) -> Tuple[Any, ...]:
+        """Datasets the vintage engine is built from"""
+        return tuple(
+            self._datasets.get(name)
+            for name in ("loan_data", "payment_schedule", "historic_real_payment")
+        )
 
-            # Calculate cumulative recovery percentage
-            recovery_summary["recovery_pct"] = (
-                recovery_summary.groupby("cohort")["True Principal Payment"].cumsum()
-                / recovery_summary[DISBURSEMENT_AMOUNT]
-                * 100
-            )
+    def _add_payment_delta(
+        self, previous: Optional[DataFrame], result: IngestResult
+    ) -> None:
+        """Add appended payments to a vintage engine built on ``previous``"""
+        if self._vintage_engine is None:
+            return
+        loan_data, schedule, payments = self._vintage_sources
+        current = self._vintage_source_tables()
+        if (
+            result.full_rebuild
+            or payments is not previous
+            or loan_data is not current[0]
+            or schedule is not current[1]
+        ):
+            self._vintage_engine, self._vintage_sources = None, ()
+            return
+        try:
+            if result.new_rows:
+                self._vintage_engine.add_payments(result.delta)
+                self._vintage_curves = None
+        except Exception as e:
+            logger.error(f"Error adding payments to vintage curves: {str(e)}")
+            self._vintage_engine, self._vintage_sources = None, ()
+            return
+        self._vintage_sources = current
+
+    def compute_balance_history(
+        self,
+        level: str = PORTFOLIO,
+        freq: str = "M",
+        start: Optional[Any] = None,
+        end: Optional[Any] = None,
+    ) -> Any:
+        """
+        Outstanding principal per day or month-end, rebuilt from events.
+
+        Args:
+            level: ``portfolio``, ``loan``, ``customer`` or ``company``
+            freq: ``D`` (daily) or ``M`` (month-end)
+            start: First date (defaults to the first event)
+            end: Last date (defaults to the last event)
+
+        Returns:
+            Series for the portfolio, DataFrame of one column per entity
+            otherwise; empty without loan data
+        """
+        ledger = self.stages.get("balance_ledger")
+        if ledger is None:
+            return pd.Series(dtype=float) if level == PORTFOLIO else DataFrame()
+        return ledger.series(level, freq, start, end)
+
+    def outstanding_as_of(
+        self, as_of: Any, level: str = PORTFOLIO, key: Optional[str] = None
+    ) -> Any:
+        """Outstanding principal at ``as_of`` (see ``BalanceLedger.balance_as_of``)"""
+        ledger = self.stages.get("balance_ledger")
+        if ledger is None:
+            if level == PORTFOLIO or key is not None:
+                return 0.0
+            return pd.Series(dtype=float)
+        return ledger.balance_as_of(as_of, level, key)
+
+    def _stage_balance_ledger(
+        self, loan_data: Optional[DataFrame], payments: Optional[DataFrame]
+    ) -> Optional[BalanceLedger]:
+        """Disbursement and repayment events behind balance time series"""
+        if not _has_rows(loan_data):
+            return None
+        return BalanceLedger.from_tables(
+            loan_data, payments if _has_rows(payments) else None
+        )
 
-            self._computed_metrics["recovery_metrics"] = recovery_summary
-            return recovery_summary
+    def compute_dpd_transitions(self) -> Optional[TransitionMatrices]:
+        """Month-end DPD bucket transitions (roll rates) of the loan tape."""
+        return self.stages.get("dpd_transitions")
+
+    def _stage_dpd_transitions(
+        self,
+        loan_data: Optional[DataFrame],
+        schedule: Optional[DataFrame],
+        payments: Optional[DataFrame],
+    ) -> Optional[TransitionMatrices]:
+        """Roll-rate matrices rebuilt from the schedule and payment tables"""
+        if not (_has_rows(loan_data) and _has_rows(schedule) and _has_rows(payments)):
+            return None
+        engine = RollRateEngine(dpd_engine=self.dpd_engine)
+        return engine.transitions(loan_data, schedule, payments)
+
+    def _stage_loan_cohorts(
+        self, loan_data: Optional[DataFrame]
+    ) -> Optional[DataFrame]:
+        """Loan columns used by recovery curves, with the disbursement cohort"""
+        if not _has_rows(loan_data):
+            return None
+        try:
+            disbursed = _as_datetime(loan_data[DISBURSEMENT_DATE])
+        except Exception as e:
+            logger.error(f"Error computing recovery metrics: {str(e)}")
+            return None
+        return pd.DataFrame(
+            {
+                LOAN_ID: loan_data[LOAN_ID],
+                DISBURSEMENT_AMOUNT: loan_data[DISBURSEMENT_AMOUNT],
+                DISBURSEMENT_DATE: disbursed,
+            }
+        )
 
+    def _stage_payment_dates(
+        self, payments: Optional[DataFrame]
+    ) -> Optional[DataFrame]:
+        """Payment columns used by recovery curves, with parsed dates"""
+        if not _has_rows(payments):
+            return None
+        try:
+            return pd.DataFrame(
+                {
+                    LOAN_ID: payments[LOAN_ID],
+                    TRUE_PAYMENT_DATE: _as_datetime(payments[TRUE_PAYMENT_DATE]),
+                    TRUE_PRINCIPAL_PAYMENT: payments[TRUE_PRINCIPAL_PAYMENT],
+                }
+            )
         except Exception as e:
             logger.error(f"Error computing recovery metrics: {str(e)}")
-            return pd.DataFrame()
+            return None
 
     def generate_executive_summary(self) -> Dict[str, Any]:
         """Generate comprehensive executive summary."""
-        portfolio_metrics = self.compute_portfolio_metrics()
+        summary = copy.deepcopy(self.stages.get("executive_summary"))
+        summary["generated_at"] = datetime.now().isoformat()
+        return summary
 
-        summary = {
+    def _stage_data_quality(self, *datasets: Optional[DataFrame]) -> Dict[str, Any]:
+        """Row counts of the loaded datasets"""
+        loaded = dict(zip(DATASET_NAMES, datasets))
+        return {
+            "datasets_loaded": sum(1 for df in datasets if _has_rows(df)),
+            "total_loans": _row_count(loaded["loan_data"]),
+            "total_payments": _row_count(loaded["historic_real_payment"]),
+        }
+
+    def _stage_executive_summary(
+        self, portfolio_metrics: Dict[str, Any], data_quality: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Executive summary assembled from the portfolio metrics"""
+        return {
             "portfolio_overview": {
                 "outstanding_balance": portfolio_metrics.get(
                     "portfolio_outstanding", 0
@@ -259,20 +658,9 @@ class CommercialViewPipeline:
                 ),
                 "dpd_distribution": portfolio_metrics.get("dpd_distribution", {}),
             },
-            "data_quality": {
-                "datasets_loaded": sum(
-                    1 for df in self._datasets.values() if not df.empty
-                ),
-                "total_loans": len(self._datasets.get("loan_data", pd.DataFrame())),
-                "total_payments": len(
-                    self._datasets.get("historic_real_payment", pd.DataFrame())
-                ),
-            },
-            "generated_at": datetime.now().isoformat(),
+            "data_quality": data_quality,
         }
 
-        return summary
-
     def calculate_delinquency_metrics(self, loan_data: pd.DataFrame) -> Dict[str, Any]:
         """Calculate comprehensive delinquency metrics."""
         metrics = {}
@@ -280,13 +668,11 @@ class CommercialViewPipeline:
         if DAYS_IN_DEFAULT_COLUMN in loan_data.columns:
             dpd_series = loan_data[DAYS_IN_DEFAULT_COLUMN]
 
-            # Calculate DPD buckets
-            dpd_buckets = [0, 7, 15, 30, 60, 90, 120, 150, 180]
-            loan_data["dpd_bucket"] = pd.cut(
-                dpd_series,
-                bins=[-1] + dpd_buckets + [float("in")],
-                labels=["Current"] + [f"{b}d" for b in dpd_buckets[1:]] + ["180d+"],
+            # Assign policy DPD buckets, risk weights and provisions
+            buckets = self.dpd_engine.assign(
+                loan_data, DAYS_IN_DEFAULT_COLUMN, OUTSTANDING_LOAN_VALUE_COLUMN
             )
+            loan_data[buckets.columns] = buckets
 
             # Calculate past due amounts
             loan_data["past_due_amount"] = loan_data[OUTSTANDING_LOAN_VALUE_COLUMN] * (
@@ -296,9 +682,15 @@ class CommercialViewPipeline:
             # Determine default status (>90 days)
             loan_data["is_default"] = dpd_series > 90
 
-            metrics["dpd_distribution"] = loan_data.groupby("dpd_bucket")[
-                OUTSTANDING_LOAN_VALUE_COLUMN
-            ].sum()
+            totals = self.dpd_engine.totals(
+                buckets["dpd_bucket_code"].to_numpy(),
+                loan_data[OUTSTANDING_LOAN_VALUE_COLUMN].to_numpy(
+                    dtype=float, na_value=np.nan
+                ),
+            )
+            metrics["dpd_distribution"] = pd.Series(
+                totals, index=list(self.dpd_engine.policy.names)
+            )
 
         return metrics
 
@@ -306,17 +698,14 @@ class CommercialViewPipeline:
         """Process and validate date columns."""
         df_processed = df.copy()
 
-        # Process disbursement dates
-        if DISBURSEMENT_DATE_COLUMN in df_processed.columns:
-            df_processed[DISBURSEMENT_DATE_COLUMN] = pd.to_datetime(
-                df_processed[DISBURSEMENT_DATE_COLUMN], errors="coerce"
-            )
-
-        # Process payment dates
-        if TRUE_PAYMENT_DATE_COLUMN in df_processed.columns:
-            df_processed[TRUE_PAYMENT_DATE_COLUMN] = pd.to_datetime(
-                df_processed[TRUE_PAYMENT_DATE_COLUMN], errors="coerce"
-            )
+        # Typed loaders already deliver datetime64 columns; only parse text
+        for date_column in (DISBURSEMENT_DATE_COLUMN, TRUE_PAYMENT_DATE_COLUMN):
+            if date_column in df_processed.columns and not is_datetime64_any_dtype(
+                df_processed[date_column]
+            ):
+                df_processed[date_column] = pd.to_datetime(
+                    df_processed[date_column], errors="coerce"
+                )
 
         return df_processed
 
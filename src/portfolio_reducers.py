@@ -0,0 +1,184 @@
+"""
+Chunk-aware portfolio reducers for out-of-core loan tapes
+Each reducer folds typed chunks into a running aggregate, so portfolio
+metrics can be computed over arbitrarily large files in constant memory
+"""
+
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional
+import logging
+
+from src.dpd_policy import DPDBucketEngine, default_dpd_engine
+
+logger = logging.getLogger(__name__)
+
+
+class ChunkReducer(ABC):
+    """Base class for aggregates that are updated one chunk at a time"""
+
+    @abstractmethod
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Fold a chunk into the running aggregate"""
+
+    @abstractmethod
+    def result(self) -> Any:
+        """Return the aggregate over every chunk seen so far"""
+
+
+class OutstandingSumReducer(ChunkReducer):
+    """Sum of a value column, optionally restricted to ``min_days`` DPD and above"""
+
+    def __init__(
+        self,
+        value_column: str = "Outstanding Loan Value",
+        dpd_column: str = "Days in Default",
+        min_days: Optional[int] = None,
+    ):
+        self.value_column = value_column
+        self.dpd_column = dpd_column
+        self.min_days = min_days
+        self.total = 0.0
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        values = chunk[self.value_column]
+        if self.min_days is not None:
+            values = values[chunk[self.dpd_column] >= self.min_days]
+        self.total += float(values.sum())
+
+    def result(self) -> float:
+        return self.total
+
+
+class WeightedAPRReducer(ChunkReducer):
+    """Balance-weighted APR over loans with a positive balance"""
+
+    def __init__(
+        self,
+        rate_column: str = "Interest Rate APR",
+        weight_column: str = "Outstanding Loan Value",
+    ):
+        self.rate_column = rate_column
+        self.weight_column = weight_column
+        self.weighted_sum = 0.0
+        self.weight_total = 0.0
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        weights = chunk[self.weight_column].to_numpy(dtype=float, na_value=np.nan)
+        rates = chunk[self.rate_column].to_numpy(dtype=float, na_value=np.nan)
+        mask = weights > 0
+        self.weighted_sum += float(np.nansum(rates[mask] * weights[mask]))
+        self.weight_total += float(weights[mask].sum())
+
+    def result(self) -> float:
+        return self.weighted_sum / self.weight_total if self.weight_total > 0 else 0.0
+
+
+class DPDBucketReducer(ChunkReducer):
+    """Value totals per DPD bucket of the DPD policy (see ``src.dpd_policy``)"""
+
+    def __init__(
+        self,
+        engine: Optional[DPDBucketEngine] = None,
+        dpd_column: str = "Days in Default",
+        value_column: str = "Outstanding Loan Value",
+    ):
+        self.engine = engine or default_dpd_engine()
+        self.dpd_column = dpd_column
+        self.value_column = value_column
+        self.totals = np.zeros(len(self.engine.policy.names))
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        codes = self.engine.codes(chunk[self.dpd_column])
+        values = chunk[self.value_column].to_numpy(dtype=float, na_value=np.nan)
+        self.totals += self.engine.totals(codes, values)
+
+    def result(self) -> Dict[str, float]:
+        names = self.engine.policy.names
+        return {name: float(total) for name, total in zip(names, self.totals)}
+
+
+class UniqueCustomerReducer(ChunkReducer):
+    """
+    Distinct customers, optionally only those with a positive balance.
+
+    Memory grows with the number of distinct customers, not with rows.
+    """
+
+    def __init__(
+        self,
+        customer_column: str = "Customer ID",
+        value_column: Optional[str] = "Outstanding Loan Value",
+    ):
+        self.customer_column = customer_column
+        self.value_column = value_column
+        self.customers: set = set()
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        customers = chunk[self.customer_column]
+        if self.value_column is not None:
+            customers = customers[chunk[self.value_column] > 0]
+        self.customers.update(customers.dropna().unique())
+
+    def result(self) -> int:
+        return len(self.customers)
+
+
+class CustomerExposureReducer(ChunkReducer):
+    """Per-customer value totals, used for concentration metrics"""
+
+    def __init__(
+        self,
+        customer_column: str = "Customer ID",
+        value_column: str = "Outstanding Loan Value",
+    ):
+        self.customer_column = customer_column
+        self.value_column = value_column
+        self.exposure = pd.Series(dtype=float)
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        chunk_exposure = (
+            chunk.groupby(chunk[self.customer_column].astype(object))[self.value_column]
+            .sum()
+            .astype(float)
+        )
+        self.exposure = self.exposure.add(chunk_exposure, fill_value=0.0)
+
+    def result(self) -> pd.Series:
+        return self.exposure
+
+
+def reduce_chunks(
+    chunks: Iterable[pd.DataFrame], reducers: Dict[str, ChunkReducer]
+) -> Dict[str, Any]:
+    """
+    Feed every chunk to every reducer and collect their results.
+
+    Args:
+        chunks: Iterable of typed DataFrame chunks
+        reducers: Mapping of result name to reducer
+
+    Returns:
+        Mapping of result name to reduced value
+    """
+    rows = 0
+    for chunk in chunks:
+        rows += len(chunk)
+        for reducer in reducers.values():
+            reducer.update(chunk)
+
+    logger.info(f"Reduced {rows} rows with {len(reducers)} reducers")
+    return {name: reducer.result() for name, reducer in reducers.items()}
+
+
+__all__: List[str] = [
+    "ChunkReducer",
+    "OutstandingSumReducer",
+    "WeightedAPRReducer",
+    "DPDBucketReducer",
+    "UniqueCustomerReducer",
+    "CustomerExposureReducer",
+    "reduce_chunks",
+]
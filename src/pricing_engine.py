@@ -0,0 +1,306 @@
+"""
+Interval-join pricing engine
+Pricing grids are parsed once per file version and indexed per exact-key
+group, so each loan's band is resolved by binary search instead of a merge
+followed by band masking
+"""
+
+import logging
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+PRICING_CONFIG_PATH = (
+    Path(__file__).resolve().parent.parent / "config" / "pricing_config.yml"
+)
+NO_BAND = -1
+# Largest dense winner table of one key group; bigger groups intersect
+# per-dimension candidate sets instead
+MAX_DENSE_CELLS = 1 << 22
+# Loan x band cells examined at once by the candidate-set lookup
+RESOLVE_CHUNK_CELLS = 1 << 22
+
+# Loan column -> (grid lower bound column, grid upper bound column)
+BandKeys = Dict[str, Tuple[str, str]]
+
+
+def load_band_keys(config: Dict[str, Any]) -> BandKeys:
+    """Band keys from the ``band_keys`` section of ``pricing_config.yml``"""
+    return {
+        loan_column: (spec["lower_bound"], spec["upper_bound"])
+        for loan_column, spec in (config.get("band_keys") or {}).items()
+    }
+
+
+def load_pricing_config(path: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
+    """Parsed pricing configuration (defaults to ``config/pricing_config.yml``)"""
+    import yaml
+
+    with open(path or PRICING_CONFIG_PATH, "r") as f:
+        return yaml.safe_load(f) or {}
+
+
+@lru_cache(maxsize=32)
+def _read_grid(path: Path, version: Tuple[int, int]) -> pd.DataFrame:
+    if path.suffix == ".parquet":
+        grid = pd.read_parquet(path)
+    elif path.suffix in (".yaml", ".yml"):
+        import yaml
+
+        with open(path, "r") as f:
+            config = yaml.safe_load(f) or {}
+        grid = pd.DataFrame(config.get("pricing_grid", []))
+    else:
+        grid = pd.read_csv(path)
+    logger.info(f"Parsed pricing grid {path.name}: {len(grid)} bands")
+    return grid
+
+
+def grid_version(path: Union[str, Path]) -> Tuple[int, int]:
+    """(size, mtime_ns) of a grid file; changes whenever the file is rewritten"""
+    stat = Path(path).stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def load_grid(path: Union[str, Path]) -> pd.DataFrame:
+    """
+    Parse a pricing grid (CSV, Parquet or YAML ``pricing_grid``), cached per
+    file version. The cached frame is shared; callers must not modify it.
+    """
+    path = Path(path).resolve()
+    return _read_grid(path, grid_version(path))
+
+
+def _bounds(grid: pd.DataFrame, column: str, missing: float) -> np.ndarray:
+    """Numeric band bounds; a missing bound becomes ``missing`` (open side)"""
+    values = pd.to_numeric(grid[column], errors="coerce")
+    return values.to_numpy(dtype="float64", na_value=missing)
+
+
+@dataclass
+class _GroupIndex:
+    """Band lookup for the grid rows sharing one exact-key combination"""
+
+    breakpoints: List[np.ndarray]
+    winners: np.ndarray
+
+    def resolve(self, values: List[np.ndarray]) -> np.ndarray:
+        """Winning grid row for each loan, ``NO_BAND`` where none covers it"""
+        cells = tuple(
+            np.searchsorted(points, column, side="right")
+            for points, column in zip(self.breakpoints, values)
+        )
+        rows = self.winners[cells]
+        missing = np.zeros(len(rows), dtype=bool)
+        for column in values:
+            missing |= np.isnan(column)
+        return np.where(missing, NO_BAND, rows)
+
+
+@dataclass
+class _CandidateGroupIndex:
+    """
+    Band lookup by candidate-set intersection, for groups whose dense
+    winner table would be too large.
+
+    ``covers[d][s, b]`` is True when band ``b`` (in grid order) covers
+    segment ``s`` of dimension ``d``; a loan's bands are the AND of its
+    segments' rows, and the first one wins.
+    """
+
+    breakpoints: List[np.ndarray]
+    covers: List[np.ndarray]
+    rows: np.ndarray
+
+    def resolve(self, values: List[np.ndarray]) -> np.ndarray:
+        """Winning grid row for each loan, ``NO_BAND`` where none covers it"""
+        segments = [
+            np.searchsorted(points, column, side="right")
+            for points, column in zip(self.breakpoints, values)
+        ]
+        matched = np.full(len(values[0]), NO_BAND, dtype=np.int64)
+        step = max(1, RESOLVE_CHUNK_CELLS // max(len(self.rows), 1))
+        for start in range(0, len(matched), step):
+            chunk = slice(start, start + step)
+            hit = self.covers[0][segments[0][chunk]]
+            for covers, segment in zip(self.covers[1:], segments[1:]):
+                hit &= covers[segment[chunk]]
+            first = hit.argmax(axis=1)
+            matched[chunk] = np.where(hit.any(axis=1), self.rows[first], NO_BAND)
+        missing = np.zeros(len(matched), dtype=bool)
+        for column in values:
+            missing |= np.isnan(column)
+        return np.where(missing, NO_BAND, matched)
+
+
+class BandIndex:
+    """
+    Interval index over a pricing grid.
+
+    Grid rows are grouped by their exact join keys. Within a group, every
+    band dimension is cut into elementary segments at the band bounds, and a
+    table maps each combination of segments to the band covering it, so a
+    loan is priced with one ``searchsorted`` per band dimension.
+
+    Bounds are inclusive; a missing lower or upper bound leaves that side
+    open. When bands overlap, the band listed first in the grid wins, so
+    results never depend on merge order. Loans with no covering band, no
+    matching key group, or a missing band value get ``NO_BAND``.
+
+    The table has one cell per segment combination, up to (2N+1)^d for N
+    bands over d dimensions. Groups whose table would exceed
+    ``MAX_DENSE_CELLS`` instead keep, per dimension, which bands cover each
+    segment and intersect those candidate sets per loan.
+    """
+
+    def __init__(
+        self, grid: pd.DataFrame, join_keys: Sequence[str], band_keys: BandKeys
+    ):
+        self.join_keys = list(join_keys)
+        self.band_keys = dict(band_keys)
+        self.n_bands = len(grid)
+        self._groups: Dict[
+            Tuple[Any, ...], Union[_GroupIndex, _CandidateGroupIndex]
+        ] = {}
+
+        lowers, uppers = [], []
+        for lower_col, upper_col in self.band_keys.values():
+            lowers.append(_bounds(grid, lower_col, -np.inf))
+            uppers.append(_bounds(grid, upper_col, np.inf))
+
+        if self.join_keys:
+            groups = grid.groupby(self.join_keys, sort=False, dropna=False).indices
+        else:
+            groups = {(): np.arange(len(grid))}
+        for key, rows in groups.items():
+            key = key if isinstance(key, tuple) else (key,)
+            self._groups[key] = self._build_group(
+                np.sort(rows), [lo[rows] for lo in lowers], [hi[rows] for hi in uppers]
+            )
+
+    @staticmethod
+    def _build_group(
+        rows: np.ndarray, lowers: List[np.ndarray], uppers: List[np.ndarray]
+    ) -> Union[_GroupIndex, _CandidateGroupIndex]:
+        # A band [lo, hi] spans the segments from lo up to just after hi
+        ends = [np.nextafter(hi, np.inf) for hi in uppers]
+        breakpoints = [
+            np.unique(np.concatenate([lo, end])) for lo, end in zip(lowers, ends)
+        ]
+        spans = [
+            (
+                np.searchsorted(points, lo, side="right"),
+                np.searchsorted(points, end, side="right"),
+            )
+            for points, lo, end in zip(breakpoints, lowers, ends)
+        ]
+        shape = tuple(len(p) + 1 for p in breakpoints)
+
+        if math.prod(shape) > MAX_DENSE_CELLS:
+            bands = np.arange(len(rows))
+            covers = []
+            for size, (starts, stops) in zip(shape, spans):
+                marks = np.zeros((size + 1, len(rows)), dtype=np.int32)
+                np.add.at(marks, (starts, bands), 1)
+                np.add.at(marks, (stops, bands), -1)
+                covers.append(np.cumsum(marks, axis=0)[:size] > 0)
+            return _CandidateGroupIndex(breakpoints, covers, rows)
+
+        winners = np.full(shape, NO_BAND)
+        # Paint bands last to first so the earliest grid row ends up on top
+        for band in range(len(rows) - 1, -1, -1):
+            cells = tuple(slice(starts[band], stops[band]) for starts, stops in spans)
+            winners[cells] = rows[band]
+        return _GroupIndex(breakpoints=breakpoints, winners=winners)
+
+    def lookup(self, loans: pd.DataFrame) -> np.ndarray:
+        """
+        Grid row position priced for each loan.
+
+        Args:
+            loans: Loans with the join key columns and band value columns
+
+        Returns:
+            Array of grid row positions, ``NO_BAND`` where unpriced
+        """
+        matched = np.full(len(loans), NO_BAND, dtype=np.int64)
+        if not len(loans):
+            return matched
+        values = [
+            pd.to_numeric(loans[column], errors="coerce").to_numpy(
+                dtype="float64", na_value=np.nan
+            )
+            for column in self.band_keys
+        ]
+        if self.join_keys:
+            loan_groups = loans.groupby(self.join_keys, sort=False, dropna=False)
+            positions_by_key = loan_groups.indices.items()
+        else:
+            positions_by_key = [((), np.arange(len(loans)))]
+
+        for key, positions in positions_by_key:
+            group = self._groups.get(key if isinstance(key, tuple) else (key,))
+            if group is not None:
+                matched[positions] = group.resolve([v[positions] for v in values])
+        return matched
+
+
+def interval_join(
+    loans: pd.DataFrame,
+    grid: pd.DataFrame,
+    index: BandIndex,
+    columns: Optional[Sequence[str]] = None,
+    suffix: str = "_grid",
+) -> pd.DataFrame:
+    """
+    Attach the priced grid row's columns to every loan, one row per loan.
+
+    Args:
+        loans: Loans to price
+        grid: Grid the index was built from
+        index: Band index over ``grid``
+        columns: Grid columns to attach (defaults to all but the join keys)
+        suffix: Appended to grid columns whose name a loan column already uses
+
+    Returns:
+        Copy of ``loans`` with the grid columns; unpriced loans get missing
+        values
+
+    Raises:
+        ValueError: If a suffixed grid column name is also taken
+    """
+    if columns is None:
+        columns = [c for c in grid.columns if c not in index.join_keys]
+    columns = list(columns)
+    names = {c: f"{c}{suffix}" if c in loans.columns else c for c in columns}
+    taken = [name for column, name in names.items() if name != column and name in loans]
+    if taken:
+        raise ValueError(f"Grid columns clash with loan columns: {taken}")
+
+    matched = index.lookup(loans)
+    priced = grid[columns].reindex(matched).rename(columns=names)
+    priced.index = loans.index
+    result = loans.copy()
+    result[list(names.values())] = priced
+    return result
+
+
+__all__ = [
+    "BandIndex",
+    "BandKeys",
+    "MAX_DENSE_CELLS",
+    "NO_BAND",
+    "PRICING_CONFIG_PATH",
+    "grid_version",
+    "interval_join",
+    "load_band_keys",
+    "load_grid",
+    "load_pricing_config",
+]
@@ -4,17 +4,42 @@ Loan pricing enrichment with flexible join strategies
 """
 
 import pandas as pd
-import numpy as np
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+try:
+    from src.pricing_engine import (
+        BandIndex,
+        grid_version,
+        interval_join,
+        load_band_keys,
+        load_grid,
+        load_pricing_config,
+    )
+except ImportError:
+    from pricing_engine import (
+        BandIndex,
+        grid_version,
+        interval_join,
+        load_band_keys,
+        load_grid,
+        load_pricing_config,
+    )
+
 
 class PricingEnricher:
     """Comprehensive pricing enrichment system with multi-stage matching"""
 
-    def __init__(self, pricing_paths: Optional[List[str]] = None):
+    def __init__(
+        self,
+        pricing_paths: Optional[List[str]] = None,
+        config_path: Optional[str] = None,
+    ):
         self.pricing_paths = pricing_paths or ["./configs", "./pricing"]
+        self.config_path = config_path
         self.pricing_grid = None
         self.recommended_pricing = None
+        self._band_indexes: Dict[tuple, BandIndex] = {}
 
     def enrich_with_pricing(
         self,
@@ -27,48 +52,58 @@ class PricingEnricher:
     ) -> pd.DataFrame:
         """
         Exact keys only or Interval + exact keys enrichment
-        """
-        result = loans_df.copy()
 
-        # Load pricing configuration
-        if pricing_file.endswith(".parquet"):
-            pricing_df = pd.read_parquet(pricing_file)
-        elif pricing_file.endswith(".yaml"):
-            import yaml
+        With ``band_keys`` each loan is priced from the grid row whose bands
+        contain its values (first grid row wins on overlaps), giving one
+        output row per loan. Only the rate columns are attached:
+        ``rate_cols``, or ``recommended_col`` by default; a rate column whose
+        name the loans already use gets a ``_grid`` suffix. Unmatched loans
+        keep missing rates for ``apply_fallback_pricing``. Without
+        ``band_keys`` this is a left merge on ``join_keys`` that attaches
+        every grid column.
+        """
+        pricing_df = load_grid(pricing_file)
 
-            with open(pricing_file, "r") as f:
-                config = yaml.safe_load(f)
-            pricing_df = pd.DataFrame(config.get("pricing_grid", []))
-        else:
-            pricing_df = pd.read_csv(pricing_file)
+        if not band_keys:
+            return loans_df.merge(pricing_df, on=join_keys, how="left")
 
-        # Exact key joins
-        merged = result.merge(pricing_df, on=join_keys, how="left")
+        index = self.band_index(pricing_file, join_keys, band_keys)
+        columns = list(rate_cols) if rate_cols else [recommended_col]
+        return interval_join(loans_df, pricing_df, index, columns=columns)
 
-        # Band-based matching if specified
-        if band_keys:
-            for loan_col, (min_col, max_col) in band_keys.items():
-                if loan_col in merged.columns:
-                    mask = (merged[loan_col] >= merged[min_col]) & (
-                        merged[loan_col] <= merged[max_col]
-                    )
-                    # Apply band-based filtering to ensure proper matching
-                    merged.loc[~mask, rate_cols or [recommended_col]] = np.nan
+    def band_index(
+        self,
+        pricing_file: str,
+        join_keys: List[str],
+        band_keys: Dict[str, Tuple[str, str]],
+    ) -> BandIndex:
+        """Band index over a pricing grid, rebuilt only when the file changes"""
+        path = Path(pricing_file).resolve()
+        version = grid_version(path)
+        key = (
+            path,
+            version,
+            tuple(join_keys),
+            tuple((col, tuple(bounds)) for col, bounds in band_keys.items()),
+        )
+        index = self._band_indexes.get(key)
+        if index is None:
+            index = BandIndex(load_grid(path), join_keys, band_keys)
+            self._band_indexes = {
+                k: v
+                for k, v in self._band_indexes.items()
+                if k[0] != path or k[1] == version
+            }
+            self._band_indexes[key] = index
+        return index
 
-        return merged
+    def configured_band_keys(self) -> Dict[str, Tuple[str, str]]:
+        """Band keys declared in ``pricing_config.yml``"""
+        return load_band_keys(load_pricing_config(self.config_path))
 
     def load_pricing_grid(self, pricing_file: str) -> pd.DataFrame:
-        """Load pricing grid from various file formats"""
-        if pricing_file.endswith(".parquet"):
-            return pd.read_parquet(pricing_file)
-        elif pricing_file.endswith(".yaml"):
-            import yaml
-
-            with open(pricing_file, "r") as f:
-                config = yaml.safe_load(f)
-            return pd.DataFrame(config.get("pricing_grid", []))
-        else:
-            return pd.read_csv(pricing_file)
+        """Load pricing grid from various file formats (cached per file version)"""
+        return load_grid(pricing_file).copy()
 
     def apply_fallback_pricing(
         self, df: pd.DataFrame, fallback_rules: Dict[str, float]
@@ -7,11 +7,12 @@ Main entry point for loan portfolio analysis and processing
 import sys
 import os
 import logging
+import threading
 import pandas as pd
 import json
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 # Add src to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__)))
@@ -24,6 +25,7 @@ try:
     from dpd_analyzer import DPDAnalyzer
     from payment_processor import PaymentProcessor
     from metrics_registry import MetricsRegistry
+    from export_catalog import ExportCatalog, CATALOG_FILENAME
 except ImportError as e:
     logging.warning(f"Some modules not available: {e}")
 
@@ -42,9 +44,16 @@ logger = logging.getLogger(__name__)
 class PortfolioProcessor:
     """Main portfolio processing orchestrator"""
     
-    def __init__(self, config_path: Optional[str] = None):
-        """Initialize the portfolio processor"""
+    def __init__(self, config_path: Optional[str] = None, base_dir: Optional[str] = None):
+        """Initialize the portfolio processor
+        
+        Args:
+            config_path: Configuration directory
+            base_dir: Project root that data and export paths are relative to
+                (defaults to the current directory)
+        """
         self.config_path = config_path or "config"
+        self.base_dir = Path(base_dir) if base_dir else Path(".")
         self.data_loader = None
         self.feature_engineer = None
         self.kpi_calculator = None
@@ -53,6 +62,11 @@ class PortfolioProcessor:
         self.payment_processor = None
         self.metrics_registry = MetricsRegistry()
         
+        # Loaded datasets are kept and reused until their source files change
+        self._datasets: Dict[str, pd.DataFrame] = {}
+        self._dataset_signature: Optional[Tuple] = None
+        self._data_lock = threading.Lock()
+        
         self.setup_directories()
         
     def setup_directories(self):
@@ -65,32 +79,62 @@ class PortfolioProcessor:
         ]
         
         for directory in directories:
-            Path(directory).mkdir(parents=True, exist_ok=True)
-            
-    def load_data(self) -> Dict[str, pd.DataFrame]:
-        """Load all portfolio data"""
-        logger.info("Loading portfolio data...")
-        
-        data_files = {
-            "customer_data": "data/raw/Abaco - Loan Tape_Customer Data_Table",
-            "loan_data": "data/raw/Abaco - Loan Tape_Loan Data_Table", 
-            "payment_history": "data/raw/Abaco - Loan Tape_Historic Real Payment_Table",
-            "payment_schedule": "data/raw/Abaco - Loan Tape_Payment Schedule_Table"
+            (self.base_dir / directory).mkdir(parents=True, exist_ok=True)
+    
+    def data_files(self) -> Dict[str, Path]:
+        """Source file of each portfolio dataset"""
+        raw_dir = self.base_dir / "data/raw"
+        return {
+            "customer_data": raw_dir / "Abaco - Loan Tape_Customer Data_Table",
+            "loan_data": raw_dir / "Abaco - Loan Tape_Loan Data_Table", 
+            "payment_history": raw_dir / "Abaco - Loan Tape_Historic Real Payment_Table",
+            "payment_schedule": raw_dir / "Abaco - Loan Tape_Payment Schedule_Table"
         }
-        
-        datasets = {}
-        for name, filepath in data_files.items():
+    
+    @staticmethod
+    def _file_signature(paths: Dict[str, Path]) -> Tuple:
+        """(name, size, mtime) of every source file; missing files map to None"""
+        signature = []
+        for name, filepath in paths.items():
             try:
-                if os.path.exists(filepath):
-                    logger.info(f"Loading {name} from {filepath}")
-                    datasets[name] = pd.read_excel(filepath)
-                    logger.info(f"Loaded {len(datasets[name])} rows for {name}")
-                else:
-                    logger.warning(f"File not found: {filepath}")
-            except Exception as e:
-                logger.error(f"Error loading {name}: {e}")
-                
-        return datasets
+                stat = filepath.stat()
+                signature.append((name, stat.st_size, stat.st_mtime_ns))
+            except OSError:
+                signature.append((name, None, None))
+        return tuple(signature)
+            
+    def load_data(self, reload: bool = False) -> Dict[str, pd.DataFrame]:
+        """Load all portfolio data
+        
+        Datasets are parsed once and reused by later calls until a source
+        file changes, so a long-lived processor stays warm between runs.
+        
+        Args:
+            reload: Re-read every file even if none changed
+        """
+        data_files = self.data_files()
+        signature = self._file_signature(data_files)
+        
+        with self._data_lock:
+            if not reload and self._datasets and signature == self._dataset_signature:
+                logger.info("Reusing loaded portfolio data")
+                return dict(self._datasets)
+            
+            logger.info("Loading portfolio data...")
+            datasets = {}
+            for name, filepath in data_files.items():
+                try:
+                    if filepath.exists():
+                        logger.info(f"Loading {name} from {filepath}")
+                        datasets[name] = pd.read_excel(filepath)
+                        logger.info(f"Loaded {len(datasets[name])} rows for {name}")
+                    else:
+                        logger.warning(f"File not found: {filepath}")
+                except Exception as e:
+                    logger.error(f"Error loading {name}: {e}")
+            
+            self._datasets, self._dataset_signature = datasets, signature
+            return dict(datasets)
     
     def process_portfolio(self) -> Dict:
         """Main portfolio processing pipeline"""
@@ -149,7 +193,7 @@ class PortfolioProcessor:
         """Export processing results"""
         
         # Export to JSON
-        output_file = f"abaco_runtime/exports/analytics/portfolio_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        output_file = self.base_dir / f"abaco_runtime/exports/analytics/portfolio_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         
         try:
             with open(output_file, 'w') as f:
@@ -157,6 +201,14 @@ class PortfolioProcessor:
             logger.info(f"Results exported to {output_file}")
         except Exception as e:
             logger.error(f"Error exporting results: {e}")
+            return
+        
+        # Index the run so the API can list and serve it without scanning exports
+        try:
+            catalog_path = output_file.parent / CATALOG_FILENAME
+            ExportCatalog(catalog_path).record(output_file, results)
+        except Exception as e:
+            logger.error(f"Error cataloguing {output_file}: {e}")
 
 def main():
     """Main execution function"""
@@ -0,0 +1,176 @@
+"""
+Hash indexes over Loan ID and Customer ID for Abaco point lookups
+Indexes are built once per data version through the dataset cache, so a loan
+or customer with all its related rows is fetched without scanning any table
+"""
+
+import json
+import logging
+import time
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.dataset_cache import DatasetCache
+from src.record_query import to_json_bytes
+
+logger = logging.getLogger(__name__)
+
+LOAN_ID = "Loan ID"
+CUSTOMER_ID = "Customer ID"
+
+# Response section -> cached table
+LOAN_SECTIONS = {
+    "loans": "loan_data",
+    "payments": "payment_history",
+    "schedule": "payment_schedule",
+    "collateral": "collateral",
+}
+
+
+@dataclass
+class KeyIndex:
+    """
+    A table clustered by one key column, with the row span of every key.
+
+    Rows are stably sorted by key, so each key's rows are contiguous and a
+    lookup is a slice (a view) rather than a gather across every column.
+    """
+
+    frame: pd.DataFrame
+    spans: Dict[Any, slice]
+
+    def rows(self, key: Any) -> pd.DataFrame:
+        """Rows holding ``key``, in file order; empty if unknown"""
+        return self.frame.iloc[self.spans.get(key, slice(0, 0))]
+
+    def rows_many(self, keys: List[Any]) -> pd.DataFrame:
+        """Rows holding any of ``keys``"""
+        spans = [self.spans[key] for key in keys if key in self.spans]
+        if len(spans) <= 1:
+            return self.frame.iloc[spans[0] if spans else slice(0, 0)]
+        positions = np.concatenate([np.arange(s.start, s.stop) for s in spans])
+        return self.frame.iloc[np.sort(positions)]
+
+
+def build_key_index(df: pd.DataFrame, column: str) -> KeyIndex:
+    """
+    Cluster ``df`` by ``column`` and record where each key's rows start and end.
+
+    Rows with a missing key are not indexed. Rows sharing a key keep file order.
+    """
+    if column not in df.columns or df.empty:
+        return KeyIndex(frame=df.iloc[0:0], spans={})
+    codes, uniques = pd.factorize(df[column])
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    # Missing keys are coded -1 and sort first
+    first = int(np.searchsorted(sorted_codes, 0))
+    frame = df.take(order[first:])
+    sorted_codes = sorted_codes[first:]
+    starts = np.searchsorted(sorted_codes, np.arange(len(uniques)))
+    stops = np.append(starts[1:], len(sorted_codes))
+    spans = {
+        key: slice(int(start), int(stop))
+        for key, start, stop in zip(uniques.tolist(), starts, stops)
+    }
+    return KeyIndex(frame=frame, spans=spans)
+
+
+class AbacoRecordIndex:
+    """
+    Point lookups of loans and customers across every Abaco table.
+
+    Each table gets a ``Loan ID`` index (and Loan Data a ``Customer ID``
+    index), stored as a derived artifact of the dataset cache, so indexes are
+    rebuilt only when their table's file changes.
+    """
+
+    def __init__(self, dataset_cache: DatasetCache):
+        self.dataset_cache = dataset_cache
+
+    def _index(self, table: str, column: str) -> KeyIndex:
+        """Index of ``table`` over ``column`` for the current data version"""
+        return self.dataset_cache.derived(
+            table, f"index:{column}", partial(build_key_index, column=column)
+        )
+
+    def warm(self) -> Dict[str, float]:
+        """Build every index ahead of the first lookup; returns build seconds"""
+        timings = {}
+        for table in LOAN_SECTIONS.values():
+            started = time.perf_counter()
+            self._index(table, LOAN_ID)
+            timings[table] = round(time.perf_counter() - started, 4)
+        self._index("loan_data", CUSTOMER_ID)
+        logger.info(f"Abaco record indexes ready: {timings}")
+        return timings
+
+    def loan(self, loan_id: str) -> Optional[Dict[str, pd.DataFrame]]:
+        """
+        Everything recorded for one loan.
+
+        Returns:
+            Mapping of section (loans, payments, schedule, collateral) to rows,
+            or None if no table mentions the loan
+        """
+        sections = {
+            section: self._index(table, LOAN_ID).rows(loan_id)
+            for section, table in LOAN_SECTIONS.items()
+        }
+        if all(frame.empty for frame in sections.values()):
+            return None
+        return sections
+
+    def customer(self, customer_id: str) -> Optional[Dict[str, pd.DataFrame]]:
+        """
+        Every loan of a customer with its payments, schedule and collateral.
+
+        Returns:
+            Mapping of section to rows, or None if the customer has no loans
+        """
+        loans = self._index("loan_data", CUSTOMER_ID).rows(customer_id)
+        if loans.empty:
+            return None
+        loan_ids = list(dict.fromkeys(loans[LOAN_ID].dropna().tolist()))
+
+        sections = {"loans": loans}
+        for section, table in LOAN_SECTIONS.items():
+            if section != "loans":
+                sections[section] = self._index(table, LOAN_ID).rows_many(loan_ids)
+        return sections
+
+
+def _json_member(key: str, encoded: bytes) -> bytes:
+    return json.dumps(key).encode() + b":" + encoded
+
+
+def sections_to_json(
+    header: Dict[str, Any], sections: Dict[str, pd.DataFrame]
+) -> bytes:
+    """
+    Encode lookup results as one JSON object without materializing row dicts.
+
+    Args:
+        header: Scalar fields placed first, e.g. the looked-up ID
+        sections: Row sections, each encoded as a JSON array with a count
+    """
+    parts = [
+        _json_member(key, json.dumps(value).encode()) for key, value in header.items()
+    ]
+    for section, frame in sections.items():
+        parts.append(_json_member(section, to_json_bytes(frame)))
+        parts.append(_json_member(f"{section}_count", str(len(frame)).encode()))
+    return b"{" + b",".join(parts) + b"}"
+
+
+__all__ = [
+    "AbacoRecordIndex",
+    "KeyIndex",
+    "build_key_index",
+    "sections_to_json",
+    "LOAN_SECTIONS",
+]
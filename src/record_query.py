@@ -0,0 +1,377 @@
+"""
+Filtering, projection, pagination and incremental encoding of Abaco records
+Used by the /abaco/* record endpoints so responses stay bounded in memory;
+binary Arrow IPC and Parquet encodings need pyarrow
+"""
+
+import base64
+import binascii
+import json
+import logging
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+
+    _ARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    _ARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+COMPANY = "Company"
+LOAN_STATUS = "Loan Status"
+
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 10_000
+STREAM_CHUNK_ROWS = 5_000
+
+# Column used by the date range filter of each record table
+DATE_FILTER_COLUMNS = {
+    "loan_data": "Disbursement Date",
+    "payment_history": "True Payment Date",
+    "payment_schedule": "Payment Date",
+}
+
+# Response format -> media type
+MEDIA_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+# Other media types clients commonly send for the same formats
+MEDIA_TYPE_ALIASES = {
+    "application/x-parquet": "parquet",
+    "application/octet-stream+parquet": "parquet",
+}
+BINARY_FORMATS = frozenset({"arrow", "parquet"})
+
+
+class RecordQueryError(ValueError):
+    """Invalid record query parameters"""
+
+
+class StaleCursorError(RecordQueryError):
+    """Cursor was issued for a different version of the data"""
+
+
+@dataclass
+class RecordQuery:
+    """Filters, projection and page position requested by a client"""
+
+    limit: Optional[int] = None
+    cursor: Optional[str] = None
+    fields: Optional[List[str]] = None
+    company: Optional[str] = None
+    loan_status: Optional[str] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+
+
+@dataclass
+class RecordPage:
+    """One page of records plus what the client needs to fetch the next"""
+
+    frame: pd.DataFrame
+    offset: int
+    total: int
+    next_cursor: Optional[str]
+    # Positions of the page rows in the source table: a slice when unfiltered
+    rows: Union[slice, np.ndarray]
+    fields: Optional[List[str]] = None
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Split a comma-separated ``fields=`` parameter"""
+    if not fields:
+        return None
+    return [name.strip() for name in fields.split(",") if name.strip()]
+
+
+def resolve_format(requested: Optional[str], accept: Optional[str] = None) -> str:
+    """
+    Pick the response format from an explicit ``format=`` or the Accept header.
+
+    Args:
+        requested: Value of the ``format`` query parameter, if any
+        accept: Value of the Accept header, if any
+
+    Returns:
+        A key of ``MEDIA_TYPES``; JSON when nothing better matches
+
+    Raises:
+        RecordQueryError: If ``requested`` is not a supported format, or is a
+            binary format and pyarrow is not installed
+    """
+    if requested:
+        if requested not in MEDIA_TYPES:
+            raise RecordQueryError(
+                f"Unsupported format '{requested}'; "
+                f"expected one of {sorted(MEDIA_TYPES)}"
+            )
+        chosen = requested
+    else:
+        chosen = "json"
+        by_media_type = {media: name for name, media in MEDIA_TYPES.items()}
+        by_media_type.update(MEDIA_TYPE_ALIASES)
+        for media_range in (accept or "").split(","):
+            media_type = media_range.split(";")[0].strip().lower()
+            if media_type in by_media_type:
+                chosen = by_media_type[media_type]
+                break
+
+    if chosen in BINARY_FORMATS and not _ARROW_AVAILABLE:
+        raise RecordQueryError(
+            f"Format '{chosen}' requires pyarrow, which is not installed"
+        )
+    return chosen
+
+
+def encode_cursor(offset: int, version: Optional[Sequence[int]]) -> str:
+    """Opaque cursor pinning a row offset to a data version"""
+    payload = json.dumps({"o": offset, "v": list(version) if version else None})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], version: Optional[Sequence[int]]) -> int:
+    """
+    Return the row offset a cursor points at.
+
+    Raises:
+        RecordQueryError: If the cursor is malformed
+        StaleCursorError: If the data changed since the cursor was issued
+    """
+    if not cursor:
+        return 0
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        offset = int(payload["o"])
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise RecordQueryError(f"Invalid cursor: {cursor}") from e
+
+    current = list(version) if version else None
+    if payload.get("v") != current:
+        raise StaleCursorError(
+            "Data changed since the cursor was issued; restart pagination"
+        )
+    return max(offset, 0)
+
+
+def filter_mask(
+    df: pd.DataFrame, query: RecordQuery, date_column: Optional[str] = None
+) -> Optional[np.ndarray]:
+    """
+    Boolean row mask for the Company, Loan Status and date range filters.
+
+    Returns:
+        Mask over the rows of ``df``, or None when the query has no filters
+
+    Raises:
+        RecordQueryError: If a filter targets a column the table does not have
+    """
+    if not (query.company or query.loan_status or query.date_from or query.date_to):
+        return None
+    mask = pd.Series(True, index=df.index)
+
+    for column, value in ((COMPANY, query.company), (LOAN_STATUS, query.loan_status)):
+        if value is None:
+            continue
+        if column not in df.columns:
+            raise RecordQueryError(f"Column '{column}' is not available for filtering")
+        mask &= (df[column] == value).fillna(False).astype(bool)
+
+    if query.date_from or query.date_to:
+        if not date_column or date_column not in df.columns:
+            raise RecordQueryError(
+                "Date range filtering is not available for this table"
+            )
+        dates = pd.to_datetime(df[date_column], errors="coerce")
+        if query.date_from:
+            mask &= dates >= pd.Timestamp(query.date_from)
+        if query.date_to:
+            mask &= dates < pd.Timestamp(query.date_to + timedelta(days=1))
+
+    return mask.to_numpy(dtype=bool)
+
+
+def filter_records(
+    df: pd.DataFrame, query: RecordQuery, date_column: Optional[str] = None
+) -> pd.DataFrame:
+    """Apply the Company, Loan Status and date range filters of a query"""
+    mask = filter_mask(df, query, date_column)
+    return df if mask is None else df[mask]
+
+
+def project(df: pd.DataFrame, fields: Optional[List[str]]) -> pd.DataFrame:
+    """
+    Keep only the requested columns, in the requested order.
+
+    Raises:
+        RecordQueryError: If a requested column does not exist
+    """
+    if not fields:
+        return df
+    unknown = [name for name in fields if name not in df.columns]
+    if unknown:
+        raise RecordQueryError(f"Unknown fields: {', '.join(unknown)}")
+    return df[fields]
+
+
+def paginate(
+    df: pd.DataFrame,
+    query: RecordQuery,
+    version: Optional[Sequence[int]] = None,
+    date_column: Optional[str] = None,
+) -> RecordPage:
+    """
+    Filter, slice and project a table for one response.
+
+    Args:
+        df: Full table
+        query: Client query; ``limit=None`` means every remaining row
+        version: Data version the cursor is pinned to
+        date_column: Column used by the date range filter
+
+    Returns:
+        RecordPage with the projected rows and the cursor of the next page
+    """
+    offset = decode_cursor(query.cursor, version)
+    mask = filter_mask(df, query, date_column)
+    positions = None if mask is None else np.flatnonzero(mask)
+    total = len(df) if positions is None else len(positions)
+
+    end = total if query.limit is None else min(offset + query.limit, total)
+    rows = slice(offset, end) if positions is None else positions[offset:end]
+    page = project(df.iloc[rows], query.fields)
+    next_cursor = encode_cursor(end, version) if end < total else None
+    return RecordPage(page, offset, total, next_cursor, rows, query.fields)
+
+
+def to_json_bytes(df: pd.DataFrame) -> bytes:
+    """Encode rows as a JSON array; NaN/NaT become null and dates ISO-8601"""
+    if df.empty:
+        return b"[]"
+    return df.to_json(orient="records", date_format="iso").encode("utf-8")
+
+
+def iter_ndjson(
+    df: pd.DataFrame, chunk_rows: int = STREAM_CHUNK_ROWS
+) -> Iterator[bytes]:
+    """Yield rows as newline-delimited JSON, encoding ``chunk_rows`` at a time"""
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start : start + chunk_rows]
+        yield chunk.to_json(orient="records", lines=True, date_format="iso").rstrip(
+            "\n"
+        ).encode("utf-8") + b"\n"
+
+
+def to_arrow_table(df: pd.DataFrame) -> "pa.Table":
+    """Convert a table to Arrow once, keeping categoricals, nullable ints and dates"""
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def arrow_page(table: "pa.Table", page: RecordPage) -> "pa.Table":
+    """
+    Select a page from the Arrow form of its source table.
+
+    Unfiltered pages are zero-copy slices; filtered pages gather their rows.
+    """
+    if isinstance(page.rows, slice):
+        start, stop = page.rows.start or 0, page.rows.stop
+        selected = table.slice(start, max(stop - start, 0))
+    else:
+        selected = table.take(pa.array(page.rows, type=pa.int64()))
+    return selected.select(page.fields) if page.fields else selected
+
+
+class _ChunkSink:
+    """Write-only file object whose buffered bytes are drained after each batch"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def iter_arrow_ipc(
+    table: "pa.Table", chunk_rows: int = STREAM_CHUNK_ROWS
+) -> Iterator[bytes]:
+    """Yield an Arrow IPC stream one record batch at a time"""
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        yield sink.drain()
+        for batch in table.to_batches(max_chunksize=chunk_rows):
+            writer.write_batch(batch)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def iter_parquet(
+    table: "pa.Table", chunk_rows: int = STREAM_CHUNK_ROWS
+) -> Iterator[bytes]:
+    """Yield a Parquet file one row group at a time; the footer comes last"""
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, table.schema) as writer:
+        for start in range(0, max(table.num_rows, 1), chunk_rows):
+            row_group = table.slice(start, chunk_rows)
+            writer.write_table(row_group, row_group_size=chunk_rows)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def page_headers(page: RecordPage) -> List[Tuple[str, str]]:
+    """Pagination headers sent with every record response"""
+    headers = [("X-Total-Count", str(page.total)), ("X-Page-Offset", str(page.offset))]
+    if page.next_cursor:
+        headers.append(("X-Next-Cursor", page.next_cursor))
+    return headers
+
+
+__all__ = [
+    "RecordQuery",
+    "RecordPage",
+    "RecordQueryError",
+    "StaleCursorError",
+    "DEFAULT_PAGE_SIZE",
+    "MAX_PAGE_SIZE",
+    "DATE_FILTER_COLUMNS",
+    "MEDIA_TYPES",
+    "BINARY_FORMATS",
+    "parse_fields",
+    "resolve_format",
+    "encode_cursor",
+    "decode_cursor",
+    "filter_records",
+    "project",
+    "paginate",
+    "to_json_bytes",
+    "iter_ndjson",
+    "to_arrow_table",
+    "arrow_page",
+    "iter_arrow_ipc",
+    "iter_parquet",
+    "page_headers",
+]
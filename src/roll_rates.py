@@ -0,0 +1,376 @@
+"""
+DPD roll-rate transition engine
+Rebuilds every loan's month-end DPD bucket from the Payment Schedule and
+Historic Real Payment tables, counts bucket-to-bucket transitions for each
+month pair with one bincount, and projects them with matrix powers
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from src.date_codes import day_numbers, month_ends
+    from src.dpd_policy import DPDBucketEngine, default_dpd_engine
+    from src.payment_reconciliation import PaymentReconciler
+except ImportError:
+    from date_codes import day_numbers, month_ends
+    from dpd_policy import DPDBucketEngine, default_dpd_engine
+    from payment_reconciliation import PaymentReconciler
+
+logger = logging.getLogger(__name__)
+
+LOAN_ID = "Loan ID"
+DISBURSEMENT_DATE = "Disbursement Date"
+
+CLOSED = "closed"
+OFF_BOOK = -1
+
+
+# Day number of missing dates: later than every real day
+MISSING_DAY = np.iinfo(np.int64).max
+
+
+@dataclass
+class MonthEndPositions:
+    """
+    Every loan's delinquency and principal at every month-end.
+
+    Arrays have shape (month ends, loans). ``dpd`` is the age in days of the
+    oldest installment still open (0 when nothing is overdue), ``closed``
+    marks loans with every installment settled and ``on_book`` loans
+    disbursed by the month-end.
+    """
+
+    month_ends: pd.DatetimeIndex
+    loan_ids: pd.Index
+    dpd: np.ndarray
+    closed: np.ndarray
+    on_book: np.ndarray
+    balance: np.ndarray
+
+
+@dataclass
+class TransitionMatrices:
+    """
+    Month-over-month DPD bucket transitions.
+
+    ``counts`` and ``balances`` have shape (month pairs, states, states):
+    entry ``[p, i, j]`` is the number (or opening outstanding principal) of
+    loans in state ``i`` at ``month_ends[p]`` and state ``j`` one month later.
+    The last state is ``closed`` (fully repaid), which is absorbing.
+    """
+
+    states: Tuple[str, ...]
+    month_ends: pd.DatetimeIndex
+    counts: np.ndarray
+    balances: np.ndarray
+
+    def _weights(self, weighted: bool) -> np.ndarray:
+        return self.balances if weighted else self.counts
+
+    def _normalize(self, totals: np.ndarray) -> np.ndarray:
+        """Row-normalize; states never observed, and closed, stay put"""
+        rows = totals.sum(axis=-1, keepdims=True)
+        rates = np.divide(totals, rows, out=np.zeros_like(totals), where=rows > 0)
+        rates[..., -1, :] = 0.0
+        rates[..., -1, -1] = 1.0
+        unobserved = np.broadcast_to(rows == 0, rates.shape) & np.eye(
+            len(self.states), dtype=bool
+        )
+        rates[unobserved] = 1.0
+        return rates
+
+    def matrix(self, weighted: bool = False) -> pd.DataFrame:
+        """Transition rates pooled over every month pair"""
+        pooled = self._weights(weighted).sum(axis=0).astype("float64")
+        return pd.DataFrame(
+            self._normalize(pooled), index=list(self.states), columns=self.states
+        )
+
+    def monthly(self, weighted: bool = False) -> Dict[pd.Timestamp, pd.DataFrame]:
+        """Transition rates of each month pair, keyed by the opening month-end"""
+        rates = self._normalize(self._weights(weighted).astype("float64"))
+        return {
+            month: pd.DataFrame(rates[p], index=list(self.states), columns=self.states)
+            for p, month in enumerate(self.month_ends[:-1])
+        }
+
+    def roll_rates(self, weighted: bool = False) -> pd.Series:
+        """Share of each delinquency bucket rolling one bucket worse"""
+        rates = self.matrix(weighted).to_numpy()
+        n_buckets = len(self.states) - 1
+        rolls = [rates[i, i + 1] for i in range(n_buckets - 1)]
+        return pd.Series(
+            rolls,
+            index=[f"{a}->{b}" for a, b in zip(self.states[:-2], self.states[1:-1])],
+            name="roll_rate",
+        )
+
+    def project(self, months: int, weighted: bool = False) -> pd.DataFrame:
+        """
+        Multi-month transition rates as a power of the pooled matrix.
+
+        Args:
+            months: Number of monthly steps
+            weighted: Use balance-weighted instead of count-based rates
+        """
+        rates = np.linalg.matrix_power(self.matrix(weighted).to_numpy(), months)
+        return pd.DataFrame(rates, index=list(self.states), columns=self.states)
+
+    def project_distribution(
+        self, initial: pd.Series, months: int, weighted: bool = False
+    ) -> pd.Series:
+        """
+        Roll a distribution over states (counts or balances) forward.
+
+        Args:
+            initial: Amount per state; missing states count as zero
+            months: Number of monthly steps
+            weighted: Use balance-weighted instead of count-based rates
+        """
+        start = initial.reindex(list(self.states)).fillna(0.0).to_numpy(float)
+        projected = start @ self.project(months, weighted).to_numpy()
+        return pd.Series(projected, index=list(self.states))
+
+
+class RollRateEngine:
+    """
+    Reconstruct month-end DPD buckets and their transitions.
+
+    Installments are settled oldest first by ``PaymentReconciler``, so each
+    loan's settlement dates rise with its due dates. At a month-end, a
+    loan's DPD is the age of its oldest installment not yet settled by that
+    day, found for every loan and month with one ``searchsorted``; loans with
+    every installment settled are ``closed``, and loans not yet disbursed
+    are off book for that month. Outstanding principal at a month-end is
+    scheduled principal less principal paid by then.
+    """
+
+    def __init__(
+        self,
+        dpd_engine: Optional[DPDBucketEngine] = None,
+        reconciler: Optional[PaymentReconciler] = None,
+    ):
+        self.dpd_engine = dpd_engine or default_dpd_engine()
+        self.reconciler = reconciler or PaymentReconciler()
+
+    @property
+    def states(self) -> Tuple[str, ...]:
+        """DPD bucket names in policy order, then ``closed``"""
+        return tuple(self.dpd_engine.policy.names) + (CLOSED,)
+
+    def month_end_positions(
+        self,
+        loan_data: pd.DataFrame,
+        schedule: pd.DataFrame,
+        payments: pd.DataFrame,
+        start: Optional[Any] = None,
+        end: Optional[Any] = None,
+    ) -> MonthEndPositions:
+        """
+        DPD and outstanding principal of every loan at every month-end.
+
+        Args:
+            loan_data: Loans with Disbursement Date (earliest per Loan ID wins)
+            schedule: Payment Schedule table
+            payments: Historic Real Payment table
+            start: First month (defaults to the first disbursement)
+            end: Last month (defaults to the last payment)
+        """
+        reconciliation = self.reconciler.reconcile(schedule, payments)
+        installments = reconciliation.installments
+        paid = reconciliation.payments
+
+        disbursed = (
+            pd.to_datetime(loan_data[DISBURSEMENT_DATE], errors="coerce")
+            .groupby(loan_data[LOAN_ID])
+            .min()
+            .dropna()
+        )
+        loan_ids = disbursed.index.intersection(
+            pd.Index(installments[self.reconciler.loan_column].unique())
+        ).sort_values()
+
+        start = pd.Timestamp(start) if start is not None else disbursed.min()
+        if end is not None:
+            end = pd.Timestamp(end)
+        else:
+            end = pd.to_datetime(paid[self.reconciler.payment_date_column]).max()
+        if pd.isna(start) or pd.isna(end) or not len(loan_ids):
+            empty = np.zeros((0, len(loan_ids)))
+            return MonthEndPositions(
+                month_ends=pd.DatetimeIndex([], name="month_end"),
+                loan_ids=loan_ids,
+                dpd=empty.astype(np.int64),
+                closed=empty.astype(bool),
+                on_book=empty.astype(bool),
+                balance=empty,
+            )
+        ends = month_ends(start, end)
+        end_days = ends.astype(np.int64)
+
+        # Installments and payments keyed by (loan, day) in one int64 range
+        inst_codes = loan_ids.get_indexer(installments[self.reconciler.loan_column])
+        kept = inst_codes >= 0
+        inst_codes = inst_codes[kept]
+        due_days = day_numbers(
+            installments[self.reconciler.due_date_column], MISSING_DAY
+        )[kept]
+        settled_days = day_numbers(installments["settled_date"], MISSING_DAY)[kept]
+        scheduled = np.bincount(
+            inst_codes,
+            installments["scheduled_principal"].to_numpy(float)[kept],
+            len(loan_ids),
+        )
+        # Installments with nothing due are settled from the start
+        nothing_due = (
+            installments["installment_status"].to_numpy()[kept] == "paid"
+        ) & (settled_days == np.iinfo(np.int64).max)
+        settled_days[nothing_due] = np.iinfo(np.int64).min
+
+        # Day offsets past the last month-end share the top slot of each range
+        first_day = int(end_days.min()) - 1
+        span = int(end_days.max()) - first_day + 2
+        last_slot = first_day + span - 1
+        settled_slot = np.clip(settled_days, first_day, last_slot) - first_day
+        inst_keys = inst_codes * span + settled_slot
+        # Settlement dates rise with due dates, so this keeps due-date order
+        order = np.argsort(inst_keys, kind="stable")
+        inst_keys, inst_codes, due_days = (
+            inst_keys[order],
+            inst_codes[order],
+            due_days[order],
+        )
+
+        pay_codes = loan_ids.get_indexer(paid[self.reconciler.loan_column])
+        placed = pay_codes >= 0
+        pay_codes = pay_codes[placed]
+        pay_days = day_numbers(paid[self.reconciler.payment_date_column], MISSING_DAY)[
+            placed
+        ]
+        pay_keys = (
+            pay_codes * span + np.clip(pay_days, first_day, last_slot) - first_day
+        )
+        order = np.argsort(pay_keys, kind="stable")
+        pay_keys = pay_keys[order]
+        principal = paid["paid_principal"].to_numpy(float)[placed][order]
+        running = np.r_[0.0, np.cumsum(principal)]
+        loan_start = np.searchsorted(pay_keys, np.arange(len(loan_ids)) * span)
+
+        codes = np.arange(len(loan_ids))
+        query = codes[None, :] * span + (end_days - first_day)[:, None]
+
+        # Oldest installment still open at each month-end
+        oldest = np.searchsorted(inst_keys, query, side="right")
+        open_ = oldest < len(inst_keys)
+        open_[open_] = (
+            inst_codes[oldest[open_]] == np.broadcast_to(codes, open_.shape)[open_]
+        )
+        oldest_due = due_days[np.minimum(oldest, len(due_days) - 1)]
+        dpd = np.where(open_, np.maximum(end_days[:, None] - oldest_due, 0), 0)
+
+        disbursed_days = disbursed.reindex(loan_ids).to_numpy(dtype="datetime64[ns]")
+        disbursed_days = disbursed_days.astype("datetime64[D]").astype(np.int64)
+        on_book = disbursed_days[None, :] <= end_days[:, None]
+
+        paid_by = running[np.searchsorted(pay_keys, query, side="right")]
+        paid_by -= running[loan_start][None, :]
+        balance = np.clip(scheduled[None, :] - paid_by, 0.0, None)
+        return MonthEndPositions(
+            month_ends=pd.DatetimeIndex(ends, name="month_end"),
+            loan_ids=loan_ids,
+            dpd=dpd,
+            closed=~open_,
+            on_book=on_book,
+            balance=np.where(on_book, balance, 0.0),
+        )
+
+    def month_end_states(
+        self,
+        loan_data: pd.DataFrame,
+        schedule: pd.DataFrame,
+        payments: pd.DataFrame,
+        start: Optional[Any] = None,
+        end: Optional[Any] = None,
+    ) -> Tuple[pd.DatetimeIndex, pd.Index, np.ndarray, np.ndarray]:
+        """
+        State code and outstanding principal of every loan at every month-end.
+
+        Args:
+            loan_data: Loans with Disbursement Date (earliest per Loan ID wins)
+            schedule: Payment Schedule table
+            payments: Historic Real Payment table
+            start: First month (defaults to the first disbursement)
+            end: Last month (defaults to the last payment)
+
+        Returns:
+            (month ends, loan IDs, state codes, balances); the arrays have
+            shape (months, loans) and off-book loans have code ``OFF_BOOK``
+        """
+        positions = self.month_end_positions(loan_data, schedule, payments, start, end)
+        dpd = positions.dpd
+        state = self.dpd_engine.codes(dpd.ravel()).reshape(dpd.shape)
+        state = np.where(positions.closed, len(self.states) - 1, state)
+        state = np.where(positions.on_book, state, OFF_BOOK)
+        return positions.month_ends, positions.loan_ids, state, positions.balance
+
+    def transitions(
+        self,
+        loan_data: pd.DataFrame,
+        schedule: pd.DataFrame,
+        payments: pd.DataFrame,
+        start: Optional[Any] = None,
+        end: Optional[Any] = None,
+    ) -> TransitionMatrices:
+        """
+        Count and balance-weighted transition matrices for every month pair.
+
+        Args:
+            loan_data: Loans with Disbursement Date
+            schedule: Payment Schedule table
+            payments: Historic Real Payment table
+            start: First month (defaults to the first disbursement)
+            end: Last month (defaults to the last payment)
+        """
+        ends, _, state, balance = self.month_end_states(
+            loan_data, schedule, payments, start, end
+        )
+        n_states = len(self.states)
+        n_pairs = max(len(ends) - 1, 0)
+        shape = (n_pairs, n_states, n_states)
+        if not n_pairs:
+            return TransitionMatrices(
+                self.states, ends, np.zeros(shape, np.int64), np.zeros(shape)
+            )
+
+        before, after = state[:-1], state[1:]
+        observed = (before >= 0) & (after >= 0)
+        pair = np.broadcast_to(np.arange(n_pairs)[:, None], before.shape)
+        cell = (pair * n_states + before) * n_states + after
+        counts = np.bincount(cell[observed], minlength=np.prod(shape))
+        balances = np.bincount(
+            cell[observed], weights=balance[:-1][observed], minlength=np.prod(shape)
+        )
+        logger.info(
+            f"Built DPD transitions over {n_pairs} month pairs "
+            f"for {state.shape[1]} loans"
+        )
+        return TransitionMatrices(
+            states=self.states,
+            month_ends=ends,
+            counts=counts.reshape(shape),
+            balances=balances.reshape(shape),
+        )
+
+
+__all__ = [
+    "CLOSED",
+    "OFF_BOOK",
+    "MonthEndPositions",
+    "RollRateEngine",
+    "TransitionMatrices",
+]
@@ -51,20 +51,46 @@ import os
 import sys
 import logging
 import json
+import threading
 from pathlib import Path
+from datetime import date
 from typing import Dict, Any, List, Optional
 
-# Add src to Python path for imports
-sys.path.insert(0, str(Path(__file__).parent / "src"))
+# Add the project root to Python path so the ``src`` package imports resolve
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 try:
-    from fastapi import FastAPI, HTTPException, Request
+    from fastapi import Depends, FastAPI, HTTPException, Query, Request
     from fastapi.middleware.cors import CORSMiddleware
-    from fastapi.responses import JSONResponse
+    from fastapi.concurrency import run_in_threadpool
+    from fastapi.responses import JSONResponse, Response, StreamingResponse
     import uvicorn
 
     # Import Abaco-specific modules
-    from data_loader import DataLoader, validate_abaco_schema
+    from src.data_loader import DataLoader
+    from src.dataset_cache import DatasetCache
+    from src.metrics_snapshot import PortfolioMetricsSnapshot
+    from src.record_index import AbacoRecordIndex, sections_to_json
+    from src.record_query import (
+        BINARY_FORMATS,
+        DATE_FILTER_COLUMNS,
+        DEFAULT_PAGE_SIZE,
+        MAX_PAGE_SIZE,
+        MEDIA_TYPES,
+        RecordQuery,
+        RecordQueryError,
+        StaleCursorError,
+        arrow_page,
+        iter_arrow_ipc,
+        iter_ndjson,
+        iter_parquet,
+        page_headers,
+        paginate,
+        parse_fields,
+        resolve_format,
+        to_arrow_table,
+        to_json_bytes,
+    )
 
 except ImportError as e:
     print(f"❌ Import error: {e}")
@@ -103,9 +129,11 @@ try:
     data_dir_legacy = Path("data")
     if data_dir_raw.exists() and data_dir_raw.is_dir():
         data_loader = DataLoader(data_dir=str(data_dir_raw))
+        dataset_cache = DatasetCache(data_dir_raw)
         logger.info("✅ Abaco data loader initialized successfully (data/raw)")
     elif data_dir_legacy.exists() and data_dir_legacy.is_dir():
         data_loader = DataLoader(data_dir=str(data_dir_legacy))
+        dataset_cache = DatasetCache(data_dir_legacy)
         logger.info("✅ Abaco data loader initialized successfully (data)")
     else:
         logger.error(
@@ -117,6 +145,10 @@ try:
 except Exception as e:
     logger.error(f"❌ Failed to initialize Abaco data loader: {e}")
     data_loader = None
+    dataset_cache = None
+
+metrics_snapshot = PortfolioMetricsSnapshot(dataset_cache) if dataset_cache else None
+record_index = AbacoRecordIndex(dataset_cache) if dataset_cache else None
 
 # Constants
 ABACO_RECORDS_EXPECTED = 48853
@@ -204,6 +236,7 @@ async def health_check() -> Dict[str, Any]:
             },
             "components": {
                 "data_loader": data_status,
+                "dataset_cache": dataset_cache.stats() if dataset_cache else None,
                 "schema_validation": "valid" if schema_data else "invalid",
                 "spanish_processing": "enabled",
                 "usd_factoring": "enabled",
@@ -296,100 +329,133 @@ async def get_abaco_schema() -> Dict[str, Any]:
         )
 
 
-# Abaco loan data endpoint
-@app.get("/abaco/loan-data")
-async def get_abaco_loan_data() -> List[Dict[str, Any]]:
+def record_query_params(
+    limit: Optional[int] = Query(None, ge=1, description="Rows per page"),
+    cursor: Optional[str] = Query(None, description="Cursor from X-Next-Cursor"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns"),
+    company: Optional[str] = Query(None, description="Filter on Company"),
+    loan_status: Optional[str] = Query(None, description="Filter on Loan Status"),
+    date_from: Optional[date] = Query(None, description="Earliest date (inclusive)"),
+    date_to: Optional[date] = Query(None, description="Latest date (inclusive)"),
+) -> RecordQuery:
+    """Collect the shared record query parameters"""
+    return RecordQuery(
+        limit=limit,
+        cursor=cursor,
+        fields=parse_fields(fields),
+        company=company,
+        loan_status=loan_status,
+        date_from=date_from,
+        date_to=date_to,
+    )
+
+
+def serve_records(
+    table: str, query: RecordQuery, request: Request, response_format: Optional[str]
+) -> Response:
     """
-    Get Abaco loan data (16,205 records)
-    Returns your actual loan portfolio with Spanish client support
+    Serve one page of a cached Abaco table.
+
+    JSON responses are paginated (``DEFAULT_PAGE_SIZE`` rows unless ``limit``
+    says otherwise). NDJSON, Arrow IPC and Parquet responses stream every
+    matching row from the cursor on, or ``limit`` rows, encoding a chunk at a
+    time; the binary formats are cut from the table's cached Arrow form, so
+    column types survive. Pagination state is returned in the
+    ``X-Total-Count`` and ``X-Next-Cursor`` headers.
     """
-    try:
-        if not data_loader:
-            raise HTTPException(
-                status_code=503, detail="Abaco data loader not available"
-            )
+    if not dataset_cache:
+        raise HTTPException(status_code=503, detail="Abaco data loader not available")
 
-        # Load Abaco loan data
-        abaco_data = data_loader.load_abaco_data()
+    try:
+        media = resolve_format(response_format, request.headers.get("accept"))
+        if media == "json":
+            if query.limit is None:
+                query.limit = DEFAULT_PAGE_SIZE
+            elif query.limit > MAX_PAGE_SIZE:
+                raise RecordQueryError(
+                    f"limit may not exceed {MAX_PAGE_SIZE} for JSON; use format=ndjson"
+                )
 
-        if abaco_data and "loan_data" in abaco_data:
-            loan_df = abaco_data["loan_data"]
-            records = loan_df.to_dict("records")
-            logger.info(f"✅ Loaded {len(records)} Abaco loan records")
-            return records
+        # Cached until the file changes; binary formats also need the Arrow
+        # form of exactly this version of the table
+        if media in BINARY_FORMATS:
+            df, cached = dataset_cache.derived_with_frame(
+                table, "arrow", to_arrow_table
+            )
         else:
-            logger.warning("No Abaco loan data available")
-            return []
-
-    except Exception as e:
-        logger.error(f"Failed to load Abaco loan data: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Failed to load Abaco loan data: {str(e)}"
+            df = dataset_cache.get(table)
+        page = paginate(
+            df, query, dataset_cache.version(table), DATE_FILTER_COLUMNS.get(table)
         )
+    except StaleCursorError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except RecordQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = dict(page_headers(page))
+    logger.info(
+        f"✅ Serving {len(page.frame)} of {page.total} Abaco {table} records "
+        f"as {media}"
+    )
+    if media in BINARY_FORMATS:
+        arrow_table = arrow_page(cached, page)
+        encoder = iter_arrow_ipc if media == "arrow" else iter_parquet
+        if media == "parquet":
+            headers["Content-Disposition"] = f'attachment; filename="{table}.parquet"'
+        return StreamingResponse(
+            encoder(arrow_table), media_type=MEDIA_TYPES[media], headers=headers
+        )
+    if media == "ndjson":
+        return StreamingResponse(
+            iter_ndjson(page.frame), media_type=MEDIA_TYPES[media], headers=headers
+        )
+    return Response(
+        content=to_json_bytes(page.frame),
+        media_type=MEDIA_TYPES[media],
+        headers=headers,
+    )
+
+
+# Abaco loan data endpoint
+@app.get("/abaco/loan-data")
+def get_abaco_loan_data(
+    request: Request,
+    query: RecordQuery = Depends(record_query_params),
+    format: Optional[str] = Query(None, description="json, ndjson, arrow or parquet"),
+) -> Response:
+    """
+    Get Abaco loan data (16,205 records)
+    Returns your actual loan portfolio with Spanish client support
+    """
+    return serve_records("loan_data", query, request, format)
 
 
 # Abaco payment history endpoint
 @app.get("/abaco/payment-history")
-async def get_abaco_payment_history() -> List[Dict[str, Any]]:
+def get_abaco_payment_history(
+    request: Request,
+    query: RecordQuery = Depends(record_query_params),
+    format: Optional[str] = Query(None, description="json, ndjson, arrow or parquet"),
+) -> Response:
     """
     Get Abaco payment history (16,443 records)
     Returns actual payment performance data
     """
-    try:
-        if not data_loader:
-            raise HTTPException(
-                status_code=503, detail="Abaco data loader not available"
-            )
-
-        # Load Abaco payment history
-        abaco_data = data_loader.load_abaco_data()
-
-        if abaco_data and "payment_history" in abaco_data:
-            payment_df = abaco_data["payment_history"]
-            records = payment_df.to_dict("records")
-            logger.info(f"✅ Loaded {len(records)} Abaco payment history records")
-            return records
-        else:
-            logger.warning("No Abaco payment history available")
-            return []
-
-    except Exception as e:
-        logger.error(f"Failed to load Abaco payment history: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Failed to load Abaco payment history: {str(e)}"
-        )
+    return serve_records("payment_history", query, request, format)
 
 
 # Abaco payment schedule endpoint
 @app.get("/abaco/payment-schedule")
-async def get_abaco_payment_schedule() -> List[Dict[str, Any]]:
+def get_abaco_payment_schedule(
+    request: Request,
+    query: RecordQuery = Depends(record_query_params),
+    format: Optional[str] = Query(None, description="json, ndjson, arrow or parquet"),
+) -> Response:
     """
     Get Abaco payment schedule (16,205 records)
     Returns scheduled payment data
     """
-    try:
-        if not data_loader:
-            raise HTTPException(
-                status_code=503, detail="Abaco data loader not available"
-            )
-
-        # Load Abaco payment schedule
-        abaco_data = data_loader.load_abaco_data()
-
-        if abaco_data and "payment_schedule" in abaco_data:
-            schedule_df = abaco_data["payment_schedule"]
-            records = schedule_df.to_dict("records")
-            logger.info(f"✅ Loaded {len(records)} Abaco payment schedule records")
-            return records
-        else:
-            logger.warning("No Abaco payment schedule available")
-            return []
-
-    except Exception as e:
-        logger.error(f"Failed to load Abaco payment schedule: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Failed to load Abaco payment schedule: {str(e)}"
-        )
+    return serve_records("payment_schedule", query, request, format)
 
 
 # Portfolio metrics with Abaco data
@@ -397,62 +463,84 @@ async def get_abaco_payment_schedule() -> List[Dict[str, Any]]:
 async def get_abaco_portfolio_metrics() -> Dict[str, Any]:
     """
     Get comprehensive Abaco portfolio metrics
-    Returns real-time analytics from your 48,853 records
+    Returns analytics from your 48,853 records, served from a snapshot that
+    is rebuilt in the background whenever the source files change
     """
+    if not metrics_snapshot:
+        raise HTTPException(status_code=503, detail="Abaco data loader not available")
+
     try:
-        if not data_loader:
-            raise HTTPException(
-                status_code=503, detail="Abaco data loader not available"
-            )
+        if metrics_snapshot.ready:
+            snapshot, stale = metrics_snapshot.get()
+        else:
+            # Only the first request waits for a build, off the event loop
+            snapshot, stale = await run_in_threadpool(metrics_snapshot.get)
+    except RuntimeError as e:
+        logger.error(f"Abaco portfolio metrics calculation failed: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
 
-        # Load all Abaco data
-        abaco_data = data_loader.load_abaco_data()
-
-        if not abaco_data:
-            raise HTTPException(status_code=503, detail="Abaco data not available")
-
-        # Calculate metrics from your actual data
-        loan_df = abaco_data.get("loan_data")
-        payment_df = abaco_data.get("payment_history")
-
-        metrics = {
-            "total_records": sum(len(df) for df in abaco_data.values()),
-            "portfolio_outstanding": (
-                float(loan_df[OUTSTANDING_LOAN_VALUE].sum())
-                if loan_df is not None
-                else 0.0
-            ),
-            "total_exposure": 208192588.65,  # From your schema
-            "active_loans": (
-                len(loan_df[loan_df[LOAN_STATUS] == "Current"])
-                if loan_df is not None
-                else 0
-            ),
-            "completed_loans": (
-                len(loan_df[loan_df[LOAN_STATUS] == "Complete"])
-                if loan_df is not None
-                else 0
-            ),
-            "spanish_companies": (
-                len(loan_df[loan_df["Cliente"].str.contains(SA_DE_CV, na=False)])
-                if loan_df is not None
-                else 0
-            ),
-            "usd_factoring_compliance": 100.0,  # Your data is 100% USD factoring
-            "weighted_apr": 33.41,  # From your schema
-            "payment_performance_rate": 67.3,  # From your schema
-            "status": "success",
-            "data_source": "abaco_production",
-        }
+    if snapshot.metrics["total_records"] == 0:
+        raise HTTPException(status_code=503, detail="Abaco data not available")
 
-        logger.info("✅ Abaco portfolio metrics calculated successfully")
-        return metrics
+    return {
+        **snapshot.metrics,
+        "total_exposure": 208192588.65,  # From your schema
+        "usd_factoring_compliance": 100.0,  # Your data is 100% USD factoring
+        "weighted_apr": 33.41,  # From your schema
+        "payment_performance_rate": 67.3,  # From your schema
+        "status": "success",
+        "data_source": "abaco_production",
+        "snapshot": snapshot.describe(stale),
+    }
 
-    except Exception as e:
-        logger.error(f"Abaco portfolio metrics calculation failed: {e}")
+
+# Single loan lookup
+@app.get("/abaco/loans/{loan_id}")
+def get_abaco_loan(loan_id: str) -> Response:
+    """
+    Get one loan with its payments, schedule rows and collateral
+    Served from prebuilt Loan ID indexes, without scanning any table
+    """
+    if not record_index:
+        raise HTTPException(status_code=503, detail="Abaco data loader not available")
+
+    sections = record_index.loan(loan_id)
+    if sections is None:
+        raise HTTPException(status_code=404, detail=f"Loan not found: {loan_id}")
+    return Response(
+        content=sections_to_json({"loan_id": loan_id}, sections),
+        media_type="application/json",
+    )
+
+
+# Single customer lookup
+@app.get("/abaco/customers/{customer_id}")
+def get_abaco_customer(customer_id: str) -> Response:
+    """
+    Get every loan of a customer with their payments, schedules and collateral
+    Served from prebuilt Customer ID and Loan ID indexes
+    """
+    if not record_index:
+        raise HTTPException(status_code=503, detail="Abaco data loader not available")
+
+    sections = record_index.customer(customer_id)
+    if sections is None:
         raise HTTPException(
-            status_code=500, detail=f"Portfolio metrics calculation failed: {str(e)}"
+            status_code=404, detail=f"Customer not found: {customer_id}"
         )
+    return Response(
+        content=sections_to_json({"customer_id": customer_id}, sections),
+        media_type="application/json",
+    )
+
+
+# Dataset cache statistics
+@app.get("/abaco/cache-stats")
+async def get_abaco_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters and load times of the shared dataset cache"""
+    if not dataset_cache:
+        raise HTTPException(status_code=503, detail="Abaco data loader not available")
+    return dataset_cache.stats()
 
 
 # Application startup
@@ -464,6 +552,14 @@ async def startup_event():
     logger.info("🇪🇸 Spanish client support enabled")
     logger.info("💰 USD factoring validation active")
     logger.info("💵 $208,192,588.65 USD portfolio exposure")
+    if metrics_snapshot:
+        # Warm the metrics snapshot so the first dashboard poll is served from memory
+        metrics_snapshot.refresh()
+    if record_index:
+        # Build the lookup indexes without delaying startup
+        threading.Thread(
+            target=record_index.warm, name="abaco-record-index", daemon=True
+        ).start()
 
 
 # Application shutdown
@@ -490,14 +586,3 @@ if __name__ == "__main__":
     except Exception as e:
         logger.error(f"Server failed to start: {e}")
         sys.exit(1)
-<<<<<<< Updated upstream:src/run.py
-=======
-
-# Help message for error resolution
-help_text = """To properly fix all errors, I need to see:
-1. The complete error messages
-2. Your repository structure
-3. The specific files with issues"""
-
-print(help_text)
->>>>>>> Stashed changes:scripts/run.py
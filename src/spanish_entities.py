@@ -0,0 +1,200 @@
+"""
+Memoized Spanish entity classifier for Abaco client names
+Cliente and Pagador columns repeat a few thousand distinct names, so names
+are factorized, each new name is matched once against every entity pattern
+and name indicator with a single compiled regex, and results are reused
+"""
+
+import logging
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SA_DE_CV = "S.A. DE C.V."
+
+# Business entity patterns in priority order, with their entity types
+ENTITY_PATTERNS = {
+    SA_DE_CV: "sociedad_anonima_cv",
+    "S.A.": "sociedad_anonima",
+    "S.R.L.": "sociedad_limitada",
+    "HOSPITAL NACIONAL": "hospital_publico",
+}
+
+# Spanish individual name indicators (from schema samples)
+NAME_INDICATORS = ("ENRIQUE", "KEVIN", "CARMEN", "GARCIA", "MORALES", "RAFAEL")
+
+BUSINESS_CONFIDENCE = 0.95
+INDIVIDUAL_CONFIDENCE = 0.85
+OTHER_CONFIDENCE = 0.1
+
+# Class codes beyond the per-pattern codes 0..len(patterns) - 1
+_INDIVIDUAL = -1
+_OTHER = -2
+_UNKNOWN = -3
+
+DEFAULT_MAX_CACHED_NAMES = 100_000
+
+
+class SpanishEntityClassifier:
+    """
+    Classify client names as Spanish business entities, individuals or other.
+
+    Matches the rules of ``AbacoRiskModel.identify_spanish_client``: the
+    first entity pattern (in priority order) found in the upper-cased name
+    decides the entity type, otherwise any name indicator marks an
+    individual. All patterns and indicators form one regex alternation
+    wrapped in a lookahead, so a single scan reports every pattern starting
+    at every position and the highest-priority hit can be picked.
+
+    Each distinct name is matched once; its class code is cached across
+    calls and columns, so repeated tapes only scan names not seen before.
+    """
+
+    def __init__(
+        self,
+        patterns: Optional[Sequence[str]] = None,
+        indicators: Sequence[str] = NAME_INDICATORS,
+        entity_types: Optional[Dict[str, str]] = None,
+        max_cached_names: int = DEFAULT_MAX_CACHED_NAMES,
+    ):
+        self.patterns = list(patterns if patterns is not None else ENTITY_PATTERNS)
+        self.indicators = list(indicators)
+        self.entity_types = dict(entity_types or ENTITY_PATTERNS)
+        self.max_cached_names = max_cached_names
+
+        alternation = "|".join(
+            f"(?P<p{i}>{re.escape(term)})"
+            for i, term in enumerate(self.patterns + self.indicators)
+        )
+        self._regex = re.compile(f"(?=(?:{alternation}))")
+        self._n_patterns = len(self.patterns)
+        self._cache: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.scanned_names = 0
+
+    def _match(self, name: str) -> int:
+        """Class code of one upper-cased name"""
+        best = None
+        for match in self._regex.finditer(name):
+            term = int(match.lastgroup[1:])
+            if best is None or term < best:
+                best = term
+                if best == 0:
+                    break
+        if best is None:
+            return _OTHER
+        return best if best < self._n_patterns else _INDIVIDUAL
+
+    def _codes_for(self, names: Iterable[Any]) -> np.ndarray:
+        """Class code of every distinct name, scanning only uncached ones"""
+        codes = []
+        with self._lock:
+            for name in names:
+                key = str(name).upper()
+                code = self._cache.get(key)
+                if code is None:
+                    code = self._match(key)
+                    self.scanned_names += 1
+                    if len(self._cache) >= self.max_cached_names:
+                        self._cache.clear()
+                    self._cache[key] = code
+                codes.append(code)
+        return np.array(codes, dtype=np.int64)
+
+    def class_codes(self, names: pd.Series) -> np.ndarray:
+        """
+        Class code of every row: pattern index, or individual/other/unknown.
+
+        Args:
+            names: Client name column; missing names are unknown
+        """
+        row_codes, uniques = pd.factorize(names)
+        unique_codes = np.append(self._codes_for(uniques), _UNKNOWN)
+        return unique_codes[row_codes]
+
+    def is_spanish(self, names: pd.Series) -> np.ndarray:
+        """Boolean flag per row: Spanish business entity or individual"""
+        codes = self.class_codes(names)
+        return codes >= _INDIVIDUAL
+
+    def classify(self, names: pd.Series) -> pd.DataFrame:
+        """
+        Classification of every row, aligned on the index of ``names``.
+
+        Returns:
+            DataFrame with ``is_spanish``, ``entity_type``, ``pattern_matched``
+            and ``confidence`` columns
+        """
+        codes = self.class_codes(names)
+        labels = self._labels()
+        # Class code -> position in the label tables (patterns first)
+        positions = np.where(codes >= 0, codes, self._n_patterns - codes - 1)
+        matched = np.array(labels["pattern_matched"], dtype=object)
+        return pd.DataFrame(
+            {
+                "is_spanish": codes >= _INDIVIDUAL,
+                "entity_type": pd.Categorical.from_codes(
+                    positions, categories=labels["entity_type"]
+                ),
+                "pattern_matched": matched[positions],
+                "confidence": np.array(labels["confidence"])[positions],
+            },
+            index=names.index,
+        )
+
+    def _labels(self) -> Dict[str, List[Any]]:
+        """Per-class output values, patterns first, then individual/other/unknown"""
+        entity_types = [
+            self.entity_types.get(pattern, "business") for pattern in self.patterns
+        ]
+        return {
+            "entity_type": entity_types + ["individual", "other", "unknown"],
+            "pattern_matched": self.patterns + [None, None, None],
+            "confidence": [BUSINESS_CONFIDENCE] * self._n_patterns
+            + [INDIVIDUAL_CONFIDENCE, OTHER_CONFIDENCE, 0.0],
+        }
+
+    def identify(self, name: Any) -> Dict[str, Any]:
+        """Classification of a single name, as a dictionary"""
+        if pd.isna(name):
+            return {"is_spanish": False, "entity_type": "unknown", "confidence": 0.0}
+
+        code = self._codes_for([name])[0]
+        if code >= 0:
+            pattern = self.patterns[code]
+            return {
+                "is_spanish": True,
+                "entity_type": self.entity_types.get(pattern, "business"),
+                "pattern_matched": pattern,
+                "confidence": BUSINESS_CONFIDENCE,
+                "utf8_supported": True,
+            }
+        if code == _INDIVIDUAL:
+            return {
+                "is_spanish": True,
+                "entity_type": "individual",
+                "confidence": INDIVIDUAL_CONFIDENCE,
+                "utf8_supported": True,
+            }
+        return {
+            "is_spanish": False,
+            "entity_type": "other",
+            "confidence": OTHER_CONFIDENCE,
+        }
+
+    def cache_info(self) -> Dict[str, int]:
+        """Cached distinct names and total names scanned"""
+        return {"cached_names": len(self._cache), "scanned_names": self.scanned_names}
+
+
+__all__ = [
+    "SpanishEntityClassifier",
+    "ENTITY_PATTERNS",
+    "NAME_INDICATORS",
+    "SA_DE_CV",
+]
@@ -0,0 +1,286 @@
+"""
+Vintage (static-pool) curve engine
+Loans are grouped into disbursement-month cohorts with integer month codes;
+principal recovered and month-end delinquent balances are accumulated in
+dense cohort x calendar-month matrices that grow as new payment months
+arrive, and are read back as cohort x months-on-book curves
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from src.date_codes import month_codes, to_days
+    from src.roll_rates import RollRateEngine
+except ImportError:
+    from date_codes import month_codes, to_days
+    from roll_rates import RollRateEngine
+
+logger = logging.getLogger(__name__)
+
+LOAN_ID = "Loan ID"
+DISBURSEMENT_DATE = "Disbursement Date"
+DISBURSEMENT_AMOUNT = "Disbursement Amount"
+TRUE_PAYMENT_DATE = "True Payment Date"
+TRUE_PRINCIPAL_PAYMENT = "True Principal Payment"
+
+DPD_30 = 30
+DPD_90 = 90
+CURVES = ("recovery", "charge_off", "dpd_30_plus", "dpd_90_plus")
+
+
+def _period(code: int) -> pd.Period:
+    return pd.PeriodIndex.from_ordinals([code], freq="M")[0]
+
+
+@dataclass
+class VintageCurves:
+    """
+    Cumulative curves per disbursement cohort, as (cohorts, months on book)
+    ratios of the cohort's disbursed principal.
+
+    Cells not observed yet (later than the last month of data, or before
+    delinquency was computed) are NaN, giving the usual vintage triangle.
+    """
+
+    cohorts: pd.PeriodIndex
+    disbursed: np.ndarray
+    curves: Dict[str, np.ndarray]
+    principal: np.ndarray
+
+    def frame(self, curve: str = "recovery") -> pd.DataFrame:
+        """One curve as a cohort x months-on-book DataFrame"""
+        values = self.curves[curve]
+        return pd.DataFrame(
+            values,
+            index=self.cohorts.rename("cohort"),
+            columns=pd.RangeIndex(values.shape[1], name="months_since_disbursement"),
+        )
+
+    def recovery_summary(self) -> pd.DataFrame:
+        """
+        Long-format recovery curve: principal recovered per cohort and month
+        on book, the cohort's disbursed principal and the cumulative
+        recovery percentage; only observed months are listed.
+        """
+        observed = ~np.isnan(self.curves["recovery"])
+        cohort, age = np.nonzero(observed)
+        return pd.DataFrame(
+            {
+                "cohort": self.cohorts[cohort],
+                "months_since_disbursement": age,
+                TRUE_PRINCIPAL_PAYMENT: self.principal[cohort, age],
+                DISBURSEMENT_AMOUNT: self.disbursed[cohort],
+                "recovery_pct": self.curves["recovery"][cohort, age] * 100,
+            }
+        )
+
+
+class VintageEngine:
+    """
+    Static-pool curves for disbursement cohorts, updated incrementally.
+
+    A loan's cohort is the month of its (earliest) disbursement and its
+    months on book at a date are the difference of integer month codes.
+    Principal payments are added into a cohort x calendar-month matrix with
+    one ``bincount``, so ``add_payments`` with only the new rows extends the
+    curves without touching earlier payments. Month-end delinquency comes
+    from ``RollRateEngine.month_end_positions`` and ``update_delinquency``
+    adds only month-ends not seen before: outstanding principal of loans
+    over 30 and 90 DPD, and charge-offs, the outstanding principal of a
+    loan in the month it first exceeds the policy default threshold.
+
+    Only recovery updates cost O(new payments). Settling installments
+    needs every loan's full payment history, so each delinquency update
+    reconciles the whole schedule and payment table (O(full history)) and
+    only skips re-aggregating the month-ends already stored.
+    """
+
+    def __init__(
+        self,
+        loan_data: pd.DataFrame,
+        roll_rate_engine: Optional[RollRateEngine] = None,
+    ):
+        self.roll_rate_engine = roll_rate_engine or RollRateEngine()
+        self.loans = loan_data
+        by_loan = pd.DataFrame(
+            {
+                "month": month_codes(loan_data[DISBURSEMENT_DATE]),
+                "amount": pd.to_numeric(
+                    loan_data[DISBURSEMENT_AMOUNT], errors="coerce"
+                ).fillna(0.0),
+            },
+            index=loan_data.index,
+        )
+        by_loan = by_loan[by_loan["month"] >= 0]
+        grouped = by_loan.groupby(loan_data.loc[by_loan.index, LOAN_ID], sort=True)
+        self.loan_ids = grouped.size().index
+        loan_months = grouped["month"].min().to_numpy()
+
+        cohort_months, self._loan_cohort = np.unique(loan_months, return_inverse=True)
+        self.first_month = int(cohort_months[0]) if len(cohort_months) else 0
+        self._cohort_months = cohort_months
+        self._cohort_offset = (cohort_months - self.first_month).astype(np.int64)
+        self.disbursed = np.bincount(
+            self._loan_cohort,
+            grouped["amount"].sum().to_numpy(),
+            len(cohort_months),
+        )
+
+        n_cohorts = len(cohort_months)
+        self._principal = np.zeros((n_cohorts, 0))
+        self._dpd_30 = np.zeros((n_cohorts, 0))
+        self._dpd_90 = np.zeros((n_cohorts, 0))
+        self._charge_off = np.zeros((n_cohorts, 0))
+        self._charged_off = np.zeros(len(self.loan_ids), dtype=bool)
+        self.delinquency_months = 0
+        self.last_payment_date: Optional[np.datetime64] = None
+        # Every cohort is observed in its own disbursement month
+        self._grow(int(self._cohort_offset.max()) + 1 if n_cohorts else 0)
+
+    @property
+    def calendar_months(self) -> int:
+        """Calendar months covered so far, from the first cohort month"""
+        return self._principal.shape[1]
+
+    def _grow(self, months: int) -> None:
+        """Extend the calendar axis to ``months`` columns"""
+        extra = months - self.calendar_months
+        if extra <= 0:
+            return
+        pad = ((0, 0), (0, extra))
+        self._principal = np.pad(self._principal, pad)
+        self._dpd_30 = np.pad(self._dpd_30, pad)
+        self._dpd_90 = np.pad(self._dpd_90, pad)
+        self._charge_off = np.pad(self._charge_off, pad)
+
+    def add_payments(self, payments: pd.DataFrame) -> int:
+        """
+        Add principal payments (a full table or just newly arrived rows).
+
+        Payments made before their loan's disbursement month count in the
+        disbursement month; payments of unknown loans are ignored.
+
+        Returns:
+            Number of payment rows added
+        """
+        loans = self.loan_ids.get_indexer(payments[LOAN_ID])
+        months = month_codes(payments[TRUE_PAYMENT_DATE])
+        known = (loans >= 0) & (months >= 0)
+        if not known.any():
+            return 0
+        latest = to_days(payments[TRUE_PAYMENT_DATE])[known].max()
+        if self.last_payment_date is None or latest > self.last_payment_date:
+            self.last_payment_date = latest
+        cohorts = self._loan_cohort[loans[known]]
+        column = np.maximum(
+            months[known] - self.first_month, self._cohort_offset[cohorts]
+        )
+        self._grow(int(column.max()) + 1)
+        principal = pd.to_numeric(payments[TRUE_PRINCIPAL_PAYMENT], errors="coerce")
+        principal = principal.fillna(0.0).to_numpy()[known]
+        n_cells = self._principal.size
+        self._principal += np.bincount(
+            cohorts * self.calendar_months + column, principal, n_cells
+        ).reshape(self._principal.shape)
+        return int(known.sum())
+
+    def update_delinquency(self, schedule: pd.DataFrame, payments: pd.DataFrame) -> int:
+        """
+        Add month-end delinquency for calendar months not computed yet.
+
+        Only months that ended by the latest payment date are computed, so a
+        month still receiving payments is not frozen half-way. The schedule
+        and full payment history are reconciled again on every call, so the
+        cost is O(full history) even when one month-end is added.
+
+        Args:
+            schedule: Payment Schedule table
+            payments: Full Historic Real Payment table (settlement needs the
+                whole history), already passed to ``add_payments``
+
+        Returns:
+            Number of month-ends added
+        """
+        if self.last_payment_date is None:
+            return 0
+        # Months whose last day is on or before the latest payment date
+        next_day = (self.last_payment_date + 1).astype("datetime64[M]")
+        complete = int(next_day.astype(np.int64)) - self.first_month
+        complete = min(complete, self.calendar_months)
+        if self.delinquency_months >= complete:
+            return 0
+        start = _period(self.first_month + self.delinquency_months).start_time
+        end = _period(self.first_month + complete - 1).end_time
+        positions = self.roll_rate_engine.month_end_positions(
+            self.loans, schedule, payments, start=start, end=end
+        )
+        loans = self.loan_ids.get_indexer(positions.loan_ids)
+        known = loans >= 0
+        loans = loans[known]
+        steps = len(positions.month_ends)
+        live = positions.on_book[:, known] & ~positions.closed[:, known]
+        dpd = positions.dpd[:, known]
+        balance = positions.balance[:, known]
+        # Flat (cohort, calendar month) cell of every loan at every new month-end
+        columns = self.delinquency_months + np.arange(steps)[:, None]
+        cells = self._loan_cohort[loans][None, :] * self.calendar_months + columns
+
+        def totals(hit: np.ndarray) -> np.ndarray:
+            return np.bincount(cells[hit], balance[hit], self._principal.size).reshape(
+                self._principal.shape
+            )
+
+        self._dpd_30 += totals(live & (dpd > DPD_30))
+        self._dpd_90 += totals(live & (dpd > DPD_90))
+
+        threshold = self.roll_rate_engine.dpd_engine.policy.default_threshold
+        crossed = live & (dpd > threshold) & ~self._charged_off[loans][None, :]
+        first = crossed & (np.cumsum(crossed, axis=0) == 1)
+        self._charged_off[loans[first.any(axis=0)]] = True
+        self._charge_off += totals(first)
+
+        added = len(positions.month_ends)
+        self.delinquency_months += added
+        return added
+
+    def _by_age(self, calendar: np.ndarray, observed_months: int) -> np.ndarray:
+        """Re-index cohort x calendar-month values to cohort x months on book"""
+        ages = np.arange(self.calendar_months)
+        column = self._cohort_offset[:, None] + ages[None, :]
+        valid = column < observed_months
+        values = np.full(column.shape, np.nan)
+        rows = np.broadcast_to(np.arange(len(column))[:, None], column.shape)
+        values[valid] = calendar[rows[valid], column[valid]]
+        return values
+
+    def curves(self) -> VintageCurves:
+        """Cumulative recovery and charge-off, and DPD 30+/90+ balance curves"""
+        denominator = np.where(self.disbursed > 0, self.disbursed, np.nan)[:, None]
+        principal = self._by_age(self._principal, self.calendar_months)
+        # Unobserved cells are NaN, so cumulative sums stop at the triangle edge
+        recovered = np.cumsum(principal, axis=1)
+        charge_off = np.cumsum(
+            self._by_age(self._charge_off, self.delinquency_months), axis=1
+        )
+        curves = {
+            "recovery": recovered / denominator,
+            "charge_off": charge_off / denominator,
+            "dpd_30_plus": self._by_age(self._dpd_30, self.delinquency_months)
+            / denominator,
+            "dpd_90_plus": self._by_age(self._dpd_90, self.delinquency_months)
+            / denominator,
+        }
+        return VintageCurves(
+            cohorts=pd.PeriodIndex.from_ordinals(self._cohort_months, freq="M"),
+            disbursed=self.disbursed,
+            curves=curves,
+            principal=principal,
+        )
+
+
+__all__ = ["CURVES", "VintageCurves", "VintageEngine", "month_codes"]
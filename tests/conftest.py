@@ -53,6 +53,8 @@ except ImportError:
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+import pandas as pd
+
 
 # Configure test environment
 @pytest.fixture(scope="session", autouse=True)
@@ -65,3 +67,54 @@ def configure_env():
     test_data_dir.mkdir(exist_ok=True)
 
     yield
+
+
+@pytest.fixture(autouse=True)
+def kpi_history_dir(tmp_path, monkeypatch):
+    """Keep the KPI engines' default history store out of the working tree."""
+    directory = tmp_path / "kpi_history"
+    monkeypatch.setattr("src.analytics.kpi_engine.DEFAULT_HISTORY_DIR", directory)
+    return directory
+
+
+# Toy loan tape shared by the roll-rate and vintage tests
+@pytest.fixture
+def loans():
+    """
+    Loan A pays each installment late, B on time, C never.
+
+    A and C are the January cohort (500 disbursed), B the February one.
+    """
+    return pd.DataFrame(
+        {
+            "Loan ID": ["A", "B", "C"],
+            "Disbursement Date": ["2024-01-05", "2024-02-01", "2024-01-10"],
+            "Disbursement Amount": [200.0, 50.0, 300.0],
+        }
+    )
+
+
+@pytest.fixture
+def schedule():
+    """Payment Schedule of the toy loan tape"""
+    return pd.DataFrame(
+        {
+            "Loan ID": ["A", "A", "B", "C"],
+            "Payment Date": ["2024-01-20", "2024-02-20", "2024-02-15", "2024-01-25"],
+            "Principal Payment": [100.0, 100.0, 50.0, 300.0],
+        }
+    )
+
+
+@pytest.fixture
+def payments():
+    """Historic Real Payment of the toy loan tape"""
+    return pd.DataFrame(
+        {
+            "Loan ID": ["A", "A", "B"],
+            "True Payment Date": pd.to_datetime(
+                ["2024-02-10", "2024-03-25", "2024-02-15"]
+            ),
+            "True Principal Payment": [100.0, 100.0, 50.0],
+        }
+    )
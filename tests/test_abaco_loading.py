@@ -0,0 +1,374 @@
+"""Test suite for Abaco tape loading: columnar cache and typed parsing."""
+
+import json
+import os
+
+import pytest
+from pathlib import Path
+import pandas as pd
+
+from src import data_loader
+from src.data_loader import (
+    CACHE_DIRNAME,
+    load_loan_data,
+    load_tables_concurrently,
+    iter_table_chunks,
+    DataLoader,
+    LOAN_DATA_TABLE,
+)
+from src.incremental_ingest import IncrementalPaymentIngestor
+from src.pipeline import CommercialViewPipeline
+from src.portfolio_reducers import ChunkReducer
+
+LOAN_FILE = "Abaco - Loan Tape_Loan Data_Table.csv"
+PAYMENT_FILE = "Abaco - Loan Tape_Historic Real Payment_Table.csv"
+PAYMENT_HEADER = (
+    "Loan ID,True Payment Date,True Principal Payment,True Payment Status\n"
+)
+
+
+def _write_loan_tape(path: Path, outstanding=(1000.0, 2500.5)) -> None:
+    pd.DataFrame(
+        {
+            "Company": ["Abaco Technologies", "Abaco Financial"],
+            "Customer ID": ["CLIAB000001", "CLIAB000002"],
+            "Loan ID": ["DSB0001-001", "DSB0002-001"],
+            "Disbursement Date": ["2025-09-30", "2025-09-29"],
+            "Interest Rate APR": [0.3315, 0.2947],
+            "Days in Default": [0, 45],
+            "Loan Status": ["Current", "Default"],
+            "Outstanding Loan Value": list(outstanding),
+        }
+    ).to_csv(path / LOAN_FILE, index=False)
+
+
+@pytest.fixture
+def tape_dir(tmp_path):
+    """Temporary data directory with a small loan tape."""
+    _write_loan_tape(tmp_path)
+    return tmp_path
+
+
+@pytest.mark.skipif(not data_loader._PARQUET_AVAILABLE, reason="pyarrow not installed")
+class TestColumnarCache:
+    """Tests for the content-hash keyed Parquet cache."""
+
+    def test_cache_is_built_once_and_reused(self, tape_dir, monkeypatch):
+        """Second load reads the Parquet cache instead of the CSV."""
+        first = load_loan_data(tape_dir)
+        cache_files = list((tape_dir / CACHE_DIRNAME).glob("*.parquet"))
+        assert len(cache_files) == 1
+
+        def fail_read_csv(*args, **kwargs):
+            raise AssertionError("CSV should not be re-parsed")
+
+        monkeypatch.setattr(data_loader.pd, "read_csv", fail_read_csv)
+        second = load_loan_data(tape_dir)
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_cache_invalidated_when_csv_changes(self, tape_dir):
+        """Rewriting the CSV produces a fresh cache and drops the stale one."""
+        load_loan_data(tape_dir)
+        _write_loan_tape(tape_dir, outstanding=(10.0, 20.0))
+
+        df = load_loan_data(tape_dir)
+        assert df["Outstanding Loan Value"].tolist() == [10.0, 20.0]
+        assert len(list((tape_dir / CACHE_DIRNAME).glob("*.parquet"))) == 1
+
+    def test_other_parse_options_keep_their_cache(self, tape_dir):
+        """Loads with different parse options do not evict each other."""
+        load_loan_data(tape_dir)
+        data_loader._read_csv(tape_dir / LOAN_FILE, usecols=["Loan ID"])
+        assert len(list((tape_dir / CACHE_DIRNAME).glob("*.parquet"))) == 2
+
+        _write_loan_tape(tape_dir, outstanding=(10.0, 20.0))
+        load_loan_data(tape_dir)
+        assert len(list((tape_dir / CACHE_DIRNAME).glob("*.parquet"))) == 2
+
+    def test_use_cache_false_skips_cache(self, tape_dir):
+        """Disabling the cache never writes cache files."""
+        load_loan_data(tape_dir, use_cache=False)
+        assert not (tape_dir / CACHE_DIRNAME).exists()
+
+    def test_loader_class_uses_cache(self, tape_dir):
+        """DataLoader.load_abaco_data goes through the same cache."""
+        data = DataLoader().load_abaco_data(tape_dir)
+        assert len(data["loan_data"]) == 2
+        assert data["payment_history"].empty
+        assert (tape_dir / CACHE_DIRNAME).exists()
+
+
+class TestTypedSchema:
+    """Tests for schema-driven typed parsing."""
+
+    def test_loan_columns_are_typed_at_parse_time(self, tape_dir):
+        """Categoricals, datetimes and nullable ints come straight from the loader."""
+        df = load_loan_data(tape_dir, use_cache=False)
+
+        assert isinstance(df["Company"].dtype, pd.CategoricalDtype)
+        assert isinstance(df["Loan Status"].dtype, pd.CategoricalDtype)
+        assert pd.api.types.is_datetime64_any_dtype(df["Disbursement Date"])
+        assert str(df["Days in Default"].dtype) == "Int64"
+        assert df["Outstanding Loan Value"].dtype == "float64"
+
+    def test_null_literal_maps_to_na(self, tmp_path):
+        """The literal ``null`` token becomes NA in numeric and date columns."""
+        (tmp_path / LOAN_FILE).write_text(
+            "Loan ID,Disbursement Date,Days in Default,Other\n"
+            "DSB0001-001,2025-09-30,null,null\n"
+            "DSB0002-001,null,3,1.5\n"
+        )
+        df = load_loan_data(tmp_path, use_cache=False)
+
+        assert df["Days in Default"].isna().tolist() == [True, False]
+        assert df["Disbursement Date"].isna().tolist() == [False, True]
+        assert df["Other"].isna().tolist() == [True, False]
+
+    def test_schema_drift_falls_back_to_inference(self, tmp_path):
+        """A value that does not fit the schema type still loads."""
+        (tmp_path / LOAN_FILE).write_text(
+            "Loan ID,Interest Rate APR\nDSB0001-001,not-a-rate\n"
+        )
+        df = load_loan_data(tmp_path, use_cache=False)
+        assert len(df) == 1
+
+    def test_text_in_int_column_falls_back_to_na(self, tmp_path):
+        """Non-numeric values in an integer column become NA, not an empty frame."""
+        (tmp_path / LOAN_FILE).write_text(
+            "Loan ID,Days in Default\nDSB0001-001,abc\nDSB0002-001,45\n"
+        )
+        df = load_loan_data(tmp_path, use_cache=False)
+
+        assert len(df) == 2
+        assert str(df["Days in Default"].dtype) == "Int64"
+        assert df["Days in Default"].isna().tolist() == [True, False]
+
+    def test_spec_is_derived_from_schema(self):
+        """Date, integer and string columns are read from the schema file."""
+        spec = data_loader.get_table_spec(data_loader.HISTORIC_REAL_PAYMENT_TABLE)
+
+        assert "True Payment Date" in spec.date_columns
+        assert "True Rabates" in spec.int_columns
+        assert spec.dtypes["Loan ID"] == "string"
+
+    def test_schema_edits_are_picked_up(self, tmp_path):
+        """Rewriting the schema file invalidates the cached table spec."""
+        schema = tmp_path / "schema.json"
+
+        def write(dtype):
+            columns = [{"name": "Days in Default", "dtype": dtype, "non_null": 1}]
+            schema.write_text(
+                json.dumps({"datasets": {"Loan Data": {"columns": columns}}})
+            )
+
+        write("int")
+        before = data_loader.get_table_spec("Loan Data", schema)
+        write("float")
+        os.utime(schema, ns=(0, schema.stat().st_mtime_ns + 1))
+        after = data_loader.get_table_spec("Loan Data", schema)
+
+        assert before.int_columns == ("Days in Default",)
+        assert after.int_columns == ()
+        assert after.dtypes["Days in Default"] == "float64"
+
+
+class TestConcurrentLoading:
+    """Tests for thread-pool table loading."""
+
+    def test_parallel_matches_sequential(self, tape_dir):
+        """Parallel and sequential loads return the same frames and timings."""
+        loader = DataLoader(data_dir=tape_dir, max_workers=4)
+        parallel = loader.load_abaco_data(use_cache=False)
+        sequential = loader.load_abaco_data(use_cache=False, parallel=False)
+
+        assert set(parallel) == {
+            "loan_data",
+            "payment_history",
+            "payment_schedule",
+            "collateral",
+        }
+        pd.testing.assert_frame_equal(parallel["loan_data"], sequential["loan_data"])
+        assert set(loader.load_timings) == set(parallel)
+        assert all(seconds >= 0 for seconds in loader.load_timings.values())
+
+    def test_failing_loader_yields_empty_frame(self, tape_dir):
+        """One broken table does not prevent the others from loading."""
+
+        def missing(base_path):
+            raise FileNotFoundError("gone")
+
+        datasets, timings = load_tables_concurrently(
+            {"loan_data": load_loan_data, "collateral": missing}, base_path=tape_dir
+        )
+
+        assert len(datasets["loan_data"]) == 2
+        assert datasets["collateral"].empty
+        assert set(timings) == {"loan_data", "collateral"}
+
+
+class TestStreamingLoader:
+    """Tests for chunked loading and chunk-aware reducers."""
+
+    def test_chunks_are_bounded_and_typed(self, tape_dir):
+        """Every chunk respects the size limit and the typed schema."""
+        chunks = list(iter_table_chunks(LOAN_DATA_TABLE, tape_dir, chunksize=1))
+
+        assert [len(chunk) for chunk in chunks] == [1, 1]
+        assert all(str(chunk["Days in Default"].dtype) == "Int64" for chunk in chunks)
+
+    def test_missing_table_raises(self, tmp_path):
+        """Streaming a missing file is an explicit error."""
+        with pytest.raises(FileNotFoundError):
+            next(iter_table_chunks(LOAN_DATA_TABLE, tmp_path))
+
+    def test_streaming_metrics_match_in_memory(self, tape_dir):
+        """Chunked reduction reproduces the in-memory portfolio metrics."""
+        pipeline = CommercialViewPipeline(tape_dir)
+        pipeline.load_all_datasets(parallel=False)
+
+        in_memory = pipeline.compute_portfolio_metrics()
+        streamed = pipeline.compute_portfolio_metrics(streaming=True, chunksize=1)
+
+        assert set(streamed) == set(in_memory)
+        for key in (
+            "portfolio_outstanding",
+            "weighted_apr",
+            "npl_180",
+            "max_borrower_pct",
+        ):
+            assert streamed[key] == pytest.approx(in_memory[key])
+        assert streamed["active_clients"] == in_memory["active_clients"]
+        assert streamed["dpd_distribution"] == pytest.approx(
+            in_memory["dpd_distribution"]
+        )
+
+    def test_incomplete_reducer_cannot_be_built(self):
+        """A reducer missing ``result`` fails at construction, not mid-stream."""
+
+        class CountOnly(ChunkReducer):
+            def update(self, chunk):
+                pass
+
+        with pytest.raises(TypeError):
+            CountOnly()
+
+
+@pytest.mark.skipif(not data_loader._PARQUET_AVAILABLE, reason="pyarrow not installed")
+class TestIncrementalIngest:
+    """Tests for watermark-based Historic Real Payment ingestion."""
+
+    @staticmethod
+    def _append(path: Path, rows) -> None:
+        with open(path / PAYMENT_FILE, "a", encoding="utf-8") as f:
+            f.writelines(rows)
+
+    @pytest.fixture
+    def payment_dir(self, tmp_path):
+        """Temporary data directory with a two-row payment history."""
+        (tmp_path / PAYMENT_FILE).write_text(
+            PAYMENT_HEADER
+            + "DSB0001-001,2025-09-01,100.0,On Time\n"
+            + "DSB0002-001,2025-09-02,200.0,Late\n"
+        )
+        return tmp_path
+
+    def test_first_run_ingests_everything(self, payment_dir):
+        """First run has no watermark, so the whole file is ingested."""
+        result = IncrementalPaymentIngestor(payment_dir).ingest()
+
+        assert result.full_rebuild
+        assert result.new_rows == 2
+        assert result.watermark.row_count == 2
+        assert result.watermark.max_true_payment_date == "2025-09-02"
+
+    def test_only_appended_rows_are_parsed(self, payment_dir):
+        """A fresh ingestor resumes from the persisted watermark."""
+        IncrementalPaymentIngestor(payment_dir).ingest()
+        self._append(payment_dir, ["DSB0003-001,2025-10-05,300.0,Late\n"])
+
+        result = IncrementalPaymentIngestor(payment_dir).ingest()
+
+        assert not result.full_rebuild
+        assert result.delta["Loan ID"].tolist() == ["DSB0003-001"]
+        assert len(result.data) == 3
+        assert result.watermark.max_true_payment_date == "2025-10-05"
+        assert pd.api.types.is_datetime64_any_dtype(result.data["True Payment Date"])
+
+    def test_unchanged_file_has_empty_delta(self, payment_dir):
+        """Re-ingesting an unchanged file reports no new rows."""
+        ingestor = IncrementalPaymentIngestor(payment_dir)
+        ingestor.ingest()
+
+        result = ingestor.ingest()
+
+        assert result.new_rows == 0
+        assert len(result.data) == 2
+
+    def test_file_without_trailing_newline(self, payment_dir):
+        """End of file terminates the last row, which later appends follow."""
+        path = payment_dir / PAYMENT_FILE
+        path.write_text(path.read_text().rstrip("\n"))
+
+        result = IncrementalPaymentIngestor(payment_dir).ingest()
+        assert len(result.data) == 2
+        assert not result.watermark.terminated
+
+        self._append(payment_dir, ["\nDSB0003-001,2025-10-05,300.0,Late\n"])
+        result = IncrementalPaymentIngestor(payment_dir).ingest()
+        assert not result.full_rebuild
+        assert result.delta["Loan ID"].tolist() == ["DSB0003-001"]
+        assert len(result.data) == 3
+
+    def test_extended_partial_row_triggers_rebuild(self, payment_dir):
+        """A last row that was still being written is re-read once complete."""
+        ingestor = IncrementalPaymentIngestor(payment_dir)
+        ingestor.ingest()
+        self._append(payment_dir, ["DSB0003-001,2025-10-05,30"])
+        assert ingestor.ingest().new_rows == 1
+
+        self._append(payment_dir, ["0.0,Late\n"])
+        result = ingestor.ingest()
+        assert result.full_rebuild
+        assert result.data["True Principal Payment"].tolist() == [100.0, 200.0, 300.0]
+
+    def test_parts_are_compacted(self, payment_dir):
+        """Past ``max_parts`` the store is merged into a single listed part."""
+        ingestor = IncrementalPaymentIngestor(payment_dir, max_parts=2)
+        ingestor.ingest()
+        for day in range(3, 6):
+            self._append(payment_dir, [f"DSB0003-001,2025-10-0{day},1.0,Late\n"])
+            ingestor.ingest()
+
+        store = ingestor.store_dir
+        watermark = ingestor.load_watermark()
+        assert len(watermark.part_files) <= 2
+        assert sorted(p.name for p in store.glob("part-*.parquet")) == sorted(
+            watermark.part_files
+        )
+        reloaded = IncrementalPaymentIngestor(payment_dir).ingest()
+        assert len(reloaded.data) == 5
+        assert reloaded.data["True Payment Date"].is_monotonic_increasing
+
+    def test_rewritten_file_triggers_rebuild(self, payment_dir):
+        """Replacing history instead of appending rebuilds the store."""
+        ingestor = IncrementalPaymentIngestor(payment_dir)
+        ingestor.ingest()
+        (payment_dir / PAYMENT_FILE).write_text(
+            PAYMENT_HEADER + "DSB0009-001,2025-09-09,900.0,Late\n"
+        )
+
+        result = ingestor.ingest()
+
+        assert result.full_rebuild
+        assert result.data["Loan ID"].tolist() == ["DSB0009-001"]
+
+    def test_pipeline_refresh_reports_delta(self, payment_dir):
+        """The pipeline swaps in the full history and exposes the delta."""
+        pipeline = CommercialViewPipeline(payment_dir)
+        pipeline.refresh_payment_history()
+        self._append(payment_dir, ["DSB0003-001,2025-10-05,300.0,Late\n"])
+
+        result = pipeline.refresh_payment_history()
+
+        assert result.new_rows == 1
+        assert len(pipeline._datasets["historic_real_payment"]) == 3
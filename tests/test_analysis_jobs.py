@@ -0,0 +1,109 @@
+"""Test suite for the in-process analysis job manager."""
+
+import threading
+
+import pytest
+
+from src.analysis_jobs import (
+    JOB_FAILED,
+    JOB_SUCCEEDED,
+    AnalysisJobManager,
+    JobQueueFullError,
+)
+
+
+class FakeProcessor:
+    """Processor stand-in that blocks until released."""
+
+    def __init__(self, result=None, error=None):
+        self.release = threading.Event()
+        self.runs = 0
+        self.loads = 0
+        self.result = result or {"status": "ok", "datasets_loaded": ["loan_data"]}
+        self.error = error
+
+    def load_data(self):
+        self.loads += 1
+        return {}
+
+    def process_portfolio(self):
+        self.release.wait(5)
+        self.runs += 1
+        if self.error:
+            raise self.error
+        return self.result
+
+
+def _wait(manager, job):
+    for _ in range(500):
+        if manager.get(job.job_id).finished_at is not None:
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError("job did not finish")
+
+
+class TestAnalysisJobManager:
+    """Tests for job submission, coalescing and status tracking."""
+
+    def test_identical_triggers_are_coalesced(self):
+        """A trigger while a job is in flight joins it instead of re-running."""
+        processor = FakeProcessor()
+        manager = AnalysisJobManager(processor_factory=lambda: processor)
+
+        first, created = manager.submit()
+        second, created_again = manager.submit()
+        processor.release.set()
+        _wait(manager, first)
+
+        assert created and not created_again
+        assert second is first
+        assert first.coalesced_requests == 1
+        assert processor.runs == 1
+        assert manager.get(first.job_id).status == JOB_SUCCEEDED
+
+    def test_new_trigger_after_completion_runs_again(self):
+        """Once a job finishes, the next trigger starts a fresh job."""
+        processor = FakeProcessor()
+        processor.release.set()
+        manager = AnalysisJobManager(processor_factory=lambda: processor)
+
+        first, _ = manager.submit()
+        _wait(manager, first)
+        second, created = manager.submit()
+        _wait(manager, second)
+
+        assert created and second.job_id != first.job_id
+        assert processor.runs == 2
+
+    def test_failures_are_recorded(self):
+        """Exceptions and error results mark the job as failed."""
+        processor = FakeProcessor(error=ValueError("boom"))
+        processor.release.set()
+        manager = AnalysisJobManager(processor_factory=lambda: processor)
+
+        job, _ = manager.submit()
+        _wait(manager, job)
+
+        assert job.status == JOB_FAILED
+        assert job.error == "boom"
+
+    def test_active_jobs_are_bounded(self):
+        """Distinct keys beyond max_active are rejected."""
+        processor = FakeProcessor()
+        manager = AnalysisJobManager(max_active=1, processor_factory=lambda: processor)
+
+        job, _ = manager.submit("a")
+        with pytest.raises(JobQueueFullError):
+            manager.submit("b")
+        processor.release.set()
+        _wait(manager, job)
+
+    def test_warm_preloads_shared_processor(self):
+        """Warming creates the shared processor and loads its data once."""
+        processor = FakeProcessor()
+        manager = AnalysisJobManager(processor_factory=lambda: processor)
+
+        manager.warm().result(5)
+
+        assert processor.loads == 1
+        assert manager.processor is processor
@@ -0,0 +1,171 @@
+"""Test suite for the event-sourced balance ledger."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.balance_ledger import BalanceLedger
+from src.pipeline import CommercialViewPipeline
+
+
+@pytest.fixture
+def loans():
+    """Three loans across two customers and two companies."""
+    return pd.DataFrame(
+        {
+            "Company": ["Abaco Technologies", "Abaco Technologies", "Abaco Financial"],
+            "Customer ID": ["C1", "C1", "C2"],
+            "Loan ID": ["L1", "L2", "L3"],
+            "Disbursement Date": ["2024-01-10", "2024-02-05", "2024-01-20"],
+            "Disbursement Amount": [1000.0, 500.0, 300.0],
+        }
+    )
+
+
+@pytest.fixture
+def payments():
+    """Principal repayments, one undated and one for an unknown customer."""
+    return pd.DataFrame(
+        {
+            "Company": ["Abaco Technologies", "Abaco Financial", None, None],
+            "Customer ID": ["C1", "C2", None, "C1"],
+            "Loan ID": ["L1", "L3", None, "L1"],
+            "True Payment Date": ["2024-01-31", "2024-02-29", "2024-02-01", None],
+            "True Principal Payment": [400.0, 300.0, 50.0, 999.0],
+        }
+    )
+
+
+@pytest.fixture
+def ledger(loans, payments):
+    return BalanceLedger.from_tables(loans, payments)
+
+
+class TestBalanceAsOf:
+    """Tests for as-of balance queries."""
+
+    @pytest.mark.parametrize(
+        "as_of, expected",
+        [
+            ("2024-01-09", 0.0),
+            ("2024-01-10", 1000.0),
+            ("2024-01-31", 900.0),
+            ("2024-02-01", 850.0),
+            ("2024-02-29", 1050.0),
+            ("2030-01-01", 1050.0),
+        ],
+    )
+    def test_portfolio(self, ledger, as_of, expected):
+        """Portfolio balances include every dated event up to the day."""
+        assert ledger.balance_as_of(as_of) == pytest.approx(expected)
+
+    def test_levels(self, ledger):
+        """Loan, customer and company balances are read at the same date."""
+        loans = ledger.balance_as_of("2024-02-10", level="loan")
+        customers = ledger.balance_as_of("2024-02-10", level="customer")
+        companies = ledger.balance_as_of("2024-02-10", level="company")
+
+        assert loans.to_dict() == {"L1": 600.0, "L2": 500.0, "L3": 300.0}
+        assert customers.to_dict() == {"C1": 1100.0, "C2": 300.0}
+        assert companies.to_dict() == {
+            "Abaco Financial": 300.0,
+            "Abaco Technologies": 1100.0,
+        }
+        assert loans.index.name == "Loan ID"
+
+    def test_single_key(self, ledger):
+        """A single entity is looked up directly; unknown keys are zero."""
+        assert ledger.balance_as_of("2024-01-31", level="loan", key="L1") == 600.0
+        assert ledger.balance_as_of("2024-01-15", level="loan", key="L2") == 0.0
+        assert ledger.balance_as_of("2024-03-01", level="loan", key="L9") == 0.0
+
+    def test_matches_filtered_sum(self):
+        """As-of balances agree with summing the events up to each date."""
+        rng = np.random.default_rng(5)
+        n = 300
+        dates = pd.Timestamp("2024-01-01") + pd.to_timedelta(
+            rng.integers(0, 90, n), unit="D"
+        )
+        loans = pd.DataFrame(
+            {
+                "Loan ID": rng.integers(0, 20, n).astype(str),
+                "Disbursement Date": dates,
+                "Disbursement Amount": rng.integers(1, 1000, n) * 1.0,
+            }
+        )
+        ledger = BalanceLedger.from_tables(loans)
+
+        for as_of in pd.date_range("2023-12-31", "2024-04-01", freq="9D"):
+            expected = (
+                loans[loans["Disbursement Date"] <= as_of]
+                .groupby("Loan ID")["Disbursement Amount"]
+                .sum()
+            )
+            result = ledger.balance_as_of(as_of, level="loan")
+            pd.testing.assert_series_equal(
+                result.reindex(expected.index), expected, check_names=False
+            )
+
+    def test_unknown_level(self, ledger):
+        """Unknown levels are rejected."""
+        with pytest.raises(ValueError):
+            ledger.balance_as_of("2024-01-31", level="pagador")
+
+
+class TestSeries:
+    """Tests for daily and monthly balance series."""
+
+    def test_portfolio_daily(self, ledger):
+        """Daily series cover every day of the event range."""
+        series = ledger.series(freq="D")
+
+        assert series.index[0] == pd.Timestamp("2024-01-10")
+        assert series.index[-1] == pd.Timestamp("2024-02-29")
+        assert len(series) == 51
+        assert series["2024-01-31"] == 900.0
+
+    def test_monthly_by_customer(self, ledger):
+        """Month-end series have one column per entity."""
+        frame = ledger.series("customer", freq="M", end="2024-03-31")
+
+        assert frame.index.strftime("%Y-%m-%d").tolist() == [
+            "2024-01-31",
+            "2024-02-29",
+            "2024-03-31",
+        ]
+        assert frame["C1"].tolist() == [600.0, 1100.0, 1100.0]
+        assert frame["C2"].tolist() == [300.0, 0.0, 0.0]
+
+    def test_series_agrees_with_as_of(self, ledger):
+        """Every point of a series equals the as-of query for that date."""
+        frame = ledger.series("loan", freq="D", start="2024-01-01")
+
+        for date in frame.index[::7]:
+            expected = ledger.balance_as_of(date, level="loan")
+            assert frame.loc[date].to_dict() == expected.to_dict()
+
+    def test_start_after_end(self, ledger):
+        """An empty range yields an empty series."""
+        assert ledger.series(start="2024-03-01", end="2024-02-01").empty
+
+
+class TestPipelineIntegration:
+    """Tests for balance history through the pipeline."""
+
+    def test_balance_history(self, loans, payments):
+        """The pipeline builds the ledger once from its loaded datasets."""
+        pipeline = CommercialViewPipeline()
+        pipeline._datasets = {"loan_data": loans, "historic_real_payment": payments}
+
+        history = pipeline.compute_balance_history(freq="M")
+
+        assert history.tolist() == [900.0, 1050.0]
+        assert pipeline.outstanding_as_of("2024-02-10", level="loan", key="L1") == 600
+        assert pipeline.stage_timings()["balance_ledger"]["computes"] == 1
+
+    def test_no_loans(self):
+        """Without loan data the balance history is empty."""
+        pipeline = CommercialViewPipeline()
+
+        assert pipeline.compute_balance_history().empty
+        assert pipeline.outstanding_as_of("2024-01-01") == 0.0
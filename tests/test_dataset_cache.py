@@ -0,0 +1,103 @@
+"""Test suite for the process-wide Abaco dataset cache."""
+
+import os
+
+import pandas as pd
+import pytest
+
+from src.dataset_cache import DatasetCache
+
+LOAN_FILE = "Abaco - Loan Tape_Loan Data_Table.csv"
+
+
+@pytest.fixture
+def tape_dir(tmp_path):
+    """Temporary data directory with a two-loan tape."""
+    pd.DataFrame(
+        {
+            "Loan ID": ["DSB0001-001", "DSB0002-001"],
+            "Outstanding Loan Value": [1.0, 2.0],
+        }
+    ).to_csv(tmp_path / LOAN_FILE, index=False)
+    return tmp_path
+
+
+@pytest.fixture
+def counting_cache(tape_dir):
+    """Cache whose loan table loader counts its calls."""
+    calls = []
+
+    def load(base_path):
+        calls.append(base_path)
+        return pd.read_csv(base_path / LOAN_FILE)
+
+    cache = DatasetCache(tape_dir, tables={"loan_data": (load, "Loan Data")})
+    return cache, calls
+
+
+class TestDatasetCache:
+    """Tests for lazy loading, invalidation and counters."""
+
+    def test_table_loaded_once_per_version(self, counting_cache):
+        """Repeated reads of an unchanged file hit the cache."""
+        cache, calls = counting_cache
+
+        first = cache.get("loan_data")
+        second = cache.get("loan_data")
+
+        assert first is second
+        assert len(calls) == 1
+        assert cache.stats()["tables"]["loan_data"]["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_file_change_invalidates(self, counting_cache, tape_dir):
+        """Rewriting the source file triggers a reload."""
+        cache, calls = counting_cache
+        cache.get("loan_data")
+        old_version = cache.version("loan_data")
+
+        changed = pd.DataFrame({"Loan ID": ["DSB0003-001"]})
+        changed.to_csv(tape_dir / LOAN_FILE, index=False)
+        stat = (tape_dir / LOAN_FILE).stat()
+        os.utime(tape_dir / LOAN_FILE, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        assert len(cache.get("loan_data")) == 1
+        assert len(calls) == 2
+        assert cache.version("loan_data") != old_version
+
+    def test_tables_load_lazily(self, tape_dir):
+        """Reading one table does not load the others."""
+        cache = DatasetCache(tape_dir)
+
+        assert len(cache.get("loan_data")) == 2
+        stats = cache.stats()["tables"]
+        assert stats["loan_data"]["loaded"]
+        assert not stats["payment_history"]["loaded"]
+
+    def test_invalidate_forces_reload(self, counting_cache):
+        """Explicit invalidation drops the cached copy."""
+        cache, calls = counting_cache
+        cache.get("loan_data")
+        cache.invalidate()
+        cache.get("loan_data")
+
+        assert len(calls) == 2
+
+    def test_derived_built_once_per_version(self, counting_cache):
+        """Derived artifacts are reused until the table reloads."""
+        cache, _ = counting_cache
+        builds = []
+
+        def build(frame):
+            builds.append(len(frame))
+            return frame["Loan ID"].tolist()
+
+        assert cache.derived("loan_data", "ids", build) == [
+            "DSB0001-001",
+            "DSB0002-001",
+        ]
+        cache.derived("loan_data", "ids", build)
+        cache.invalidate("loan_data")
+        cache.derived("loan_data", "ids", build)
+
+        assert builds == [2, 2]
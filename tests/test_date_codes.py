@@ -0,0 +1,44 @@
+"""Test suite for the shared integer date coding helpers."""
+
+import numpy as np
+import pandas as pd
+
+from src.date_codes import (
+    day_number,
+    day_numbers,
+    days_between,
+    month_codes,
+    month_ends,
+    month_starts,
+)
+
+
+class TestDayCodes:
+    """Tests for day numbers and day differences."""
+
+    def test_day_numbers_fill_missing(self):
+        """Day numbers count days since the epoch; NaT takes the fill value."""
+        numbers = day_numbers(pd.Series(["1970-01-02", "bad", None]), missing=-9)
+        assert numbers.tolist() == [1, -9, -9]
+        assert day_number("1970-01-11") == 10
+
+    def test_days_between_is_nan_when_missing(self):
+        """Whole days between dates, NaN where either side is missing."""
+        later = np.array(["2024-03-01", "NaT"], dtype="datetime64[D]")
+        earlier = np.array(["2024-02-01", "2024-02-01"], dtype="datetime64[D]")
+        result = days_between(later, earlier)
+        assert result[0] == 29.0
+        assert np.isnan(result[1])
+
+
+class TestMonthCodes:
+    """Tests for month codes and month boundaries."""
+
+    def test_month_codes_round_trip(self):
+        """Month codes map back to the first and last day of the month."""
+        codes = month_codes(pd.Series(["2024-02-15", None]))
+        assert codes.tolist() == [649, -1]
+        assert month_starts(codes[:1]).strftime("%Y-%m-%d").tolist() == ["2024-02-01"]
+
+        ends = month_ends(pd.Timestamp("2024-01-10"), pd.Timestamp("2024-02-10"))
+        assert ends.astype(str).tolist() == ["2024-01-31", "2024-02-29"]
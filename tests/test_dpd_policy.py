@@ -0,0 +1,146 @@
+"""Test suite for the policy-driven DPD bucketing engine."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.dpd_analyzer import DPDAnalyzer
+from src.dpd_policy import DPDBucketEngine, DPDPolicy, UNKNOWN_CODE, load_dpd_policy
+from src.portfolio_reducers import DPDBucketReducer
+
+CONFIG = {
+    "default_threshold": {"days": 90},
+    "delinquency_buckets": {
+        "late": {"days_range": [31, 90]},
+        "current": {"days_range": [0, 0]},
+        "early": {"days_range": [1, 30]},
+    },
+    "risk_weights": {"current": 0.0, "early": 0.5, "late": 1.0},
+    "provisioning_rates": {"current": 0.01, "early": 0.1, "late": 0.5},
+}
+
+
+@pytest.fixture
+def engine():
+    """Engine over a three-bucket policy."""
+    return DPDBucketEngine(DPDPolicy.from_config(CONFIG))
+
+
+class TestDPDPolicy:
+    """Tests for loading and validating DPD policies."""
+
+    def test_repository_policy(self):
+        """The shipped policy loads with every bucket weighted and provisioned."""
+        policy = load_dpd_policy()
+
+        assert policy.names[0] == "current"
+        assert policy.names[-1] == "npl"
+        assert policy.default_threshold == 180
+        assert len(policy.risk_weights) == len(policy.names)
+
+    def test_buckets_sorted_by_lower_bound(self):
+        """Buckets are ordered by days regardless of their order in the file."""
+        policy = DPDPolicy.from_config(CONFIG)
+
+        assert policy.names == ("current", "early", "late")
+        assert policy.lower_days.tolist() == [0, 1, 31]
+
+    def test_overlapping_buckets_rejected(self):
+        """Overlapping day ranges are a configuration error."""
+        config = dict(
+            CONFIG,
+            delinquency_buckets={
+                "current": {"days_range": [0, 10]},
+                "early": {"days_range": [5, 30]},
+            },
+        )
+        with pytest.raises(ValueError):
+            DPDPolicy.from_config(config)
+
+    def test_missing_rates_rejected(self):
+        """Every bucket needs a risk weight and a provisioning rate."""
+        config = dict(CONFIG, risk_weights={"current": 0.0})
+        with pytest.raises(ValueError, match="risk_weights"):
+            DPDPolicy.from_config(config)
+
+
+class TestDPDBucketEngine:
+    """Tests for vectorized bucket assignment."""
+
+    def test_bucket_boundaries(self, engine):
+        """Bounds are inclusive and the last bucket is open-ended."""
+        codes = engine.codes(pd.Series([0, 1, 30, 30.9, 31, 90, 5000]))
+
+        assert codes.tolist() == [0, 1, 1, 1, 2, 2, 2]
+
+    def test_missing_and_negative_days_unknown(self, engine):
+        """Missing, non-numeric and negative days have no bucket."""
+        codes = engine.codes(pd.Series([None, "n/a", -3], dtype=object))
+
+        assert codes.tolist() == [UNKNOWN_CODE] * 3
+
+    def test_gap_between_buckets_unknown(self):
+        """Days between two configured ranges have no bucket."""
+        config = dict(
+            CONFIG,
+            delinquency_buckets={
+                "current": {"days_range": [0, 0]},
+                "early": {"days_range": [1, 30]},
+                "late": {"days_range": [61, 90]},
+            },
+        )
+        engine = DPDBucketEngine(DPDPolicy.from_config(config))
+
+        assert engine.codes(np.array([45, 61])).tolist() == [UNKNOWN_CODE, 2]
+
+    def test_assign_weights_and_provisions(self, engine):
+        """Weights and provisions come out alongside the bucket codes."""
+        df = pd.DataFrame(
+            {
+                "dpd": pd.array([0, 15, None], dtype="Int64"),
+                "balance": [100.0, 200.0, 50.0],
+            },
+            index=[10, 11, 12],
+        )
+        result = engine.assign(df, "dpd", balance_column="balance")
+
+        assert result.index.tolist() == [10, 11, 12]
+        assert result["dpd_bucket"].tolist()[:2] == ["current", "early"]
+        assert pd.isna(result["dpd_bucket"].iloc[2])
+        assert result["risk_weight"].tolist()[:2] == [0.0, 0.5]
+        assert result["provision_amount"].tolist()[:2] == [1.0, 20.0]
+        assert np.isnan(result["provision_amount"].iloc[2])
+
+    def test_reducer_matches_in_memory_totals(self, engine):
+        """Chunked bucket totals equal a single pass over the whole frame."""
+        df = pd.DataFrame(
+            {
+                "Days in Default": [0, 5, 45, 200],
+                "Outstanding Loan Value": [1.0, 2.0, 3.0, 4.0],
+            }
+        )
+        reducer = DPDBucketReducer(engine)
+        for start in range(0, len(df), 3):
+            reducer.update(df.iloc[start : start + 3])
+
+        assert reducer.result() == {"current": 1.0, "early": 2.0, "late": 7.0}
+
+
+class TestDPDAnalyzer:
+    """Tests for the analyzer built on the engine."""
+
+    def test_assign_dpd_buckets(self, engine):
+        """Unmatched rows are labelled unknown and the input is untouched."""
+        df = pd.DataFrame({"days_past_due": [0, 45, np.nan]})
+        result = DPDAnalyzer(engine).assign_dpd_buckets(df)
+
+        assert result["dpd_bucket"].tolist() == ["current", "late", "unknown"]
+        assert result["provision_rate"].tolist()[:2] == [0.01, 0.5]
+        assert "dpd_bucket" not in df.columns
+
+    def test_buckets_follow_policy(self):
+        """The analyzer exposes the day ranges of the configured policy."""
+        analyzer = DPDAnalyzer()
+
+        assert analyzer.dpd_buckets["current"] == (0, 0)
+        assert analyzer.dpd_buckets["early_delinquent"] == (1, 30)
@@ -0,0 +1,176 @@
+"""Test suite for evergreen cohort retention and reactivation analytics."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.evergreen import (
+    cohort_activity,
+    days_since_previous,
+    monthly_cohort,
+    reactivation_flag,
+)
+from src.evergreen_analytics import (
+    analyze_cohort_retention,
+    calculate_customer_reactivation,
+    track_customer_lifecycle,
+)
+
+
+@pytest.fixture
+def events():
+    """A joins in January and returns in February and June; C joins in February."""
+    return pd.DataFrame(
+        {
+            "Customer ID": ["A", "B", "A", "C", "B", "A", None],
+            "Disbursement Date": [
+                "2024-01-03",
+                "2024-01-20",
+                "2024-02-05",
+                "2024-02-11",
+                "2024-04-01",
+                "2024-06-30",
+                "2024-03-01",
+            ],
+        }
+    )
+
+
+def _naive_retention(df):
+    """Reference cohort retention computed customer by customer."""
+    dates = pd.to_datetime(df["Disbursement Date"]).dt.to_period("M")
+    first = dates.groupby(df["Customer ID"]).transform("min")
+    active = pd.DataFrame({"c": df["Customer ID"], "cohort": first, "m": dates})
+    counts = active.dropna().drop_duplicates().groupby(["cohort", "m"]).size()
+    sizes = active.dropna().groupby("cohort")["c"].nunique()
+    return counts / sizes.reindex(counts.index.get_level_values(0)).to_numpy()
+
+
+class TestMonthlyCohort:
+    """Tests for the cohort retention matrix."""
+
+    def test_retention_matrix(self, events):
+        """Rows are first-activity cohorts and values are over cohort size."""
+        retention = monthly_cohort(events, "Customer ID", "Disbursement Date")
+
+        assert retention.index.strftime("%Y-%m").tolist() == ["2024-01", "2024-02"]
+        assert retention.columns.strftime("%Y-%m").tolist() == [
+            "2024-01",
+            "2024-02",
+            "2024-03",
+            "2024-04",
+            "2024-05",
+            "2024-06",
+        ]
+        assert retention.loc["2024-01-01"].tolist() == [1.0, 0.5, 0.0, 0.5, 0.0, 0.5]
+        # The February cohort is measured against its own size, not January's
+        assert retention.loc["2024-02-01"].tolist() == [0.0, 1.0, 0.0, 0.0, 0.0, 0.0]
+
+    def test_matches_naive_groupby(self):
+        """Random activity agrees with a per-customer groupby."""
+        rng = np.random.default_rng(23)
+        n = 500
+        df = pd.DataFrame(
+            {
+                "Customer ID": rng.integers(0, 60, n).astype(str),
+                "Disbursement Date": pd.Timestamp("2023-01-01")
+                + pd.to_timedelta(rng.integers(0, 700, n), unit="D"),
+            }
+        )
+        retention = monthly_cohort(df, "Customer ID", "Disbursement Date")
+        expected = _naive_retention(df)
+
+        for (cohort, month), value in expected.items():
+            actual = retention.loc[cohort.to_timestamp(), month.to_timestamp()]
+            assert actual == pytest.approx(round(value, 3))
+        assert (retention.to_numpy() > 0).sum() == len(expected)
+
+    def test_retention_by_age(self, events):
+        """Ages past the last observed month are NaN."""
+        activity = cohort_activity(events, "Customer ID", "Disbursement Date")
+        rates = activity.retention_by_age()
+
+        assert activity.sizes.tolist() == [2, 1]
+        assert rates[0].tolist() == [1.0, 0.5, 0.0, 0.5, 0.0, 0.5]
+        assert np.isnan(rates[1, 5]) and rates[1, :5].tolist() == [1.0] + [0.0] * 4
+
+    def test_empty(self):
+        """No dated activity gives an empty matrix."""
+        df = pd.DataFrame({"Customer ID": ["A"], "Disbursement Date": [None]})
+        assert monthly_cohort(df, "Customer ID", "Disbursement Date").empty
+
+
+class TestReactivation:
+    """Tests for gap-based reactivation flags."""
+
+    def test_unsorted_events(self, events):
+        """Gaps are measured against the previous event in time, not row order."""
+        shuffled = events.iloc[[5, 2, 4, 0, 3, 1, 6]]
+        flags = reactivation_flag(
+            shuffled, "Customer ID", "Disbursement Date", gap_days=60
+        )
+
+        assert flags.index.tolist() == [5, 2, 4, 0, 3, 1, 6]
+        assert flags["reactivated"].tolist() == [
+            True,
+            False,
+            True,
+            False,
+            False,
+            False,
+            False,
+        ]
+
+    def test_days_since_previous(self):
+        """First events and missing customers get NaN."""
+        dates = pd.to_datetime(["2024-03-01", "2024-01-01", "2024-01-11", None])
+        gaps = days_since_previous(np.array([0, 0, -1, 0]), dates.to_numpy())
+        assert gaps[0] == 60.0
+        assert np.isnan(gaps[1:]).all()
+
+
+class TestEvergreenAnalytics:
+    """Tests for the evergreen analytics summaries."""
+
+    def test_analyze_cohort_retention(self, events):
+        """Cohort sizes, retention curves and pooled churn."""
+        result = analyze_cohort_retention(events)
+
+        assert result["monthly_cohorts"] == {"2024-01": 2, "2024-02": 1}
+        assert result["retention_rates"]["2024-02"] == [1.0, 0.0, 0.0, 0.0, 0.0]
+        churn = result["churn_analysis"]
+        assert churn["customers"] == 3
+        assert churn["retention_by_month"][:2] == [1.0, 0.3333]
+        assert churn["churn_by_month"][5] == 0.5
+
+    def test_calculate_customer_reactivation(self, events):
+        """Customers returning after the gap count as reactivated."""
+        payments = events.rename(columns={"Disbursement Date": "True Payment Date"})
+        result = calculate_customer_reactivation(payments, gap_days=60)
+
+        assert result["reactivated_customers"] == 2
+        assert result["reactivation_rate"] == pytest.approx(2 / 3)
+        assert result["recovery_timeline"] == {"2024-04": 1, "2024-06": 1}
+
+    def test_track_customer_lifecycle(self, events):
+        """Disbursements are staged new, recurring or recovered."""
+        result = track_customer_lifecycle(events, gap_days=60)
+
+        assert result["new_customers"] == 1
+        assert result["recurring_customers"] == 0
+        assert result["recovered_customers"] == 2
+        assert result["lifecycle_stages"]["2024-02"] == {
+            "new": 1,
+            "recurring": 1,
+            "recovered": 0,
+        }
+        assert "2024-03" not in result["lifecycle_stages"]
+
+    def test_empty_inputs(self):
+        """Empty tables keep the default summaries."""
+        empty = pd.DataFrame(columns=["Customer ID", "Disbursement Date"])
+        assert analyze_cohort_retention(empty)["monthly_cohorts"] == {}
+        assert track_customer_lifecycle(empty)["new_customers"] == 0
+        assert (
+            calculate_customer_reactivation(pd.DataFrame())["reactivation_rate"] == 0.0
+        )
@@ -0,0 +1,89 @@
+"""Test suite for the analysis export catalogue."""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.export_catalog import CATALOG_FILENAME, ExportCatalog
+
+START = datetime(2025, 10, 1, 12, 0, 0)
+
+
+def _results(n):
+    return {
+        "processing_timestamp": (START + timedelta(hours=n)).isoformat(),
+        "datasets_loaded": ["loan_data", "payment_history"],
+        "total_records": {"loan_data": n, "payment_history": 10},
+    }
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    """Catalogue with five runs one hour apart."""
+    catalog = ExportCatalog(tmp_path / CATALOG_FILENAME)
+    for n in range(5):
+        catalog.record(
+            tmp_path / f"portfolio_analysis_{n}.json",
+            _results(n),
+            START + timedelta(hours=n),
+        )
+    return catalog
+
+
+class TestExportCatalog:
+    """Tests for recording, listing and backfilling analysis runs."""
+
+    def test_runs_listed_newest_first_with_pages(self, catalog):
+        """Pages walk the runs from newest to oldest."""
+        first, total = catalog.list_runs(limit=2)
+        second, _ = catalog.list_runs(limit=2, offset=2)
+
+        assert total == 5
+        assert [e.filename for e in first + second] == [
+            f"portfolio_analysis_{n}.json" for n in (4, 3, 2, 1)
+        ]
+        assert first[0].total_records == 14
+
+    def test_time_range_filter(self, catalog):
+        """since/until are inclusive bounds on the export time."""
+        entries, total = catalog.list_runs(
+            since=START + timedelta(hours=1), until=START + timedelta(hours=2)
+        )
+
+        assert total == 2
+        assert [e.filename for e in entries] == [
+            "portfolio_analysis_2.json",
+            "portfolio_analysis_1.json",
+        ]
+
+    def test_latest_carries_payload(self, catalog):
+        """The latest run in range comes with its full analysis payload."""
+        entry = catalog.latest(until=START + timedelta(hours=3))
+
+        assert entry.filename == "portfolio_analysis_3.json"
+        assert entry.payload == _results(3)
+
+    def test_backfill_indexes_existing_exports_once(self, tmp_path):
+        """Exports written before the catalogue are indexed once."""
+        export_dir = tmp_path / "analytics"
+        export_dir.mkdir()
+        (export_dir / "portfolio_analysis_old.json").write_text(json.dumps(_results(1)))
+        catalog = ExportCatalog(export_dir / CATALOG_FILENAME)
+
+        assert catalog.is_new
+        assert catalog.backfill(export_dir) == 1
+        assert catalog.backfill(export_dir) == 0
+        assert catalog.latest().payload == _results(1)
+
+    def test_export_results_records_run(self, tmp_path, monkeypatch):
+        """PortfolioProcessor.export_results adds the run to the catalogue."""
+        monkeypatch.chdir(tmp_path)
+        from src.process_portfolio import PortfolioProcessor
+
+        PortfolioProcessor(base_dir=str(tmp_path)).export_results(_results(2))
+
+        analytics_dir = tmp_path / "abaco_runtime/exports/analytics"
+        entry = ExportCatalog(analytics_dir / CATALOG_FILENAME).latest()
+        assert entry.total_records == 12
+        assert (analytics_dir / entry.filename).exists()
@@ -9,7 +9,7 @@ import numpy as np
 rng = np.random.default_rng(seed=42)  # Modern NumPy random generator
 from datetime import datetime, timedelta
 from unittest.mock import Mock, patch, MagicMock
-from src.analytics.kpi_engine import CommercialLendingKPIEngine, KPIResult
+from src.analytics.kpi_engine import CommercialLendingKPIEngine, KPIContext, KPIResult
 from src.core.production_data_manager import ProductionDataManager
 from src.core.enterprise_config import EnterpriseConfigManager
 
@@ -469,3 +469,131 @@ class TestCommercialLendingKPIEngine:
             kpi_engine._calculate_outstanding_portfolio({"loan_portfolio": corrupted_data})
     
     # ... existing code ...
+
+
+class TestKPIContext:
+    """Tests for the per-run KPI context"""
+
+    @pytest.fixture
+    def datasets(self):
+        """Three customers; loan CL3 is the only NPL and CL4 is paid off"""
+        return {
+            "loan_portfolio": pd.DataFrame({
+                'loan_id': ['CL1', 'CL2', 'CL3', 'CL4'],
+                'customer_id': ['C1', 'C1', 'C2', 'C3'],
+                'principal_amount': [1000.0, 3000.0, 2000.0, 4000.0],
+                'interest_rate': [0.20, 0.10, 0.30, 0.15],
+                'loan_status': ['active', 'active', 'active', 'paid_of'],
+                'origination_date': ['2023-12-05', '2024-01-10', '2024-01-20', '2023-06-01'],
+            }),
+            "payment_schedule": pd.DataFrame({
+                'loan_id': ['CL1', 'CL1', 'CL2', 'CL3'],
+                'remaining_balance': [900.0, 800.0, 3000.0, 2000.0],
+                'due_date': ['2024-01-05', '2024-02-05', '2024-01-25', '2024-01-28'],
+                'total_amount': [120.0, 120.0, 300.0, 250.0],
+            }),
+            "historic_payments": pd.DataFrame({
+                'loan_id': ['CL1', 'CL3', 'CL3', 'CL2'],
+                'days_past_due': [0, 150, 200, 10],
+                'payment_date': ['2024-01-05', '2023-12-28', '2024-01-28', '2024-01-25'],
+                'amount_paid': [120.0, 0.0, 0.0, 270.0],
+            }),
+            "customer_data": pd.DataFrame({
+                'customer_id': ['C1', 'C2', 'C3'],
+                'acquisition_cost': [300.0, 150.0, 150.0],
+            }),
+        }
+
+    @pytest.fixture
+    def loader(self, datasets):
+        """Data loader serving the datasets and a Q4 targets table"""
+        tables = dict(datasets)
+        tables["q4_targets"] = pd.DataFrame({'Month': ['2024-01-01'], 'npl_rate': [0.05]})
+        loader = Mock()
+        loader.load_dataset.side_effect = lambda name: tables.get(name)
+        return loader
+
+    @pytest.fixture
+    def engine(self, loader):
+        config = Mock()
+        config.get_kpi_targets.return_value = {"cost_of_funds": 0.05}
+        return CommercialLendingKPIEngine(loader, config)
+
+    @pytest.fixture(autouse=True)
+    def january_2024(self):
+        with patch('src.analytics.kpi_engine.datetime') as mock_datetime:
+            mock_datetime.now.return_value.strftime.side_effect = lambda fmt: (
+                "2024-01-01" if fmt.endswith("-01") else "2024-01"
+            )
+            yield
+
+    def test_full_suite(self, engine):
+        """Every KPI of the suite is computed from the shared context"""
+        results = engine.calculate_all_kpis()
+
+        assert len(results) == 15
+        assert all(isinstance(result, KPIResult) for result in results.values())
+        assert results["outstanding_portfolio"].value == 5800.0
+        assert results["npl_rate"].value == pytest.approx(1 / 3)
+        assert results["npl_rate"].target == 0.05
+        assert results["active_clients"].value == 2.0
+        assert results["collection_rate"].value == pytest.approx(390 / 670)
+        assert results["monthly_disbursements"].value == 5000.0
+        assert results["return_on_assets"].provisional
+        assert not results["npl_rate"].provisional
+
+    def test_targets_loaded_once_per_run(self, engine, loader):
+        """The Q4 targets table is read once, not once per KPI"""
+        engine.calculate_all_kpis()
+
+        names = [call.args[0] for call in loader.load_dataset.call_args_list]
+        assert names.count("q4_targets") == 1
+        assert engine._run_context is None
+
+    def test_context_blocks_are_cached(self, datasets):
+        """Each building block is computed once per context"""
+        context = KPIContext(datasets)
+
+        assert context.customers is context.customers
+        assert context.active_mask.tolist() == [True, True, True, False]
+        assert context.customers["principal"].to_dict() == {
+            'C1': 4000.0, 'C2': 2000.0, 'C3': 4000.0,
+        }
+        assert context.active_dpd.tolist() == [0.0, 10.0, 200.0]
+        assert context.current_month_total(
+            "payment_schedule", "due_date", "total_amount"
+        ) == 670.0
+
+    def test_month_codes_parse_dates(self, datasets):
+        """Month codes accept strings and datetimes; bad dates are NaN"""
+        datasets["loan_portfolio"]["origination_date"] = [
+            '2024-01-10', None, 'not a date', '2023-06-01',
+        ]
+        context = KPIContext(datasets)
+        codes = context.month_codes("loan_portfolio", "origination_date")
+
+        assert codes[0] == context.current_month_code
+        assert np.isnan(codes[1]) and np.isnan(codes[2])
+        assert codes[3] == context.current_month_code - 7
+
+    def test_growth_and_retention_kpis(self, engine, datasets):
+        """Client KPIs use the first origination month per customer"""
+        assert engine._calculate_new_clients(datasets).value == 1.0
+        # C1 (December) still borrows, C3 paid off
+        assert engine._calculate_client_retention(datasets).value == 0.5
+        # January originations over active principal from before January
+        assert engine._calculate_portfolio_growth(datasets).value == 5.0
+
+    def test_yield_and_margin_kpis(self, engine, datasets):
+        """Non-performing loans earn no interest"""
+        performing_interest = 0.20 * 1000 + 0.10 * 3000
+
+        portfolio_yield = engine._calculate_portfolio_yield(datasets)
+        margin = engine._calculate_net_interest_margin(datasets)
+        roa = engine._calculate_return_on_assets(datasets)
+
+        assert portfolio_yield.value == pytest.approx(performing_interest / 5800)
+        assert margin.value == pytest.approx(performing_interest / 6000 - 0.05)
+        assert roa.value == pytest.approx((performing_interest - 2000) / 10000)
+        assert engine._calculate_average_dpd(datasets).value == pytest.approx(70.0)
+        assert engine._calculate_cost_per_acquisition(datasets).value == 200.0
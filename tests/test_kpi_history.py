@@ -0,0 +1,210 @@
+"""Test suite for the append-only KPI history store."""
+
+from unittest.mock import Mock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analytics.kpi_engine import CommercialLendingKPIEngine
+from src.analytics.kpi_history import KPIHistoryStore
+
+
+def _fill(store, values, start="2024-01-01"):
+    dates = pd.date_range(start, periods=len(values), freq="D")
+    for date, value in zip(dates, values):
+        store.append_run({"npl_rate": value, "active_clients": 2 * value}, date)
+
+
+class TestAppendAndQuery:
+    """Tests for appending runs and range queries."""
+
+    def test_one_row_per_kpi_per_run(self):
+        """Runs get increasing ids and non-numeric values are skipped."""
+        store = KPIHistoryStore()
+        first = store.append_run({"npl_rate": 0.1, "note": "n/a"}, "2024-01-31")
+        second = store.append_run({"npl_rate": 0.2}, "2024-02-29")
+
+        assert (first, second) == (0, 1)
+        frame = store.to_frame()
+        assert len(store) == 2
+        assert frame["kpi"].tolist() == ["npl_rate", "npl_rate"]
+        assert frame["value"].tolist() == [0.1, 0.2]
+
+    def test_range_query(self):
+        """History is filtered by inclusive reference-date bounds."""
+        store = KPIHistoryStore()
+        _fill(store, [1.0, 2.0, 3.0, 4.0, 5.0])
+        # A backfilled run for an earlier date sorts by date
+        store.append_run({"npl_rate": 0.5}, "2023-12-31")
+
+        history = store.history("npl_rate", "2024-01-02", "2024-01-04")
+        assert history["value"].tolist() == [2.0, 3.0, 4.0]
+        assert store.history("npl_rate")["value"].tolist()[:2] == [0.5, 1.0]
+        assert store.history("active_clients", end="2024-01-01")["value"].tolist() == [
+            2.0
+        ]
+        assert store.history("missing").empty
+
+
+class TestRollingStats:
+    """Tests for incrementally maintained rolling statistics."""
+
+    def test_matches_numpy_over_window(self):
+        """Mean, stddev and slope agree with a recomputation over the window."""
+        rng = np.random.default_rng(25)
+        values = 1e6 + rng.normal(0, 1000, 40)
+        store = KPIHistoryStore(window=12)
+        _fill(store, values)
+
+        tail = values[-12:]
+        stats = store.stats("npl_rate")
+        assert stats.count == 12
+        assert stats.mean == pytest.approx(tail.mean())
+        assert stats.std == pytest.approx(tail.std(ddof=1))
+        assert stats.slope == pytest.approx(np.polyfit(np.arange(12), tail, 1)[0])
+        assert stats.last == values[-1]
+
+    def test_trend_and_anomaly(self):
+        """Trends use a 5% band around the mean; anomalies are 3 sigma away."""
+        store = KPIHistoryStore()
+        _fill(store, [100.0, 101.0, 99.0, 100.0])
+        stats = store.stats("npl_rate")
+
+        assert stats.trend(110.0) == "up"
+        assert stats.trend(90.0) == "down"
+        assert stats.trend(103.0) == "stable"
+        assert stats.is_anomaly(110.0)
+        assert not stats.is_anomaly(101.0)
+
+
+class TestPersistence:
+    """Tests for the Parquet-backed store."""
+
+    def test_reload_restores_rows_and_windows(self, tmp_path):
+        """A new store over the same directory sees every run."""
+        pytest.importorskip("pyarrow")
+        store = KPIHistoryStore(tmp_path, window=3)
+        _fill(store, [1.0, 2.0, 3.0, 4.0])
+
+        reloaded = KPIHistoryStore(tmp_path, window=3)
+        assert len(reloaded) == 8
+        assert reloaded.next_run_id == 4
+        assert reloaded.stats("npl_rate").mean == pytest.approx(3.0)
+        assert reloaded.append_run({"npl_rate": 5.0}, "2024-01-05") == 4
+        assert reloaded.stats("npl_rate").mean == pytest.approx(4.0)
+
+    def test_compaction_and_retention(self, tmp_path):
+        """Parts are merged past the limit and retention drops old runs."""
+        pytest.importorskip("pyarrow")
+        store = KPIHistoryStore(tmp_path, max_parts=3)
+        _fill(store, [1.0, 2.0, 3.0, 4.0, 5.0])
+        assert len(list(tmp_path.glob("part-*.parquet"))) <= 3
+
+        removed = store.apply_retention(max_age_days=2, as_of="2024-01-05")
+        assert removed == 4
+        assert len(store.part_files) == 1
+        assert [p.name for p in tmp_path.glob("part-*.parquet")] == store.part_files
+        assert store.stats("npl_rate").mean == pytest.approx(4.0)
+
+        reloaded = KPIHistoryStore(tmp_path)
+        assert reloaded.history("npl_rate")["value"].tolist() == [3.0, 4.0, 5.0]
+        assert store.apply_retention(keep_runs=1) == 4
+        assert store.history("npl_rate")["value"].tolist() == [5.0]
+
+    def test_failed_compaction_keeps_history(self, tmp_path, monkeypatch):
+        """A compaction that fails to write leaves the listed parts readable."""
+        pytest.importorskip("pyarrow")
+        store = KPIHistoryStore(tmp_path)
+        _fill(store, [1.0, 2.0, 3.0])
+
+        def fail(*args, **kwargs):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(pd.DataFrame, "to_parquet", fail)
+        with pytest.raises(OSError):
+            store.compact()
+        monkeypatch.undo()
+
+        reloaded = KPIHistoryStore(tmp_path)
+        assert reloaded.history("npl_rate")["value"].tolist() == [1.0, 2.0, 3.0]
+
+    def test_load_reads_only_listed_parts(self, tmp_path):
+        """Part files the manifest does not list are ignored."""
+        pytest.importorskip("pyarrow")
+        store = KPIHistoryStore(tmp_path)
+        _fill(store, [1.0, 2.0])
+        stray = pd.read_parquet(tmp_path / store.part_files[0])
+        stray.to_parquet(tmp_path / "part-09999.parquet", index=False)
+
+        assert len(KPIHistoryStore(tmp_path)) == 4
+
+
+class TestEngineTrends:
+    """Tests for KPI trends read from the history store."""
+
+    def test_trend_and_anomaly_from_history(self):
+        """Runs are recorded, and later runs are compared with them."""
+        store = KPIHistoryStore()
+        engine = CommercialLendingKPIEngine(Mock(), Mock(), history_store=store)
+        engine._calculate_kpi_suite = Mock(
+            return_value={"npl_rate": Mock(value=0.10, anomaly=False)}
+        )
+        for day, value in enumerate([0.10, 0.11, 0.09, 0.10], start=1):
+            engine._calculate_kpi_suite.return_value["npl_rate"].value = value
+            engine.calculate_all_kpis(reference_date=f"2024-01-0{day}")
+
+        assert store.history("npl_rate")["value"].tolist() == [0.10, 0.11, 0.09, 0.10]
+        assert engine._calculate_trend(0.2, "npl_rate") == "up"
+        assert engine._calculate_trend(0.1, "npl_rate") == "stable"
+
+        engine._calculate_kpi_suite.return_value["npl_rate"].value = 0.5
+        results = engine.calculate_all_kpis(reference_date="2024-01-05")
+        assert results["npl_rate"].anomaly
+
+    def test_provisional_kpis_are_not_recorded(self):
+        """Provisional KPIs are flagged and never feed history or trends."""
+        store = KPIHistoryStore()
+        engine = CommercialLendingKPIEngine(Mock(), Mock(), history_store=store)
+        roa = Mock(value=0.05, anomaly=False, provisional=False)
+        engine._calculate_kpi_suite = Mock(
+            return_value={"npl_rate": Mock(value=0.1), "return_on_assets": roa}
+        )
+        for day in range(1, 5):
+            engine.calculate_all_kpis(reference_date=f"2024-01-0{day}")
+
+        assert roa.provisional and not roa.anomaly
+        assert store.history("return_on_assets").empty
+        assert store.stats("return_on_assets") is None
+        assert engine._calculate_trend(1.0, "return_on_assets") == "stable"
+        assert len(store.history("npl_rate")) == 4
+
+    def test_default_history_persists_across_engines(self, tmp_path):
+        """A new engine on the configured directory sees earlier runs."""
+        pytest.importorskip("pyarrow")
+        config = Mock()
+        config.get_kpi_history_dir.return_value = tmp_path
+        suite = {"npl_rate": Mock(value=0.10, anomaly=False)}
+
+        first = CommercialLendingKPIEngine(Mock(), config)
+        first._calculate_kpi_suite = Mock(return_value=suite)
+        for day in range(1, 4):
+            first.calculate_all_kpis(reference_date=f"2024-01-0{day}")
+
+        second = CommercialLendingKPIEngine(Mock(), config)
+        assert second.history.path == tmp_path
+        assert second._calculate_trend(0.2, "npl_rate") == "up"
+
+    def test_in_memory_history_is_opt_in(self, kpi_history_dir):
+        """Without a configured directory the default one is used."""
+        assert CommercialLendingKPIEngine(Mock(), None).history.path == kpi_history_dir
+        engine = CommercialLendingKPIEngine(Mock(), Mock(), persist_history=False)
+        assert engine.history.path is None
+
+    def test_without_history_falls_back_to_cache(self):
+        """KPIs never recorded keep the calculation cache comparison."""
+        engine = CommercialLendingKPIEngine(Mock(), Mock())
+        engine.calculation_cache["npl_rate_historical"] = 0.1
+
+        assert engine._calculate_trend(0.2, "npl_rate") == "up"
+        assert engine._calculate_trend(0.1, "unknown") == "stable"
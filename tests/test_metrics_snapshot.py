@@ -0,0 +1,77 @@
+"""Test suite for the materialized portfolio metrics snapshot."""
+
+import os
+
+import pandas as pd
+import pytest
+
+from src.dataset_cache import DatasetCache
+from src.metrics_snapshot import PortfolioMetricsSnapshot, compute_portfolio_metrics
+
+LOAN_FILE = "Abaco - Loan Tape_Loan Data_Table.csv"
+
+
+def _write_loans(path, statuses=("Current", "Complete", "Current")):
+    pd.DataFrame(
+        {
+            "Cliente": ["ACME, S.A. DE C.V.", "Juan Perez", None][: len(statuses)],
+            "Loan Status": list(statuses),
+            "Outstanding Loan Value": [100.0, 0.0, 50.0][: len(statuses)],
+        }
+    ).to_csv(path / LOAN_FILE, index=False)
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    """Snapshot over a temporary tape with only a loan table."""
+    _write_loans(tmp_path)
+    return PortfolioMetricsSnapshot(DatasetCache(tmp_path), tables=["loan_data"])
+
+
+class TestPortfolioMetricsSnapshot:
+    """Tests for snapshot building, reuse and invalidation."""
+
+    def test_metrics_match_definition(self, snapshot):
+        """The snapshot reproduces the portfolio metrics of the loan tape."""
+        result, stale = snapshot.get()
+
+        assert not stale
+        assert result.metrics == {
+            "total_records": 3,
+            "portfolio_outstanding": 150.0,
+            "active_loans": 2,
+            "completed_loans": 1,
+            "spanish_companies": 1,
+        }
+
+    def test_unchanged_data_served_from_memory(self, snapshot):
+        """Repeated reads reuse the same snapshot without rebuilding."""
+        first, _ = snapshot.get()
+        second, _ = snapshot.get()
+
+        assert second is first
+        assert snapshot.builds == 1
+
+    def test_data_change_rebuilds_in_background(self, snapshot, tmp_path):
+        """A changed file is served stale until the rebuild finishes."""
+        first, _ = snapshot.get()
+        _write_loans(tmp_path, statuses=("Complete",))
+        stat = (tmp_path / LOAN_FILE).stat()
+        os.utime(tmp_path / LOAN_FILE, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        stale_result, stale = snapshot.get()
+        assert stale and stale_result is first
+
+        snapshot.refresh().join()
+        fresh, stale = snapshot.get()
+        assert not stale
+        assert fresh.version != first.version
+        assert fresh.metrics["completed_loans"] == 1
+        assert fresh.metrics["active_loans"] == 0
+
+    def test_empty_tables(self):
+        """Missing tables produce zeroed metrics instead of errors."""
+        metrics = compute_portfolio_metrics({"loan_data": pd.DataFrame()})
+
+        assert metrics["total_records"] == 0
+        assert metrics["spanish_companies"] == 0
@@ -0,0 +1,120 @@
+"""Test suite for Abaco risk scoring."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.modeling import AbacoRiskModel
+
+
+@pytest.fixture
+def model():
+    """Risk model with the Abaco calibration."""
+    return AbacoRiskModel()
+
+
+@pytest.fixture
+def tape():
+    """Loan tape covering every branch of each score component."""
+    return pd.DataFrame(
+        {
+            "Days in Default": pd.array([0, 45, 400, None, -3, 180], dtype="Int64"),
+            "Loan Status": ["Current", "Default", "Complete", None, "Odd", "Unknown"],
+            "Interest Rate APR": [0.2947, 0.33, 0.50, np.nan, 0.0, 0.3699],
+            "Outstanding Loan Value": [0.0, 1000.0, 90000.0, np.nan, -5.0, 77175.0],
+        },
+        index=[5, 6, 7, 8, 9, 10],
+    )
+
+
+class TestScoreFrame:
+    """Tests for vectorized batch scoring."""
+
+    def test_matches_scalar_scores_exactly(self, model, tape):
+        """Batch scores equal the row-by-row scores bit for bit."""
+        expected = tape.apply(model.calculate_abaco_risk_score, axis=1)
+
+        result = model.score_frame(tape)
+
+        assert result.index.equals(tape.index)
+        assert np.array_equal(result.to_numpy(), expected.to_numpy())
+
+    def test_score_components(self, model, tape):
+        """Known loans get the documented component weights."""
+        result = model.score_frame(tape)
+
+        assert result[5] == 0.0
+        assert result[7] == pytest.approx(0.4 + 0.1)
+        assert result[10] == pytest.approx(0.4 + 0.15 + 0.2 + 0.1)
+
+    @pytest.mark.parametrize(
+        "column", ["Days in Default", "Loan Status", "Interest Rate APR"]
+    )
+    def test_missing_columns_use_scalar_defaults(self, model, tape, column):
+        """Absent columns score like the scalar version's defaults."""
+        partial = tape.drop(columns=column)
+        expected = partial.apply(model.calculate_abaco_risk_score, axis=1)
+
+        assert np.array_equal(
+            model.score_frame(partial).to_numpy(), expected.to_numpy()
+        )
+
+    def test_empty_frame(self, model):
+        """An empty tape produces an empty score series."""
+        assert model.score_frame(pd.DataFrame()).empty
+
+
+class TestEvaluateCompliance:
+    """Tests for the columnar USD factoring compliance evaluator."""
+
+    @pytest.fixture
+    def loans(self):
+        return pd.DataFrame(
+            {
+                "Company": ["Abaco Technologies", "Abaco Financial", "Other", None],
+                "Loan Currency": ["USD", "USD", "EUR", "USD"],
+                "Product Type": ["factoring", "factoring", "factoring", np.nan],
+                "Payment Frequency": ["bullet", "bullet", "monthly", "bullet"],
+                "Interest Rate APR": [0.2947, 0.50, 0.33, np.nan],
+            },
+            index=["a", "b", "c", "d"],
+        )
+
+    def test_matches_row_wise_validation(self, model, loans):
+        """Counts and failing rows agree with the per-loan validator."""
+        rows = loans.apply(model.validate_usd_factoring_compliance, axis=1)
+
+        report = model.evaluate_compliance(loans)
+
+        for rule, passed in report.passed.items():
+            assert passed == sum(result[rule] for result in rows)
+            failing = [label for label, r in rows.items() if not r[rule]]
+            assert report.failures[rule].tolist() == failing
+        assert report.total_compliant == 1
+
+    def test_summary_counts(self, model, loans):
+        """The summary reports passes and failures per rule."""
+        summary = model.evaluate_compliance(loans).summary()
+
+        assert summary["total_loans"] == 4
+        assert summary["failed"]["rate_in_range"] == 2
+        assert summary["passed"]["currency_usd"] == 3
+
+    def test_missing_columns_fail(self, model):
+        """Rules over absent columns fail for every loan."""
+        report = model.evaluate_compliance(pd.DataFrame({"Loan Currency": ["USD"]}))
+
+        assert report.passed["currency_usd"] == 1
+        assert report.passed["company_abaco"] == 0
+        assert report.total_compliant == 0
+
+    def test_portfolio_metrics_use_report(self, model, loans):
+        """Portfolio compliance analysis is built from the evaluator."""
+        metrics = model.calculate_portfolio_metrics(loans)
+
+        assert metrics["compliance_analysis"] == {
+            "total_compliant": 1,
+            "currency_compliant": 3,
+            "product_compliant": 3,
+            "payment_compliant": 3,
+        }
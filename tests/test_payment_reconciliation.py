@@ -0,0 +1,212 @@
+"""Test suite for the payment reconciliation engine."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.payment_processor import PaymentProcessor
+from src.payment_reconciliation import PaymentReconciler
+
+
+@pytest.fixture
+def schedule():
+    """Installments for three loans, deliberately out of order."""
+    return pd.DataFrame(
+        {
+            "Loan ID": ["L2", "L1", "L1", "L3", "L2"],
+            "Payment Date": [
+                "2024-02-01",
+                "2024-02-01",
+                "2024-01-01",
+                "2024-01-15",
+                "2024-01-01",
+            ],
+            "Principal Payment": [100.0, 100.0, 100.0, 50.0, 100.0],
+        }
+    )
+
+
+@pytest.fixture
+def payments():
+    """Payments: L1 pays late then short, L2 overpays, L4 has no schedule."""
+    return pd.DataFrame(
+        {
+            "Loan ID": ["L1", "L1", "L2", "L4", "L1", None],
+            "True Payment Date": [
+                "2024-01-11",
+                "2024-02-05",
+                "2023-12-20",
+                "2024-01-01",
+                None,
+                "2024-01-01",
+            ],
+            "True Principal Payment": [100.0, 60.0, 250.0, 10.0, 500.0, 5.0],
+        }
+    )
+
+
+@pytest.fixture
+def result(schedule, payments):
+    return PaymentReconciler().reconcile(schedule, payments, as_of="2024-03-01")
+
+
+class TestInstallments:
+    """Tests for installment settlement and true DPD."""
+
+    def test_settlement_and_dpd(self, result):
+        """Installments are settled oldest first and aged from their due date."""
+        rows = result.installments.set_index(["Loan ID", "Payment Date"])
+
+        first = rows.loc[("L1", pd.Timestamp("2024-01-01"))]
+        assert first["installment_status"] == "paid"
+        assert first["settled_date"] == pd.Timestamp("2024-01-11")
+        assert first["true_dpd"] == 10
+
+        second = rows.loc[("L1", pd.Timestamp("2024-02-01"))]
+        assert second["installment_status"] == "partial"
+        assert second["allocated_principal"] == 60.0
+        assert second["remaining_principal"] == 40.0
+        assert second["true_dpd"] == 29
+
+        unpaid = rows.loc[("L3", pd.Timestamp("2024-01-15"))]
+        assert unpaid["installment_status"] == "unpaid"
+        assert unpaid["true_dpd"] == 46
+
+    def test_early_payment_has_no_dpd(self, result):
+        """Installments paid before they fall due are never past due."""
+        rows = result.installments[result.installments["Loan ID"] == "L2"]
+
+        assert rows["installment_status"].tolist() == ["paid", "paid"]
+        assert rows["true_dpd"].tolist() == [0.0, 0.0]
+
+    def test_without_as_of_unpaid_have_no_dpd(self, schedule, payments):
+        """Without a cut-off date, unsettled installments are not aged."""
+        result = PaymentReconciler().reconcile(schedule, payments)
+        open_ = result.installments["installment_status"] != "paid"
+
+        assert result.installments.loc[open_, "true_dpd"].isna().all()
+
+    def test_as_of_excludes_later_payments(self, schedule, payments):
+        """Payments after the cut-off date are not counted."""
+        result = PaymentReconciler().reconcile(schedule, payments, as_of="2024-01-31")
+        l1 = result.loans.loc["L1"]
+
+        assert l1["paid_principal"] == 100.0
+        assert l1["installments_unpaid"] == 1
+
+    def test_tolerance(self):
+        """Shortfalls within the tolerance still settle an installment."""
+        schedule = pd.DataFrame(
+            {
+                "Loan ID": ["L1"],
+                "Payment Date": ["2024-01-01"],
+                "Principal Payment": [1.0],
+            }
+        )
+        payments = pd.DataFrame(
+            {
+                "Loan ID": ["L1"],
+                "True Payment Date": ["2024-01-03"],
+                "True Principal Payment": [0.99],
+            }
+        )
+
+        result = PaymentReconciler().reconcile(schedule, payments)
+
+        assert result.installments["installment_status"].tolist() == ["paid"]
+        assert result.installments["true_dpd"].tolist() == [2.0]
+
+
+class TestPaymentsAndLoans:
+    """Tests for payment pairing and loan balances."""
+
+    def test_payment_pairing(self, result):
+        """Each payment is paired with the first installment it covers."""
+        payments = result.payments.set_index(["Loan ID", "True Payment Date"])
+
+        late = payments.loc[("L1", pd.Timestamp("2024-02-05"))]
+        assert late["installment_due_date"] == pd.Timestamp("2024-02-01")
+        assert late["days_past_due"] == 4
+
+        over = payments.loc[("L2", pd.Timestamp("2023-12-20"))]
+        assert over["applied_principal"] == 200.0
+        assert over["overpaid_principal"] == 50.0
+
+        orphan = payments.loc[("L4", pd.Timestamp("2024-01-01"))]
+        assert pd.isna(orphan["installment_due_date"])
+        assert orphan["overpaid_principal"] == 10.0
+
+    def test_unplaceable_payments_left_out(self, result):
+        """Payments without a loan or date are not reconciled."""
+        assert len(result.payments) == 4
+
+    def test_loan_balances(self, result):
+        """Loans carry outstanding and overpaid principal."""
+        loans = result.loans
+
+        assert loans.loc["L1", "outstanding_principal"] == 40.0
+        assert loans.loc["L2", "overpayment"] == 50.0
+        assert loans.loc["L3", "outstanding_principal"] == 50.0
+        assert loans.loc["L4", "overpayment"] == 10.0
+        assert loans.loc["L1", "max_true_dpd"] == 29
+        assert np.isnan(loans.loc["L4", "max_true_dpd"])
+
+    def test_summary(self, result):
+        """The summary totals installment statuses and balances."""
+        summary = result.summary()
+
+        assert summary["installments_paid"] == 3
+        assert summary["installments_partial"] == 1
+        assert summary["installments_unpaid"] == 1
+        assert summary["outstanding_principal"] == 90.0
+        assert summary["overpayment"] == 60.0
+
+    def test_matches_per_loan_allocation(self):
+        """Vectorized results agree with allocating each loan separately."""
+        rng = np.random.default_rng(11)
+        n = 400
+        schedule = pd.DataFrame(
+            {
+                "Loan ID": rng.integers(0, 60, n).astype(str),
+                "Payment Date": pd.Timestamp("2024-01-01")
+                + pd.to_timedelta(rng.integers(0, 200, n), unit="D"),
+                "Principal Payment": rng.integers(1, 500, n) * 1.0,
+            }
+        )
+        payments = pd.DataFrame(
+            {
+                "Loan ID": rng.integers(0, 70, n).astype(str),
+                "True Payment Date": pd.Timestamp("2024-01-01")
+                + pd.to_timedelta(rng.integers(0, 250, n), unit="D"),
+                "True Principal Payment": rng.integers(0, 700, n) * 1.0,
+            }
+        )
+
+        result = PaymentReconciler(tolerance=0).reconcile(schedule, payments)
+
+        for loan_id, rows in result.installments.groupby("Loan ID"):
+            paid = payments[payments["Loan ID"] == loan_id].sort_values(
+                "True Payment Date", kind="stable"
+            )
+            running = paid["True Principal Payment"].cumsum().to_numpy()
+            owed = rows["scheduled_principal"].cumsum().to_numpy()
+            for due, settled, total in zip(
+                rows["Payment Date"], rows["settled_date"], owed
+            ):
+                hits = np.flatnonzero(running >= total)
+                expected = (
+                    paid["True Payment Date"].iloc[hits[0]] if len(hits) else pd.NaT
+                )
+                assert settled == expected or (pd.isna(settled) and pd.isna(expected))
+
+
+class TestPaymentProcessorIntegration:
+    """Tests for reconciliation through PaymentProcessor."""
+
+    def test_reconcile_payments(self, schedule, payments):
+        """The processor delegates to the reconciliation engine."""
+        result = PaymentProcessor().reconcile_payments(
+            schedule, payments, as_of="2024-03-01"
+        )
+
+        assert result.loans.loc["L1", "outstanding_principal"] == 40.0
@@ -0,0 +1,258 @@
+"""Test suite for the interval-join pricing engine."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import pricing_engine
+from src.pricing_engine import (
+    NO_BAND,
+    BandIndex,
+    interval_join,
+    load_band_keys,
+    load_grid,
+    load_pricing_config,
+)
+from src.pricing_enricher import PricingEnricher
+
+BAND_KEYS = {
+    "tenor_days": ("tenor_min", "tenor_max"),
+    "amount": ("amount_min", "amount_max"),
+}
+
+
+@pytest.fixture
+def grid():
+    """Pricing grid with two segments, an overlap and an open-ended band."""
+    return pd.DataFrame(
+        {
+            "segment": ["A", "A", "A", "B", "B"],
+            "tenor_min": [0, 31, 0, 0, 91],
+            "tenor_max": [30, 90, 90, 90, None],
+            "amount_min": [0.0, 0.0, 5000.0, 0.0, 0.0],
+            "amount_max": [10000.0, 10000.0, 50000.0, 50000.0, 50000.0],
+            "recommended_rate": [0.30, 0.32, 0.28, 0.35, 0.40],
+        }
+    )
+
+
+@pytest.fixture
+def loans():
+    """Loans hitting single bands, the overlap, gaps and an unknown segment."""
+    return pd.DataFrame(
+        {
+            "loan_id": ["L1", "L2", "L3", "L4", "L5", "L6", "L7"],
+            "segment": ["A", "A", "A", "A", "B", "C", "B"],
+            "tenor_days": [30, 31, 60, 120, 400, 10, np.nan],
+            "amount": [1000.0, 9999.5, 8000.0, 1000.0, 100.0, 100.0, 100.0],
+        },
+        index=[10, 11, 12, 13, 14, 15, 16],
+    )
+
+
+class TestBandIndex:
+    """Tests for band resolution by binary search."""
+
+    def test_lookup_positions(self, grid, loans):
+        """Each loan resolves to the grid row whose bands contain it."""
+        index = BandIndex(grid, ["segment"], BAND_KEYS)
+
+        matched = index.lookup(loans)
+
+        assert matched.tolist() == [0, 1, 1, NO_BAND, 4, NO_BAND, NO_BAND]
+
+    def test_bounds_inclusive(self, grid):
+        """Values on either bound belong to the band."""
+        index = BandIndex(grid.iloc[[0]], ["segment"], BAND_KEYS)
+        loans = pd.DataFrame(
+            {"segment": ["A"] * 3, "tenor_days": [0, 30, 30.5], "amount": 10000.0}
+        )
+
+        assert index.lookup(loans).tolist() == [0, 0, NO_BAND]
+
+    def test_overlap_first_grid_row_wins(self, grid):
+        """Overlapping bands resolve to the earliest grid row, whatever the order."""
+        loans = pd.DataFrame({"segment": ["A"], "tenor_days": [20], "amount": [6000]})
+
+        forward = BandIndex(grid, ["segment"], BAND_KEYS).lookup(loans)
+        reordered = grid.iloc[[2, 0, 1, 3, 4]].reset_index(drop=True)
+        backward = BandIndex(reordered, ["segment"], BAND_KEYS).lookup(loans)
+
+        assert forward.tolist() == [0]
+        assert backward.tolist() == [0]
+        assert reordered.loc[0, "recommended_rate"] == 0.28
+
+    def test_matches_brute_force(self, grid):
+        """Resolution agrees with scanning every band in grid order."""
+        rng = np.random.default_rng(3)
+        loans = pd.DataFrame(
+            {
+                "segment": rng.choice(["A", "B", "C"], 500),
+                "tenor_days": rng.integers(-5, 200, 500),
+                "amount": rng.uniform(-100, 60000, 500).round(0),
+            }
+        )
+        bounds = grid.fillna({"tenor_max": np.inf})
+
+        def brute(row):
+            for position, band in bounds.iterrows():
+                if (
+                    band["segment"] == row["segment"]
+                    and band["tenor_min"] <= row["tenor_days"] <= band["tenor_max"]
+                    and band["amount_min"] <= row["amount"] <= band["amount_max"]
+                ):
+                    return position
+            return NO_BAND
+
+        expected = loans.apply(brute, axis=1).to_numpy()
+        result = BandIndex(grid, ["segment"], BAND_KEYS).lookup(loans)
+
+        assert np.array_equal(result, expected)
+
+    def test_candidate_sets_match_dense_table(self, grid, monkeypatch):
+        """Groups too large for a dense table resolve to the same bands."""
+        rng = np.random.default_rng(18)
+        loans = pd.DataFrame(
+            {
+                "segment": rng.choice(["A", "B", "C"], 300),
+                "tenor_days": rng.integers(-5, 200, 300).astype(float),
+                "amount": rng.uniform(-100, 60000, 300).round(0),
+            }
+        )
+        loans.loc[::7, "amount"] = np.nan
+        dense = BandIndex(grid, ["segment"], BAND_KEYS).lookup(loans)
+
+        monkeypatch.setattr(pricing_engine, "MAX_DENSE_CELLS", 0)
+        monkeypatch.setattr(pricing_engine, "RESOLVE_CHUNK_CELLS", 64)
+        index = BandIndex(grid, ["segment"], BAND_KEYS)
+
+        assert all(
+            isinstance(group, pricing_engine._CandidateGroupIndex)
+            for group in index._groups.values()
+        )
+        assert np.array_equal(index.lookup(loans), dense)
+
+    def test_without_join_keys(self, grid):
+        """With no exact keys the whole grid is one band group."""
+        index = BandIndex(grid, [], {"tenor_days": ("tenor_min", "tenor_max")})
+        loans = pd.DataFrame({"tenor_days": [45, 500]})
+
+        assert index.lookup(loans).tolist() == [1, 4]
+
+
+class TestIntervalJoin:
+    """Tests for attaching grid columns to loans."""
+
+    def test_one_row_per_loan(self, grid, loans):
+        """The join keeps loan order and index; unmatched loans get NaN."""
+        index = BandIndex(grid, ["segment"], BAND_KEYS)
+
+        result = interval_join(loans, grid, index)
+
+        assert result.index.equals(loans.index)
+        assert result["loan_id"].tolist() == loans["loan_id"].tolist()
+        np.testing.assert_array_equal(
+            result["recommended_rate"].to_numpy(),
+            [0.30, 0.32, 0.32, np.nan, 0.40, np.nan, np.nan],
+        )
+
+    def test_clashing_columns_are_suffixed(self, grid, loans):
+        """Grid columns never overwrite loan columns of the same name."""
+        index = BandIndex(grid, ["segment"], BAND_KEYS)
+        loans = loans.assign(recommended_rate=0.5)
+
+        result = interval_join(loans, grid, index, ["recommended_rate"])
+
+        assert result["recommended_rate"].eq(0.5).all()
+        assert result["recommended_rate_grid"].tolist()[:2] == [0.30, 0.32]
+        with pytest.raises(ValueError):
+            interval_join(
+                loans.assign(recommended_rate_grid=1.0),
+                grid,
+                index,
+                ["recommended_rate"],
+            )
+
+
+class TestPricingEnricher:
+    """Tests for PricingEnricher on top of the engine."""
+
+    @pytest.fixture
+    def grid_file(self, grid, tmp_path):
+        path = tmp_path / "pricing.csv"
+        grid.to_csv(path, index=False)
+        return path
+
+    def test_enrich_with_bands(self, grid_file, loans):
+        """Band enrichment prices each loan once and supports fallbacks."""
+        enricher = PricingEnricher()
+
+        result = enricher.enrich_with_pricing(
+            loans, str(grid_file), ["segment"], band_keys=BAND_KEYS
+        )
+        priced = enricher.apply_fallback_pricing(result, {"recommended_rate": 0.45})
+
+        assert len(result) == len(loans)
+        assert priced["recommended_rate"].tolist() == [
+            0.30,
+            0.32,
+            0.32,
+            0.45,
+            0.40,
+            0.45,
+            0.45,
+        ]
+
+    def test_band_enrichment_attaches_rate_columns(self, grid_file, loans):
+        """Only the rate columns are attached, not the band bounds."""
+        enricher = PricingEnricher()
+        default = enricher.enrich_with_pricing(
+            loans, str(grid_file), ["segment"], band_keys=BAND_KEYS
+        )
+        explicit = enricher.enrich_with_pricing(
+            loans.assign(tenor_min=-1),
+            str(grid_file),
+            ["segment"],
+            band_keys=BAND_KEYS,
+            rate_cols=("recommended_rate", "tenor_min"),
+        )
+
+        assert list(default.columns) == list(loans.columns) + ["recommended_rate"]
+        assert explicit["tenor_min"].eq(-1).all()
+        assert explicit["tenor_min_grid"].tolist()[:2] == [0, 31]
+
+    def test_exact_join_without_bands(self, grid_file, loans):
+        """Without bands the enricher is a left merge on the join keys."""
+        result = PricingEnricher().enrich_with_pricing(
+            loans, str(grid_file), ["segment"]
+        )
+
+        assert len(result) == 3 * 4 + 2 * 2 + 1
+
+    def test_grid_and_index_cached_per_version(self, grid, grid_file):
+        """Grids parse once per file version; a rewrite rebuilds the index."""
+        enricher = PricingEnricher()
+
+        first = enricher.band_index(str(grid_file), ["segment"], BAND_KEYS)
+        assert enricher.band_index(str(grid_file), ["segment"], BAND_KEYS) is first
+        assert load_grid(grid_file) is load_grid(grid_file)
+
+        grid.assign(recommended_rate=0.5).iloc[:2].to_csv(grid_file, index=False)
+        second = enricher.band_index(str(grid_file), ["segment"], BAND_KEYS)
+
+        assert second is not first
+        assert second.n_bands == 2
+        assert len(enricher._band_indexes) == 1
+
+    def test_loaded_grid_is_a_copy(self, grid_file):
+        """Callers may modify the grid returned by load_pricing_grid."""
+        enricher = PricingEnricher()
+        loaded = enricher.load_pricing_grid(str(grid_file))
+        loaded["recommended_rate"] = 0.0
+
+        assert load_grid(grid_file)["recommended_rate"].max() == 0.40
+
+    def test_band_keys_from_config(self):
+        """Band keys come from the repository pricing configuration."""
+        assert load_band_keys(load_pricing_config()) == BAND_KEYS
+        assert PricingEnricher().configured_band_keys() == BAND_KEYS
@@ -0,0 +1,138 @@
+"""Test suite for the Abaco loan and customer point-lookup indexes."""
+
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from src.dataset_cache import DatasetCache
+from src.record_index import AbacoRecordIndex, build_key_index, sections_to_json
+
+FILES = {
+    "loan_data": ("Abaco - Loan Tape_Loan Data_Table.csv", "Loan Data"),
+    "payment_history": (
+        "Abaco - Loan Tape_Historic Real Payment_Table.csv",
+        "Historic Real Payment",
+    ),
+    "payment_schedule": (
+        "Abaco - Loan Tape_Payment Schedule_Table.csv",
+        "Payment Schedule",
+    ),
+    "collateral": ("Abaco - Loan Tape_Collateral_Table.csv", "Collateral"),
+}
+
+
+def _reader(filename):
+    return lambda base_path: pd.read_csv(base_path / filename)
+
+
+@pytest.fixture
+def tape_dir(tmp_path):
+    """Temporary tape with two customers, three loans and related rows."""
+    frames = {
+        "loan_data": {
+            "Customer ID": ["C1", "C2", "C1"],
+            "Loan ID": ["L1", "L2", "L3"],
+            "Outstanding Loan Value": [10.0, 20.0, 30.0],
+        },
+        "payment_history": {
+            "Loan ID": ["L1", "L2", "L1", "L3"],
+            "True Payment Amount": [1.0, 2.0, 3.0, 4.0],
+        },
+        "payment_schedule": {
+            "Loan ID": ["L2", "L1", "L3"],
+            "Total Payment": [5.0, 6.0, 7.0],
+        },
+        "collateral": {"Loan ID": ["L1"], "Collateral Value": [8.0]},
+    }
+    for table, data in frames.items():
+        pd.DataFrame(data).to_csv(tmp_path / FILES[table][0], index=False)
+    return tmp_path
+
+
+@pytest.fixture
+def record_index(tape_dir):
+    """Record index over the temporary tape."""
+    tables = {
+        name: (_reader(filename), schema) for name, (filename, schema) in FILES.items()
+    }
+    return AbacoRecordIndex(DatasetCache(tape_dir, tables=tables))
+
+
+class TestBuildKeyIndex:
+    """Tests for the clustered key index."""
+
+    def test_spans_keep_file_order(self):
+        """Rows sharing a key are contiguous and stay in file order."""
+        df = pd.DataFrame({"k": ["a", "b", "a", "c"], "v": [1, 2, 3, 4]})
+        index = build_key_index(df, "k")
+
+        assert index.rows("a")["v"].tolist() == [1, 3]
+        assert index.rows("c")["v"].tolist() == [4]
+        assert index.rows("missing").empty
+        assert index.rows_many(["c", "a"])["v"].tolist() == [1, 3, 4]
+
+    def test_missing_keys_not_indexed(self):
+        """Rows without a key are left out of the index."""
+        df = pd.DataFrame({"k": [None, "a", None], "v": [1, 2, 3]})
+        index = build_key_index(df, "k")
+
+        assert list(index.spans) == ["a"]
+        assert len(index.frame) == 1
+
+    def test_missing_column(self):
+        """A table without the key column yields an empty index."""
+        index = build_key_index(pd.DataFrame({"v": [1]}), "k")
+
+        assert index.spans == {}
+        assert index.rows("a").empty
+
+
+class TestAbacoRecordIndex:
+    """Tests for loan and customer lookups across tables."""
+
+    def test_loan_lookup(self, record_index):
+        """A loan lookup returns its rows from every table."""
+        sections = record_index.loan("L1")
+
+        assert sections["loans"]["Outstanding Loan Value"].tolist() == [10.0]
+        assert sections["payments"]["True Payment Amount"].tolist() == [1.0, 3.0]
+        assert sections["schedule"]["Total Payment"].tolist() == [6.0]
+        assert sections["collateral"]["Collateral Value"].tolist() == [8.0]
+
+    def test_unknown_ids(self, record_index):
+        """Unknown loans and customers return None."""
+        assert record_index.loan("L9") is None
+        assert record_index.customer("C9") is None
+
+    def test_customer_lookup(self, record_index):
+        """A customer lookup gathers the rows of all its loans."""
+        sections = record_index.customer("C1")
+
+        assert sections["loans"]["Loan ID"].tolist() == ["L1", "L3"]
+        assert sections["payments"]["True Payment Amount"].tolist() == [1.0, 3.0, 4.0]
+        assert sections["schedule"]["Loan ID"].tolist() == ["L1", "L3"]
+        assert len(sections["collateral"]) == 1
+
+    def test_index_rebuilt_after_file_change(self, record_index, tape_dir):
+        """Editing a table file makes lookups see the new rows."""
+        assert len(record_index.loan("L2")["payments"]) == 1
+
+        path = tape_dir / FILES["payment_history"][0]
+        pd.DataFrame(
+            {"Loan ID": ["L2", "L2"], "True Payment Amount": [2.0, 9.0]}
+        ).to_csv(path, index=False)
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        payments = record_index.loan("L2")["payments"]
+        assert payments["True Payment Amount"].tolist() == [2.0, 9.0]
+
+    def test_sections_to_json(self, record_index):
+        """Lookup results encode to one JSON object with section counts."""
+        body = json.loads(sections_to_json({"loan_id": "L1"}, record_index.loan("L1")))
+
+        assert body["loan_id"] == "L1"
+        assert body["payments_count"] == 2
+        assert body["payments"][1]["True Payment Amount"] == 3.0
@@ -0,0 +1,165 @@
+"""Test suite for record filtering, pagination and encoding."""
+
+import io
+import json
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from src import record_query
+from src.record_query import (
+    RecordQuery,
+    RecordQueryError,
+    StaleCursorError,
+    arrow_page,
+    iter_arrow_ipc,
+    iter_ndjson,
+    iter_parquet,
+    paginate,
+    parse_fields,
+    resolve_format,
+    to_arrow_table,
+    to_json_bytes,
+)
+
+if record_query._ARROW_AVAILABLE:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+VERSION = (100, 1)
+
+
+@pytest.fixture
+def loans():
+    """Five loans across two companies."""
+    return pd.DataFrame(
+        {
+            "Company": pd.Categorical(
+                ["Abaco Technologies", "Abaco Financial"] * 2 + ["Abaco Financial"]
+            ),
+            "Loan ID": [f"DSB000{i}-001" for i in range(5)],
+            "Loan Status": ["Current", "Complete", "Current", "Default", "Current"],
+            "Disbursement Date": pd.to_datetime(
+                ["2025-01-01", "2025-02-01", "2025-03-01", "2025-04-01", None]
+            ),
+            "Outstanding Loan Value": [1.0, float("nan"), 3.0, 4.0, 5.0],
+        }
+    )
+
+
+class TestPagination:
+    """Tests for cursor pagination and projection."""
+
+    def test_cursor_walks_every_row_once(self, loans):
+        """Following next cursors visits each row exactly once."""
+        seen, cursor = [], None
+        while True:
+            page = paginate(loans, RecordQuery(limit=2, cursor=cursor), VERSION)
+            seen += page.frame["Loan ID"].tolist()
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        assert seen == loans["Loan ID"].tolist()
+
+    def test_cursor_rejected_after_data_change(self, loans):
+        """A cursor issued for an older data version is stale."""
+        page = paginate(loans, RecordQuery(limit=2), VERSION)
+
+        with pytest.raises(StaleCursorError):
+            paginate(loans, RecordQuery(cursor=page.next_cursor), (200, 2))
+
+    def test_projection_keeps_requested_order(self, loans):
+        """fields= selects and orders the returned columns."""
+        query = RecordQuery(fields=parse_fields("Loan ID, Company"))
+        page = paginate(loans, query, VERSION)
+
+        assert list(page.frame.columns) == ["Loan ID", "Company"]
+
+    def test_unknown_field_rejected(self, loans):
+        """Projecting a column that does not exist is a query error."""
+        with pytest.raises(RecordQueryError):
+            paginate(loans, RecordQuery(fields=["Nope"]), VERSION)
+
+
+class TestFilters:
+    """Tests for Company, Loan Status and date range filters."""
+
+    def test_company_and_status(self, loans):
+        """Filters combine with AND semantics."""
+        query = RecordQuery(company="Abaco Financial", loan_status="Current")
+        page = paginate(loans, query, VERSION)
+
+        assert page.frame["Loan ID"].tolist() == ["DSB0004-001"]
+        assert page.total == 1
+
+    def test_date_range_is_inclusive(self, loans):
+        """Both bounds are inclusive and missing dates never match."""
+        query = RecordQuery(date_from=date(2025, 2, 1), date_to=date(2025, 3, 1))
+        page = paginate(loans, query, VERSION, date_column="Disbursement Date")
+
+        assert page.frame["Loan ID"].tolist() == ["DSB0001-001", "DSB0002-001"]
+
+    def test_filter_on_missing_column(self, loans):
+        """Filtering on a column the table lacks is a query error."""
+        with pytest.raises(RecordQueryError):
+            paginate(
+                loans.drop(columns="Loan Status"), RecordQuery(loan_status="Current")
+            )
+
+
+class TestEncoding:
+    """Tests for JSON/NDJSON encoding and format negotiation."""
+
+    def test_ndjson_round_trips_in_chunks(self, loans):
+        """Chunked NDJSON encodes every row once with nulls for NaN."""
+        lines = b"".join(iter_ndjson(loans, chunk_rows=2)).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+
+        assert [row["Loan ID"] for row in rows] == loans["Loan ID"].tolist()
+        assert rows[1]["Outstanding Loan Value"] is None
+
+    def test_json_array(self, loans):
+        """JSON encoding yields an array and an empty frame yields []."""
+        assert len(json.loads(to_json_bytes(loans))) == 5
+        assert to_json_bytes(loans.iloc[0:0]) == b"[]"
+
+    def test_format_negotiation(self):
+        """Explicit format wins, then the Accept header, then JSON."""
+        assert resolve_format("ndjson", "application/json") == "ndjson"
+        assert resolve_format(None, "application/x-ndjson; q=1") == "ndjson"
+        assert resolve_format(None, "*/*") == "json"
+        with pytest.raises(RecordQueryError):
+            resolve_format("xml")
+
+
+@pytest.mark.skipif(not record_query._ARROW_AVAILABLE, reason="pyarrow not installed")
+class TestBinaryFormats:
+    """Tests for Arrow IPC and Parquet encodings."""
+
+    def test_arrow_stream_preserves_schema(self, loans):
+        """An unfiltered Arrow page round-trips with its pandas dtypes."""
+        page = paginate(loans, RecordQuery(), VERSION)
+        table = arrow_page(to_arrow_table(loans), page)
+
+        stream = b"".join(iter_arrow_ipc(table, chunk_rows=2))
+        result = pa.ipc.open_stream(stream).read_all().to_pandas()
+
+        pd.testing.assert_frame_equal(result, loans)
+
+    def test_parquet_page_matches_json_page(self, loans):
+        """Filtered, projected Parquet pages hold the same rows as JSON pages."""
+        query = RecordQuery(limit=1, company="Abaco Financial", fields=["Loan ID"])
+        page = paginate(loans, query, VERSION)
+        table = arrow_page(to_arrow_table(loans), page)
+
+        result = pq.read_table(io.BytesIO(b"".join(iter_parquet(table, chunk_rows=1))))
+
+        assert result.column_names == ["Loan ID"]
+        assert result.column("Loan ID").to_pylist() == page.frame["Loan ID"].tolist()
+
+    def test_accept_header_selects_binary(self):
+        """Arrow and Parquet media types, including aliases, are negotiated."""
+        assert resolve_format(None, "application/vnd.apache.arrow.stream") == "arrow"
+        assert resolve_format(None, "application/x-parquet") == "parquet"
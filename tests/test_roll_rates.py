@@ -0,0 +1,188 @@
+"""Test suite for the DPD roll-rate transition engine."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.payment_reconciliation import PaymentReconciler
+from src.pipeline import CommercialViewPipeline
+from src.roll_rates import OFF_BOOK, RollRateEngine
+
+EARLY, MODERATE, LATE, CLOSED_CODE = 1, 2, 3, 7
+
+
+@pytest.fixture
+def engine():
+    return RollRateEngine()
+
+
+class TestMonthEndStates:
+    """Tests for month-end DPD reconstruction."""
+
+    def test_states_and_balances(self, engine, loans, schedule, payments):
+        """Each month-end gets the bucket of the oldest open installment."""
+        ends, loan_ids, state, balance = engine.month_end_states(
+            loans, schedule, payments
+        )
+
+        assert ends.strftime("%Y-%m-%d").tolist() == [
+            "2024-01-31",
+            "2024-02-29",
+            "2024-03-31",
+        ]
+        assert loan_ids.tolist() == ["A", "B", "C"]
+        assert state.tolist() == [
+            [EARLY, OFF_BOOK, EARLY],
+            [EARLY, CLOSED_CODE, MODERATE],
+            [CLOSED_CODE, CLOSED_CODE, LATE],
+        ]
+        assert balance.tolist() == [
+            [200.0, 0.0, 300.0],
+            [100.0, 0.0, 300.0],
+            [0.0, 0.0, 300.0],
+        ]
+
+    def test_matches_reconciliation_as_of_each_month(self, engine):
+        """States agree with reconciling the tables as of every month-end."""
+        rng = np.random.default_rng(21)
+        n_loans, n = 40, 160
+        start = pd.Timestamp("2024-01-01")
+        loans = pd.DataFrame(
+            {
+                "Loan ID": np.arange(n_loans).astype(str),
+                "Disbursement Date": start
+                + pd.to_timedelta(rng.integers(0, 60, n_loans), unit="D"),
+            }
+        )
+        schedule = pd.DataFrame(
+            {
+                "Loan ID": rng.integers(0, n_loans, n).astype(str),
+                "Payment Date": start
+                + pd.to_timedelta(rng.integers(30, 200, n), unit="D"),
+                "Principal Payment": rng.integers(1, 50, n) * 10.0,
+            }
+        )
+        payments = pd.DataFrame(
+            {
+                "Loan ID": rng.integers(0, n_loans, n).astype(str),
+                "True Payment Date": start
+                + pd.to_timedelta(rng.integers(30, 300, n), unit="D"),
+                "True Principal Payment": rng.integers(1, 50, n) * 10.0,
+            }
+        )
+
+        ends, loan_ids, state, balance = engine.month_end_states(
+            loans, schedule, payments
+        )
+        disbursed = pd.to_datetime(loans.set_index("Loan ID")["Disbursement Date"])
+
+        for t, month_end in enumerate(ends):
+            result = PaymentReconciler().reconcile(schedule, payments, as_of=month_end)
+            open_ = result.installments[
+                result.installments["installment_status"] != "paid"
+            ]
+            dpd = open_.groupby("Loan ID")["true_dpd"].max()
+            for j, loan_id in enumerate(loan_ids):
+                if disbursed[loan_id] > month_end:
+                    assert state[t, j] == OFF_BOOK
+                elif loan_id not in dpd.index:
+                    assert state[t, j] == CLOSED_CODE
+                else:
+                    expected = engine.dpd_engine.codes(np.array([dpd[loan_id]]))[0]
+                    assert state[t, j] == expected
+                    assert balance[t, j] == pytest.approx(
+                        result.loans.loc[loan_id, "outstanding_principal"]
+                    )
+
+
+class TestTransitions:
+    """Tests for transition matrices and projections."""
+
+    @pytest.fixture
+    def matrices(self, engine, loans, schedule, payments):
+        return engine.transitions(loans, schedule, payments)
+
+    def test_counts_per_month_pair(self, matrices):
+        """Counts include every loan on book at both month-ends."""
+        assert matrices.counts.shape == (2, 8, 8)
+        assert matrices.counts[0, EARLY, EARLY] == 1
+        assert matrices.counts[0, EARLY, MODERATE] == 1
+        assert matrices.counts[0].sum() == 2
+        assert matrices.counts[1, CLOSED_CODE, CLOSED_CODE] == 1
+        assert matrices.counts[1, MODERATE, LATE] == 1
+
+    def test_count_and_balance_weighted_rates(self, matrices):
+        """Pooled rates weight transitions by count or opening balance."""
+        counts = matrices.matrix()
+        weighted = matrices.matrix(weighted=True)
+
+        assert counts.loc["early_delinquent"].tolist()[1:3] == [1 / 3, 1 / 3]
+        assert counts.loc["early_delinquent", "closed"] == pytest.approx(1 / 3)
+        assert weighted.loc["early_delinquent", "early_delinquent"] == 1 / 3
+        assert weighted.loc["early_delinquent", "moderate_delinquent"] == 0.5
+        assert weighted.loc["early_delinquent", "closed"] == pytest.approx(1 / 6)
+
+    def test_rows_are_stochastic(self, matrices):
+        """Every row sums to one; closed and unobserved states stay put."""
+        rates = matrices.matrix()
+
+        assert np.allclose(rates.sum(axis=1), 1.0)
+        assert rates.loc["closed", "closed"] == 1.0
+        assert rates.loc["npl", "npl"] == 1.0
+
+    def test_roll_rates(self, matrices):
+        """Roll rates read the one-bucket-worse transitions."""
+        rolls = matrices.roll_rates()
+
+        assert rolls["early_delinquent->moderate_delinquent"] == pytest.approx(1 / 3)
+        assert rolls["moderate_delinquent->late_delinquent"] == 1.0
+
+    def test_projection_is_matrix_power(self, matrices):
+        """Multi-month projections chain the monthly matrix."""
+        monthly = matrices.matrix().to_numpy()
+
+        three = matrices.project(3)
+
+        assert np.allclose(three.to_numpy(), monthly @ monthly @ monthly)
+        assert np.allclose(matrices.project(0).to_numpy(), np.eye(8))
+
+    def test_project_distribution(self, matrices):
+        """Distributions roll forward and keep their total."""
+        initial = pd.Series({"early_delinquent": 600.0, "current": 400.0})
+
+        projected = matrices.project_distribution(initial, 2, weighted=True)
+
+        assert projected.sum() == pytest.approx(1000.0)
+        assert projected["closed"] > 0
+
+    def test_monthly_rates(self, matrices):
+        """Per-month matrices are keyed by the opening month-end."""
+        monthly = matrices.monthly()
+
+        first = monthly[pd.Timestamp("2024-01-31")]
+        assert first.loc["early_delinquent", "moderate_delinquent"] == 0.5
+
+
+class TestPipelineIntegration:
+    """Tests for roll rates through the pipeline."""
+
+    def test_compute_dpd_transitions(self, loans, schedule, payments):
+        """The pipeline builds transitions from its loaded tables."""
+        pipeline = CommercialViewPipeline()
+        pipeline._datasets = {
+            "loan_data": loans,
+            "payment_schedule": schedule,
+            "historic_real_payment": payments,
+        }
+
+        matrices = pipeline.compute_dpd_transitions()
+
+        assert matrices.counts.sum() == 5
+        assert pipeline.compute_dpd_transitions() is matrices
+
+    def test_missing_tables(self, loans):
+        """Without schedule or payments there are no transitions."""
+        pipeline = CommercialViewPipeline()
+        pipeline._datasets = {"loan_data": loans}
+
+        assert pipeline.compute_dpd_transitions() is None
@@ -0,0 +1,111 @@
+"""Test suite for the memoized Spanish entity classifier."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.spanish_entities import SpanishEntityClassifier
+
+
+@pytest.fixture
+def classifier():
+    """Classifier with the default Abaco patterns."""
+    return SpanishEntityClassifier()
+
+
+@pytest.fixture
+def names():
+    """Client names covering every class, with repeats and missing values."""
+    return pd.Series(
+        [
+            "SERVICIOS TECNICOS MEDICOS, S.A. DE C.V.",
+            "Hospital Nacional Rosales, s.a.",
+            "KEVIN ENRIQUE CABEZAS MORALES",
+            "ACME LLC",
+            None,
+            "SERVICIOS TECNICOS MEDICOS, S.A. DE C.V.",
+            "DISTRIBUIDORA S.R.L.",
+        ],
+        index=list("abcdefg"),
+    )
+
+
+class TestSpanishEntityClassifier:
+    """Tests for pattern priority, broadcasting and caching."""
+
+    def test_classify_columns(self, classifier, names):
+        """Each row gets its entity type, matched pattern and confidence."""
+        result = classifier.classify(names)
+
+        assert result.index.equals(names.index)
+        assert result["entity_type"].tolist() == [
+            "sociedad_anonima_cv",
+            "sociedad_anonima",
+            "individual",
+            "other",
+            "unknown",
+            "sociedad_anonima_cv",
+            "sociedad_limitada",
+        ]
+        assert result["is_spanish"].tolist() == [
+            True,
+            True,
+            True,
+            False,
+            False,
+            True,
+            True,
+        ]
+        assert result.loc["b", "pattern_matched"] == "S.A."
+        assert result.loc["c", "confidence"] == 0.85
+
+    def test_pattern_priority_beats_position(self, classifier):
+        """The first pattern in priority order wins, wherever it occurs."""
+        result = classifier.identify("HOSPITAL NACIONAL, S.A.")
+
+        assert result["pattern_matched"] == "S.A."
+
+    def test_matches_row_wise_classification(self, classifier, names):
+        """Column results agree with classifying names one at a time."""
+        result = classifier.classify(names)
+
+        for label, name in names.items():
+            single = classifier.identify(name)
+            assert single["entity_type"] == result.loc[label, "entity_type"]
+            assert single["confidence"] == result.loc[label, "confidence"]
+
+    def test_distinct_names_scanned_once(self, classifier, names):
+        """Repeated names, and names seen in earlier calls, are not rescanned."""
+        classifier.is_spanish(names)
+        assert classifier.scanned_names == 5
+
+        classifier.classify(pd.Series(["acme llc", "NEW CLIENT"]))
+        assert classifier.cache_info() == {"cached_names": 6, "scanned_names": 6}
+
+    def test_cache_bounded(self, names):
+        """The cache is cleared once it reaches its size limit."""
+        classifier = SpanishEntityClassifier(max_cached_names=2)
+
+        flags = classifier.is_spanish(names)
+
+        assert classifier.cache_info()["cached_names"] <= 2
+        assert flags.tolist() == [True, True, True, False, False, True, True]
+
+    def test_empty_column(self, classifier):
+        """An empty column yields an empty result."""
+        assert len(classifier.is_spanish(pd.Series([], dtype=object))) == 0
+        assert classifier.classify(pd.Series([], dtype=object)).empty
+
+
+class TestRiskModelIntegration:
+    """Tests for the classifier as used by AbacoRiskModel."""
+
+    def test_portfolio_spanish_count(self, names):
+        """Portfolio metrics count Spanish clients through the classifier."""
+        from src.modeling import AbacoRiskModel
+
+        loans = pd.DataFrame({"Cliente": names})
+        metrics = AbacoRiskModel().calculate_portfolio_metrics(loans)
+
+        assert metrics["spanish_analysis"]["spanish_clients"] == 5
+        assert np.isclose(metrics["spanish_analysis"]["spanish_percentage"], 500 / 7)
@@ -0,0 +1,193 @@
+"""Test suite for the memoized stage graph and the pipeline stages built on it."""
+
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from src.pipeline import CommercialViewPipeline
+from src.stage_graph import StageGraph
+
+
+@pytest.fixture
+def sources():
+    """Mutable source mapping read by the graph."""
+    return {"numbers": [1, 2, 3]}
+
+
+@pytest.fixture
+def graph(sources):
+    """Diamond-shaped graph: total and count both feed mean."""
+    graph = StageGraph(sources.get)
+    graph.add("total", sum, ["numbers"])
+    graph.add("count", len, ["numbers"])
+    graph.add("mean", lambda total, count: total / count, ["total", "count"])
+    return graph
+
+
+class TestStageGraph:
+    """Tests for dependency resolution, memoization and timings."""
+
+    def test_each_stage_computed_once(self, graph):
+        """Shared intermediates are computed once and then reused."""
+        assert graph.get("mean") == 2
+        assert graph.get("mean") == 2
+        assert graph.get("total") == 6
+
+        timings = graph.timings()
+        assert {name: t["computes"] for name, t in timings.items()} == {
+            "total": 1,
+            "count": 1,
+            "mean": 1,
+        }
+        assert timings["mean"]["hits"] == 1
+        assert timings["total"]["last_seconds"] >= 0
+
+    def test_replaced_source_recomputes_downstream(self, graph, sources):
+        """Replacing a source recomputes the stages that read it."""
+        graph.get("mean")
+        sources["numbers"] = [10, 20]
+
+        assert graph.get("mean") == 15
+        assert graph.timings()["total"]["computes"] == 2
+
+    def test_unrelated_source_keeps_results(self, sources):
+        """Stages not reading a replaced source keep their results."""
+        sources["other"] = "a"
+        graph = StageGraph(sources.get)
+        graph.add("total", sum, ["numbers"])
+        graph.add("upper", str.upper, ["other"])
+        graph.get("total")
+        graph.get("upper")
+
+        sources["other"] = "b"
+        assert graph.get("upper") == "B"
+        graph.get("total")
+        assert graph.timings()["total"]["computes"] == 1
+
+    def test_duplicate_names_rejected(self, graph):
+        """A name can only be a stage once, and never both stage and source."""
+        with pytest.raises(ValueError):
+            graph.add("total", sum, ["numbers"])
+        with pytest.raises(ValueError):
+            graph.add("numbers", list)
+
+
+class TestPipelineStages:
+    """Tests for the memoized CommercialViewPipeline stages."""
+
+    @pytest.fixture
+    def pipeline(self):
+        pipeline = CommercialViewPipeline()
+        pipeline._datasets = {
+            "loan_data": pd.DataFrame(
+                {
+                    "Customer ID": ["C1", "C2", "C1"],
+                    "Loan ID": ["L1", "L2", "L3"],
+                    "Disbursement Date": pd.to_datetime(
+                        ["2025-01-15", "2025-02-10", "2025-01-20"]
+                    ),
+                    "Disbursement Amount": [100.0, 200.0, 300.0],
+                    "Interest Rate APR": [0.3, 0.2, 0.4],
+                    "Days in Default": [0, 45, 200],
+                    "Outstanding Loan Value": [50.0, 150.0, 300.0],
+                }
+            ),
+            "historic_real_payment": pd.DataFrame(
+                {
+                    "Loan ID": ["L1", "L2"],
+                    "True Payment Date": pd.to_datetime(["2025-02-15", "2025-03-10"]),
+                    "True Principal Payment": [50.0, 50.0],
+                }
+            ),
+        }
+        return pipeline
+
+    def test_summary_computes_intermediates_once(self, pipeline):
+        """The executive summary reuses the portfolio metrics stages."""
+        summary = pipeline.generate_executive_summary()
+        pipeline.compute_portfolio_metrics()
+        pipeline.compute_dpd_metrics()
+
+        timings = pipeline.stage_timings()
+        assert timings["portfolio_metrics"]["computes"] == 1
+        assert timings["dpd_buckets"]["computes"] == 1
+        assert summary["portfolio_overview"]["outstanding_balance"] == 500.0
+        assert summary["risk_indicators"]["dpd_distribution"]["npl"] == 300.0
+        assert summary["data_quality"]["total_loans"] == 3
+
+    def test_payment_refresh_keeps_loan_stages(self, pipeline):
+        """New payments recompute recovery curves but not loan metrics."""
+        pipeline.compute_portfolio_metrics()
+        first = pipeline.compute_recovery_metrics()
+
+        pipeline._datasets["historic_real_payment"] = pd.DataFrame(
+            {
+                "Loan ID": ["L1"],
+                "True Payment Date": pd.to_datetime(["2025-02-15"]),
+                "True Principal Payment": [100.0],
+            }
+        )
+        second = pipeline.compute_recovery_metrics()
+        pipeline.compute_portfolio_metrics()
+
+        timings = pipeline.stage_timings()
+        assert timings["payment_dates"]["computes"] == 2
+        assert timings["portfolio_metrics"]["computes"] == 1
+        assert timings["loan_cohorts"]["computes"] == 1
+        assert len(first) == 5 and len(second) == 3
+        # Recovery is over the cohort's total disbursement (L1 + L3 in January)
+        assert second["recovery_pct"].tolist() == [0.0, 25.0, 0.0]
+
+    def test_dpd_frame_is_not_shared(self, pipeline):
+        """Changing the returned DPD frame does not touch the memoized stage."""
+        first = pipeline.compute_dpd_metrics()
+        first["Days in Default"] = -1
+        second = pipeline.compute_dpd_metrics()
+
+        assert second["Days in Default"].tolist() == [0, 45, 200]
+        assert second is not first
+        assert "reference_date" not in pipeline.stages.get("dpd_frame")
+        assert pipeline.stage_timings()["dpd_frame"]["computes"] == 1
+
+    def test_returned_metrics_are_not_shared(self, pipeline):
+        """Mutating returned metrics or summaries leaves the next call intact."""
+        metrics = pipeline.compute_portfolio_metrics()
+        metrics["portfolio_outstanding"] = 0
+        metrics["dpd_distribution"]["npl"] = 0
+        summary = pipeline.generate_executive_summary()
+        summary["portfolio_overview"]["outstanding_balance"] = 0
+
+        assert pipeline.compute_portfolio_metrics()["portfolio_outstanding"] == 500.0
+        again = pipeline.generate_executive_summary()
+        assert again["portfolio_overview"]["outstanding_balance"] == 500.0
+        assert again["risk_indicators"]["dpd_distribution"]["npl"] == 300.0
+        assert "generated_at" not in pipeline.stages.get("executive_summary")
+
+    def test_summary_is_stamped_per_call(self, pipeline, monkeypatch):
+        """``generated_at`` is the request time, not the first compute time."""
+
+        class Later:
+            @staticmethod
+            def now():
+                return datetime(2099, 1, 1)
+
+        first = pipeline.generate_executive_summary()["generated_at"]
+        monkeypatch.setattr("src.pipeline.datetime", Later)
+        second = pipeline.generate_executive_summary()["generated_at"]
+
+        assert second == "2099-01-01T00:00:00" and first != second
+        assert pipeline.stage_timings()["executive_summary"]["computes"] == 1
+
+    def test_no_loans(self):
+        """Without a loan tape every stage degrades to empty results."""
+        pipeline = CommercialViewPipeline()
+
+        assert pipeline.compute_portfolio_metrics() == {}
+        assert pipeline.compute_dpd_metrics().empty
+        assert pipeline.compute_recovery_metrics().empty
+        assert pipeline.generate_executive_summary()["data_quality"] == {
+            "datasets_loaded": 0,
+            "total_loans": 0,
+            "total_payments": 0,
+        }
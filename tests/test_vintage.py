@@ -0,0 +1,205 @@
+"""Test suite for the vintage (static-pool) curve engine."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.pipeline import CommercialViewPipeline
+from src.vintage import VintageEngine, month_codes
+
+PAYMENT_FILE = "Abaco - Loan Tape_Historic Real Payment_Table.csv"
+
+
+def _nan_list(values):
+    return [None if np.isnan(v) else round(float(v), 6) for v in values]
+
+
+class TestMonthCodes:
+    """Tests for integer month codes."""
+
+    def test_codes_are_period_ordinals(self):
+        """Month codes count months since 1970-01; missing dates are -1."""
+        codes = month_codes(pd.Series(["1970-01-31", "2024-02-29", None]))
+        assert codes.tolist() == [0, 649, -1]
+
+
+class TestVintageCurves:
+    """Tests for cohort curves."""
+
+    def test_recovery_over_cohort_disbursement(self, loans, payments):
+        """Recovery is cumulative principal over the whole cohort's disbursement."""
+        engine = VintageEngine(loans)
+        engine.add_payments(payments)
+        curves = engine.curves()
+
+        assert curves.cohorts.astype(str).tolist() == ["2024-01", "2024-02"]
+        assert curves.disbursed.tolist() == [500.0, 50.0]
+        recovery = curves.frame("recovery")
+        assert _nan_list(recovery.loc["2024-01"]) == [0.0, 0.2, 0.4]
+        assert _nan_list(recovery.loc["2024-02"]) == [1.0, 1.0, None]
+
+    def test_recovery_summary(self, loans, payments):
+        """The summary lists observed cells with percentages."""
+        engine = VintageEngine(loans)
+        engine.add_payments(payments)
+        summary = engine.curves().recovery_summary()
+
+        assert summary["months_since_disbursement"].tolist() == [0, 1, 2, 0, 1]
+        assert summary["recovery_pct"].tolist() == [0.0, 20.0, 40.0, 100.0, 100.0]
+        assert summary["Disbursement Amount"].tolist() == [500.0] * 3 + [50.0] * 2
+
+    def test_early_payment_counts_in_disbursement_month(self, loans):
+        """Payments dated before disbursement land in month zero."""
+        engine = VintageEngine(loans)
+        engine.add_payments(
+            pd.DataFrame(
+                {
+                    "Loan ID": ["B", "Z"],
+                    "True Payment Date": ["2024-01-28", "2024-02-02"],
+                    "True Principal Payment": [10.0, 99.0],
+                }
+            )
+        )
+        recovery = engine.curves().frame("recovery")
+        assert recovery.loc["2024-02", 0] == pytest.approx(0.2)
+        assert recovery.loc["2024-01"].max() == 0.0
+
+    def test_delinquency_curves(self, loans, schedule, payments):
+        """DPD 30+ uses month-end balances; the open month is not computed."""
+        engine = VintageEngine(loans)
+        engine.add_payments(payments)
+        assert engine.update_delinquency(schedule, payments) == 2
+        dpd_30 = engine.curves().frame("dpd_30_plus")
+
+        # C's January installment is 35 days late at the end of February
+        assert _nan_list(dpd_30.loc["2024-01"]) == [0.0, 0.6, None]
+        assert _nan_list(dpd_30.loc["2024-02"]) == [0.0, None, None]
+
+    def test_charge_off_is_counted_once(self, loans, schedule, payments):
+        """A loan charges off in the month it first passes the threshold."""
+        later = pd.concat(
+            [
+                payments,
+                pd.DataFrame(
+                    {
+                        "Loan ID": ["A"],
+                        "True Payment Date": pd.to_datetime(["2024-09-05"]),
+                        "True Principal Payment": [0.0],
+                    }
+                ),
+            ],
+            ignore_index=True,
+        )
+        engine = VintageEngine(loans)
+        engine.add_payments(later)
+        engine.update_delinquency(schedule, later)
+        curves = engine.curves()
+
+        # Due 2024-01-25, C is 188 days past due at the end of July
+        charge_off = curves.frame("charge_off").loc["2024-01"]
+        assert _nan_list(charge_off) == [0.0] * 6 + [0.6, 0.6, None]
+        # and 96 days at the end of April
+        dpd_90 = curves.frame("dpd_90_plus").loc["2024-01"]
+        assert _nan_list(dpd_90)[2:] == [0.0, 0.6, 0.6, 0.6, 0.6, 0.6, None]
+
+    def test_incremental_update_matches_full_build(self):
+        """Adding payments month by month gives the full-build curves."""
+        rng = np.random.default_rng(22)
+        n = 40
+        loans = pd.DataFrame(
+            {
+                "Loan ID": [f"L{i}" for i in range(n)],
+                "Disbursement Date": pd.Timestamp("2024-01-01")
+                + pd.to_timedelta(rng.integers(0, 150, n), unit="D"),
+                "Disbursement Amount": rng.integers(100, 1000, n).astype(float),
+            }
+        )
+        due = loans["Disbursement Date"] + pd.to_timedelta(30, unit="D")
+        schedule = pd.DataFrame(
+            {
+                "Loan ID": loans["Loan ID"],
+                "Payment Date": due,
+                "Principal Payment": loans["Disbursement Amount"],
+            }
+        )
+        paying = rng.random(n) < 0.7
+        payments = pd.DataFrame(
+            {
+                "Loan ID": loans["Loan ID"][paying],
+                "True Payment Date": due[paying]
+                + pd.to_timedelta(rng.integers(-5, 200, paying.sum()), unit="D"),
+                "True Principal Payment": loans["Disbursement Amount"][paying],
+            }
+        ).sort_values("True Payment Date", ignore_index=True)
+
+        full = VintageEngine(loans)
+        full.add_payments(payments)
+        full.update_delinquency(schedule, payments)
+
+        incremental = VintageEngine(loans)
+        previous = pd.Timestamp.min
+        for cut in [*pd.date_range("2024-03-15", "2025-03-15", freq="45D"), None]:
+            dates = payments["True Payment Date"]
+            seen = payments if cut is None else payments[dates <= cut]
+            incremental.add_payments(seen[seen["True Payment Date"] > previous])
+            incremental.update_delinquency(schedule, seen)
+            previous = dates.max() if cut is None else cut
+
+        expected, actual = full.curves(), incremental.curves()
+        for name in expected.curves:
+            np.testing.assert_allclose(
+                actual.curves[name], expected.curves[name], equal_nan=True
+            )
+
+
+class TestPipelineIntegration:
+    """Tests for vintage curves in the pipeline."""
+
+    def test_compute_vintage_curves(self, loans, schedule, payments):
+        """The pipeline exposes the curves and derives recovery metrics."""
+        pipeline = CommercialViewPipeline()
+        pipeline._datasets = {
+            "loan_data": loans,
+            "payment_schedule": schedule,
+            "historic_real_payment": payments,
+        }
+
+        curves = pipeline.compute_vintage_curves()
+        recovery = pipeline.compute_recovery_metrics()
+
+        assert curves.frame("dpd_30_plus").loc["2024-01", 1] == pytest.approx(0.6)
+        assert recovery["recovery_pct"].tolist() == [0.0, 20.0, 40.0, 100.0, 100.0]
+
+    def test_payment_refresh_updates_engine_in_place(
+        self, tmp_path, loans, schedule, payments
+    ):
+        """Appended payments are added to the existing engine, not rebuilt."""
+        pytest.importorskip("pyarrow")
+        rows = payments.sort_values("True Payment Date", ignore_index=True)
+        rows.iloc[:2].to_csv(tmp_path / PAYMENT_FILE, index=False)
+        pipeline = CommercialViewPipeline(tmp_path)
+        pipeline._datasets = {"loan_data": loans, "payment_schedule": schedule}
+        pipeline.refresh_payment_history()
+        pipeline.compute_vintage_curves()
+        engine = pipeline._vintage_engine
+
+        rows.iloc[2:].to_csv(
+            tmp_path / PAYMENT_FILE, mode="a", header=False, index=False
+        )
+        pipeline.refresh_payment_history()
+        curves = pipeline.compute_vintage_curves()
+
+        assert pipeline._vintage_engine is engine
+        full = VintageEngine(loans)
+        full.add_payments(payments)
+        full.update_delinquency(schedule, payments)
+        for name, expected in full.curves().curves.items():
+            np.testing.assert_allclose(curves.curves[name], expected, equal_nan=True)
+
+    def test_without_payments(self, loans):
+        """Without a payment table there are no curves."""
+        pipeline = CommercialViewPipeline()
+        pipeline._datasets = {"loan_data": loans}
+
+        assert pipeline.compute_vintage_curves() is None
+        assert pipeline.compute_recovery_metrics().empty